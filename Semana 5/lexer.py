@@ -11,7 +11,7 @@ Usage:
 """
 from dataclasses import dataclass
 import re
-from typing import Iterator, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
 @dataclass
@@ -27,6 +27,33 @@ class LexerError(Exception):
     pass
 
 
+# Specification names that are reported under a different token kind
+_KIND_FOR_SPEC = {
+    "KW": "PALAVRA_CHAVE",
+    "OP_ARITMETICO": "OP",
+    "OP_RELACIONAL": "OP",
+}
+# Consumed but never emitted
+_SKIPPED_KINDS = ("WHITESPACE", "COMMENT", "NEWLINE")
+
+
+def _compile_specification(spec: List[Tuple[str, str]]):
+    """Build the master regex and its group name -> token kind table.
+
+    Each alternative becomes group ``T<idx>`` so ``match.lastgroup`` identifies
+    the rule that fired without scanning ``groupdict()``. Skipped kinds map
+    to ``None``.
+    """
+    master_re = re.compile("|".join(
+        f"(?P<T{idx}>{pattern})" for idx, (_, pattern) in enumerate(spec)
+    ))
+    group_kinds = {
+        f"T{idx}": (None if name in _SKIPPED_KINDS else _KIND_FOR_SPEC.get(name, name))
+        for idx, (name, _) in enumerate(spec)
+    }
+    return master_re, group_kinds
+
+
 class Lexer:
     """Regex-based lexer for BrasilScript.
 
@@ -83,57 +110,30 @@ class Lexer:
         ("MISMATCH", r".")
     ]
 
+    # Master regex and group -> kind table, built once per class (see below)
+    master_re: "re.Pattern[str]"
+    group_kinds: Dict[str, Optional[str]]
+
     def __init__(self, source: str):
         self.source = source
-        # Build master regex
-        parts = []
-        for idx, (name, pattern) in enumerate(self.token_specification):
-            parts.append(f"(?P<T{idx}>{pattern})")
-        # Use DOTALL only indirectly -- we handle newlines explicitly above
-        self.master_re = re.compile("|".join(parts))
 
     def tokenize(self) -> Iterator[Token]:
-        # Iterate matches in source
+        group_kinds = self.group_kinds
+        # Iterate matches in source; `lastgroup` names the alternative that fired
         for mo in self.master_re.finditer(self.source):
-            kind = None
-            value = mo.group(0)
-            # determine which named group matched
-            groupdict = mo.groupdict()
-            for idx, (name, _) in enumerate(self.token_specification):
-                if groupdict.get(f"T{idx}") is not None:
-                    kind = name
-                    break
-
+            kind = group_kinds[mo.lastgroup]
             if kind is None:
-                # should not happen because MISMATCH covers others
-                raise LexerError("Token desconhecido")
-
-            if kind in ("WHITESPACE", "COMMENT", "NEWLINE"):
-                # skip but continue (we still consume these parts)
+                # whitespace, comments and newlines are consumed but not emitted
                 continue
 
             if kind == "MISMATCH":
                 # unexpected single character
-                raise LexerError(f"Caractere inválido: {value!r}")
-
-            # For invalid identifiers, produce a token so parser can report error
-            normalized_kind = kind
-            if kind == "KW":
-                normalized_kind = "PALAVRA_CHAVE"
-            elif kind == "IDENTIFICADOR":
-                normalized_kind = "IDENTIFICADOR"
-            elif kind == "IDENTIFICADOR_INVALIDO":
-                normalized_kind = "IDENTIFICADOR_INVALIDO"
-            elif kind == "NUMERO_LITERAL":
-                normalized_kind = "NUMERO_LITERAL"
-            elif kind == "STRING_LITERAL":
-                normalized_kind = "STRING_LITERAL"
-            elif kind == "LOGICO_LITERAL":
-                normalized_kind = "LOGICO_LITERAL"
-            elif kind in ("OP_ARITMETICO", "OP_RELACIONAL"):
-                normalized_kind = "OP"
-
-            yield Token(normalized_kind, value)
+                raise LexerError(f"Caractere inválido: {mo.group()!r}")
+
+            yield Token(kind, mo.group())
+
+
+Lexer.master_re, Lexer.group_kinds = _compile_specification(Lexer.token_specification)
 
 
 if __name__ == "__main__":
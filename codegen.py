@@ -8,19 +8,73 @@ Uso:
 Requer: llvmlite
     pip install llvmlite
 """
+import re
 from llvmlite import ir
 from typing import Dict
 
+from parser.ast import FunctionDecl, ReturnStatement
+from parser.inference import infer_program
+from parser.lazy import check_bodies
+from parser.typetable import LOGICO, TEXTO, type_from_name
+from parser.visitor import NodeVisitor
 
-class CodeGen:
+
+def llvm_type(type_):
+    """Tipo nativo de um tipo inferido: numero -> double, logico -> i1, texto -> i8*
+
+    Listas, 'any' e tipos desconhecidos continuam como double.
+    """
+    if type_ is LOGICO:
+        return ir.IntType(1)
+    if type_ is TEXTO:
+        return ir.IntType(8).as_pointer()
+    return ir.DoubleType()
+
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+
+
+def text_value(lexeme: str) -> str:
+    """Conteúdo de um literal texto do fonte: sem as aspas e com os escapes trocados"""
+    if len(lexeme) >= 2 and lexeme[0] == lexeme[-1] and lexeme[0] in "\"'":
+        lexeme = lexeme[1:-1]
+    return re.sub(r"\\(.)", lambda m: _ESCAPES.get(m.group(1), m.group(1)), lexeme, flags=re.S)
+
+
+class CodeGenError(Exception):
+    """Construção sem tradução para os tipos nativos (ex.: texto + numero)"""
+    pass
+
+
+# tipos usados pelas chamadas à libc
+_CHAR_PTR = ir.IntType(8).as_pointer()
+_SIZE_T = ir.IntType(64)
+_COMPARISONS = ("==", "!=", "<", "<=", ">", ">=")
+
+
+class CodeGen(NodeVisitor):
     def __init__(self):
+        super().__init__()
         self.module = ir.Module(name="brasilscript")
         self.printf = None
+        # nome da instância (parser.inference) -> função LLVM
         self.functions: Dict[str, ir.Function] = {}
+        # tipos inferidos do programa e instância cujo corpo está sendo gerado (None: main)
+        self.types = None
+        self._instance = None
         # mapeamento nome da função atual -> tabela de símbolos local (nome->alloca)
         self.locals = {}
+        # allocas do frame atual por índice de slot (nós anotados pela análise
+        # semântica) e profundidade desse frame: 0 no main, 1 nas funções
+        self._frame = []
+        self._frame_depth = 0
+        # frame 0: as variáveis do main são globais do módulo, lidas também pelas funções
+        self._globals = []
         # auxiliar para gerar nomes de strings únicos
         self._str_count = 0
+        # despacho por classe do nó: gen_<Classe> para statements, expr_<Classe> para expressões
+        self._statements = self.dispatch_table("gen_", self._gen_other)
+        self._expressions = self.dispatch_table("expr_", self._expr_other)
 
     # --- declarações de tempo de execução ---
     def declare_printf(self):
@@ -30,6 +84,13 @@ class CodeGen:
             self.printf = ir.Function(self.module, printf_ty, name="printf")
         return self.printf
 
+    def declare_runtime(self, name, return_type, argument_types):
+        # função da libc usada pelo código gerado (strlen, malloc, strcmp...), declarada uma vez
+        fn = self.module.globals.get(name)
+        if fn is None:
+            fn = ir.Function(self.module, ir.FunctionType(return_type, argument_types), name=name)
+        return fn
+
     def new_string_constant(self, value: str) -> ir.Constant:
         # cria uma constante global (string em C) e retorna char*
         name = f".str{self._str_count}"
@@ -42,27 +103,29 @@ class CodeGen:
         return gvar.bitcast(ir.IntType(8).as_pointer())
 
     # --- criação de módulo/função ---
-    def declare_function_prototypes(self, program):
-        # percorre declarações de função e cria protótipos (retorno double, parâmetros double)
-        for stmt in program.statements:
-            if type(stmt).__name__ == "FunctionDecl":
-                param_count = len(stmt.parameters)
-                func_ty = ir.FunctionType(ir.DoubleType(), [ir.DoubleType()] * param_count)
-                fn = ir.Function(self.module, func_ty, name=stmt.name)
-                # nomeia parâmetros
-                for i, name in enumerate(stmt.parameters):
-                    fn.args[i].name = name
-                self.functions[stmt.name] = fn
+    def declare_function_prototypes(self, instances):
+        # cria um protótipo por instância (parser.inference), com os tipos nativos
+        # dos parâmetros e do retorno; clones de uma função têm nomes "nome.N"
+        for instance in instances:
+            stmt = instance.function
+            func_ty = ir.FunctionType(llvm_type(instance.returns),
+                                      [llvm_type(t) for t in instance.parameters])
+            fn = ir.Function(self.module, func_ty, name=instance.name)
+            # nomeia parâmetros
+            for i, name in enumerate(stmt.parameters):
+                fn.args[i].name = name
+            self.functions[instance.name] = fn
 
     def generate(self, program):
         # declara printf
         self.declare_printf()
-        # declara protótipos
-        self.declare_function_prototypes(program)
-        # gera corpos das funções
-        for stmt in program.statements:
-            if type(stmt).__name__ == "FunctionDecl":
-                self.gen_function(stmt)
+        # tipos de parâmetros e retornos das funções alcançáveis do nível superior,
+        # com um clone por combinação de tipos de argumentos
+        # com parser.lazy os erros dos corpos não estão nos erros do programa, e um
+        # corpo com erro pode mudar o nível superior depois dele: não gera nada
+        check_bodies(program.statements)
+        self.types = infer_program(program)
+        self.declare_function_prototypes(self.types)
         # gera função main que executa statements de nível superior
         main_ty = ir.FunctionType(ir.IntType(32), [])
         main_fn = ir.Function(self.module, main_ty, name="main")
@@ -70,245 +133,252 @@ class CodeGen:
         builder = ir.IRBuilder(block)
         # configura tabela de locais (variáveis) para main
         self.locals = {}
+        self._globals = self._frame = [None] * program.frame_size
+        self._frame_depth = 0
         self._builder = builder
+        self._instance = None
         for stmt in program.statements:
-            if type(stmt).__name__ != "FunctionDecl":
+            if not isinstance(stmt, FunctionDecl):
                 self.gen_statement(stmt)
         builder.ret(ir.Constant(ir.IntType(32), 0))
+        # gera corpos das funções depois do main: os slots do frame 0 já têm as globais
+        for instance in self.types:
+            self.gen_function(instance)
         return self.module
 
     # --- auxiliares para gerenciar variáveis locais ---
-    def alloc_local(self, name: str):
-        # aloca na entrada da função atual
-        builder = self._builder
-        ptr = builder.alloca(ir.DoubleType(), name=name)
+    def alloc_local(self, name: str, ty=None, slot=None):
+        # aloca na entrada da função atual (double, se o tipo não for dado); uma
+        # variável com slot no frame 0 é uma global do módulo, iniciada com zero
+        ty = ty if ty is not None else ir.DoubleType()
+        if slot is not None and slot[0] == 0 == self._frame_depth:
+            ptr = ir.GlobalVariable(self.module, ty, name=self.module.get_unique_name("g." + name))
+            ptr.initializer = ir.Constant(ty, None)
+        else:
+            ptr = self._builder.alloca(ty, name=name)
         self.locals[name] = ptr
+        if slot is not None and slot[0] == self._frame_depth:
+            self._frame[slot[1]] = ptr
         return ptr
 
-    def get_local(self, name: str):
+    def get_local(self, name: str, slot=None):
+        # com o slot resolvido pela análise semântica, um acesso ao array do frame
+        # atual ou ao das globais; sem ele (AST não analisada), busca pelo nome
+        if slot is not None:
+            depth, index = slot
+            frame = self._frame if depth == self._frame_depth else self._globals if depth == 0 else None
+            if frame is not None and frame[index] is not None:
+                return frame[index]
         return self.locals.get(name)
 
     # --- geração de código para statements ---
     def gen_statement(self, stmt):
-        kind = type(stmt).__name__
-        if kind == "Declaration":
-            self.gen_declaration(stmt)
-        elif kind == "Assignment":
-            self.gen_assignment(stmt)
-        elif kind == "PrintStatement":
-            self.gen_print(stmt)
-        elif kind == "IfStatement":
-            self.gen_if(stmt)
-        elif kind == "WhileStatement":
-            self.gen_while(stmt)
-        elif kind == "RepeatStatement":
-            self.gen_repeat(stmt)
-        elif kind == "ReturnStatement":
-            # return válido apenas dentro de funções - ignorar no nível do módulo
-            pass
-        else:
-            # statements não suportados: ForEach, FunctionCall no nível superior
-            if kind == "FunctionCall":
-                self.gen_function_call(stmt)
-            else:
-                # ignorar outros statements por enquanto
-                pass
+        self._statements[stmt.__class__](stmt)
 
-    def gen_declaration(self, decl):
-        ptr = self.alloc_local(decl.identifier)
+    def _gen_other(self, stmt):
+        # ReturnStatement (válido apenas dentro de funções) é ignorado no nível do módulo;
+        # statements não suportados (ForEach, funções aninhadas) também, por enquanto
+        pass
+
+    def gen_Declaration(self, decl):
+        # a variável tem o tipo nativo do tipo declarado (texto -> i8*, logico -> i1)
+        ty = llvm_type(type_from_name(decl.type_name))
+        ptr = self.alloc_local(decl.identifier, ty, decl.slot)
         if decl.initial_value is not None:
             val = self.gen_expr(decl.initial_value)
-            # tenta armazenar double
-            if val.type == ir.DoubleType():
-                self._builder.store(val, ptr)
-            else:
-                # tenta converter i1 para double
-                if isinstance(val.type, ir.IntType) and val.type.width == 1:
-                    conv = self._builder.uitofp(val, ir.DoubleType())
-                    self._builder.store(conv, ptr)
-                else:
-                    # tipo não suportado, armazena 0.0
-                    self._builder.store(ir.Constant(ir.DoubleType(), 0.0), ptr)
+            self._builder.store(self._coerce(val, ty), ptr)
 
-    def gen_assignment(self, stmt):
-        ptr = self.get_local(stmt.identifier)
-        if ptr is None:
-            ptr = self.alloc_local(stmt.identifier)
+    def gen_Assignment(self, stmt):
         val = self.gen_expr(stmt.value)
-        if val.type == ir.DoubleType():
-            self._builder.store(val, ptr)
-        else:
-            if isinstance(val.type, ir.IntType) and val.type.width == 1:
-                conv = self._builder.uitofp(val, ir.DoubleType())
-                self._builder.store(conv, ptr)
-            else:
-                # não suportado - armazena 0
-                self._builder.store(ir.Constant(ir.DoubleType(), 0.0), ptr)
+        ptr = self.get_local(stmt.identifier, stmt.slot)
+        if ptr is None:
+            ptr = self.alloc_local(stmt.identifier, val.type, stmt.slot)
+        self._builder.store(self._coerce(val, ptr.type.pointee), ptr)
 
-    def gen_print(self, stmt):
+    def gen_PrintStatement(self, stmt):
         printf = self.declare_printf()
         for expr in stmt.expressions:
-            # se for um literal texto
-            from parser.ast import Literal
-            if isinstance(expr, Literal) and expr.type == "texto":
-                ptr = self.new_string_constant(expr.value)
-                fmt = ptr
-                # chama printf com string única
-                self._builder.call(printf, [fmt])
+            # literais, variáveis e concatenações de texto saem iguais: "%s\n"
+            # (um literal dobrado por parser.folding imprime o mesmo que a expressão)
+            val = self.gen_expr(expr)
+            if isinstance(val.type, ir.PointerType):
+                fmtptr = self.new_string_constant("%s\n")
             else:
                 # tratar como número
-                val = self.gen_expr(expr)
-                # cria string de formato "%f\n"
+                val = self._coerce_to_double(val)
                 fmtptr = self.new_string_constant("%f\n")
-                self._builder.call(printf, [fmtptr, val])
+            self._builder.call(printf, [fmtptr, val])
 
     # --- expressões ---
     def gen_expr(self, node):
-        from parser.ast import Literal, Identifier, BinaryOperation, UnaryOperation, FunctionCall
-        if isinstance(node, Literal):
-            if node.type == "numero":
-                return ir.Constant(ir.DoubleType(), float(node.value))
-            if node.type == "texto":
-                return self.new_string_constant(node.value)
-            if node.type == "logico":
-                return ir.Constant(ir.IntType(1), 1 if node.value else 0)
-            # fallback / caso padrão
-            return ir.Constant(ir.DoubleType(), 0.0)
-        if isinstance(node, Identifier):
-            ptr = self.get_local(node.name)
-            if ptr is None:
-                # inicializa implicitamente com zero
-                ptr = self.alloc_local(node.name)
-                self._builder.store(ir.Constant(ir.DoubleType(), 0.0), ptr)
-            return self._builder.load(ptr)
-        if isinstance(node, UnaryOperation):
-            op = node.operator
-            val = self.gen_expr(node.operand)
-            if op == "-":
-                return self._builder.fsub(ir.Constant(ir.DoubleType(), 0.0), val)
-            if op == "nao":
-                # not lógico: assume operando é i1 ou conversível
-                if isinstance(val.type, ir.IntType) and val.type.width == 1:
-                    return self._builder.not_(val)
-                else:
-                    # compara com zero
-                    cmp = self._builder.fcmp_ordered('==', val, ir.Constant(ir.DoubleType(), 0.0))
-                    return cmp
-        if isinstance(node, BinaryOperation):
-            l = self.gen_expr(node.left)
-            r = self.gen_expr(node.right)
-            op = node.operator
-            if op == "+":
-                return self._builder.fadd(l, r)
-            if op == "-":
-                return self._builder.fsub(l, r)
-            if op == "*":
-                return self._builder.fmul(l, r)
-            if op == "/":
-                return self._builder.fdiv(l, r)
-            if op in ("==", "!=", "<", "<=", ">", ">="):
-                if op == "==":
-                    cmp = self._builder.fcmp_ordered('==', l, r)
-                elif op == "!=":
-                    cmp = self._builder.fcmp_ordered('!=', l, r)
-                elif op == "<":
-                    cmp = self._builder.fcmp_ordered('<', l, r)
-                elif op == "<=":
-                    cmp = self._builder.fcmp_ordered('<=', l, r)
-                elif op == ">":
-                    cmp = self._builder.fcmp_ordered('>', l, r)
-                else:
-                    cmp = self._builder.fcmp_ordered('>=', l, r)
-                # retorna i1
-                return cmp
-            # fallback / padrão
-            return l
-        if isinstance(node, FunctionCall):
-            fn = self.functions.get(node.name)
-            if fn is None:
-                # função desconhecida - retorna 0.0
-                return ir.Constant(ir.DoubleType(), 0.0)
-            args = [self._coerce_to_double(self.gen_expr(a)) for a in node.arguments]
-            return self._builder.call(fn, args)
+        return self._expressions[node.__class__](node)
+
+    def _expr_other(self, node):
         # padrão
         return ir.Constant(ir.DoubleType(), 0.0)
 
-    def _coerce_to_double(self, val):
-        if val.type == ir.DoubleType():
+    def expr_Literal(self, node):
+        if node.type == "numero":
+            return ir.Constant(ir.DoubleType(), float(node.value))
+        if node.type == "texto":
+            return self.new_string_constant(text_value(node.value))
+        if node.type == "logico":
+            return ir.Constant(ir.IntType(1), 1 if node.value else 0)
+        # fallback / caso padrão
+        return ir.Constant(ir.DoubleType(), 0.0)
+
+    def expr_Identifier(self, node):
+        ptr = self.get_local(node.name, node.slot)
+        if ptr is None:
+            # inicializa implicitamente com zero
+            ptr = self.alloc_local(node.name, slot=node.slot)
+            self._builder.store(ir.Constant(ir.DoubleType(), 0.0), ptr)
+        return self._builder.load(ptr)
+
+    def expr_UnaryOperation(self, node):
+        op = node.operator
+        val = self.gen_expr(node.operand)
+        if op == "-":
+            return self._builder.fsub(ir.Constant(ir.DoubleType(), 0.0), self._coerce_to_double(val))
+        if op == "nao":
+            # not lógico: operando i1, ou double comparado com zero
+            return self._builder.not_(self._coerce(val, ir.IntType(1)))
+        return self._expr_other(node)
+
+    def expr_BinaryOperation(self, node):
+        l = self.gen_expr(node.left)
+        r = self.gen_expr(node.right)
+        op = node.operator
+        if isinstance(l.type, ir.PointerType) or isinstance(r.type, ir.PointerType):
+            return self._text_operation(op, l, r)
+        if op in ("e", "ou"):
+            l = self._coerce(l, ir.IntType(1))
+            r = self._coerce(r, ir.IntType(1))
+            return self._builder.and_(l, r) if op == "e" else self._builder.or_(l, r)
+        # lógicos (i1) entram nas operações como double
+        l = self._coerce_to_double(l)
+        r = self._coerce_to_double(r)
+        if op == "+":
+            return self._builder.fadd(l, r)
+        if op == "-":
+            return self._builder.fsub(l, r)
+        if op == "*":
+            return self._builder.fmul(l, r)
+        if op == "/":
+            return self._builder.fdiv(l, r)
+        if op == "%":
+            return self._builder.frem(l, r)
+        if op in _COMPARISONS:
+            # retorna i1
+            return self._builder.fcmp_ordered(op, l, r)
+        raise CodeGenError(f"operador '{op}' não suportado")
+
+    def _text_operation(self, op, l, r):
+        # texto (i8*) só opera com texto: '+' concatena, comparações usam a strcmp
+        if l.type != r.type:
+            raise CodeGenError(f"operador '{op}' entre {l.type} e {r.type} não suportado")
+        if op == "+":
+            return self._concat(l, r)
+        if op in _COMPARISONS:
+            strcmp = self.declare_runtime("strcmp", ir.IntType(32), [_CHAR_PTR, _CHAR_PTR])
+            order = self._builder.call(strcmp, [l, r])
+            return self._builder.icmp_signed(op, order, ir.Constant(ir.IntType(32), 0))
+        raise CodeGenError(f"operador '{op}' não suportado para texto")
+
+    def _concat(self, l, r):
+        # novo buffer de strlen(l) + strlen(r) + 1 bytes (nunca liberado)
+        strlen = self.declare_runtime("strlen", _SIZE_T, [_CHAR_PTR])
+        malloc = self.declare_runtime("malloc", _CHAR_PTR, [_SIZE_T])
+        strcpy = self.declare_runtime("strcpy", _CHAR_PTR, [_CHAR_PTR, _CHAR_PTR])
+        strcat = self.declare_runtime("strcat", _CHAR_PTR, [_CHAR_PTR, _CHAR_PTR])
+        b = self._builder
+        size = b.add(b.add(b.call(strlen, [l]), b.call(strlen, [r])), ir.Constant(_SIZE_T, 1))
+        buffer = b.call(malloc, [size])
+        b.call(strcpy, [buffer, l])
+        return b.call(strcat, [buffer, r])
+
+    def expr_FunctionCall(self, node):
+        fn = self.get_callee(node)
+        if fn is None:
+            # função desconhecida - retorna 0.0
+            return ir.Constant(ir.DoubleType(), 0.0)
+        return self._builder.call(fn, self.gen_arguments(node, fn))
+
+    def get_callee(self, node):
+        # instância chamada neste ponto (parser.inference); sem ela, a função de mesmo nome
+        target = self.types.target(node, self._instance) if self.types is not None else None
+        return self.functions.get(target.name if target is not None else node.name)
+
+    def gen_arguments(self, node, fn):
+        # argumentos convertidos para os tipos dos parâmetros da instância
+        return [self._coerce(self.gen_expr(a), param.type) for a, param in zip(node.arguments, fn.args)]
+
+    def _coerce(self, val, ty):
+        # converte val para o tipo LLVM ty: i1 <-> double; texto não converte
+        if val.type == ty:
             return val
-        if isinstance(val.type, ir.IntType) and val.type.width == 1:
-            return self._builder.uitofp(val, ir.DoubleType())
-        return val
+        if isinstance(ty, ir.DoubleType) and isinstance(val.type, ir.IntType) and val.type.width == 1:
+            return self._builder.uitofp(val, ty)
+        if isinstance(ty, ir.IntType) and ty.width == 1 and isinstance(val.type, ir.DoubleType):
+            return self._builder.fcmp_ordered('!=', val, ir.Constant(val.type, 0.0))
+        raise CodeGenError(f"não é possível converter {val.type} para {ty}")
+
+    def _coerce_to_double(self, val):
+        return self._coerce(val, ir.DoubleType())
 
     # --- fluxo de controle ---
-    def gen_if(self, stmt):
-        condv = self.gen_expr(stmt.condition)
-        # garante i1
-        if isinstance(condv.type, ir.DoubleType):
-            cond = self._builder.fcmp_ordered('!=', condv, ir.Constant(ir.DoubleType(), 0.0))
-        else:
-            cond = condv
-        then_bb = self._builder.append_basic_block('then')
-        else_bb = self._builder.append_basic_block('else')
+    def gen_condition(self, node):
+        # condição como i1 (um double é comparado com zero)
+        return self._coerce(self.gen_expr(node), ir.IntType(1))
+
+    def gen_IfStatement(self, stmt):
         end_bb = self._builder.append_basic_block('ifend')
-        self._builder.cbranch(cond, then_bb, else_bb)
-        # then
-        self._builder.position_at_end(then_bb)
-        for s in stmt.then_block:
-            self.gen_statement(s)
-        self._builder.branch(end_bb)
-        # else/elseifs
-        self._builder.position_at_end(else_bb)
-        # trata apenas o primeiro else_if por simplicidade
-        if stmt.else_ifs:
-            # apenas trata o primeiro else_if
-            cond2, block2 = stmt.else_ifs[0]
-            for s in block2:
-                self.gen_statement(s)
-        if stmt.else_block:
-            for s in stmt.else_block:
+        # `se` e cada `senao_se`: testa a condição, senão segue para o próximo teste
+        for condition, block in [(stmt.condition, stmt.then_block)] + list(stmt.else_ifs):
+            cond = self.gen_condition(condition)
+            then_bb = self._builder.append_basic_block('then')
+            else_bb = self._builder.append_basic_block('else')
+            self._builder.cbranch(cond, then_bb, else_bb)
+            self._builder.position_at_end(then_bb)
+            for s in block:
                 self.gen_statement(s)
+            self._builder.branch(end_bb)
+            self._builder.position_at_end(else_bb)
+        for s in stmt.else_block or []:
+            self.gen_statement(s)
         self._builder.branch(end_bb)
         self._builder.position_at_end(end_bb)
 
-    def gen_while(self, stmt):
+    def gen_WhileStatement(self, stmt):
         loop_bb = self._builder.append_basic_block('loop')
+        body_bb = self._builder.append_basic_block('loopbody')
         after_bb = self._builder.append_basic_block('loopend')
-        # branch inicial
+        # a condição é testada antes de cada volta, inclusive a primeira
         self._builder.branch(loop_bb)
         self._builder.position_at_end(loop_bb)
-        condv = self.gen_expr(stmt.condition)
-        if isinstance(condv.type, ir.DoubleType):
-            cond = self._builder.fcmp_ordered('!=', condv, ir.Constant(ir.DoubleType(), 0.0))
-        else:
-            cond = condv
-        # corpo
+        self._builder.cbranch(self.gen_condition(stmt.condition), body_bb, after_bb)
+        self._builder.position_at_end(body_bb)
         for s in stmt.body:
             self.gen_statement(s)
-        # reavalia e faz branch
-        self._builder.cbranch(cond, loop_bb, after_bb)
+        self._builder.branch(loop_bb)
         self._builder.position_at_end(after_bb)
 
-    def gen_repeat(self, stmt):
+    def gen_RepeatStatement(self, stmt):
         # repeat N vezes -> traduz para loop com contador simples
-        cnt = self.gen_expr(stmt.count)
+        cnt = self._coerce_to_double(self.gen_expr(stmt.count))
         # coerção para int por truncamento
-        if isinstance(cnt.type, ir.DoubleType):
-            n_int = self._builder.fptoui(cnt, ir.IntType(32))
-        else:
-            n_int = cnt
+        n_int = self._builder.fptoui(cnt, ir.IntType(32))
         # aloca contador
         cptr = self._builder.alloca(ir.IntType(32), name='rep_cnt')
         self._builder.store(ir.Constant(ir.IntType(32), 0), cptr)
         loop_bb = self._builder.append_basic_block('reploop')
+        body_bb = self._builder.append_basic_block('repbody')
         end_bb = self._builder.append_basic_block('repend')
         self._builder.branch(loop_bb)
         self._builder.position_at_end(loop_bb)
         cur = self._builder.load(cptr)
         cmp = self._builder.icmp_unsigned('<', cur, n_int)
-        self._builder.cbranch(cmp, loop_bb.append_basic_block('repl_body'), end_bb)
-        # ajuste de posição do corpo
-        body_bb = loop_bb.get_next_block()
+        self._builder.cbranch(cmp, body_bb, end_bb)
         self._builder.position_at_end(body_bb)
         for s in stmt.body:
             self.gen_statement(s)
@@ -319,56 +389,58 @@ class CodeGen:
         self._builder.position_at_end(end_bb)
 
     # --- funções ---
-    def gen_function(self, fdecl):
-        fn = self.functions.get(fdecl.name)
+    def gen_function(self, instance):
+        # gera o corpo de uma instância (parser.inference) da função
+        fn = self.functions.get(instance.name)
         if fn is None:
             return
+        fdecl = instance.function
         block = fn.append_basic_block('entry')
         builder = ir.IRBuilder(block)
-        # salva builder e tabela de locais
+        # salva builder, tabela de locais e instância
         prev_builder = getattr(self, '_builder', None)
         prev_locals = self.locals
+        prev_frame = self._frame, self._frame_depth
+        prev_instance = self._instance
         self._builder = builder
         self.locals = {}
+        self._frame = [None] * instance.frame_size
+        self._frame_depth = 1
+        self._instance = instance
         # argumentos de entrada
-        for arg in fn.args:
+        slots = instance.parameter_slots or [None] * len(fn.args)
+        for arg, slot in zip(fn.args, slots):
             # aloca local e armazena argumento
-            ptr = builder.alloca(ir.DoubleType(), name=arg.name)
+            ptr = self.alloc_local(arg.name, arg.type, slot)
             builder.store(arg, ptr)
-            self.locals[arg.name] = ptr
         # gera corpo
+        ret_ty = fn.function_type.return_type
         ret_val = None
         for s in fdecl.body:
-            if type(s).__name__ == 'ReturnStatement':
+            if isinstance(s, ReturnStatement):
                 if s.value is not None:
                     rv = self.gen_expr(s.value)
-                    rv = self._coerce_to_double(rv)
+                    rv = self._coerce(rv, ret_ty)
                     builder.ret(rv)
                     ret_val = True
                 else:
-                    builder.ret(ir.Constant(ir.DoubleType(), 0.0))
+                    builder.ret(ir.Constant(ret_ty, None))
                     ret_val = True
                 break
             else:
                 self.gen_statement(s)
         if not ret_val:
             # garante que a função retorne algo
-            builder.ret(ir.Constant(ir.DoubleType(), 0.0))
+            builder.ret(ir.Constant(ret_ty, None))
         # restaura
         self._builder = prev_builder
         self.locals = prev_locals
+        self._frame, self._frame_depth = prev_frame
+        self._instance = prev_instance
 
-    def gen_function_call(self, callnode):
+    def gen_FunctionCall(self, callnode):
         # permite chamada de função como statement
-        fn = self.functions.get(callnode.name)
+        fn = self.get_callee(callnode)
         if fn is None:
             return None
-        args = [self._coerce_to_double(self.gen_expr(a)) for a in callnode.arguments]
-        return self._builder.call(fn, args)
-
-    def _coerce_to_double(self, val):
-        if val.type == ir.DoubleType():
-            return val
-        if isinstance(val.type, ir.IntType) and val.type.width == 1:
-            return self._builder.uitofp(val, ir.DoubleType())
-        return val
+        return self._builder.call(fn, self.gen_arguments(callnode, fn))
@@ -76,20 +76,23 @@ def _make_nfa_numero():
     s3 = _fresh("num")
     s4 = _fresh("num")
     s5 = _fresh("num")
-    delta = {s0: {}, s1: {}, s2: {}, s3: {}, s4: {}, s5: {}}
+    s6 = _fresh("num")
+    delta = {s0: {}, s1: {}, s2: {}, s3: {}, s4: {}, s5: {}, s6: {}}
     for d in "0123456789":
         delta[s0].setdefault(d, set()).add(s1)
         delta[s1].setdefault(d, set()).add(s1)
         delta[s2].setdefault(d, set()).add(s3)
         delta[s3].setdefault(d, set()).add(s3)
         delta[s5].setdefault(d, set()).add(s5)
+        delta[s6].setdefault(d, set()).add(s5)
     delta[s1]["."] = {s2}
     delta[s1]["e"] = {s4}
     delta[s1]["E"] = {s4}
     delta[s3]["e"] = {s4}
     delta[s3]["E"] = {s4}
-    delta[s4]["+"] = {s5}
-    delta[s4]["-"] = {s5}
+    # o sinal do expoente precisa de pelo menos um dígito depois ("1e+" não é número)
+    delta[s4]["+"] = {s6}
+    delta[s4]["-"] = {s6}
     for d in "0123456789":
         delta[s4].setdefault(d, set()).add(s5)
     accepts = {s1: "NUMERO_LITERAL", s3: "NUMERO_LITERAL", s5: "NUMERO_LITERAL"}
@@ -97,34 +100,25 @@ def _make_nfa_numero():
     return {"start": s0, "delta": delta, "alphabet": alphabet, "accepts": accepts}
 
 def _make_nfa_string():
-    # Aspas duplas
+    # Aspas duplas ou simples; a aspa que fecha leva a um estado final só
+    # dela (voltar ao estado inicial juntava '"a""b"' num token só)
     s0 = _fresh("str")
-    s1 = _fresh("str")
-    s2 = _fresh("str")
-    delta = {s0: {}, s1: {}, s2: {}}
-    delta[s0]['"'] = {s1}
-    for c in (chr(i) for i in range(32, 127)):
-        if c not in ('"', '\\'):
-            delta[s1].setdefault(c, set()).add(s1)
-    delta[s1]['\\'] = {s2}
-    for c in (chr(i) for i in range(32, 127)):
-        delta[s2].setdefault(c, set()).add(s1)
-    delta[s1]['"'] = {s0}
-    accepts = {s0: "STRING_LITERAL"}
-    # Aspas simples (repete estrutura)
-    s3 = _fresh("str")
-    s4 = _fresh("str")
-    s5 = _fresh("str")
-    delta[s3] = {}; delta[s4] = {}; delta[s5] = {}
-    delta[s3]["'"] = {s4}
-    for c in (chr(i) for i in range(32, 127)):
-        if c not in ("'", "\\"):
-            delta[s4].setdefault(c, set()).add(s4)
-    delta[s4]["\\"] = {s5}
-    for c in (chr(i) for i in range(32, 127)):
-        delta[s5].setdefault(c, set()).add(s4)
-    delta[s4]["'"] = {s3}
-    accepts[s3] = "STRING_LITERAL"
+    s_end = _fresh("str")
+    delta = {s0: {}, s_end: {}}
+    for quote in ('"', "'"):
+        s1 = _fresh("str")
+        s2 = _fresh("str")
+        delta[s1] = {}
+        delta[s2] = {}
+        delta[s0][quote] = {s1}
+        for c in (chr(i) for i in range(32, 127)):
+            if c not in (quote, '\\'):
+                delta[s1].setdefault(c, set()).add(s1)
+        delta[s1]['\\'] = {s2}
+        for c in (chr(i) for i in range(32, 127)):
+            delta[s2].setdefault(c, set()).add(s1)
+        delta[s1][quote] = {s_end}
+    accepts = {s_end: "STRING_LITERAL"}
     alphabet = set(chr(i) for i in range(32, 127))
     return {"start": s0, "delta": delta, "alphabet": alphabet, "accepts": accepts}
 
@@ -232,8 +226,9 @@ def _make_basic_nfa_for_operators(start_id=2000):
     alphabet = set()
     for idx, op in enumerate(ops):
         cur = start
-        for ch in op:
-            nxt = f"op_{idx}_{ch}"
+        for pos, ch in enumerate(op):
+            # um estado por posição: com só o caractere no nome, "&&" e "==" viravam laços ("&", "===")
+            nxt = f"op_{idx}_{pos}"
             delta.setdefault(cur, {}).setdefault(ch, set()).add(nxt)
             delta.setdefault(nxt, {})
             cur = nxt
@@ -286,9 +281,63 @@ def build_lexer_dfa() -> Dict[str, Any]:
     return dfa
 
 
-def tokenize(dfa: Dict[str, Any], text: str):
-    out = []
-    pos = 0
+class LexerError(ValueError):
+    """Caractere que não inicia nenhum token
+
+    Guarda só o texto e a posição: a mensagem (linha, coluna, trecho com
+    caret e a busca por um caractere suspeito) só é montada em `str(erro)`.
+    """
+
+    def __init__(self, text: str, pos: int):
+        super().__init__(text, pos)
+        self.text = text
+        self.pos = pos
+
+    def __str__(self) -> str:
+        return _unexpected_character(self.text, self.pos)
+
+
+def _unexpected_character(text: str, err_pos: int) -> str:
+    """Monta a mensagem para um caractere que não inicia nenhum token"""
+    N = len(text)
+    ch = text[err_pos]
+    # calcula linha/coluna amigáveis e mostra trecho com caret
+    line = text.count('\n', 0, err_pos) + 1
+    # coluna: distância a partir da nova linha anterior (1-based)
+    last_nl = text.rfind('\n', 0, err_pos)
+    col = err_pos - last_nl
+    # trecho ao redor do erro
+    start = max(0, err_pos - 40)
+    end = min(N, err_pos + 40)
+    snippet = text[start:end].replace('\t', '\\t')
+    pointer = ' ' * (err_pos - start) + '^'
+    # tenta localizar um caractere não-ASCII ou possivelmente inválido no trecho
+    suspect_pos = None
+    for i in range(start, err_pos):
+        try:
+            if ord(text[i]) > 127:
+                suspect_pos = i
+                break
+        except Exception:
+            suspect_pos = i
+            break
+    suspect_info = ''
+    if suspect_pos is not None:
+        suspect_ch = text[suspect_pos]
+        s_line = text.count('\n', 0, suspect_pos) + 1
+        s_last_nl = text.rfind('\n', 0, suspect_pos)
+        s_col = suspect_pos - s_last_nl
+        suspect_info = f"\nPossible invalid character at {suspect_pos}: {suspect_ch!r} (line {s_line}, column {s_col})"
+    return f"Unexpected character at {err_pos}: {ch!r} (line {line}, column {col})\n{snippet}\n{pointer}{suspect_info}"
+
+
+def iter_tokens(dfa: Dict[str, Any], text: str, pos: int = 0):
+    """Gera os tokens `(tipo, lexema)` sob demanda a partir de `text[pos]`
+
+    O casamento é sempre o mais longo a partir da posição atual, sem estado
+    entre tokens, então recomeçar em qualquer fronteira de token produz a
+    mesma sequência que tokenizar o texto inteiro.
+    """
     N = len(text)
     delta = dfa["delta"]
     accepts = dfa["accepts"]
@@ -309,40 +358,14 @@ def tokenize(dfa: Dict[str, Any], text: str):
                 last_accept_tok = accepts[cur_state]
             i += 1
         if last_accept_pos < 0:
-            # calcula linha/coluna amigáveis e mostra trecho com caret
-            err_pos = pos
-            ch = text[pos]
-            line = text.count('\n', 0, err_pos) + 1
-            # coluna: distância a partir da nova linha anterior (1-based)
-            last_nl = text.rfind('\n', 0, err_pos)
-            col = err_pos - last_nl
-            # trecho ao redor do erro
-            start = max(0, err_pos - 40)
-            end = min(N, err_pos + 40)
-            snippet = text[start:end].replace('\t', '\\t')
-            pointer = ' ' * (err_pos - start) + '^'
-            # tenta localizar um caractere não-ASCII ou possivelmente inválido no trecho
-            suspect_pos = None
-            for i in range(start, err_pos):
-                try:
-                    if ord(text[i]) > 127:
-                        suspect_pos = i
-                        break
-                except Exception:
-                    suspect_pos = i
-                    break
-            suspect_info = ''
-            if suspect_pos is not None:
-                suspect_ch = text[suspect_pos]
-                s_line = text.count('\n', 0, suspect_pos) + 1
-                s_last_nl = text.rfind('\n', 0, suspect_pos)
-                s_col = suspect_pos - s_last_nl
-                suspect_info = f"\nPossible invalid character at {suspect_pos}: {suspect_ch!r} (line {s_line}, column {s_col})"
-            raise ValueError(f"Unexpected character at {err_pos}: {ch!r} (line {line}, column {col})\n{snippet}\n{pointer}{suspect_info}")
+            raise LexerError(text, pos)
         lexeme = text[pos:last_accept_pos + 1]
-        out.append((last_accept_tok, lexeme))
+        yield last_accept_tok, lexeme
         pos = last_accept_pos + 1
-    return out
+
+
+def tokenize(dfa: Dict[str, Any], text: str):
+    return list(iter_tokens(dfa, text))
 
 
 # conveniência: constrói e expõe o tokenizador
@@ -350,3 +373,6 @@ _default_dfa = build_lexer_dfa()
 
 def tokenize_text(text: str):
     return tokenize(_default_dfa, text)
+
+def iter_tokens_text(text: str, pos: int = 0):
+    return iter_tokens(_default_dfa, text, pos)
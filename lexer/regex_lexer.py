@@ -0,0 +1,116 @@
+"""Lexer baseado em uma única expressão regular mestre.
+
+Espelha o `Lexer` da Semana 5: as regras de `TOKEN_SPECIFICATION` são
+unidas em uma regex com um grupo nomeado por regra, compilada uma única vez
+na importação do módulo. Para cada casamento, `match.lastgroup` indica a
+regra que disparou e `_GROUP_KINDS` traduz o grupo para o tipo de token,
+sem percorrer `groupdict()`. Diferente da Semana 5, os tokens são os do
+lexer por AFD (`==`, `!`, `&&` e `||` são operadores, `123abc` é um
+identificador inválido, strings não atravessam linhas); a regex só aceita
+a mais '%' e caracteres fora do ASCII imprimível em strings e comentários
+(ver parser/test_lexer_engines.py).
+
+Expõe `tokenize_text` com a mesma saída de `lexer.lexer.tokenize_text`
+(lista de tuplas `(tipo, lexema)`), podendo ser usado como motor léxico
+alternativo em `parse_brasilscript(code, engine="regex")`, e `iter_tokens`,
+a versão sob demanda que pode começar no meio do texto.
+"""
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class LexerError(ValueError):
+    """Caractere que não inicia nenhum token válido.
+
+    A mensagem (com linha e coluna) só é montada em `str(erro)`.
+    """
+
+    def __init__(self, text: str, pos: int):
+        super().__init__(text, pos)
+        self.text = text
+        self.pos = pos
+
+    def __str__(self) -> str:
+        return _unexpected_character(self.text, self.pos)
+
+
+# Ordem importa: padrões mais longos/específicos primeiro
+TOKEN_SPECIFICATION: List[Tuple[str, str]] = [
+    ("NEWLINE", r"\r\n|\n"),
+    ("COMMENT", r"#[^\r\n]*"),
+    ("WHITESPACE", r"[ \t]+"),
+    # como no AFD vence o token mais longo: "123abc" e "1e5b" são um
+    # identificador inválido, mas "123", "1e5", "1.5" e "1e+5" são números
+    ("IDENTIFICADOR_INVALIDO", r"(?!\d+(?:[eE]\d+)?(?![a-zA-Z0-9_])|\d+[eE][+-]\d)\d[a-zA-Z0-9_]*"),
+    ("NUMERO_LITERAL", r"\d+(?:\.\d+)?(?:[eE][+-]?\d+)?"),
+    # strings não atravessam linhas
+    ("STRING_LITERAL", r'"(?:[^"\\\n]|\\[^\n])*"'),
+    ("STRING_LITERAL", r"'(?:[^'\\\n]|\\[^\n])*'"),
+    ("LOGICO_LITERAL", r"(?:verdadeiro|falso)\b"),
+    ("KW", r"(?:declarar|como|mostrar|perguntar|guardar_em|se|entao|senao|senao_se|fim_se|repetir|vezes|enquanto|faca|fim_enquanto|fim_repetir|funcao|fim_funcao|retornar|para_cada|em|fim_para_cada|parar|e|ou|nao|lista|texto|numero|logico)\b"),
+    ("OP_RELACIONAL", r"==|!=|<=|>="),
+    ("OP_LOGICO", r"&&|\|\||!"),
+    ("OP_ARITMETICO", r"[+\-*/%]"),
+    ("OP_RELACIONAL", r"=|<|>"),
+    ("LPAREN", r"\("),
+    ("RPAREN", r"\)"),
+    ("LBRACKET", r"\["),
+    ("RBRACKET", r"\]"),
+    ("LBRACE", r"\{"),
+    ("RBRACE", r"\}"),
+    ("COMMA", r","),
+    ("SEMICOLON", r";"),
+    ("COLON", r":"),
+    ("DOT", r"\."),
+    ("IDENTIFICADOR", r"[a-zA-Z_][a-zA-Z0-9_]*"),
+    ("MISMATCH", r"."),
+]
+
+# Nomes da especificação que são reportados com outro tipo de token
+_KIND_FOR_SPEC = {
+    "KW": "PALAVRA_CHAVE",
+    "OP_ARITMETICO": "OP",
+    "OP_RELACIONAL": "OP",
+    "OP_LOGICO": "OP",
+}
+
+_MASTER_RE = re.compile("|".join(
+    f"(?P<T{idx}>{pattern})" for idx, (_, pattern) in enumerate(TOKEN_SPECIFICATION)
+))
+_GROUP_KINDS: Dict[str, Optional[str]] = {
+    f"T{idx}": _KIND_FOR_SPEC.get(name, name)
+    for idx, (name, _) in enumerate(TOKEN_SPECIFICATION)
+}
+
+
+def _unexpected_character(text: str, pos: int) -> str:
+    line = text.count('\n', 0, pos) + 1
+    col = pos - text.rfind('\n', 0, pos)
+    return f"Unexpected character at {pos}: {text[pos]!r} (line {line}, column {col})"
+
+
+def tokenize_text(text: str) -> List[Tuple[str, str]]:
+    out = []
+    append = out.append
+    group_kinds = _GROUP_KINDS
+    for mo in _MASTER_RE.finditer(text):
+        kind = group_kinds[mo.lastgroup]
+        if kind == "MISMATCH":
+            raise LexerError(text, mo.start())
+        append((kind, mo.group()))
+    return out
+
+
+def iter_tokens(text: str, pos: int = 0) -> Iterator[Tuple[str, str]]:
+    """Como `tokenize_text`, mas sob demanda e começando em `text[pos]`
+
+    O texto inteiro continua visível para a regex (`\\b` olha o caractere
+    anterior a `pos`), então recomeçar em uma fronteira de token produz a
+    mesma sequência que tokenizar desde o início.
+    """
+    group_kinds = _GROUP_KINDS
+    for mo in _MASTER_RE.finditer(text, pos):
+        kind = group_kinds[mo.lastgroup]
+        if kind == "MISMATCH":
+            raise LexerError(text, mo.start())
+        yield kind, mo.group()
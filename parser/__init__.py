@@ -1,3 +1,7 @@
  # minimal package init for parser
 
+# versão do compilador; entra na chave do cache de ASTs (parser/cache.py),
+# então deve mudar sempre que o formato da AST ou o parser mudarem
+__version__ = "0.3.0"
+
 __all__ = []
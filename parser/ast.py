@@ -1,143 +1,304 @@
-from dataclasses import dataclass
-from typing import Any, List, Optional
+from dataclasses import dataclass, field, fields
+from hashlib import blake2b
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Conjunto canônico de nós da AST, usado pelo parser, pela análise semântica
+# e pelo codegen. Os nós usam __slots__ (sem __dict__ por instância) e guardam
+# a posição como um único `offset`: índice do primeiro caractere do nó no
+# código fonte (-1 quando desconhecido). Linha e coluna são derivadas sob
+# demanda com `line_column`. `offset` não participa de __eq__ nem do repr.
+#
+# A análise semântica (parser.semantic) anota as variáveis com o slot
+# resolvido, (profundidade do frame, índice no frame), em `slot` (None
+# enquanto não resolvido), e as funções com `frame_size` e
+# `parameter_slots`; o nível superior é o frame 0 e `Program.frame_size`
+# é o tamanho dele. As anotações, como o offset, ficam fora de __eq__, do
+# repr, dos filhos e do hash estrutural, e não são serializadas.
+# `Program.shared` marca as árvores de parser.hashcons, que os passes que
+# anotam ou reescrevem nós recusam (`require_unshared`).
+
+
+def line_column(source: str, offset: int) -> Tuple[int, int]:
+    """Converte um offset no código fonte em (linha, coluna), ambos a partir de 1"""
+    line = source.count('\n', 0, offset) + 1
+    column = offset - source.rfind('\n', 0, offset)
+    return line, column
+
+
+def _offset():
+    return field(default=-1, compare=False, repr=False)
+
+
+def _annotation(default=None):
+    return field(default=default, compare=False, repr=False)
+
+
+class ASTNode:
+    """Base comum dos nós (apenas para isinstance e anotações)"""
+    __slots__ = ()
+
 
 # Nó raiz
-@dataclass
-class Program:
+@dataclass(slots=True)
+class Program(ASTNode):
     statements: List[Any]
+    # erros não-fatais coletados pelo parser (`Diagnostic`s de parser.diagnostics)
+    _errors: List[Any] = field(default_factory=list, compare=False, repr=False)
+    # slots do frame do nível superior
+    frame_size: int = _annotation(0)
+    # nós compartilhados entre ocorrências (parser.hashcons)
+    shared: bool = _annotation(False)
 
 # Literais e identificadores
-@dataclass
-class Literal:
+@dataclass(slots=True)
+class Literal(ASTNode):
     value: Any
     type: str  # ex: 'numero', 'texto', 'logico'
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
 
-@dataclass
-class Identifier:
+@dataclass(slots=True)
+class Identifier(ASTNode):
     name: str
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
+    slot: Optional[Tuple[int, int]] = _annotation()
 
 # Declarações e atribuições
-@dataclass
-class Declaration:
+@dataclass(slots=True)
+class Declaration(ASTNode):
     identifier: str
     type_name: str
     initial_value: Optional[Any] = None
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
+    slot: Optional[Tuple[int, int]] = _annotation()
 
-@dataclass
-class Assignment:
+@dataclass(slots=True)
+class Assignment(ASTNode):
     identifier: str
     value: Any
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
+    slot: Optional[Tuple[int, int]] = _annotation()
 
 # Operações
-@dataclass
-class BinaryOperation:
+@dataclass(slots=True)
+class BinaryOperation(ASTNode):
     left: Any
     operator: str
     right: Any
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
 
-@dataclass
-class UnaryOperation:
+@dataclass(slots=True)
+class UnaryOperation(ASTNode):
     operator: str
     operand: Any
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
 
 # Listas e acessos por índice
-@dataclass
-class ListLiteral:
+@dataclass(slots=True)
+class ListLiteral(ASTNode):
     elements: List[Any]
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
 
-@dataclass
-class IndexAccess:
+@dataclass(slots=True)
+class IndexAccess(ASTNode):
     object: Any
     index: Any
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
 
 # Funções e chamadas
-@dataclass
-class FunctionDecl:
+@dataclass(slots=True)
+class FunctionDecl(ASTNode):
     name: str
     parameters: List[str]
     body: List[Any]
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
+    frame_size: int = _annotation(0)
+    # slot de cada parâmetro (None no parâmetro duplicado)
+    parameter_slots: Optional[List[Optional[Tuple[int, int]]]] = _annotation()
 
-@dataclass
-class FunctionCall:
+@dataclass(slots=True)
+class FunctionCall(ASTNode):
     name: str
     arguments: List[Any]
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
 
 # Controle de fluxo
-@dataclass
-class IfStatement:
+@dataclass(slots=True)
+class IfStatement(ASTNode):
     condition: Any
     then_block: List[Any]
     else_ifs: List[tuple]  # lista de (condition, block)
     else_block: Optional[List[Any]] = None
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
 
-@dataclass
-class WhileStatement:
+@dataclass(slots=True)
+class WhileStatement(ASTNode):
     condition: Any
     body: List[Any]
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
 
-@dataclass
-class ForEachStatement:
+@dataclass(slots=True)
+class ForEachStatement(ASTNode):
     variable: str
     iterable: Any
     body: List[Any]
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
+    slot: Optional[Tuple[int, int]] = _annotation()
 
-@dataclass
-class RepeatStatement:
+@dataclass(slots=True)
+class RepeatStatement(ASTNode):
     count: Any
     body: List[Any]
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
 
-@dataclass
-class ReturnStatement:
-    value: Optional[Any]
-    line: Optional[int] = None
-    column: Optional[int] = None
+@dataclass(slots=True)
+class ReturnStatement(ASTNode):
+    value: Optional[Any] = None
+    offset: int = _offset()
 
-@dataclass
-class PrintStatement:
+@dataclass(slots=True)
+class PrintStatement(ASTNode):
     expressions: List[Any]
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
 
-@dataclass
-class InputStatement:
+@dataclass(slots=True)
+class InputStatement(ASTNode):
     variable: str
     prompt: Optional[Any] = None
-    line: Optional[int] = None
-    column: Optional[int] = None
+    offset: int = _offset()
+    slot: Optional[Tuple[int, int]] = _annotation()
+
+# nomes dos campos que podem conter filhos, por classe de nó
+_CHILD_FIELDS = {}
+# campos que nunca contêm filhos: posição e anotações
+_NON_CHILD_FIELDS = ("offset", "_errors", "slot", "frame_size", "parameter_slots", "shared")
+
+
+def require_unshared(program: Program, pass_name: str) -> None:
+    """Recusa, num passe que anota ou reescreve os nós, uma árvore com nós compartilhados
+
+    Num nó compartilhado a anotação de uma ocorrência sobrescreveria a das
+    outras; `load_ast(dump_ast(program))` (parser.binary_ast) dá uma cópia
+    sem compartilhamento.
+    """
+    if program.shared:
+        raise ValueError(f"{pass_name}: a AST tem nós compartilhados (parser.hashcons)")
+
+
+def iter_child_nodes(node) -> Iterator[ASTNode]:
+    """Itera os nós filhos diretos de `node`, na ordem dos campos
+
+    Percorre campos que são nós, listas de nós e as tuplas (condição, bloco)
+    de `IfStatement.else_ifs`.
+    """
+    names = _CHILD_FIELDS.get(type(node))
+    if names is None:
+        names = tuple(f.name for f in fields(node) if f.name not in _NON_CHILD_FIELDS)
+        _CHILD_FIELDS[type(node)] = names
+    for name in names:
+        value = getattr(node, name)
+        if isinstance(value, ASTNode):
+            yield value
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, ASTNode):
+                    yield item
+                elif isinstance(item, tuple):
+                    condition, block = item
+                    yield condition
+                    yield from block
+
+
+def walk(node) -> Iterator[ASTNode]:
+    """Percorre `node` e seus descendentes em pré-ordem, sem recursão"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        children = list(iter_child_nodes(current))
+        children.reverse()
+        stack.extend(children)
+
+
+# hash estrutural: 64 bits, combinados como no FNV-1a
+_HASH_MASK = (1 << 64) - 1
+_HASH_PRIME = 0x100000001B3
+_HASH_NONE = 0x6E6F6E65
+_HASH_LIST = 0x6C697374
+_HASH_TUPLE = 0x7475706C
+# classe do nó -> hash do nome da classe de parser.ast que ela estende
+_HASH_TAGS = {}
+
+
+def _hash_text(text: str) -> int:
+    # o hash() de str muda a cada processo (PYTHONHASHSEED); o blake2b não
+    return int.from_bytes(blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _hash_tag(cls) -> int:
+    tag = _HASH_TAGS.get(cls)
+    if tag is None:
+        # subclasses (ex.: parser.lazy.LazyFunctionDecl) têm o hash da classe base
+        base = next(c for c in cls.__mro__ if c.__module__ == __name__)
+        tag = _HASH_TAGS[cls] = _hash_text(base.__name__)
+    return tag
+
+
+def _hash_value(value, memo: Dict[int, int]) -> int:
+    if isinstance(value, ASTNode):
+        return memo[id(value)]
+    if isinstance(value, str):
+        return _hash_text(value)
+    if value is None:
+        return _HASH_NONE
+    if isinstance(value, (list, tuple)):
+        h = _HASH_LIST if isinstance(value, list) else _HASH_TUPLE
+        for item in value:
+            h = ((h ^ _hash_value(item, memo)) * _HASH_PRIME) & _HASH_MASK
+        return h
+    # números: o hash() de int/float não depende da execução e iguala 1, 1.0 e True, como o ==
+    return hash(value) & _HASH_MASK
+
+
+def _hash_node(node, memo: Dict[int, int]) -> int:
+    h = _hash_tag(type(node))
+    names = _CHILD_FIELDS.get(type(node))
+    if names is None:
+        names = tuple(f.name for f in fields(node) if f.name not in _NON_CHILD_FIELDS)
+        _CHILD_FIELDS[type(node)] = names
+    for name in names:
+        h = ((h ^ _hash_value(getattr(node, name), memo)) * _HASH_PRIME) & _HASH_MASK
+    return h
+
+
+def structural_hash(node, memo: Optional[Dict[int, int]] = None) -> int:
+    """Hash de 64 bits da estrutura de `node`, estável entre execuções
+
+    Nós iguais por `==` têm o mesmo hash (o offset não entra). `memo`
+    (id do nó -> hash) guarda os hashes das subárvores já calculadas e só
+    vale enquanto esses nós existirem; sem recursão.
+    """
+    memo = {} if memo is None else memo
+    known = memo.get(id(node))
+    if known is not None:
+        return known
+    stack = [node]
+    while stack:
+        current = stack[-1]
+        pending = [child for child in iter_child_nodes(current) if id(child) not in memo]
+        if pending:
+            stack += pending
+            continue
+        stack.pop()
+        memo[id(current)] = _hash_node(current, memo)
+    return memo[id(node)]
+
 
 # Exporte explícito
 __all__ = [
-    "Program", "Literal", "Identifier", "Declaration", "Assignment",
+    "ASTNode", "Program", "Literal", "Identifier", "Declaration", "Assignment",
     "BinaryOperation", "UnaryOperation", "ListLiteral", "IndexAccess",
     "FunctionDecl", "FunctionCall", "IfStatement", "WhileStatement",
     "ForEachStatement", "RepeatStatement", "ReturnStatement", "PrintStatement",
-    "InputStatement",
+    "InputStatement", "line_column", "iter_child_nodes", "walk", "structural_hash",
+    "require_unshared",
 ]
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark de estresse do parser com código profundamente aninhado
+
+Gera programas com um único tipo de aninhamento (parênteses, operadores
+unários, listas, chamadas, índices, blocos se/enquanto) em profundidades de
+10³ a 10⁵ e mede tokenização e parse separadamente. Como o parser usa pilhas
+explícitas, nenhuma profundidade esbarra no limite de recursão do Python.
+
+Uso:
+    python -m parser.benchmark_aninhamento [profundidade ...]
+"""
+
+import sys
+import time
+
+from parser.ast import walk
+from parser.brasilscript_parser import BrasilScriptParser, tokenize_source
+
+PROFUNDIDADES = (1_000, 10_000, 100_000)
+
+GERADORES = {
+    "parenteses": lambda n: "mostrar " + "(" * n + "1" + ")" * n,
+    "condicao": lambda n: "se " + "(" * n + "a" + ")" * n + " entao\nfim_se",
+    "unarios": lambda n: "mostrar " + "-" * n + "1",
+    "nao": lambda n: "se " + "nao (" * n + "a" + ")" * n + " entao\nfim_se",
+    "soma a direita": lambda n: "mostrar " + "1 + (" * n + "1" + ")" * n,
+    "listas": lambda n: "mostrar " + "[" * n + "1" + "]" * n,
+    "chamadas": lambda n: "mostrar " + "f(" * n + "1" + ")" * n,
+    "indices": lambda n: "mostrar " + "l[" * n + "0" + "]" * n,
+    "se": lambda n: "se a entao\n" * n + "mostrar 1\n" + "fim_se\n" * n,
+    "enquanto/funcao": lambda n: "enquanto a faca\nfuncao f()\n" * (n // 2) + "fim_funcao\nfim_enquanto\n" * (n // 2),
+}
+
+
+def medir(codigo: str):
+    inicio = time.perf_counter()
+    tokens = tokenize_source(codigo)
+    meio = time.perf_counter()
+    program = BrasilScriptParser(tokens).parse()
+    fim = time.perf_counter()
+    # `walk` é iterativo; a comparação/repr dos nós ainda seria recursiva
+    nos = sum(1 for _ in walk(program))
+    return len(tokens), nos, meio - inicio, fim - meio, program._errors
+
+
+def main(profundidades):
+    print(f"{'caso':<16} {'profund.':>9} {'tokens':>9} {'nós':>9} {'lexer ms':>9} {'parse ms':>9} {'tokens/s':>11}")
+    for nome, gerar in GERADORES.items():
+        for n in profundidades:
+            tokens, nos, t_lexer, t_parse, erros = medir(gerar(n))
+            assert not erros, erros[:3]
+            print(f"{nome:<16} {n:>9} {tokens:>9} {nos:>9} {t_lexer * 1000:>9.1f} {t_parse * 1000:>9.1f} {tokens / t_parse:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or PROFUNDIDADES)
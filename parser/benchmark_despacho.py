@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark do despacho por nó: tabela de `NodeVisitor` (parser/visitor.py),
+por `visit()` e consultada direto no laço, contra a cadeia de `isinstance` (antiga análise semântica) e as comparações
+com `type(node).__name__` (antigo codegen)
+
+Os quatro despachos chamam os mesmos métodos (que contam os nós por classe)
+para todos os nós de uma AST grande; as cadeias testam as classes na ordem
+de `_infer_type` da antiga análise semântica, e os nós de statement caem no
+último ramo, o caso mais caro da cadeia.
+
+Uso:
+    python -m parser.benchmark_despacho [linhas]
+"""
+
+import sys
+import time
+
+from parser.ast import (
+    BinaryOperation, FunctionCall, Identifier, IndexAccess, ListLiteral, Literal, UnaryOperation, walk,
+)
+from parser.brasilscript_parser import parse_brasilscript
+from parser.visitor import NodeVisitor
+
+LINHAS = 20_000
+REPETICOES = 5
+
+
+class _Contador(NodeVisitor):
+    def __init__(self):
+        super().__init__()
+        self.counts = [0] * 8
+
+    def visit_Literal(self, node):
+        self.counts[0] += 1
+
+    def visit_Identifier(self, node):
+        self.counts[1] += 1
+
+    def visit_ListLiteral(self, node):
+        self.counts[2] += 1
+
+    def visit_IndexAccess(self, node):
+        self.counts[3] += 1
+
+    def visit_UnaryOperation(self, node):
+        self.counts[4] += 1
+
+    def visit_BinaryOperation(self, node):
+        self.counts[5] += 1
+
+    def visit_FunctionCall(self, node):
+        self.counts[6] += 1
+
+    def generic_visit(self, node):
+        self.counts[7] += 1
+
+
+def contar_isinstance(nodes):
+    contador = _Contador()
+    for node in nodes:
+        if isinstance(node, Literal):
+            contador.visit_Literal(node)
+        elif isinstance(node, Identifier):
+            contador.visit_Identifier(node)
+        elif isinstance(node, ListLiteral):
+            contador.visit_ListLiteral(node)
+        elif isinstance(node, IndexAccess):
+            contador.visit_IndexAccess(node)
+        elif isinstance(node, UnaryOperation):
+            contador.visit_UnaryOperation(node)
+        elif isinstance(node, BinaryOperation):
+            contador.visit_BinaryOperation(node)
+        elif isinstance(node, FunctionCall):
+            contador.visit_FunctionCall(node)
+        else:
+            contador.generic_visit(node)
+    return contador.counts
+
+
+def contar_nome(nodes):
+    contador = _Contador()
+    for node in nodes:
+        kind = type(node).__name__
+        if kind == "Literal":
+            contador.visit_Literal(node)
+        elif kind == "Identifier":
+            contador.visit_Identifier(node)
+        elif kind == "ListLiteral":
+            contador.visit_ListLiteral(node)
+        elif kind == "IndexAccess":
+            contador.visit_IndexAccess(node)
+        elif kind == "UnaryOperation":
+            contador.visit_UnaryOperation(node)
+        elif kind == "BinaryOperation":
+            contador.visit_BinaryOperation(node)
+        elif kind == "FunctionCall":
+            contador.visit_FunctionCall(node)
+        else:
+            contador.generic_visit(node)
+    return contador.counts
+
+
+def contar_visit(nodes):
+    contador = _Contador()
+    visit = contador.visit
+    for node in nodes:
+        visit(node)
+    return contador.counts
+
+
+def contar_tabela(nodes):
+    contador = _Contador()
+    table = contador.dispatch_table("visit_", contador.generic_visit)
+    for node in nodes:
+        table[node.__class__](node)
+    return contador.counts
+
+
+def main(linhas):
+    code = "\n".join(f"x{i} = (a + {i}) * b[{i}] - f(-c, [{i}, nao d]) / \"s\"" for i in range(linhas))
+    nodes = list(walk(parse_brasilscript(code)))
+    print(f"{len(nodes):,} nós")
+    esperado = None
+    for nome, contar in (("isinstance", contar_isinstance), ("type().__name__", contar_nome),
+                         ("visit()", contar_visit), ("tabela", contar_tabela)):
+        melhor = float("inf")
+        for _ in range(REPETICOES):
+            inicio = time.perf_counter()
+            counts = contar(nodes)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        assert esperado is None or counts == esperado
+        esperado = counts
+        print(f"{nome:<16} {melhor * 1e9 / len(nodes):8.1f} ns/nó")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else LINHAS)
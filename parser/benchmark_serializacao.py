@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark da serialização binária da AST (parser/binary_ast.py) contra o pickle
+
+Para cada programa (os exemplos de exemplos/ concatenados e repetidos, e
+dois casos gerados: muitas expressões pequenas e aninhamento profundo),
+mede tamanho, tempo de escrita e tempo de leitura de `dump_ast`/`load_ast`
+e de `pickle` (protocolo mais alto), conferindo que a leitura reconstrói a
+mesma AST.
+
+Uso:
+    python -m parser.benchmark_serializacao [repeticoes]
+"""
+
+import glob
+import os
+import pickle
+import sys
+import time
+
+from parser.ast import walk
+from parser.binary_ast import dump_ast, load_ast
+from parser.brasilscript_parser import parse_brasilscript
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPETICOES = 5
+
+
+def _exemplos() -> str:
+    partes = []
+    for caminho in sorted(glob.glob(os.path.join(RAIZ, "exemplos", "*.bs"))):
+        with open(caminho, encoding="utf-8") as f:
+            partes.append(f.read())
+    return "\n".join(partes)
+
+
+CASOS = {
+    "exemplos x50": lambda: "\n".join([_exemplos()] * 50),
+    "expressoes": lambda: "\n".join(f"x{i} = (a + {i}) * b[{i}] - f(\"s{i}\", {i}.5)" for i in range(20_000)),
+    # o pickle recursa uma vez por nível; fica abaixo do limite de recursão
+    "aninhado": lambda: "se a entao\n" * 150 + "mostrar 1\n" + "fim_se\n" * 150,
+}
+
+
+def _melhor(funcao, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def medir(program, repeticoes):
+    linhas = []
+    formatos = {
+        "binary_ast": (lambda: dump_ast(program), load_ast),
+        "pickle": (lambda: pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+    }
+    for nome, (escrever, ler) in formatos.items():
+        t_escrita, dados = _melhor(escrever, repeticoes)
+        t_leitura, lido = _melhor(lambda: ler(dados), repeticoes)
+        assert lido == program and lido._errors == program._errors
+        linhas.append((nome, len(dados), t_escrita, t_leitura))
+    return linhas
+
+
+def main(repeticoes):
+    print(f"{'caso':<14} {'nós':>8} {'formato':<11} {'bytes':>10} {'escrita ms':>11} {'leitura ms':>11}")
+    for caso, gerar in CASOS.items():
+        program = parse_brasilscript(gerar())
+        nos = sum(1 for _ in walk(program))
+        for nome, tamanho, t_escrita, t_leitura in medir(program, repeticoes):
+            print(f"{caso:<14} {nos:>8} {nome:<11} {tamanho:>10,} {t_escrita * 1000:>11.1f} {t_leitura * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else REPETICOES)
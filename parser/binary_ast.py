@@ -0,0 +1,633 @@
+"""
+Serialização binária versionada da AST (parser/ast.py)
+
+`dump_ast(program)` gera bytes compactos e `load_ast(dados)` reconstrói um
+`Program` idêntico: mesmos nós, offsets, tipos dos valores literais e
+`_errors` (os `Diagnostic`s de parser.diagnostics voltam como registros,
+com os argumentos em texto, sem formatar a mensagem). É o formato do cache em disco (parser/cache.py) e serve para
+enviar ASTs a outros processos; é menor e mais rápido que o pickle da
+árvore de dataclasses (`python -m parser.benchmark_serializacao`).
+
+Layout:
+
+    cabeçalho       b"BSAST" + versão (1 byte)
+    strings         n, e n vezes (tamanho, UTF-8)
+    floats          n, e n vezes 8 bytes (double little-endian)
+    offsets         tamanho em bytes, e um varint por nó com offset
+    nós             registros em pós-ordem até o fim dos dados
+
+Contagens, índices e offsets são varints (LEB128 sem sinal). Nomes,
+operadores, tipos, textos e mensagens de erro são índices na tabela de
+strings, e floats são índices na tabela de floats. Os offsets ficam numa
+seção própria, na ordem dos registros, como diferença (zigzag) para o
+offset do nó anterior: nós vizinhos estão perto no fonte, então quase
+todos ocupam 1 byte. Cada registro começa com o byte de tipo (`NodeTag`) e
+vem depois dos filhos, então a leitura decodifica os varints de uma vez e
+monta a árvore num laço sobre uma pilha de valores, sem recursão: a
+profundidade da árvore não é limitada. Campos de cada registro (filhos
+entre colchetes, na ordem em que aparecem antes do registro):
+
+    NONE                    (filho opcional ausente)
+    PROGRAM                 n_statements n_erros erro...     [statements]
+        erro                código severidade início fim n_args arg...  (início e fim: zigzag)
+                            ou "" mensagem                   (erro guardado como texto)
+    LITERAL_*               valor tipo                       (INT: zigzag; FLOAT: float; STR: string; demais: sem valor)
+    IDENTIFIER              nome
+    DECLARATION             identificador tipo               [valor_inicial|NONE]
+    ASSIGNMENT              identificador                    [valor]
+    BINARY_OPERATION        operador                         [esquerda direita]
+    UNARY_OPERATION         operador                         [operando]
+    LIST_LITERAL            n                                [elementos]
+    INDEX_ACCESS                                             [objeto indice]
+    FUNCTION_DECL           nome n_params param... n_corpo   [corpo]
+    FUNCTION_CALL           nome n_args                      [argumentos]
+    IF_STATEMENT            n_entao n_senao_se n... senao+1  [cond entao (cond bloco)* senao]
+    WHILE_STATEMENT         n_corpo                          [cond corpo]
+    FOR_EACH_STATEMENT      variavel n_corpo                 [iteravel corpo]
+    REPEAT_STATEMENT        n_corpo                          [contagem corpo]
+    RETURN_STATEMENT                                         [valor|NONE]
+    PRINT_STATEMENT         n                                [expressoes]
+    INPUT_STATEMENT         variavel                         [prompt|NONE]
+
+`FORMAT_VERSION` muda sempre que o layout mudar; dados de outra versão
+são recusados com ValueError.
+
+Uso:
+    data = dump_ast(program)
+    program = load_ast(data)
+"""
+
+import gc
+import re
+import struct
+from itertools import accumulate
+from enum import IntEnum
+from typing import Callable, Dict, List
+
+from parser.diagnostics import Diagnostic, Severity
+from parser.ast import (
+    Program, Literal, Identifier, Declaration, Assignment, BinaryOperation, UnaryOperation,
+    ListLiteral, IndexAccess, FunctionDecl, FunctionCall, IfStatement, WhileStatement,
+    ForEachStatement, RepeatStatement, ReturnStatement, PrintStatement, InputStatement,
+)
+
+MAGIC = b"BSAST"
+FORMAT_VERSION = 2
+
+_DOUBLE = struct.Struct("<d")
+# varints de mais de um byte (os demais são os próprios bytes)
+_MULTIBYTE_VARINT = re.compile(rb"([\x80-\xff]+[\x00-\x7f])")
+
+class NodeTag(IntEnum):
+    """Byte de tipo de cada registro"""
+    NONE = 0
+    PROGRAM = 1
+    LITERAL_INT = 2
+    LITERAL_FLOAT = 3
+    LITERAL_STR = 4
+    LITERAL_TRUE = 5
+    LITERAL_FALSE = 6
+    LITERAL_NONE = 7
+    IDENTIFIER = 8
+    DECLARATION = 9
+    ASSIGNMENT = 10
+    BINARY_OPERATION = 11
+    UNARY_OPERATION = 12
+    LIST_LITERAL = 13
+    INDEX_ACCESS = 14
+    FUNCTION_DECL = 15
+    FUNCTION_CALL = 16
+    IF_STATEMENT = 17
+    WHILE_STATEMENT = 18
+    FOR_EACH_STATEMENT = 19
+    REPEAT_STATEMENT = 20
+    RETURN_STATEMENT = 21
+    PRINT_STATEMENT = 22
+    INPUT_STATEMENT = 23
+
+
+def _varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _zigzag(n: int) -> int:
+    return n << 1 if n >= 0 else (-n << 1) - 1
+
+
+def _unzigzag(n: int) -> int:
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+def _read_varint(data: bytes, pos: int):
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _decode_varints(data: bytes) -> List[int]:
+    """Decodifica uma sequência de varints
+
+    Os trechos de varints de 1 byte são copiados direto (`list.extend` de
+    bytes); só os de vários bytes passam pelo laço em Python.
+    """
+    if data.isascii():
+        return list(data)
+    ints: List[int] = []
+    parts = _MULTIBYTE_VARINT.split(data)
+    if parts[-1] and parts[-1][-1] >= 0x80:
+        raise ValueError("Dados de AST truncados")
+    for k, part in enumerate(parts):
+        if k & 1:
+            ints.append(_read_varint(part, 0)[0])
+        else:
+            ints += part
+    return ints
+
+
+# ---------- escrita ----------
+
+_NONE_RECORD = bytes([NodeTag.NONE])
+
+
+class _Writer:
+    """Gera os registros de um nó e devolve seus filhos, na ordem do layout"""
+
+    def __init__(self):
+        self.strings: Dict[str, int] = {}
+        # chave pelos bytes: 0.0 e -0.0 são distintos e nan casa consigo mesmo
+        self.floats: Dict[bytes, int] = {}
+
+    def string(self, out: bytearray, value: str) -> None:
+        index = self.strings.get(value)
+        if index is None:
+            if type(value) is not str:
+                raise TypeError(f"Esperado texto na AST, encontrado {type(value).__name__}: {value!r}")
+            index = self.strings[value] = len(self.strings)
+        _varint(out, index)
+
+    def float(self, out: bytearray, value: float) -> None:
+        packed = _DOUBLE.pack(value)
+        index = self.floats.get(packed)
+        if index is None:
+            index = self.floats[packed] = len(self.floats)
+        _varint(out, index)
+
+    def program(self, node: Program, out: bytearray) -> list:
+        _varint(out, len(node.statements))
+        _varint(out, len(node._errors))
+        for error in node._errors:
+            if type(error) is str:
+                self.string(out, "")
+                self.string(out, error)
+                continue
+            self.string(out, error.code)
+            self.string(out, error.severity.value)
+            _varint(out, _zigzag(error.start))
+            _varint(out, _zigzag(error.end))
+            _varint(out, len(error.arguments))
+            for argument in error.arguments:
+                self.string(out, str(argument))
+        return node.statements
+
+    def literal(self, node: Literal, out: bytearray) -> list:
+        value = node.value
+        kind = type(value)
+        if kind is bool:
+            out[0] = NodeTag.LITERAL_TRUE if value else NodeTag.LITERAL_FALSE
+        elif kind is int:
+            out[0] = NodeTag.LITERAL_INT
+            _varint(out, _zigzag(value))
+        elif kind is float:
+            out[0] = NodeTag.LITERAL_FLOAT
+            self.float(out, value)
+        elif kind is str:
+            out[0] = NodeTag.LITERAL_STR
+            self.string(out, value)
+        elif value is None:
+            out[0] = NodeTag.LITERAL_NONE
+        else:
+            raise TypeError(f"Valor de literal não suportado: {value!r}")
+        self.string(out, node.type)
+        return []
+
+    def identifier(self, node: Identifier, out: bytearray) -> list:
+        self.string(out, node.name)
+        return []
+
+    def declaration(self, node: Declaration, out: bytearray) -> list:
+        self.string(out, node.identifier)
+        self.string(out, node.type_name)
+        return [node.initial_value]
+
+    def assignment(self, node: Assignment, out: bytearray) -> list:
+        self.string(out, node.identifier)
+        return [node.value]
+
+    def binary_operation(self, node: BinaryOperation, out: bytearray) -> list:
+        self.string(out, node.operator)
+        return [node.left, node.right]
+
+    def unary_operation(self, node: UnaryOperation, out: bytearray) -> list:
+        self.string(out, node.operator)
+        return [node.operand]
+
+    def list_literal(self, node: ListLiteral, out: bytearray) -> list:
+        _varint(out, len(node.elements))
+        return node.elements
+
+    def index_access(self, node: IndexAccess, out: bytearray) -> list:
+        return [node.object, node.index]
+
+    def function_decl(self, node: FunctionDecl, out: bytearray) -> list:
+        self.string(out, node.name)
+        _varint(out, len(node.parameters))
+        for parameter in node.parameters:
+            self.string(out, parameter)
+        _varint(out, len(node.body))
+        return node.body
+
+    def function_call(self, node: FunctionCall, out: bytearray) -> list:
+        self.string(out, node.name)
+        _varint(out, len(node.arguments))
+        return node.arguments
+
+    def if_statement(self, node: IfStatement, out: bytearray) -> list:
+        children = [node.condition]
+        children += node.then_block
+        _varint(out, len(node.then_block))
+        _varint(out, len(node.else_ifs))
+        for condition, block in node.else_ifs:
+            _varint(out, len(block))
+            children.append(condition)
+            children += block
+        if node.else_block is None:
+            out.append(0)
+        else:
+            _varint(out, len(node.else_block) + 1)
+            children += node.else_block
+        return children
+
+    def while_statement(self, node: WhileStatement, out: bytearray) -> list:
+        _varint(out, len(node.body))
+        return [node.condition, *node.body]
+
+    def for_each_statement(self, node: ForEachStatement, out: bytearray) -> list:
+        self.string(out, node.variable)
+        _varint(out, len(node.body))
+        return [node.iterable, *node.body]
+
+    def repeat_statement(self, node: RepeatStatement, out: bytearray) -> list:
+        _varint(out, len(node.body))
+        return [node.count, *node.body]
+
+    def return_statement(self, node: ReturnStatement, out: bytearray) -> list:
+        return [node.value]
+
+    def print_statement(self, node: PrintStatement, out: bytearray) -> list:
+        _varint(out, len(node.expressions))
+        return node.expressions
+
+    def input_statement(self, node: InputStatement, out: bytearray) -> list:
+        self.string(out, node.variable)
+        return [node.prompt]
+
+
+# classe do nó -> (byte de tipo, método de _Writer)
+_WRITERS = {
+    Program: (NodeTag.PROGRAM, _Writer.program),
+    Literal: (NodeTag.LITERAL_NONE, _Writer.literal),  # o método corrige o byte pelo valor
+    Identifier: (NodeTag.IDENTIFIER, _Writer.identifier),
+    Declaration: (NodeTag.DECLARATION, _Writer.declaration),
+    Assignment: (NodeTag.ASSIGNMENT, _Writer.assignment),
+    BinaryOperation: (NodeTag.BINARY_OPERATION, _Writer.binary_operation),
+    UnaryOperation: (NodeTag.UNARY_OPERATION, _Writer.unary_operation),
+    ListLiteral: (NodeTag.LIST_LITERAL, _Writer.list_literal),
+    IndexAccess: (NodeTag.INDEX_ACCESS, _Writer.index_access),
+    FunctionDecl: (NodeTag.FUNCTION_DECL, _Writer.function_decl),
+    FunctionCall: (NodeTag.FUNCTION_CALL, _Writer.function_call),
+    IfStatement: (NodeTag.IF_STATEMENT, _Writer.if_statement),
+    WhileStatement: (NodeTag.WHILE_STATEMENT, _Writer.while_statement),
+    ForEachStatement: (NodeTag.FOR_EACH_STATEMENT, _Writer.for_each_statement),
+    RepeatStatement: (NodeTag.REPEAT_STATEMENT, _Writer.repeat_statement),
+    ReturnStatement: (NodeTag.RETURN_STATEMENT, _Writer.return_statement),
+    PrintStatement: (NodeTag.PRINT_STATEMENT, _Writer.print_statement),
+    InputStatement: (NodeTag.INPUT_STATEMENT, _Writer.input_statement),
+}
+
+
+def _subclass_writer(cls):
+    """Entrada de `_WRITERS` de uma subclasse de nó (ex.: `LazyFunctionDecl`), guardada no dicionário"""
+    for base in cls.__mro__[1:]:
+        entry = _WRITERS.get(base)
+        if entry is not None:
+            _WRITERS[cls] = entry
+            return entry
+    return None
+
+
+def dump_ast(program: Program) -> bytes:
+    """Serializa `program` (e toda a subárvore) no formato binário"""
+    writer = _Writer()
+    records = []
+    offsets = []
+    # pré-ordem com os filhos da direita para a esquerda: invertida, a lista
+    # de registros fica em pós-ordem com os filhos da esquerda para a direita
+    stack = [program]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            records.append(_NONE_RECORD)
+            continue
+        entry = _WRITERS.get(type(node)) or _subclass_writer(type(node))
+        if entry is None:
+            raise TypeError(f"Nó não suportado na AST: {type(node).__name__}")
+        tag, write = entry
+        out = bytearray((tag,))
+        stack += write(writer, node, out)
+        records.append(out)
+        if tag != NodeTag.PROGRAM:
+            offsets.append(node.offset)
+    records.reverse()
+    offsets.reverse()
+
+    data = bytearray(MAGIC)
+    data.append(FORMAT_VERSION)
+    _varint(data, len(writer.strings))
+    for value in writer.strings:
+        encoded = value.encode("utf-8")
+        _varint(data, len(encoded))
+        data += encoded
+    _varint(data, len(writer.floats))
+    for packed in writer.floats:
+        data += packed
+    deltas = bytearray()
+    previous = -1
+    for offset in offsets:
+        _varint(deltas, _zigzag(offset - previous))
+        previous = offset
+    _varint(data, len(deltas))
+    data += deltas
+    data += b"".join(records)
+    return bytes(data)
+
+
+# ---------- leitura ----------
+# cada leitor consome os campos do registro a partir de `i` (em `ints`, os
+# varints da seção de nós), troca os filhos no topo de `values` pelo nó e
+# devolve o índice do próximo registro; `offset()` dá o offset do nó
+
+
+def _take(values: list, n: int) -> list:
+    if n > len(values):
+        raise ValueError("Dados de AST inconsistentes: filhos faltando")
+    if not n:
+        return []
+    taken = values[-n:]
+    del values[-n:]
+    return taken
+
+
+def _read_none(ints, i, values, strings, floats, offset):
+    values.append(None)
+    return i
+
+
+def _read_program(ints, i, values, strings, floats, offset):
+    count = ints[i]
+    n_errors = ints[i + 1]
+    i += 2
+    errors = []
+    for _ in range(n_errors):
+        code = strings[ints[i]]
+        if not code:
+            errors.append(strings[ints[i + 1]])
+            i += 2
+            continue
+        n_arguments = ints[i + 4]
+        arguments = tuple(strings[index] for index in ints[i + 5:i + 5 + n_arguments])
+        errors.append(Diagnostic(code, arguments, _unzigzag(ints[i + 2]), _unzigzag(ints[i + 3]),
+                                 Severity(strings[ints[i + 1]])))
+        i += 5 + n_arguments
+    values.append(Program(_take(values, count), errors))
+    return i
+
+
+def _read_literal_int(ints, i, values, strings, floats, offset):
+    values.append(Literal(_unzigzag(ints[i]), strings[ints[i + 1]], offset()))
+    return i + 2
+
+
+def _read_literal_float(ints, i, values, strings, floats, offset):
+    values.append(Literal(floats[ints[i]], strings[ints[i + 1]], offset()))
+    return i + 2
+
+
+def _read_literal_str(ints, i, values, strings, floats, offset):
+    values.append(Literal(strings[ints[i]], strings[ints[i + 1]], offset()))
+    return i + 2
+
+
+def _constant_literal_reader(value):
+    def read(ints, i, values, strings, floats, offset):
+        values.append(Literal(value, strings[ints[i]], offset()))
+        return i + 1
+    return read
+
+
+def _read_identifier(ints, i, values, strings, floats, offset):
+    values.append(Identifier(strings[ints[i]], offset()))
+    return i + 1
+
+
+def _read_declaration(ints, i, values, strings, floats, offset):
+    (initial,) = _take(values, 1)
+    values.append(Declaration(strings[ints[i]], strings[ints[i + 1]], initial, offset()))
+    return i + 2
+
+
+def _read_assignment(ints, i, values, strings, floats, offset):
+    (value,) = _take(values, 1)
+    values.append(Assignment(strings[ints[i]], value, offset()))
+    return i + 1
+
+
+def _read_binary_operation(ints, i, values, strings, floats, offset):
+    left, right = _take(values, 2)
+    values.append(BinaryOperation(left, strings[ints[i]], right, offset()))
+    return i + 1
+
+
+def _read_unary_operation(ints, i, values, strings, floats, offset):
+    (operand,) = _take(values, 1)
+    values.append(UnaryOperation(strings[ints[i]], operand, offset()))
+    return i + 1
+
+
+def _read_list_literal(ints, i, values, strings, floats, offset):
+    values.append(ListLiteral(_take(values, ints[i]), offset()))
+    return i + 1
+
+
+def _read_index_access(ints, i, values, strings, floats, offset):
+    obj, index = _take(values, 2)
+    values.append(IndexAccess(obj, index, offset()))
+    return i
+
+
+def _read_function_decl(ints, i, values, strings, floats, offset):
+    name = strings[ints[i]]
+    n_params = ints[i + 1]
+    i += 2
+    parameters = [strings[index] for index in ints[i:i + n_params]]
+    i += n_params
+    values.append(FunctionDecl(name, parameters, _take(values, ints[i]), offset()))
+    return i + 1
+
+
+def _read_function_call(ints, i, values, strings, floats, offset):
+    values.append(FunctionCall(strings[ints[i]], _take(values, ints[i + 1]), offset()))
+    return i + 2
+
+
+def _read_if_statement(ints, i, values, strings, floats, offset):
+    n_then = ints[i]
+    n_else_ifs = ints[i + 1]
+    i += 2
+    sizes = ints[i:i + n_else_ifs]
+    i += n_else_ifs
+    n_else = ints[i]
+    children = _take(values, 1 + n_then + n_else_ifs + sum(sizes) + max(n_else - 1, 0))
+    k = 1 + n_then
+    else_ifs = []
+    for size in sizes:
+        else_ifs.append((children[k], children[k + 1:k + 1 + size]))
+        k += 1 + size
+    else_block = children[k:] if n_else else None
+    values.append(IfStatement(children[0], children[1:1 + n_then], else_ifs, else_block, offset()))
+    return i + 1
+
+
+def _block_reader(cls):
+    # nós com um filho (condição, contagem) seguido do corpo
+    def read(ints, i, values, strings, floats, offset):
+        children = _take(values, ints[i] + 1)
+        values.append(cls(children[0], children[1:], offset()))
+        return i + 1
+    return read
+
+
+def _read_for_each_statement(ints, i, values, strings, floats, offset):
+    children = _take(values, ints[i + 1] + 1)
+    values.append(ForEachStatement(strings[ints[i]], children[0], children[1:], offset()))
+    return i + 2
+
+
+def _read_return_statement(ints, i, values, strings, floats, offset):
+    (value,) = _take(values, 1)
+    values.append(ReturnStatement(value, offset()))
+    return i
+
+
+def _read_print_statement(ints, i, values, strings, floats, offset):
+    values.append(PrintStatement(_take(values, ints[i]), offset()))
+    return i + 1
+
+
+def _read_input_statement(ints, i, values, strings, floats, offset):
+    (prompt,) = _take(values, 1)
+    values.append(InputStatement(strings[ints[i]], prompt, offset()))
+    return i + 1
+
+
+_READERS: Dict[int, Callable] = {
+    NodeTag.NONE: _read_none,
+    NodeTag.PROGRAM: _read_program,
+    NodeTag.LITERAL_INT: _read_literal_int,
+    NodeTag.LITERAL_FLOAT: _read_literal_float,
+    NodeTag.LITERAL_STR: _read_literal_str,
+    NodeTag.LITERAL_TRUE: _constant_literal_reader(True),
+    NodeTag.LITERAL_FALSE: _constant_literal_reader(False),
+    NodeTag.LITERAL_NONE: _constant_literal_reader(None),
+    NodeTag.IDENTIFIER: _read_identifier,
+    NodeTag.DECLARATION: _read_declaration,
+    NodeTag.ASSIGNMENT: _read_assignment,
+    NodeTag.BINARY_OPERATION: _read_binary_operation,
+    NodeTag.UNARY_OPERATION: _read_unary_operation,
+    NodeTag.LIST_LITERAL: _read_list_literal,
+    NodeTag.INDEX_ACCESS: _read_index_access,
+    NodeTag.FUNCTION_DECL: _read_function_decl,
+    NodeTag.FUNCTION_CALL: _read_function_call,
+    NodeTag.IF_STATEMENT: _read_if_statement,
+    NodeTag.WHILE_STATEMENT: _block_reader(WhileStatement),
+    NodeTag.FOR_EACH_STATEMENT: _read_for_each_statement,
+    NodeTag.REPEAT_STATEMENT: _block_reader(RepeatStatement),
+    NodeTag.RETURN_STATEMENT: _read_return_statement,
+    NodeTag.PRINT_STATEMENT: _read_print_statement,
+    NodeTag.INPUT_STATEMENT: _read_input_statement,
+}
+# tupla indexada pelo byte de tipo: mais rápida que o dicionário no laço
+_READER_TABLE = tuple(_READERS[tag] for tag in sorted(_READERS))
+
+
+def load_ast(data: bytes) -> Program:
+    """Reconstrói o `Program` gravado por `dump_ast`
+
+    Lança ValueError para dados de outro formato, de outra versão ou
+    truncados.
+    """
+    data = bytes(data)
+    header = len(MAGIC) + 1
+    if len(data) < header or data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Dados não são uma AST serializada por dump_ast")
+    if data[len(MAGIC)] != FORMAT_VERSION:
+        raise ValueError(f"Versão de AST serializada não suportada: {data[len(MAGIC)]} (esperada {FORMAT_VERSION})")
+    # a leitura só cria nós novos, sem ciclos: o coletor de ciclos, disparado
+    # a cada tantas alocações, só custaria tempo (é a maior parte dele em ASTs grandes)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        count, pos = _read_varint(data, header)
+        strings: List[str] = []
+        for _ in range(count):
+            size, pos = _read_varint(data, pos)
+            end = pos + size
+            if end > len(data):
+                raise ValueError("Dados de AST truncados")
+            strings.append(data[pos:end].decode("utf-8"))
+            pos = end
+        count, pos = _read_varint(data, pos)
+        end = pos + count * _DOUBLE.size
+        floats = [value for (value,) in _DOUBLE.iter_unpack(data[pos:end])]
+        size, pos = _read_varint(data, end)
+        end = pos + size
+        if end > len(data):
+            raise ValueError("Dados de AST truncados")
+        offsets = accumulate(map(_unzigzag, _decode_varints(data[pos:end])), initial=-1)
+        next(offsets)
+        offset = offsets.__next__
+        ints = _decode_varints(data[end:])
+        values: list = []
+        readers = _READER_TABLE
+        i = 0
+        end = len(ints)
+        while i < end:
+            i = readers[ints[i]](ints, i + 1, values, strings, floats, offset)
+    except (IndexError, UnicodeDecodeError, StopIteration, struct.error) as e:
+        raise ValueError(f"Dados de AST truncados ou corrompidos: {e!r}") from e
+    finally:
+        if gc_enabled:
+            gc.enable()
+    if i != end or len(values) != 1 or type(values[0]) is not Program or next(offsets, None) is not None:
+        raise ValueError("Dados de AST inconsistentes: esperado um único Program")
+    return values[0]
+
+
+__all__ = ["MAGIC", "FORMAT_VERSION", "NodeTag", "dump_ast", "load_ast"]
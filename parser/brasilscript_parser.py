@@ -5,13 +5,35 @@ Este módulo implementa um parser recursivo descendente básico seguindo
 a gramática formal definida para o BrasilScript.
 """
 
-from typing import List, Optional, Any, Union
+from typing import Iterator, List, Optional, Any, Union
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 #from parser.brasilscript_parser import parse_brasilscript, ParseError
 
 # Assumindo que temos o lexer disponível (pacote top-level `lexer`)
-from lexer.lexer import tokenize_text
+from lexer.lexer import tokenize_text, iter_tokens_text
+from lexer.regex_lexer import tokenize_text as regex_tokenize_text, iter_tokens as regex_iter_tokens
+
+# Nós da AST (conjunto canônico compartilhado com semantic.py e codegen.py)
+import parser.ast as ast_nodes
+from parser.diagnostics import TOO_MANY_ERRORS, Diagnostic, too_many
+from parser.ast import (
+    ASTNode, Program, Declaration, Assignment, FunctionDecl, IfStatement,
+    WhileStatement, RepeatStatement, ForEachStatement, PrintStatement,
+    InputStatement, ReturnStatement, FunctionCall, BinaryOperation,
+    UnaryOperation, Literal, Identifier, ListLiteral, IndexAccess
+)
+
+# Motores léxicos disponíveis para `parse_brasilscript` (todos produzem tuplas (tipo, lexema))
+LEXER_ENGINES = {
+    "afd": tokenize_text,
+    "regex": regex_tokenize_text,
+}
+# Versões sob demanda, que podem começar em qualquer fronteira de token
+LEXER_STREAMS = {
+    "afd": iter_tokens_text,
+    "regex": regex_iter_tokens,
+}
 
 
 class TokenType(Enum):
@@ -35,582 +57,923 @@ class TokenType(Enum):
     EOF = "EOF"
 
 
+# Terminais internados como inteiros pequenos. Tipos de token e lexemas fixos
+# (palavras-chave, literais lógicos, operadores e delimitadores) usam faixas
+# disjuntas do mesmo espaço de ids, então um único `int` ou `frozenset`
+# descreve qualquer expectativa do parser.
+TOKEN_KINDS = [t.value for t in TokenType] + ["IDENTIFICADOR_INVALIDO"]
+FIXED_LEXEMES = [
+    "declarar", "como", "mostrar", "perguntar", "guardar_em", "se", "entao", "senao", "senao_se", "fim_se",
+    "repetir", "vezes", "enquanto", "faca", "fim_enquanto", "fim_repetir", "funcao", "fim_funcao", "retornar",
+    "para_cada", "em", "fim_para_cada", "parar", "e", "ou", "nao", "lista", "texto", "numero", "logico",
+    "verdadeiro", "falso",
+    "+", "-", "*", "/", "%", "=", "==", "!=", "<", "<=", ">", ">=",
+    "(", ")", "[", "]", "{", "}", ",", ";", ":", ".",
+]
+KIND_IDS = {name: i for i, name in enumerate(TOKEN_KINDS, start=1)}
+VALUE_IDS = {lexeme: i for i, lexeme in enumerate(FIXED_LEXEMES, start=len(KIND_IDS) + 1)}
+SYMBOL_NAMES = {i: name for name, i in {**KIND_IDS, **VALUE_IDS}.items()}
+
+K_EOF = KIND_IDS["EOF"]
+K_PALAVRA_CHAVE = KIND_IDS["PALAVRA_CHAVE"]
+K_IDENTIFICADOR = KIND_IDS["IDENTIFICADOR"]
+K_NUMERO_LITERAL = KIND_IDS["NUMERO_LITERAL"]
+K_STRING_LITERAL = KIND_IDS["STRING_LITERAL"]
+
+V_DECLARAR = VALUE_IDS["declarar"]
+V_COMO = VALUE_IDS["como"]
+V_MOSTRAR = VALUE_IDS["mostrar"]
+V_PERGUNTAR = VALUE_IDS["perguntar"]
+V_GUARDAR_EM = VALUE_IDS["guardar_em"]
+V_SE = VALUE_IDS["se"]
+V_ENTAO = VALUE_IDS["entao"]
+V_SENAO = VALUE_IDS["senao"]
+V_SENAO_SE = VALUE_IDS["senao_se"]
+V_FIM_SE = VALUE_IDS["fim_se"]
+V_REPETIR = VALUE_IDS["repetir"]
+V_VEZES = VALUE_IDS["vezes"]
+V_ENQUANTO = VALUE_IDS["enquanto"]
+V_FACA = VALUE_IDS["faca"]
+V_FIM_ENQUANTO = VALUE_IDS["fim_enquanto"]
+V_FIM_REPETIR = VALUE_IDS["fim_repetir"]
+V_FUNCAO = VALUE_IDS["funcao"]
+V_FIM_FUNCAO = VALUE_IDS["fim_funcao"]
+V_RETORNAR = VALUE_IDS["retornar"]
+V_PARA_CADA = VALUE_IDS["para_cada"]
+V_EM = VALUE_IDS["em"]
+V_FIM_PARA_CADA = VALUE_IDS["fim_para_cada"]
+V_PARAR = VALUE_IDS["parar"]
+V_E = VALUE_IDS["e"]
+V_OU = VALUE_IDS["ou"]
+V_NAO = VALUE_IDS["nao"]
+V_LISTA = VALUE_IDS["lista"]
+V_VERDADEIRO = VALUE_IDS["verdadeiro"]
+V_FALSO = VALUE_IDS["falso"]
+V_MENOS = VALUE_IDS["-"]
+V_ATRIBUICAO = VALUE_IDS["="]
+V_LPAREN = VALUE_IDS["("]
+V_RPAREN = VALUE_IDS[")"]
+V_LBRACKET = VALUE_IDS["["]
+V_RBRACKET = VALUE_IDS["]"]
+V_VIRGULA = VALUE_IDS[","]
+
+# Conjuntos pré-computados usados nos laços do parser
+BLOCK_TERMINATORS = frozenset({V_FIM_SE, V_FIM_ENQUANTO, V_FIM_REPETIR, V_FIM_PARA_CADA, V_FIM_FUNCAO})
+TYPE_NAMES = frozenset(VALUE_IDS[t] for t in ("numero", "texto", "logico", "lista"))
+LOGICAL_LITERALS = frozenset({V_VERDADEIRO, V_FALSO})
+SKIPPED_TOKEN_TYPES = frozenset({"WHITESPACE", "COMMENT", "NEWLINE"})
+
+# Conjuntos FIRST/FOLLOW de docs/diagramas/analise_first_follow.md, usados
+# para encerrar listas de statements e na recuperação de erros (modo pânico).
+# Misturam ids de tipo (K_*) e de lexema (V_*), que não se sobrepõem.
+FIRST_STATEMENT = frozenset(VALUE_IDS[k] for k in (
+    "declarar", "se", "enquanto", "repetir", "para_cada", "mostrar",
+    "perguntar", "retornar", "funcao", "parar",
+))  # mais IDENTIFICADOR seguido de "=" ou "(" (decisão LL(2))
+FOLLOW_STATEMENT_LIST = BLOCK_TERMINATORS | {V_SENAO_SE, V_SENAO, K_EOF}
+# pontos de sincronização depois de um statement inválido
+STATEMENT_SYNC = FIRST_STATEMENT | FOLLOW_STATEMENT_LIST
+IDENTIFIER_STATEMENT_FOLLOW = frozenset({V_ATRIBUICAO, V_LPAREN})
+# ExprOpt do "retornar" é vazio em FOLLOW(ReturnStmt) = FOLLOW(Statement);
+# IDENTIFICADOR fica de fora porque também inicia Expression
+RETURN_TERMINATORS = STATEMENT_SYNC
+
+# Limite de erros registrados por parse; os demais são descartados
+# (o aviso final é `too_many`, com o texto TOO_MANY_ERRORS de parser.diagnostics)
+MAX_ERRORS = 100
+
+# Binding powers das expressões (maior = liga mais forte)
+BP_OU = 1
+BP_E = 2
+BP_NAO = 3
+BP_RELACIONAL = 4
+BP_ADITIVO = 5
+BP_MULTIPLICATIVO = 6
+BP_UNARIO = 7
+BP_MAX = 99
+
+# Operadores infixos: id do lexema -> binding power (associativos à esquerda,
+# exceto os relacionais, que aparecem no máximo uma vez por operando lógico)
+INFIX_OPS = {
+    V_OU: BP_OU,
+    V_E: BP_E,
+    **{VALUE_IDS[op]: BP_RELACIONAL for op in ("==", "!=", "<", "<=", ">", ">=", "=")},
+    **{VALUE_IDS[op]: BP_ADITIVO for op in ("+", "-")},
+    **{VALUE_IDS[op]: BP_MULTIPLICATIVO for op in ("*", "/", "%")},
+}
+
+# Operadores prefixos: id -> (maior min_bp em que é aceito, bp do operando,
+# maior bp infixo permitido depois dele). "nao" só existe em condições e
+# nega uma PrimaryCondition; "-" vale em qualquer expressão e nega um Factor.
+PREFIX_OPS = {
+    V_NAO: (BP_NAO, BP_RELACIONAL, BP_E),
+    V_MENOS: (BP_MAX, BP_UNARIO, BP_MAX),
+}
+
+
 @dataclass
 class Token:
-    """Representa um token do código fonte"""
+    """Representa um token do código fonte
+
+    `offset` é a posição do primeiro caractere no código fonte (-1 quando
+    desconhecida). `kind` e `sym` são os ids internados de `type` e `value`
+    (0 quando o lexema não é fixo, ex.: identificadores e literais).
+    """
     type: str
     value: str
-    line: int = 0
-    column: int = 0
-
-# Nós da AST (tentar importar do módulo compartilhado `src.parser.ast`)
-try:
-    from src.parser.ast import (
-        Program, Declaration, Assignment, FunctionDecl, IfStatement,
-        WhileStatement, RepeatStatement, ForEachStatement, PrintStatement,
-        InputStatement, ReturnStatement, FunctionCall, BinaryOperation,
-        UnaryOperation, Literal, Identifier, ListLiteral, IndexAccess
-    )
-except Exception:
-    # Import fallback (mantém as definições locais caso o módulo não esteja disponível)
-    from dataclasses import dataclass
-    from typing import List, Optional, Union
-
-    @dataclass
-    class ASTNode:
-        pass
-
-    @dataclass
-    class Program(ASTNode):
-        statements: List[ASTNode]
-
-    @dataclass
-    class Declaration(ASTNode):
-        identifier: str
-        type_name: str
-        initial_value: Optional[ASTNode] = None
-
-    @dataclass
-    class Assignment(ASTNode):
-        identifier: str
-        value: ASTNode
-
-    @dataclass
-    class FunctionDecl(ASTNode):
-        name: str
-        parameters: List[str]
-        body: List[ASTNode]
-
-    @dataclass
-    class IfStatement(ASTNode):
-        condition: ASTNode
-        then_block: List[ASTNode]
-        else_ifs: List[tuple]
-        else_block: Optional[List[ASTNode]] = None
-
-    @dataclass
-    class WhileStatement(ASTNode):
-        condition: ASTNode
-        body: List[ASTNode]
-
-    @dataclass
-    class RepeatStatement(ASTNode):
-        count: ASTNode
-        body: List[ASTNode]
-
-    @dataclass
-    class ForEachStatement(ASTNode):
-        variable: str
-        iterable: ASTNode
-        body: List[ASTNode]
-
-    @dataclass
-    class PrintStatement(ASTNode):
-        expressions: List[ASTNode]
-
-    @dataclass
-    class InputStatement(ASTNode):
-        prompt: ASTNode
-        variable: str
-
-    @dataclass
-    class ReturnStatement(ASTNode):
-        value: Optional[ASTNode] = None
-
-    @dataclass
-    class FunctionCall(ASTNode):
-        name: str
-        arguments: List[ASTNode]
-
-    @dataclass
-    class BinaryOperation(ASTNode):
-        left: ASTNode
-        operator: str
-        right: ASTNode
-
-    @dataclass
-    class UnaryOperation(ASTNode):
-        operator: str
-        operand: ASTNode
-
-    @dataclass
-    class Literal(ASTNode):
-        value: Union[int, float, str, bool]
-        type: str
-
-    @dataclass
-    class Identifier(ASTNode):
-        name: str
-
-    @dataclass
-    class ListLiteral(ASTNode):
-        elements: List[ASTNode]
-
-    @dataclass
-    class IndexAccess(ASTNode):
-        object: ASTNode
-        index: ASTNode
+    offset: int = -1
+    kind: int = field(init=False, repr=False, compare=False)
+    sym: int = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        self.kind = KIND_IDS.get(self.type, 0)
+        self.sym = VALUE_IDS.get(self.value, 0)
+
+
+def intern_expected(expected: Union[str, List[str]]) -> Union[int, frozenset]:
+    """Converte nomes de tipos/lexemas em texto para os ids usados por `match`/`consume`"""
+    if isinstance(expected, str):
+        return KIND_IDS[expected] if expected.isupper() else VALUE_IDS[expected]
+    return frozenset(intern_expected(e) for e in expected)
 
 class ParseError(Exception):
-    """Exceção lançada quando há erro de sintaxe"""
-    pass
+    """Exceção lançada quando há erro de sintaxe
+
+    Os erros léxicos chegam com um `Diagnostic` (parser.diagnostics), cuja
+    mensagem só é formatada em `str(erro)`.
+    """
+
+    @property
+    def diagnostic(self) -> Optional[Diagnostic]:
+        argument = self.args[0] if self.args else None
+        return argument if isinstance(argument, Diagnostic) else None
+
+
+def _lexical_error(error: ValueError) -> ParseError:
+    # ParseError amigável, em português, com o erro do lexer (posição e caractere inválido)
+    pos = getattr(error, "pos", -1)
+    return ParseError(Diagnostic("caractere_invalido", (error,), pos, pos + 1 if pos >= 0 else -1))
+
+
+def number_value(lexeme: str) -> Union[int, float]:
+    """Valor de um NUMERO_LITERAL: int só com dígitos, float com '.' ou expoente"""
+    return int(lexeme) if lexeme.isdigit() else float(lexeme)
+
+
+# Quadros da pilha de `parse_operators` (comparados por identidade)
+_RIGHT = "operando direito"
+_PREFIX = "operando de prefixo"
+_CONDITION = "condição entre parênteses"
+_ARGUMENTS = "argumentos"
+_ELEMENTS = "elementos de lista"
+_INDEX = "índice"
+_GROUP = "expressão entre parênteses"
+
+
+class _Block:
+    """Statement composto aberto na pilha de `BrasilScriptParser._parse_nested`"""
+    __slots__ = ("close", "start", "header", "body")
+
+    def __init__(self, close, start: Token, header: Any):
+        self.close = close      # método que lê o fim do bloco e devolve o nó
+        self.start = start      # token da palavra-chave de abertura
+        self.header = header    # valores lidos no cabeçalho
+        self.body: List[ASTNode] = []
 
 
 class BrasilScriptParser:
-    """Parser recursivo descendente para BrasilScript"""
-    
-    def __init__(self, tokens: List[Token]):
+    """Parser descendente para BrasilScript (blocos e expressões aninhados usam pilhas explícitas)"""
+    
+    def __init__(self, tokens: Union[List[Token], "TokenBuffer"], nodes=ast_nodes, max_errors: Optional[int] = MAX_ERRORS):
+        # garante um EOF final: `advance` nunca passa dele, então
+        # `self.tokens[self.current]` é sempre válido (um TokenBuffer já
+        # termina em EOF, pois vem de `iter_source_tokens`)
+        if not isinstance(tokens, TokenBuffer) and (not tokens or tokens[-1].kind != K_EOF):
+            tokens = tokens + [Token("EOF", "")]
         self.tokens = tokens
         self.current = 0
-        # coletar erros não-fatais para permitir recuperação e construção de AST parcial
-        self.errors: List[str] = []
+        # fábrica de nós: o módulo parser.ast (árvore de objetos) ou qualquer
+        # objeto com construtores de mesma assinatura (ex.: FlatASTBuilder)
+        self.nodes = nodes
+        # coletar erros não-fatais (`Diagnostic`s de parser.diagnostics) para
+        # permitir recuperação e construção de AST parcial
+        self.errors: List[Diagnostic] = []
+        self.max_errors = max_errors
+        # depois de um erro, os seguintes são tratados como cascata e omitidos
+        # até o próximo statement ou o próximo token esperado encontrado
+        self._recovering = False
+        # despacho de statements por palavra-chave (id internado -> método ligado)
+        self._statement_dispatch = {
+            V_DECLARAR: self.parse_declaration,
+            V_SE: self.parse_if_statement,
+            V_ENQUANTO: self.parse_while_statement,
+            V_REPETIR: self.parse_repeat_statement,
+            V_PARA_CADA: self.parse_foreach_statement,
+            V_MOSTRAR: self.parse_print_statement,
+            V_PERGUNTAR: self.parse_input_statement,
+            V_RETORNAR: self.parse_return_statement,
+            V_FUNCAO: self.parse_function_decl,
+            V_PARAR: self.parse_break_statement,
+        }
+        # statements compostos: leitura do cabeçalho, usada por `_parse_nested`
+        self._block_openers = {
+            V_SE: self._open_if_statement,
+            V_ENQUANTO: self._open_while_statement,
+            V_REPETIR: self._open_repeat_statement,
+            V_PARA_CADA: self._open_foreach_statement,
+            V_FUNCAO: self._open_function_decl,
+        }
         
     def peek(self) -> Token:
         """Retorna o token atual sem consumir"""
-        if self.current >= len(self.tokens):
-            return Token("EOF", "")
         return self.tokens[self.current]
     
     def advance(self) -> Token:
-        """Consome e retorna o token atual"""
-        token = self.peek()
-        if self.current < len(self.tokens):
+        """Consome e retorna o token atual (o EOF final nunca é ultrapassado)"""
+        token = self.tokens[self.current]
+        if token.kind != K_EOF:
             self.current += 1
         return token
     
-    def match(self, expected: Union[str, List[str]]) -> bool:
-        """Verifica se o token atual casa com o esperado"""
+    def match(self, expected: Union[int, frozenset, str, List[str]]) -> bool:
+        """Verifica se o token atual casa com o esperado
+
+        `expected` é um id internado (tipo de token ou lexema fixo) ou um
+        frozenset de ids; nomes em texto são aceitos e convertidos.
+        """
         current_token = self.peek()
-        if isinstance(expected, str):
-            # Se é um tipo de token (maiúsculo)
-            if expected.isupper():
-                return current_token.type == expected
-            # Se é um valor específico
-            return current_token.value == expected
-        
-        # Lista de expectativas
-        for exp in expected:
-            if exp.isupper():
-                if current_token.type == exp:
-                    return True
-            else:
-                if current_token.value == exp:
-                    return True
-        return False
-    
-    def consume(self, expected: str) -> Token:
+        if type(expected) is int:
+            return current_token.kind == expected or current_token.sym == expected
+        if not isinstance(expected, frozenset):
+            expected = intern_expected(expected)
+            if type(expected) is int:
+                return current_token.kind == expected or current_token.sym == expected
+        return current_token.kind in expected or current_token.sym in expected
+    
+    def consume(self, expected: Union[int, str]) -> Token:
         """Consome um token esperado ou lança erro"""
         current = self.peek()
+        if type(expected) is not int:
+            expected = intern_expected(expected)
         
-        # Se esperamos um tipo de token (maiúsculo)
-        if expected.isupper():
-            if current.type == expected:
-                return self.advance()
-            # registrar erro e tentar recuperar (consome o token atual)
-            msg = f"Esperado token {expected}, encontrado {current.type}: '{current.value}'"
-            self.errors.append(msg)
+        if current.kind == expected or current.sym == expected:
+            self._recovering = False
             return self.advance()
         
-        # Se esperamos um valor específico
-        if current.value == expected:
-            return self.advance()
-        msg = f"Esperado '{expected}', encontrado '{current.value}'"
-        self.errors.append(msg)
-        return self.advance()
+        # registrar erro e tentar recuperar
+        name = SYMBOL_NAMES[expected]
+        if expected <= len(KIND_IDS):
+            # Se esperamos um tipo de token
+            self.error("token_esperado", current, name, current.type, current.value)
+        else:
+            # Se esperamos um valor específico
+            self.error("lexema_esperado", current, name, current.value)
+        if current.kind != K_EOF:
+            following = self.tokens[self.current + 1]
+            if following.kind == expected or following.sym == expected:
+                # token sobrando: descarta o atual e consome o esperado
+                self.current += 1
+                return self.advance()
+        # token faltando: segue como se ele estivesse ali, sem consumir nada
+        # (o token atual é devolvido só para quem precisa de um valor)
+        return current
+    
+    def error(self, code: str, token: Token, *arguments) -> None:
+        """Registra um erro não-fatal no `token`, omitindo cascatas e respeitando `max_errors`
+
+        `code` e `arguments` formam um `Diagnostic` (a mensagem vem de
+        parser.diagnostics.MESSAGES e só é formatada quando exibida).
+        """
+        if self._recovering:
+            return
+        self._recovering = True
+        errors = self.errors
+        if self.max_errors is not None and len(errors) >= self.max_errors:
+            if len(errors) == self.max_errors:
+                errors.append(too_many(self.max_errors))
+            return
+        errors.append(Diagnostic(code, arguments, token.offset, token.offset + len(token.value)))
+    
+    def synchronize(self) -> None:
+        """Modo pânico: descarta tokens até um que possa iniciar ou encerrar um statement"""
+        tokens = self.tokens
+        while True:
+            current = tokens[self.current]
+            if current.kind == K_EOF or current.sym in STATEMENT_SYNC:
+                return
+            if current.kind == K_IDENTIFICADOR and tokens[self.current + 1].sym in IDENTIFIER_STATEMENT_FOLLOW:
+                return
+            self.current += 1
     
     def parse(self) -> Program:
-        """Ponto de entrada do parser - programa completo"""
-        statements = self.parse_statement_list()
-        return Program(statements)
+        """Ponto de entrada do parser - programa completo
+
+        Program = StatementList com FOLLOW = {EOF}: um terminador de bloco
+        solto no nível superior é um erro, e o parse continua depois dele.
+        """
+        statements = []
+        tokens = self.tokens
+        while tokens[self.current].kind != K_EOF:
+            stmt = self.parse_statement()
+            if stmt is not None:
+                statements.append(stmt)
+        return self.nodes.Program(statements, self.errors)
     
     def parse_statement_list(self) -> List[ASTNode]:
         """StatementList = { Statement }"""
-        statements = []
-        while not self.match("EOF") and not self.match(["fim_se", "fim_enquanto", "fim_repetir", "fim_para_cada", "fim_funcao"]):
+        return self._parse_nested([], [])
+    
+    def _parse_nested(self, stack: List["_Block"], statements: Optional[List[ASTNode]]):
+        """Laço de StatementList com os blocos abertos em uma pilha explícita
+
+        Statements compostos (se, enquanto, repetir, para_cada, funcao) não
+        recursam: o cabeçalho é lido por `_open_*`, que empilha um `_Block`,
+        e os statements seguintes vão para o corpo do bloco do topo. Em um
+        terminador, `_Block.close` lê a continuação (senao_se, senao, fim_*)
+        e devolve o nó pronto, ou None quando abriu outro corpo no mesmo bloco.
+
+        Com `statements` (lista do nível de fora) devolve essa lista ao achar
+        um terminador com a pilha vazia; com None, devolve o nó do bloco da
+        base da pilha assim que ele fecha.
+        """
+        tokens = self.tokens
+        openers = self._block_openers
+        body = stack[-1].body if stack else statements
+        while True:
+            current = tokens[self.current]
+            if current.kind == K_EOF or current.sym in FOLLOW_STATEMENT_LIST:
+                if not stack:
+                    return statements
+                block = stack[-1]
+                node = block.close(block)
+                if node is None:
+                    body = block.body
+                    continue
+                stack.pop()
+                if stack:
+                    body = stack[-1].body
+                elif statements is None:
+                    return node
+                else:
+                    body = statements
+                body.append(node)
+                continue
+            opener = openers.get(current.sym) if current.kind == K_PALAVRA_CHAVE else None
+            if opener is not None:
+                self._recovering = False
+                block = opener()
+                stack.append(block)
+                body = block.body
+                continue
             stmt = self.parse_statement()
-            if stmt:
-                statements.append(stmt)
-        return statements
+            if stmt is not None:
+                body.append(stmt)
     
     def parse_statement(self) -> Optional[ASTNode]:
         """Statement = Declaration | Assignment | IfStmt | WhileStmt | ..."""
         current = self.peek()
+        # início de statement: ponto de sincronização, encerra a cascata anterior
+        self._recovering = False
         
         # Pular se chegou ao fim
-        if current.type == "EOF":
+        if current.kind == K_EOF:
             return None
             
         # Verificar palavra-chave ou identificador
-        if current.type == "PALAVRA_CHAVE":
-            if current.value == "declarar":
-                return self.parse_declaration()
-            elif current.value == "se":
-                return self.parse_if_statement()
-            elif current.value == "enquanto":
-                return self.parse_while_statement()
-            elif current.value == "repetir":
-                return self.parse_repeat_statement()
-            elif current.value == "para_cada":
-                return self.parse_foreach_statement()
-            elif current.value == "mostrar":
-                return self.parse_print_statement()
-            elif current.value == "perguntar":
-                return self.parse_input_statement()
-            elif current.value == "retornar":
-                return self.parse_return_statement()
-            elif current.value == "funcao":
-                return self.parse_function_decl()
-            elif current.value == "parar":
-                self.advance()
-                return None  # Break statement (pode ser representado diferente)
-        elif current.type == "IDENTIFICADOR":
-            # Pode ser assignment ou function call
-            next_token = self.tokens[self.current + 1] if self.current + 1 < len(self.tokens) else None
-            if next_token and next_token.value == "=":
+        if current.kind == K_PALAVRA_CHAVE:
+            handler = self._statement_dispatch.get(current.sym)
+            if handler is not None:
+                return handler()
+        elif current.kind == K_IDENTIFICADOR:
+            # Pode ser assignment ou function call (o token atual não é o EOF,
+            # então o seguinte sempre existe)
+            next_token = self.tokens[self.current + 1]
+            if next_token.sym == V_ATRIBUICAO:
                 return self.parse_assignment()
-            elif next_token and next_token.value == "(":
+            elif next_token.sym == V_LPAREN:
                 return self.parse_function_call()
         
-        # Se chegou aqui, não reconheceu o statement - registrar erro e pular token
-        self.errors.append(f"token invalido, digite da forma correta: {current.type} = '{current.value}'")
+        # Se chegou aqui, não reconheceu o statement - registrar erro e pular
+        # até o próximo token em FIRST(Statement) ∪ FOLLOW(StatementList)
+        self.error("statement_invalido", current, current.type, current.value)
         self.advance()
+        self.synchronize()
         return None
     
+    def parse_break_statement(self) -> None:
+        """BreakStmt = "parar" """
+        self.advance()
+        return None  # Break statement (pode ser representado diferente)
+    
     def parse_declaration(self) -> Declaration:
         """Declaration = "declarar" Identifier "como" Type [ "=" Expression ]"""
-        self.consume("declarar")
-        identifier = self.consume("IDENTIFICADOR").value
-        self.consume("como")
+        start = self.consume(V_DECLARAR)
+        identifier = self.consume(K_IDENTIFICADOR).value
+        self.consume(V_COMO)
         type_name = self.parse_type()
         
         initial_value = None
-        if self.match("="):
+        if self.match(V_ATRIBUICAO):
             self.advance()
             initial_value = self.parse_expression()
         
-        return Declaration(identifier, type_name, initial_value)
+        return self.nodes.Declaration(identifier, type_name, initial_value, offset=start.offset)
     
     def parse_type(self) -> str:
         """Type = "numero" | "texto" | "logico" | "lista" [ "[" Type "]" ]"""
-        current = self.peek()
-        if current.type == "PALAVRA_CHAVE" and current.value in ["numero", "texto", "logico", "lista"]:
-            type_name = self.advance().value
-            if type_name == "lista" and self.match("["):
-                self.consume("[")
-                element_type = self.parse_type()
-                self.consume("]")
-                return f"lista[{element_type}]"
-            return type_name
-        else:
-            msg = f"Tipo esperado, encontrado '{current.type}:{current.value}'"
-            self.errors.append(msg)
-            # tentar recuperar retornando um tipo genérico
-            self.advance()
-            return "any"
+        depth = 0
+        while True:
+            current = self.peek()
+            if current.kind == K_PALAVRA_CHAVE and current.sym in TYPE_NAMES:
+                type_name = self.advance().value
+                if current.sym == V_LISTA and self.match(V_LBRACKET):
+                    self.consume(V_LBRACKET)
+                    depth += 1
+                    continue
+            else:
+                self.error("tipo_esperado", current, current.type, current.value)
+                # tentar recuperar retornando um tipo genérico
+                self.advance()
+                type_name = "any"
+            break
+        for _ in range(depth):
+            self.consume(V_RBRACKET)
+        return "lista[" * depth + type_name + "]" * depth
     
     def parse_assignment(self) -> Assignment:
         """Assignment = Identifier "=" Expression"""
-        identifier = self.consume("IDENTIFICADOR").value
-        self.consume("=")
+        start = self.consume(K_IDENTIFICADOR)
+        self.consume(V_ATRIBUICAO)
         value = self.parse_expression()
-        return Assignment(identifier, value)
+        return self.nodes.Assignment(start.value, value, offset=start.offset)
     
     def parse_function_decl(self) -> FunctionDecl:
         """FuncDecl = "funcao" Identifier "(" [ FormalParams ] ")" StatementList "fim_funcao" """
-        self.consume("funcao")
-        name = self.consume("IDENTIFICADOR").value
-        self.consume("(")
+        return self._parse_nested([self._open_function_decl()], None)
+    
+    def _open_function_decl(self) -> "_Block":
+        start = self.consume(V_FUNCAO)
+        name = self.consume(K_IDENTIFICADOR).value
+        self.consume(V_LPAREN)
         
         parameters = []
-        if not self.match(")"):
+        if not self.match(V_RPAREN):
             parameters = self.parse_formal_params()
         
-        self.consume(")")
-        body = self.parse_statement_list()
-        self.consume("fim_funcao")
-        
-        return FunctionDecl(name, parameters, body)
+        self.consume(V_RPAREN)
+        return _Block(self._close_function_decl, start, (name, parameters))
+    
+    def _close_function_decl(self, block: "_Block") -> FunctionDecl:
+        self.consume(V_FIM_FUNCAO)
+        name, parameters = block.header
+        return self.nodes.FunctionDecl(name, parameters, block.body, offset=block.start.offset)
     
     def parse_formal_params(self) -> List[str]:
         """FormalParams = Identifier { "," Identifier }"""
-        params = [self.consume("IDENTIFICADOR").value]
+        params = [self.consume(K_IDENTIFICADOR).value]
         
-        while self.match(","):
+        while self.match(V_VIRGULA):
             self.advance()
-            params.append(self.consume("IDENTIFICADOR").value)
+            params.append(self.consume(K_IDENTIFICADOR).value)
         
         return params
     
     def parse_if_statement(self) -> IfStatement:
         """IfStmt = "se" Condition "entao" StatementList { "senao_se" Condition "entao" StatementList } [ "senao" StatementList ] "fim_se" """
-        self.consume("se")
+        return self._parse_nested([self._open_if_statement()], None)
+    
+    def _open_if_statement(self) -> "_Block":
+        start = self.consume(V_SE)
         condition = self.parse_condition()
-        self.consume("entao")
-        then_block = self.parse_statement_list()
+        self.consume(V_ENTAO)
+        # [condição, bloco então, senao_ses, condição do senao_se aberto, no senao?]
+        return _Block(self._close_if_statement, start, [condition, None, [], None, False])
+    
+    def _close_if_statement(self, block: "_Block") -> Optional[IfStatement]:
+        header = block.header
+        condition, then_block, else_ifs, elif_condition, in_else = header
+        if in_else:
+            self.consume(V_FIM_SE)
+            return self.nodes.IfStatement(condition, then_block, else_ifs, block.body, offset=block.start.offset)
+        if then_block is None:
+            header[1] = then_block = block.body
+        else:
+            else_ifs.append((elif_condition, block.body))
         
-        else_ifs = []
-        while self.match("senao_se"):
+        if self.match(V_SENAO_SE):
             self.advance()
-            elif_condition = self.parse_condition()
-            self.consume("entao")
-            elif_block = self.parse_statement_list()
-            else_ifs.append((elif_condition, elif_block))
-        
-        else_block = None
-        if self.match("senao"):
+            header[3] = self.parse_condition()
+            self.consume(V_ENTAO)
+            block.body = []
+            return None
+        if self.match(V_SENAO):
             self.advance()
-            else_block = self.parse_statement_list()
+            header[4] = True
+            block.body = []
+            return None
         
-        self.consume("fim_se")
-        return IfStatement(condition, then_block, else_ifs, else_block)
+        self.consume(V_FIM_SE)
+        return self.nodes.IfStatement(condition, then_block, else_ifs, None, offset=block.start.offset)
     
     def parse_while_statement(self) -> WhileStatement:
         """WhileStmt = "enquanto" Condition "faca" StatementList "fim_enquanto" """
-        self.consume("enquanto")
+        return self._parse_nested([self._open_while_statement()], None)
+    
+    def _open_while_statement(self) -> "_Block":
+        start = self.consume(V_ENQUANTO)
         condition = self.parse_condition()
-        self.consume("faca")
-        body = self.parse_statement_list()
-        self.consume("fim_enquanto")
-        return WhileStatement(condition, body)
+        self.consume(V_FACA)
+        return _Block(self._close_while_statement, start, condition)
+    
+    def _close_while_statement(self, block: "_Block") -> WhileStatement:
+        self.consume(V_FIM_ENQUANTO)
+        return self.nodes.WhileStatement(block.header, block.body, offset=block.start.offset)
     
     def parse_repeat_statement(self) -> RepeatStatement:
         """RepeatStmt = "repetir" Expression "vezes" StatementList "fim_repetir" """
-        self.consume("repetir")
+        return self._parse_nested([self._open_repeat_statement()], None)
+    
+    def _open_repeat_statement(self) -> "_Block":
+        start = self.consume(V_REPETIR)
         count = self.parse_expression()
-        self.consume("vezes")
-        body = self.parse_statement_list()
-        self.consume("fim_repetir")
-        return RepeatStatement(count, body)
+        self.consume(V_VEZES)
+        return _Block(self._close_repeat_statement, start, count)
+    
+    def _close_repeat_statement(self, block: "_Block") -> RepeatStatement:
+        self.consume(V_FIM_REPETIR)
+        return self.nodes.RepeatStatement(block.header, block.body, offset=block.start.offset)
     
     def parse_foreach_statement(self) -> ForEachStatement:
         """ForStmt = "para_cada" Identifier "em" Expression "faca" StatementList "fim_para_cada" """
-        self.consume("para_cada")
-        variable = self.consume("IDENTIFICADOR").value
-        self.consume("em")
+        return self._parse_nested([self._open_foreach_statement()], None)
+    
+    def _open_foreach_statement(self) -> "_Block":
+        start = self.consume(V_PARA_CADA)
+        variable = self.consume(K_IDENTIFICADOR).value
+        self.consume(V_EM)
         iterable = self.parse_expression()
-        self.consume("faca")
-        body = self.parse_statement_list()
-        self.consume("fim_para_cada")
-        return ForEachStatement(variable, iterable, body)
+        self.consume(V_FACA)
+        return _Block(self._close_foreach_statement, start, (variable, iterable))
+    
+    def _close_foreach_statement(self, block: "_Block") -> ForEachStatement:
+        self.consume(V_FIM_PARA_CADA)
+        variable, iterable = block.header
+        return self.nodes.ForEachStatement(variable, iterable, block.body, offset=block.start.offset)
     
     def parse_print_statement(self) -> PrintStatement:
         """PrintStmt = "mostrar" Expression { "," Expression }"""
-        self.consume("mostrar")
+        start = self.consume(V_MOSTRAR)
         expressions = [self.parse_expression()]
         
-        while self.match(","):
+        while self.match(V_VIRGULA):
             self.advance()
             expressions.append(self.parse_expression())
         
-        return PrintStatement(expressions)
+        return self.nodes.PrintStatement(expressions, offset=start.offset)
     
     def parse_input_statement(self) -> InputStatement:
         """InputStmt = "perguntar" Expression "guardar_em" Identifier"""
-        self.consume("perguntar")
+        start = self.consume(V_PERGUNTAR)
         prompt = self.parse_expression()
-        self.consume("guardar_em")
-        variable = self.consume("IDENTIFICADOR").value
-        return InputStatement(prompt, variable)
+        self.consume(V_GUARDAR_EM)
+        variable = self.consume(K_IDENTIFICADOR).value
+        return self.nodes.InputStatement(variable, prompt, offset=start.offset)
     
     def parse_return_statement(self) -> ReturnStatement:
         """ReturnStmt = "retornar" [ Expression ]"""
-        self.consume("retornar")
+        start = self.consume(V_RETORNAR)
         value = None
-        if not self.match(["fim_funcao", "EOF"]):
+        if not self.match(RETURN_TERMINATORS):
             value = self.parse_expression()
-        return ReturnStatement(value)
+        return self.nodes.ReturnStatement(value, offset=start.offset)
     
     def parse_function_call(self) -> FunctionCall:
         """FuncCall = Identifier "(" [ ActualParams ] ")" """
-        name = self.consume("IDENTIFICADOR").value
-        self.consume("(")
+        start = self.consume(K_IDENTIFICADOR)
+        self.consume(V_LPAREN)
         
         arguments = []
-        if not self.match(")"):
+        if not self.match(V_RPAREN):
             arguments = self.parse_actual_params()
         
-        self.consume(")")
-        return FunctionCall(name, arguments)
+        self.consume(V_RPAREN)
+        return self.nodes.FunctionCall(start.value, arguments, offset=start.offset)
     
     def parse_actual_params(self) -> List[ASTNode]:
         """ActualParams = Expression { "," Expression }"""
         params = [self.parse_expression()]
         
-        while self.match(","):
+        while self.match(V_VIRGULA):
             self.advance()
             params.append(self.parse_expression())
         
         return params
     
     def parse_condition(self) -> ASTNode:
-        """Condition = OrCondition"""
-        return self.parse_or_condition()
-    
-    def parse_or_condition(self) -> ASTNode:
-        """OrCondition = AndCondition { "ou" AndCondition }"""
-        left = self.parse_and_condition()
-        
-        while self.match("ou"):
-            operator = self.advance().value
-            right = self.parse_and_condition()
-            left = BinaryOperation(left, operator, right)
-        
-        return left
-    
-    def parse_and_condition(self) -> ASTNode:
-        """AndCondition = NotCondition { "e" NotCondition }"""
-        left = self.parse_not_condition()
-        
-        while self.match("e"):
-            operator = self.advance().value
-            right = self.parse_not_condition()
-            left = BinaryOperation(left, operator, right)
-        
-        return left
-    
-    def parse_not_condition(self) -> ASTNode:
-        """NotCondition = "nao" PrimaryCondition | PrimaryCondition"""
-        if self.match("nao"):
-            operator = self.advance().value
-            operand = self.parse_primary_condition()
-            return UnaryOperation(operator, operand)
-        
-        return self.parse_primary_condition()
-    
-    def parse_primary_condition(self) -> ASTNode:
-        """PrimaryCondition = Expression [ RelOp Expression ] | "(" Condition ")" """
-        if self.match("("):
-            self.advance()
-            condition = self.parse_condition()
-            self.consume(")")
-            return condition
-        
-        left = self.parse_expression()
-        
-        # Verificar operadores relacionais
-        current = self.peek()
-        if current.value in ["==", "!=", "<", "<=", ">", ">=", "="]:
-            operator = self.advance().value
-            right = self.parse_expression()
-            return BinaryOperation(left, operator, right)
-        
-        return left
+        """Condition = OrCondition (ou > e > nao > relacionais > aritméticos)"""
+        return self.parse_operators(BP_OU)
     
     def parse_expression(self) -> ASTNode:
-        """Expression = Term { ArithOp Term }"""
-        left = self.parse_term()
-        
-        while self.match(["+", "-"]):
-            operator = self.advance().value
-            right = self.parse_term()
-            left = BinaryOperation(left, operator, right)
-        
-        return left
-    
-    def parse_term(self) -> ASTNode:
-        """Term = Factor { MulOp Factor }"""
-        left = self.parse_factor()
-        
-        while self.match(["*", "/", "%"]):
-            operator = self.advance().value
-            right = self.parse_factor()
-            left = BinaryOperation(left, operator, right)
-        
-        return left
-    
-    def parse_factor(self) -> ASTNode:
-        """Factor = Identifier | Literal | FuncCall | "(" Expression ")" | "[" ListLiteral "]" | IndexAccess"""
-        current = self.peek()
-        
-        if current.type == "IDENTIFICADOR":
-            name = self.advance().value
+        """Expression = Term { ArithOp Term } (apenas operadores aritméticos)"""
+        return self.parse_operators(BP_ADITIVO)
+    
+    def parse_operators(self, min_bp: int) -> ASTNode:
+        """Parser de precedência (Pratt) dirigido por `PREFIX_OPS` e `INFIX_OPS`.
+
+        Consome operadores infixos com binding power >= `min_bp`. Com
+        `min_bp` <= BP_RELACIONAL estamos em uma condição: "(" abre uma
+        Condition completa, como em PrimaryCondition, e depois dela (ou de
+        um "nao" / relacional) só podem seguir operadores lógicos.
+
+        Não há recursão: cada subexpressão pendente (operando direito,
+        operando de prefixo, parênteses, argumentos, elementos de lista,
+        índice) é um quadro em `stack`, então a profundidade de aninhamento
+        só é limitada pela memória. O laço alterna entre descer (começar um
+        nível com `min_bp` até achar o primário) e subir (consumir os
+        infixos do nível e entregar o resultado ao quadro do topo).
+        """
+        tokens = self.tokens
+        nodes = self.nodes
+        stack = []
+        while True:
+            # --- descer: prefixos e "(" de condição empilham o nível atual ---
+            current = tokens[self.current]
+            sym = current.sym
+            prefix = PREFIX_OPS.get(sym)
+            if prefix is not None and min_bp <= prefix[0]:
+                self.current += 1
+                stack.append((_PREFIX, min_bp, current, prefix))
+                min_bp = prefix[1]
+                continue
+            if sym == V_LPAREN and min_bp <= BP_RELACIONAL:
+                # PrimaryCondition = "(" Condition ")"
+                self.current += 1
+                stack.append((_CONDITION, min_bp, current))
+                min_bp = BP_OU
+                continue
+            left = self._start_factor(current, min_bp, stack)
+            if left is None:
+                # o fator abriu um quadro e espera uma Expression
+                min_bp = BP_ADITIVO
+                continue
+            start = current.offset
+            ceiling = BP_MAX
+            
+            # --- subir ---
+            while True:
+                current = tokens[self.current]
+                bp = INFIX_OPS.get(current.sym)
+                if bp is not None and min_bp <= bp <= ceiling:
+                    self.current += 1
+                    stack.append((_RIGHT, min_bp, start, left, current, bp))
+                    # relacionais não associam: Expression RelOp Expression;
+                    # nos demais o operando direito consome o que liga mais forte
+                    min_bp = BP_ADITIVO if bp == BP_RELACIONAL else bp + 1
+                    break
+                # nível concluído: `left` vai para o quadro do topo
+                if not stack:
+                    return left
+                frame = stack[-1]
+                kind = frame[0]
+                if kind is _RIGHT:
+                    stack.pop()
+                    _, min_bp, start, operand, op, bp = frame
+                    left = nodes.BinaryOperation(operand, op.value, left, offset=start)
+                    ceiling = BP_E if bp == BP_RELACIONAL else bp
+                elif kind is _PREFIX:
+                    stack.pop()
+                    _, min_bp, op, prefix = frame
+                    left = nodes.UnaryOperation(op.value, left, offset=op.offset)
+                    start = op.offset
+                    ceiling = prefix[2]
+                elif kind is _CONDITION:
+                    stack.pop()
+                    min_bp = frame[1]
+                    self.consume(V_RPAREN)
+                    start = frame[2].offset
+                    ceiling = BP_E
+                else:
+                    left = self._resume_factor(frame, left, stack)
+                    if left is None:
+                        # outro argumento / elemento depois de ","
+                        min_bp = BP_ADITIVO
+                        break
+                    min_bp = frame[1]
+                    start = frame[2].offset
+                    ceiling = BP_MAX
+    
+    def _start_factor(self, current: Token, min_bp: int, stack: list) -> Optional[ASTNode]:
+        """Factor = Identifier | Literal | FuncCall | "(" Expression ")" | "[" ListLiteral "]" | IndexAccess
+
+        Devolve o nó quando o fator é atômico. Quando ele contém
+        Expressions, empilha um quadro (com o `min_bp` do nível) e devolve
+        None; `_resume_factor` recebe cada Expression concluída. O "-"
+        unário é tratado como operador prefixo em `parse_operators`.
+        """
+        if current.kind == K_IDENTIFICADOR:
+            self.current += 1
+            following = self.tokens[self.current].sym
             
             # Verificar se é function call
-            if self.match("("):
+            if following == V_LPAREN:
                 self.advance()
-                arguments = []
-                if not self.match(")"):
-                    arguments = self.parse_actual_params()
-                self.consume(")")
-                return FunctionCall(name, arguments)
+                if not self.match(V_RPAREN):
+                    stack.append((_ARGUMENTS, min_bp, current, []))
+                    return None
+                self.consume(V_RPAREN)
+                return self.nodes.FunctionCall(current.value, [], offset=current.offset)
             
             # Verificar se é index access
-            elif self.match("["):
+            elif following == V_LBRACKET:
+                # o objeto é construído antes do índice (ordem do fonte)
+                obj = self.nodes.Identifier(current.value, offset=current.offset)
                 self.advance()
-                index = self.parse_expression()
-                self.consume("]")
-                return IndexAccess(Identifier(name), index)
+                stack.append((_INDEX, min_bp, current, obj))
+                return None
             
             # Simples identifier
-            return Identifier(name)
-        
-        elif current.type == "NUMERO_LITERAL":
-            value = self.advance().value
-            return Literal(float(value) if '.' in value else int(value), "numero")
+            return self.nodes.Identifier(current.value, offset=current.offset)
         
-        elif current.type == "STRING_LITERAL":
-            value = self.advance().value
-            return Literal(value, "texto")
+        elif current.kind == K_NUMERO_LITERAL:
+            self.current += 1
+            return self.nodes.Literal(number_value(current.value), "numero", offset=current.offset)
         
-        elif current.value in ["verdadeiro", "falso"]:
+        elif current.kind == K_STRING_LITERAL:
             value = self.advance().value
-            return Literal(value == "verdadeiro", "logico")
+            return self.nodes.Literal(value, "texto", offset=current.offset)
         
-        elif current.value == "(":
+        elif current.sym in LOGICAL_LITERALS:
             self.advance()
-            expr = self.parse_expression()
-            self.consume(")")
-            return expr
+            return self.nodes.Literal(current.sym == V_VERDADEIRO, "logico", offset=current.offset)
         
-        elif current.value == "[":
+        elif current.sym == V_LPAREN:
             self.advance()
-            elements = []
-            if not self.match("]"):
-                elements = self.parse_actual_params()
-            self.consume("]")
-            return ListLiteral(elements)
+            stack.append((_GROUP, min_bp, current))
+            return None
         
-        elif current.value == "-":
-            # Unary minus
-            operator = self.advance().value
-            operand = self.parse_factor()
-            return UnaryOperation(operator, operand)
+        elif current.sym == V_LBRACKET:
+            self.advance()
+            if not self.match(V_RBRACKET):
+                stack.append((_ELEMENTS, min_bp, current, []))
+                return None
+            self.consume(V_RBRACKET)
+            return self.nodes.ListLiteral([], offset=current.offset)
         
         else:
             # registrar erro e produzir nó de erro (Literal com tipo 'error') para continuar
-            msg = f"Fator inesperado: '{current.value}'"
-            self.errors.append(msg)
+            self.error("fator_inesperado", current, current.value)
             self.advance()
-            return Literal(None, "error")
+            return self.nodes.Literal(None, "error", offset=current.offset)
+    
+    def _resume_factor(self, frame: tuple, value: ASTNode, stack: list) -> Optional[ASTNode]:
+        """Entrega uma Expression ao quadro de fator do topo
+
+        Devolve o fator pronto (e desempilha o quadro) ou None quando uma
+        "," pede mais uma Expression para o mesmo quadro.
+        """
+        kind = frame[0]
+        if kind is _ARGUMENTS or kind is _ELEMENTS:
+            # ActualParams = Expression { "," Expression }
+            frame[3].append(value)
+            if self.match(V_VIRGULA):
+                self.advance()
+                return None
+            stack.pop()
+            start = frame[2]
+            if kind is _ARGUMENTS:
+                self.consume(V_RPAREN)
+                return self.nodes.FunctionCall(start.value, frame[3], offset=start.offset)
+            self.consume(V_RBRACKET)
+            return self.nodes.ListLiteral(frame[3], offset=start.offset)
+        stack.pop()
+        if kind is _INDEX:
+            self.consume(V_RBRACKET)
+            return self.nodes.IndexAccess(frame[3], value, offset=frame[2].offset)
+        # _GROUP: "(" Expression ")"
+        self.consume(V_RPAREN)
+        return value
+
+
+def _lexer(table, engine: str):
+    try:
+        return table[engine]
+    except KeyError:
+        raise ValueError(f"Motor léxico desconhecido: '{engine}' (opções: {', '.join(table)})") from None
+
 
+def tokenize_source(code: str, engine: str = "afd") -> List[Token]:
+    """Tokeniza o código e devolve os `Token`s significativos, terminados por EOF
 
-def parse_brasilscript(code: str) -> Program:
-    """Função de conveniência para fazer o parse de código BrasilScript"""
+    `engine` escolhe o motor léxico: "afd" (padrão, lexer.lexer) ou "regex"
+    (lexer.regex_lexer, mais rápido para muitos fontes curtos).
+    """
+    tokenize = _lexer(LEXER_ENGINES, engine)
     # Tokenizar o código (capturar erros do lexer e transformar em ParseError amigável)
     try:
-        raw_tokens = tokenize_text(code)
-    # ast = parse_brasilscript(code)
+        raw_tokens = tokenize(code)
     except ValueError as e:
-        # Fornece uma mensagem amigável em português quando o lexer encontra caractere inesperado
-        # Inclui a mensagem original do lexer para indicar posição/char inválido
-        raise ParseError(f"token invalido, digite da forma correta: {e}") from e
+        raise _lexical_error(e) from e
     
-    # Converter para objetos Token (filtrando whitespace e comentários)
+    # Converter para objetos Token (filtrando whitespace e comentários). Os
+    # lexers cobrem o fonte inteiro, então o offset de cada token é a soma
+    # dos tamanhos dos lexemas anteriores.
     tokens = []
+    offset = 0
     for token_type, token_value in raw_tokens:
-        if token_type not in ["WHITESPACE", "COMMENT", "NEWLINE"]:
-            tokens.append(Token(token_type, token_value))
+        if token_type not in SKIPPED_TOKEN_TYPES:
+            tokens.append(Token(token_type, token_value, offset))
+        offset += len(token_value)
     
     # Adicionar token EOF
-    tokens.append(Token("EOF", ""))
-    
-    # Fazer o parse (o parser agora coleta erros não-fatais em parser.errors)
+    tokens.append(Token("EOF", "", offset))
+    return tokens
+
+
+def iter_source_tokens(code: str, engine: str = "afd", pos: int = 0) -> Iterator[Token]:
+    """Como `tokenize_source`, mas sob demanda e a partir de `code[pos]`
+
+    `pos` precisa ser uma fronteira de token (ex.: o offset de um `Token`
+    anterior). O último token gerado é o EOF.
+    """
+    stream = _lexer(LEXER_STREAMS, engine)(code, pos)
+    offset = pos
+    try:
+        for token_type, token_value in stream:
+            if token_type not in SKIPPED_TOKEN_TYPES:
+                yield Token(token_type, token_value, offset)
+            offset += len(token_value)
+    except ValueError as e:
+        raise _lexical_error(e) from e
+    yield Token("EOF", "", offset)
+
+
+def parse_brasilscript(code: str, engine: str = "afd") -> Program:
+    """Função de conveniência para fazer o parse de código BrasilScript
+
+    `engine` escolhe o motor léxico (ver `tokenize_source`).
+    """
+    tokens = tokenize_source(code, engine)
+    # Fazer o parse (o parser coleta erros não-fatais em parser.errors e
+    # os anexa a `program._errors` para que o runner possa exibi-los)
+    parser = BrasilScriptParser(tokens)
+    return parser.parse()
+
+
+class TokenBuffer:
+    """Janela de tokens preenchida sob demanda a partir de um iterador
+
+    Indexada com as mesmas posições absolutas de uma lista de tokens, para o
+    parser não notar diferença. Só guarda os tokens a partir da última
+    chamada a `release`, então a memória fica limitada pelo maior statement
+    (mais a lookahead de 2 tokens da gramática).
+    """
+
+    __slots__ = ("_source", "_tokens", "_base")
+
+    def __init__(self, source: Iterator[Token]):
+        self._source = source
+        self._tokens: List[Token] = []
+        # posição absoluta de self._tokens[0]
+        self._base = 0
+
+    def __getitem__(self, index: int) -> Token:
+        tokens = self._tokens
+        i = index - self._base
+        while i >= len(tokens):
+            try:
+                tokens.append(next(self._source))
+            except StopIteration:
+                # depois do EOF só existe o próprio EOF
+                return tokens[-1]
+        return tokens[i]
+
+    def release(self, index: int) -> None:
+        """Descarta os tokens antes da posição absoluta `index`"""
+        drop = index - self._base
+        if drop > 0:
+            del self._tokens[:drop]
+            self._base = index
+
+
+def parse_stream(code: str, engine: str = "afd", errors: Optional[List[Diagnostic]] = None) -> Iterator[ASTNode]:
+    """Gera os statements de nível superior à medida que ficam completos
+
+    Os tokens são produzidos pelo lexer sob demanda, então o primeiro
+    statement sai antes do resto do fonte ser tokenizado e a memória fica
+    limitada pelo maior statement. Os erros não-fatais são acrescentados em
+    `errors` (se fornecida) conforme aparecem; um erro léxico vira ParseError
+    quando o parse chega até ele. A sequência gerada é a mesma de
+    `parse_brasilscript(code, engine).statements`.
+    """
+    tokens = TokenBuffer(iter_source_tokens(code, engine))
     parser = BrasilScriptParser(tokens)
-    program = parser.parse()
-    # Anexar erros (se houver) ao objeto AST para que o runner possa exibi-los
-    setattr(program, "_errors", parser.errors)
-    return program
+    if errors is not None:
+        parser.errors = errors
+    while parser.peek().kind != K_EOF:
+        stmt = parser.parse_statement()
+        tokens.release(parser.current)
+        if stmt is not None:
+            yield stmt
 
 
 # Exemplo de uso
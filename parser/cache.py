@@ -0,0 +1,149 @@
+"""
+Cache persistente de ASTs indexado pelo conteúdo do código fonte
+
+A chave de cada entrada é o SHA-256 do código fonte, da versão do
+compilador (`parser.__version__`) e do motor léxico, então qualquer mudança
+em um deles gera uma entrada nova. O valor é o `Program` serializado por
+`dump_ast` (parser/binary_ast.py), incluindo `_errors`. Erros léxicos
+(ParseError) não são guardados.
+
+Escritas são atômicas (arquivo temporário no mesmo diretório + os.replace),
+então execuções concorrentes nunca leem uma entrada pela metade. O tamanho
+total do diretório é limitado por `max_bytes`; ao passar do limite, as
+entradas menos usadas recentemente (mtime mais antigo, atualizado a cada
+acerto) são removidas.
+
+Uso:
+    cache = ParseCache(".brasilscript_cache")
+    program = cache.parse(code)
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+from parser import __version__
+from parser.ast import Program
+from parser.binary_ast import dump_ast, load_ast
+from parser.brasilscript_parser import parse_brasilscript
+
+ENTRY_SUFFIX = ".ast"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ParseCache:
+    """Cache de `Program`s em disco com limite de tamanho (LRU)"""
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # total em bytes, calculado sob demanda na primeira escrita
+        self._total_bytes: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, code: str, engine: str = "afd") -> str:
+        digest = hashlib.sha256()
+        for part in (__version__, engine, code):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (key + ENTRY_SUFFIX)
+
+    def get(self, code: str, engine: str = "afd") -> Optional[Program]:
+        """Retorna o `Program` em cache para `code`, ou None"""
+        path = self._path(self.key(code, engine))
+        try:
+            with open(path, "rb") as f:
+                program = load_ast(f.read())
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # entrada corrompida ou de formato antigo: descartar
+            self._remove(path)
+            self.misses += 1
+            return None
+        try:
+            # marca a entrada como usada recentemente
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return program
+
+    def put(self, code: str, program: Program, engine: str = "afd") -> None:
+        """Grava `program` atomicamente e aplica o limite de tamanho"""
+        path = self._path(self.key(code, engine))
+        data = dump_ast(program)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=ENTRY_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            self._remove(Path(tmp_name))
+            raise
+        if self._total_bytes is None:
+            self._total_bytes = self._scan_size()
+        else:
+            self._total_bytes += len(data)
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def parse(self, code: str, engine: str = "afd") -> Program:
+        """Como `parse_brasilscript`, consultando e alimentando o cache"""
+        program = self.get(code, engine)
+        if program is None:
+            program = parse_brasilscript(code, engine)
+            self.put(code, program, engine)
+        return program
+
+    def clear(self) -> None:
+        for path in self._entries():
+            self._remove(path)
+        self._total_bytes = 0
+
+    # ---------- auxiliares ----------
+    def _entries(self):
+        return [p for p in self.directory.iterdir() if p.suffix == ENTRY_SUFFIX and not p.name.startswith(".tmp-")]
+
+    def _scan_size(self) -> int:
+        total = 0
+        for path in self._entries():
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def _evict(self) -> None:
+        """Remove as entradas mais antigas até ficar em 90% do limite"""
+        entries = []
+        for path in self._entries():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue  # removida por outro processo
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 9 // 10
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+        self._total_bytes = total
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,161 @@
+"""
+Grafo de chamadas das funções de nível superior e componentes fortemente conexas
+
+`build_call_graph` liga cada função de nível superior às funções de nível
+superior que o corpo dela chama (na ordem da primeira chamada), e guarda
+as chamadas feitas pelo próprio nível superior (`roots`). O grafo é uma
+aproximação por nome: uma chamada a `f` conta como chamada à função `f` de
+nível superior mesmo que um parâmetro ou uma função aninhada com esse nome
+a esconda.
+
+`strongly_connected_components` é o algoritmo de Tarjan com pilha
+explícita (a recursão do Python não aguentaria cadeias de milhares de
+chamadas). As componentes saem com as funções chamadas antes das que as
+chamam: funções mutuamente recursivas ficam na mesma componente, e um
+passe que precise do resultado das funções chamadas (ex.: o retorno
+inferido) pode processar as componentes nessa ordem.
+
+`python -m parser.callgraph arquivo.bs` lista as funções recursivas, por
+componente, e as que o nível superior nunca alcança.
+
+Uso:
+    graph = build_call_graph(program)
+    graph.calls["f"]            # funções chamadas por f
+    graph.components()          # [["g"], ["f", "h"], ...], chamadas primeiro
+"""
+
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Set
+
+from parser.ast import FunctionCall, FunctionDecl, Program, walk
+from parser.brasilscript_parser import parse_brasilscript
+
+
+@dataclass(slots=True)
+class CallGraph:
+    """Funções de nível superior e as chamadas entre elas"""
+    # nome -> declaração (a primeira, se o nome se repete)
+    functions: Dict[str, FunctionDecl] = field(default_factory=dict)
+    # nome -> funções de nível superior chamadas no corpo, na ordem da primeira chamada
+    calls: Dict[str, List[str]] = field(default_factory=dict)
+    # funções chamadas pelo nível superior, na ordem da primeira chamada
+    roots: List[str] = field(default_factory=list)
+
+    def components(self) -> List[List[str]]:
+        """Componentes fortemente conexas, as chamadas antes de quem as chama"""
+        return strongly_connected_components(self.calls)
+
+    def reachable(self) -> Set[str]:
+        """Funções chamadas, direta ou indiretamente, pelo nível superior"""
+        seen = set(self.roots)
+        pending = list(self.roots)
+        while pending:
+            for callee in self.calls[pending.pop()]:
+                if callee not in seen:
+                    seen.add(callee)
+                    pending.append(callee)
+        return seen
+
+
+def _callees(nodes: Iterable, functions: Mapping[str, FunctionDecl]) -> List[str]:
+    seen = {}
+    for root in nodes:
+        for node in walk(root):
+            if isinstance(node, FunctionCall) and node.name in functions:
+                seen[node.name] = None
+    return list(seen)
+
+
+def build_call_graph(program: Program) -> CallGraph:
+    graph = CallGraph()
+    top_level = []
+    for stmt in program.statements:
+        if isinstance(stmt, FunctionDecl):
+            graph.functions.setdefault(stmt.name, stmt)
+        else:
+            top_level.append(stmt)
+    for name, decl in graph.functions.items():
+        graph.calls[name] = _callees(decl.body, graph.functions)
+    graph.roots = _callees(top_level, graph.functions)
+    return graph
+
+
+def strongly_connected_components(edges: Mapping[str, List[str]]) -> List[List[str]]:
+    """Tarjan iterativo sobre `edges` (nó -> sucessores); ordem determinística
+
+    Cada componente lista os nós na ordem de `edges`; as componentes saem
+    em ordem topológica reversa (sucessores primeiro). Sucessores que não
+    são chaves de `edges` são ignorados.
+    """
+    order = {node: i for i, node in enumerate(edges)}
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    for start in edges:
+        if start in index:
+            continue
+        # pilha de (nó, posição do próximo sucessor a visitar)
+        work = [(start, 0)]
+        index[start] = lowlink[start] = len(index)
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, i = work[-1]
+            successors = edges[node]
+            if i < len(successors):
+                work[-1] = (node, i + 1)
+                succ = successors[i]
+                if succ not in order:
+                    continue
+                if succ not in index:
+                    index[succ] = lowlink[succ] = len(index)
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, 0))
+                elif succ in on_stack and index[succ] < lowlink[node]:
+                    lowlink[node] = index[succ]
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if lowlink[node] < lowlink[parent]:
+                    lowlink[parent] = lowlink[node]
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                component.sort(key=order.__getitem__)
+                components.append(component)
+    return components
+
+
+def main(argv: List[str]) -> int:
+    if not argv:
+        print("Uso: python -m parser.callgraph arquivo.bs")
+        return 2
+    with open(argv[0], encoding="utf-8") as f:
+        graph = build_call_graph(parse_brasilscript(f.read()))
+    components = graph.components()
+    for component in components:
+        if len(component) > 1 or component[0] in graph.calls[component[0]]:
+            print("recursivas:", ", ".join(component))
+    reachable = graph.reachable()
+    unreachable = [name for name in graph.functions if name not in reachable]
+    if unreachable:
+        print("não alcançadas:", ", ".join(unreachable))
+    print(f"{len(graph.functions)} funções, {len(components)} componentes")
+    return 0
+
+
+__all__ = ["CallGraph", "build_call_graph", "strongly_connected_components"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
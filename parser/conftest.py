@@ -0,0 +1,14 @@
+"""
+Fixtures compartilhadas pelos testes de parser/
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def pool():
+    """Pool de threads: exercita a divisão e a junção dos lotes sem criar processos"""
+    with ThreadPoolExecutor(3) as executor:
+        yield executor
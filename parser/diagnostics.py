@@ -0,0 +1,220 @@
+"""
+Diagnósticos do lexer, do parser e da análise semântica
+
+Um `Diagnostic` guarda o código do erro (ex.: "identificador_nao_declarado"),
+a severidade, o trecho do fonte (`start`/`end`, offsets; -1 quando
+desconhecido) e os argumentos da mensagem (nomes, tipos, lexemas). O texto
+só é montado quando alguém o pede (`str(d)`, `d.message`, `d.render(fonte)`)
+a partir do modelo em `MESSAGES`, e o trecho do fonte com a marcação da
+coluna só em `render`. Ferramentas que só contam erros ou olham os códigos
+não pagam nada pela formatação.
+
+Para que as listas de erros continuem comparáveis com listas de textos, um
+`Diagnostic` é igual (`==`) a um `str` com a sua mensagem; entre si, dois
+diagnósticos são iguais quando todos os campos são iguais. Por isso ele
+não tem hash (não vai em sets nem é chave de dict).
+
+`Diagnostics` é a lista de erros de um arquivo: `report` descarta um
+diagnóstico igual ao anterior (mesmo código, posição e argumentos) e, com `limit`,
+para de registrar depois de `limit` erros, acrescentando uma vez o aviso
+`too_many(limit)`, como o parser sempre fez.
+
+Uso:
+    errors = Diagnostics(limit=100)
+    errors.report("identificador_nao_declarado", ("x",), start=12)
+    len(errors), errors[0].code         # sem formatar nada
+    print(errors[0].render(fonte, "prog.bs"))
+"""
+
+from collections import Counter
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from parser.ast import line_column
+
+TOO_MANY_ERRORS = "Muitos erros: apenas os {limit} primeiros foram registrados"
+
+
+class Severity(Enum):
+    ERROR = "erro"
+    WARNING = "aviso"
+
+
+def _mixed_elements(types) -> str:
+    return f"Elementos de lista com tipos mistos: {[str(t) for t in types]}"
+
+
+# código -> modelo da mensagem: um str.format com os argumentos em ordem, ou
+# uma função que recebe os argumentos
+MESSAGES: Dict[str, Union[str, Callable[..., str]]] = {
+    # lexer
+    "caractere_invalido": "token invalido, digite da forma correta: {0}",
+    # parser
+    "token_esperado": "Esperado token {0}, encontrado {1}: '{2}'",
+    "lexema_esperado": "Esperado '{0}', encontrado '{1}'",
+    "statement_invalido": "token invalido, digite da forma correta: {0} = '{1}'",
+    "tipo_esperado": "Tipo esperado, encontrado '{0}:{1}'",
+    "fator_inesperado": "Fator inesperado: '{0}'",
+    "muitos_erros": lambda limit: TOO_MANY_ERRORS.format(limit=limit),
+    "corpo_divergente": "Corpo da função '{0}' não termina onde a varredura previu: use o parse completo",
+    # análise semântica
+    "funcao_redeclarada": "Redeclaração: função '{0}' já declarada",
+    "funcao_redeclarada_variavel": "Redeclaração: função '{0}' já declarada como variável",
+    "parametro_duplicado": "Parâmetro duplicado: '{0}' na função '{1}'",
+    "identificador_redeclarado": "Redeclaração: identificador '{0}' já declarado",
+    "identificador_nao_declarado": "Identificador não declarado: '{0}'",
+    "atribuicao_nao_declarada": "Identificador não declarado: '{0}' na atribuição",
+    "perguntar_nao_declarado": "Identificador não declarado: '{0}' usado em 'perguntar'",
+    "inicializacao_incompativel": "Incompatibilidade de tipos na inicialização de '{0}': declarado {1}, inicializado com {2}",
+    "atribuicao_incompativel": "Incompatibilidade de tipos na atribuição para '{0}': esperado {1}, obtido {2}",
+    "erro_interno": "Erro interno na inferência de tipos: {0}",
+    "lista_mista": _mixed_elements,
+    "indice_em_nao_lista": "Acesso por índice em tipo não-lista: {0}",
+    "indice_nao_numerico": "Índice de lista deve ser 'numero', encontrado {0}",
+    "menos_nao_numerico": "Operador unário '-' aplicado a tipo não-numérico: {0}",
+    "nao_nao_logico": "Operador 'nao' aplicado a tipo não-lógico: {0}",
+    "operandos_nao_logicos": "Operador lógico '{0}' requer operandos 'logico', encontrados {1} e {2}",
+    "soma_incompativel": "Operador '+' requisitos: ambos 'numero' ou ambos 'texto' - encontrados {0} e {1}",
+    "operandos_nao_numericos": "Operador '{0}' requer operandos 'numero', encontrados {1} e {2}",
+    "comparacao_incompativel": "Operador relacional '{0}' entre tipos incompatíveis: {1} e {2}",
+    "funcao_nao_declarada": "Chamada para função não declarada: '{0}'",
+    "nao_e_funcao": "'{0}' não é uma função",
+}
+
+
+class Diagnostic:
+    """Erro ou aviso com a mensagem formatada sob demanda"""
+    __slots__ = ("code", "arguments", "start", "end", "severity", "_message")
+
+    def __init__(self, code: str, arguments: Tuple[Any, ...] = (), start: int = -1, end: int = -1,
+                 severity: Severity = Severity.ERROR):
+        self.code = code
+        self.arguments = arguments
+        self.start = start
+        self.end = end
+        self.severity = severity
+        self._message: Optional[str] = None
+
+    @property
+    def message(self) -> str:
+        """Texto da mensagem (formatado na primeira leitura)"""
+        message = self._message
+        if message is None:
+            template = MESSAGES[self.code]
+            if isinstance(template, str):
+                message = template.format(*self.arguments)
+            else:
+                message = template(*self.arguments)
+            self._message = message
+        return message
+
+    def __str__(self) -> str:
+        return self.message
+
+    def __repr__(self) -> str:
+        return f"Diagnostic({self.code!r}, {self.arguments!r}, start={self.start}, end={self.end})"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, str):
+            return self.message == other
+        if isinstance(other, Diagnostic):
+            return (self.code == other.code and self.arguments == other.arguments and self.start == other.start
+                    and self.end == other.end and self.severity is other.severity)
+        return NotImplemented
+
+    # igual ao seu texto, mas um hash compatível com o do str exigiria formatar a
+    # mensagem; e `_message` muda depois da criação: sem hash, como uma lista
+    __hash__ = None
+
+    def __reduce__(self):
+        return Diagnostic, (self.code, self.arguments, self.start, self.end, self.severity)
+
+    def shifted(self, delta: int) -> "Diagnostic":
+        """Cópia com o trecho deslocado em `delta` caracteres (ex.: depois de uma edição)"""
+        if self.start < 0:
+            return self
+        end = self.end + delta if self.end >= 0 else -1
+        shifted = Diagnostic(self.code, self.arguments, self.start + delta, end, self.severity)
+        shifted._message = self._message
+        return shifted
+
+    def render(self, source: Optional[str] = None, filename: Optional[str] = None) -> str:
+        """Mensagem com a posição e, se `source` for dado, a linha do fonte marcada
+
+        Formato: "arquivo:linha:coluna: erro: mensagem [código]", seguido da
+        linha e de "^~~~" sob o trecho (limitado à linha).
+        """
+        located = source is not None and 0 <= self.start <= len(source)
+        location = [filename] if filename else []
+        if located:
+            location += map(str, line_column(source, self.start))
+        prefix = ":".join(location) + ": " if location else ""
+        text = f"{prefix}{self.severity.value}: {self.message} [{self.code}]"
+        if located:
+            text += "\n" + snippet(source, self.start, self.end)
+        return text
+
+
+def snippet(source: str, start: int, end: int = -1) -> str:
+    """Linha de `source` que contém `start`, com "^~~~" sob `start:end` (dentro da linha)"""
+    line_start = source.rfind("\n", 0, start) + 1
+    line_end = source.find("\n", start)
+    if line_end < 0:
+        line_end = len(source)
+    line = source[line_start:line_end]
+    width = max(1, min(end, line_end) - start) if end > start else 1
+    # tabs viram espaços na marcação para ela ficar alinhada com a linha
+    pad = "".join("\t" if c == "\t" else " " for c in line[:start - line_start])
+    return f"    {line}\n    {pad}^{'~' * (width - 1)}"
+
+
+def too_many(limit: int) -> Diagnostic:
+    """Aviso de que só os `limit` primeiros erros foram registrados"""
+    # argumentos em texto, como os dos outros erros do parser (ver parser.binary_ast)
+    return Diagnostic("muitos_erros", (str(limit),))
+
+
+def cap(errors: List, limit: Optional[int]) -> List:
+    """`errors` com no máximo `limit` erros, mais `too_many(limit)` se algum foi cortado"""
+    if limit is not None and len(errors) > limit:
+        errors = errors[:limit] + [too_many(limit)]
+    return errors
+
+
+class Diagnostics(list):
+    """Lista de diagnósticos de um arquivo, com deduplicação e limite"""
+    __slots__ = ("limit",)
+
+    def __init__(self, items: Iterable = (), limit: Optional[int] = None):
+        super().__init__(items)
+        self.limit = limit
+
+    def report(self, code: str, arguments: Tuple[Any, ...] = (), start: int = -1, end: int = -1,
+               severity: Severity = Severity.ERROR) -> Optional[Diagnostic]:
+        """Registra um diagnóstico; devolve None se ele repete o anterior ou passou do limite
+
+        Diagnósticos sem posição (`start` -1, ex.: nós construídos à mão ou
+        compartilhados por hash-consing) nunca são tratados como repetidos.
+        """
+        if start >= 0 and self:
+            # as repetições vêm do mesmo nó visitado de novo, logo em seguida
+            # (um conjunto com todas as chaves custaria mais que a formatação
+            # que se quer evitar)
+            last = self[-1]
+            if last.start == start and last.code == code and last.arguments == arguments:
+                return None
+        limit = self.limit
+        if limit is not None and len(self) >= limit:
+            if len(self) == limit:
+                self.append(too_many(limit))
+            return None
+        diagnostic = Diagnostic(code, arguments, start, end, severity)
+        self.append(diagnostic)
+        return diagnostic
+
+    def codes(self) -> Counter:
+        """Quantos diagnósticos de cada código (sem formatar mensagens)"""
+        return Counter(getattr(d, "code", None) for d in self)
+
+
+__all__ = ["TOO_MANY_ERRORS", "MESSAGES", "Severity", "Diagnostic", "Diagnostics", "snippet", "too_many", "cap"]
@@ -0,0 +1,395 @@
+"""
+AST em arena (FlatAST) para BrasilScript
+
+Alternativa à árvore de objetos de parser/ast.py: os nós vivem em arrays
+paralelos tipados (`kind`, `first_child`, `next_sibling`, `payload`,
+`offset`) e o nó é apenas um índice inteiro. Dados escalares (nomes,
+operadores e literais) ficam na tabela `payloads`, internados: nomes e
+valores iguais compartilham a mesma entrada.
+
+O `FlatASTBuilder` tem construtores com a mesma assinatura das classes de
+parser/ast.py, então o `BrasilScriptParser` constrói a arena diretamente:
+
+    tree = BrasilScriptParser(tokens, nodes=FlatASTBuilder()).parse()
+
+Layout dos filhos por tipo de nó (payload entre colchetes):
+
+    PROGRAM, BLOCK          statements...
+    LITERAL                 [(valor, tipo)]
+    IDENTIFIER              [nome]
+    DECLARATION             [(identificador, tipo)] valor_inicial?
+    ASSIGNMENT              [identificador] valor
+    BINARY_OPERATION        [operador] esquerda direita
+    UNARY_OPERATION         [operador] operando
+    LIST_LITERAL            elementos...
+    INDEX_ACCESS            objeto indice
+    FUNCTION_DECL           [(nome, parametros)] BLOCK
+    FUNCTION_CALL           [nome] argumentos...
+    IF_STATEMENT            condicao BLOCK ELSE_IF* BLOCK?   (BLOCK final = senao)
+    ELSE_IF                 condicao BLOCK
+    WHILE_STATEMENT         condicao BLOCK
+    FOR_EACH_STATEMENT      [variavel] iteravel BLOCK
+    REPEAT_STATEMENT        contagem BLOCK
+    RETURN_STATEMENT        valor?
+    PRINT_STATEMENT         expressoes...
+    INPUT_STATEMENT         [variavel] prompt?
+"""
+
+import math
+from array import array
+from enum import IntEnum
+from typing import Any, Dict, Iterator, List, Optional
+
+import parser.ast as ast_nodes
+from parser.brasilscript_parser import BrasilScriptParser, tokenize_source
+
+NO_NODE = -1
+
+
+class NodeKind(IntEnum):
+    """Tipos de nó da arena"""
+    PROGRAM = 0
+    BLOCK = 1
+    LITERAL = 2
+    IDENTIFIER = 3
+    DECLARATION = 4
+    ASSIGNMENT = 5
+    BINARY_OPERATION = 6
+    UNARY_OPERATION = 7
+    LIST_LITERAL = 8
+    INDEX_ACCESS = 9
+    FUNCTION_DECL = 10
+    FUNCTION_CALL = 11
+    IF_STATEMENT = 12
+    ELSE_IF = 13
+    WHILE_STATEMENT = 14
+    FOR_EACH_STATEMENT = 15
+    REPEAT_STATEMENT = 16
+    RETURN_STATEMENT = 17
+    PRINT_STATEMENT = 18
+    INPUT_STATEMENT = 19
+
+
+class FlatAST:
+    """Arena de nós em arrays paralelos; `root` é o nó PROGRAM"""
+
+    __slots__ = ("kind", "first_child", "next_sibling", "payload", "offset", "payloads", "root", "_errors")
+
+    def __init__(self):
+        self.kind = array("B")
+        self.first_child = array("i")
+        self.next_sibling = array("i")
+        self.payload = array("i")
+        self.offset = array("i")
+        self.payloads: List[Any] = []
+        self.root = NO_NODE
+        # erros não-fatais coletados pelo parser (como em Program._errors)
+        self._errors: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def children(self, node: int) -> Iterator[int]:
+        """Itera os índices dos filhos de `node`, em ordem"""
+        next_sibling = self.next_sibling
+        child = self.first_child[node]
+        while child != NO_NODE:
+            yield child
+            child = next_sibling[child]
+
+    def value(self, node: int) -> Any:
+        """Payload do nó (nome, operador, (valor, tipo), ...) ou None"""
+        index = self.payload[node]
+        return None if index == NO_NODE else self.payloads[index]
+
+    def cursor(self, node: Optional[int] = None) -> "Cursor":
+        """Cursor posicionado em `node` (padrão: raiz)"""
+        return Cursor(self, self.root if node is None else node)
+
+    def walk(self, node: Optional[int] = None) -> Iterator[int]:
+        """Percorre a subárvore em pré-ordem, sem recursão"""
+        stack = [self.root if node is None else node]
+        first_child = self.first_child
+        next_sibling = self.next_sibling
+        while stack:
+            current = stack.pop()
+            yield current
+            # empilha os filhos em ordem reversa para visitá-los em ordem
+            children = []
+            child = first_child[current]
+            while child != NO_NODE:
+                children.append(child)
+                child = next_sibling[child]
+            stack.extend(reversed(children))
+
+    def to_program(self) -> ast_nodes.Program:
+        """Materializa a arena como árvore de objetos de parser/ast.py"""
+        program = ast_nodes.Program([self._to_node(c) for c in self.children(self.root)], list(self._errors))
+        return program
+
+    def _block(self, node: int) -> list:
+        return [self._to_node(c) for c in self.children(node)]
+
+    def _to_node(self, node: int):
+        kind = self.kind[node]
+        value = self.value(node)
+        offset = self.offset[node]
+        children = list(self.children(node))
+        if kind == NodeKind.LITERAL:
+            return ast_nodes.Literal(value[0], value[1], offset=offset)
+        if kind == NodeKind.IDENTIFIER:
+            return ast_nodes.Identifier(value, offset=offset)
+        if kind == NodeKind.DECLARATION:
+            initial = self._to_node(children[0]) if children else None
+            return ast_nodes.Declaration(value[0], value[1], initial, offset=offset)
+        if kind == NodeKind.ASSIGNMENT:
+            return ast_nodes.Assignment(value, self._to_node(children[0]), offset=offset)
+        if kind == NodeKind.BINARY_OPERATION:
+            return ast_nodes.BinaryOperation(self._to_node(children[0]), value, self._to_node(children[1]), offset=offset)
+        if kind == NodeKind.UNARY_OPERATION:
+            return ast_nodes.UnaryOperation(value, self._to_node(children[0]), offset=offset)
+        if kind == NodeKind.LIST_LITERAL:
+            return ast_nodes.ListLiteral([self._to_node(c) for c in children], offset=offset)
+        if kind == NodeKind.INDEX_ACCESS:
+            return ast_nodes.IndexAccess(self._to_node(children[0]), self._to_node(children[1]), offset=offset)
+        if kind == NodeKind.FUNCTION_DECL:
+            return ast_nodes.FunctionDecl(value[0], list(value[1]), self._block(children[0]), offset=offset)
+        if kind == NodeKind.FUNCTION_CALL:
+            return ast_nodes.FunctionCall(value, [self._to_node(c) for c in children], offset=offset)
+        if kind == NodeKind.IF_STATEMENT:
+            else_ifs = []
+            else_block = None
+            for child in children[2:]:
+                if self.kind[child] == NodeKind.ELSE_IF:
+                    cond, block = self.children(child)
+                    else_ifs.append((self._to_node(cond), self._block(block)))
+                else:
+                    else_block = self._block(child)
+            return ast_nodes.IfStatement(self._to_node(children[0]), self._block(children[1]), else_ifs, else_block, offset=offset)
+        if kind == NodeKind.WHILE_STATEMENT:
+            return ast_nodes.WhileStatement(self._to_node(children[0]), self._block(children[1]), offset=offset)
+        if kind == NodeKind.FOR_EACH_STATEMENT:
+            return ast_nodes.ForEachStatement(value, self._to_node(children[0]), self._block(children[1]), offset=offset)
+        if kind == NodeKind.REPEAT_STATEMENT:
+            return ast_nodes.RepeatStatement(self._to_node(children[0]), self._block(children[1]), offset=offset)
+        if kind == NodeKind.RETURN_STATEMENT:
+            return ast_nodes.ReturnStatement(self._to_node(children[0]) if children else None, offset=offset)
+        if kind == NodeKind.PRINT_STATEMENT:
+            return ast_nodes.PrintStatement([self._to_node(c) for c in children], offset=offset)
+        if kind == NodeKind.INPUT_STATEMENT:
+            prompt = self._to_node(children[0]) if children else None
+            return ast_nodes.InputStatement(value, prompt, offset=offset)
+        raise ValueError(f"Nó inesperado na arena: {NodeKind(kind).name}")
+
+
+class Cursor:
+    """Visão leve de um nó da arena (par árvore/índice)"""
+
+    __slots__ = ("tree", "node")
+
+    def __init__(self, tree: FlatAST, node: int):
+        self.tree = tree
+        self.node = node
+
+    @property
+    def kind(self) -> NodeKind:
+        return NodeKind(self.tree.kind[self.node])
+
+    @property
+    def offset(self) -> int:
+        return self.tree.offset[self.node]
+
+    @property
+    def value(self) -> Any:
+        return self.tree.value(self.node)
+
+    @property
+    def children(self) -> List["Cursor"]:
+        tree = self.tree
+        return [Cursor(tree, c) for c in tree.children(self.node)]
+
+    def __iter__(self) -> Iterator["Cursor"]:
+        tree = self.tree
+        for child in tree.children(self.node):
+            yield Cursor(tree, child)
+
+    def __repr__(self) -> str:
+        return f"Cursor({self.kind.name}, {self.value!r}, offset={self.offset})"
+
+
+def _literal_key(value: Any, type_name: str) -> tuple:
+    # o payload é a tupla (valor, tipo), que não distingue 1 de 1.0 (nem 0.0
+    # de -0.0): a chave leva o tipo do valor e, nos floats, o sinal
+    if isinstance(value, float):
+        return float, value, math.copysign(1.0, value), type_name
+    return type(value), value, type_name
+
+
+class FlatASTBuilder:
+    """Fábrica de nós para `BrasilScriptParser` que escreve em uma `FlatAST`
+
+    Cada construtor recebe os mesmos argumentos da classe correspondente em
+    parser/ast.py (filhos já construídos, como índices) e devolve o índice
+    do novo nó. `Program` encerra a construção e devolve a `FlatAST`.
+    """
+
+    def __init__(self):
+        self.tree = FlatAST()
+        self._interned: Dict[Any, int] = {}
+
+    def _intern(self, value: Any, key: Any = None) -> int:
+        # o tipo entra na chave para não unificar 1, 1.0 e True
+        if key is None:
+            key = (type(value), value)
+        index = self._interned.get(key)
+        if index is None:
+            index = len(self.tree.payloads)
+            self.tree.payloads.append(value)
+            self._interned[key] = index
+        return index
+
+    def _node(self, kind: NodeKind, children=(), payload: int = NO_NODE, offset: int = -1) -> int:
+        tree = self.tree
+        node = len(tree.kind)
+        tree.kind.append(kind)
+        tree.payload.append(payload)
+        tree.offset.append(offset)
+        tree.next_sibling.append(NO_NODE)
+        # os filhos já existem (construção de baixo para cima); encadeia irmãos
+        previous = NO_NODE
+        first = NO_NODE
+        next_sibling = tree.next_sibling
+        for child in children:
+            if child is None:
+                continue
+            if previous == NO_NODE:
+                first = child
+            else:
+                next_sibling[previous] = child
+            previous = child
+        tree.first_child.append(first)
+        return node
+
+    def _block(self, statements: List[int]) -> int:
+        return self._node(NodeKind.BLOCK, statements)
+
+    # --- construtores com a assinatura de parser/ast.py ---
+    def Program(self, statements: List[int], _errors: Optional[List[str]] = None) -> FlatAST:
+        tree = self.tree
+        tree.root = self._node(NodeKind.PROGRAM, statements)
+        tree._errors = _errors if _errors is not None else []
+        return tree
+
+    def Literal(self, value, type, offset=-1):
+        return self._node(NodeKind.LITERAL, (), self._intern((value, type), _literal_key(value, type)), offset)
+
+    def Identifier(self, name, offset=-1):
+        return self._node(NodeKind.IDENTIFIER, (), self._intern(name), offset)
+
+    def Declaration(self, identifier, type_name, initial_value=None, offset=-1):
+        return self._node(NodeKind.DECLARATION, (initial_value,), self._intern((identifier, type_name)), offset)
+
+    def Assignment(self, identifier, value, offset=-1):
+        return self._node(NodeKind.ASSIGNMENT, (value,), self._intern(identifier), offset)
+
+    def BinaryOperation(self, left, operator, right, offset=-1):
+        return self._node(NodeKind.BINARY_OPERATION, (left, right), self._intern(operator), offset)
+
+    def UnaryOperation(self, operator, operand, offset=-1):
+        return self._node(NodeKind.UNARY_OPERATION, (operand,), self._intern(operator), offset)
+
+    def ListLiteral(self, elements, offset=-1):
+        return self._node(NodeKind.LIST_LITERAL, elements, NO_NODE, offset)
+
+    def IndexAccess(self, object, index, offset=-1):
+        return self._node(NodeKind.INDEX_ACCESS, (object, index), NO_NODE, offset)
+
+    def FunctionDecl(self, name, parameters, body, offset=-1):
+        payload = self._intern((name, tuple(parameters)))
+        return self._node(NodeKind.FUNCTION_DECL, (self._block(body),), payload, offset)
+
+    def FunctionCall(self, name, arguments, offset=-1):
+        return self._node(NodeKind.FUNCTION_CALL, arguments, self._intern(name), offset)
+
+    def IfStatement(self, condition, then_block, else_ifs, else_block=None, offset=-1):
+        children = [condition, self._block(then_block)]
+        for elif_condition, elif_block in else_ifs:
+            children.append(self._node(NodeKind.ELSE_IF, (elif_condition, self._block(elif_block))))
+        if else_block is not None:
+            children.append(self._block(else_block))
+        return self._node(NodeKind.IF_STATEMENT, children, NO_NODE, offset)
+
+    def WhileStatement(self, condition, body, offset=-1):
+        return self._node(NodeKind.WHILE_STATEMENT, (condition, self._block(body)), NO_NODE, offset)
+
+    def ForEachStatement(self, variable, iterable, body, offset=-1):
+        return self._node(NodeKind.FOR_EACH_STATEMENT, (iterable, self._block(body)), self._intern(variable), offset)
+
+    def RepeatStatement(self, count, body, offset=-1):
+        return self._node(NodeKind.REPEAT_STATEMENT, (count, self._block(body)), NO_NODE, offset)
+
+    def ReturnStatement(self, value=None, offset=-1):
+        return self._node(NodeKind.RETURN_STATEMENT, (value,), NO_NODE, offset)
+
+    def PrintStatement(self, expressions, offset=-1):
+        return self._node(NodeKind.PRINT_STATEMENT, expressions, NO_NODE, offset)
+
+    def InputStatement(self, variable, prompt=None, offset=-1):
+        return self._node(NodeKind.INPUT_STATEMENT, (prompt,), self._intern(variable), offset)
+
+
+def parse_flat(code: str, engine: str = "afd") -> FlatAST:
+    """Como `parse_brasilscript`, mas constrói uma `FlatAST`"""
+    tokens = tokenize_source(code, engine)
+    return BrasilScriptParser(tokens, nodes=FlatASTBuilder()).parse()
+
+
+def flatten(program: ast_nodes.Program) -> FlatAST:
+    """Converte uma árvore de objetos de parser/ast.py em `FlatAST`"""
+    builder = FlatASTBuilder()
+
+    def build(node):
+        if node is None:
+            return None
+        if isinstance(node, ast_nodes.Literal):
+            return builder.Literal(node.value, node.type, node.offset)
+        if isinstance(node, ast_nodes.Identifier):
+            return builder.Identifier(node.name, node.offset)
+        if isinstance(node, ast_nodes.Declaration):
+            return builder.Declaration(node.identifier, node.type_name, build(node.initial_value), node.offset)
+        if isinstance(node, ast_nodes.Assignment):
+            return builder.Assignment(node.identifier, build(node.value), node.offset)
+        if isinstance(node, ast_nodes.BinaryOperation):
+            return builder.BinaryOperation(build(node.left), node.operator, build(node.right), node.offset)
+        if isinstance(node, ast_nodes.UnaryOperation):
+            return builder.UnaryOperation(node.operator, build(node.operand), node.offset)
+        if isinstance(node, ast_nodes.ListLiteral):
+            return builder.ListLiteral([build(e) for e in node.elements], node.offset)
+        if isinstance(node, ast_nodes.IndexAccess):
+            return builder.IndexAccess(build(node.object), build(node.index), node.offset)
+        if isinstance(node, ast_nodes.FunctionDecl):
+            return builder.FunctionDecl(node.name, node.parameters, [build(s) for s in node.body], node.offset)
+        if isinstance(node, ast_nodes.FunctionCall):
+            return builder.FunctionCall(node.name, [build(a) for a in node.arguments], node.offset)
+        if isinstance(node, ast_nodes.IfStatement):
+            # mesma ordem de construção do parser: condição, então, senao_ses, senao
+            condition = build(node.condition)
+            then_block = [build(s) for s in node.then_block]
+            else_ifs = [(build(c), [build(s) for s in b]) for c, b in node.else_ifs]
+            else_block = None if node.else_block is None else [build(s) for s in node.else_block]
+            return builder.IfStatement(condition, then_block, else_ifs, else_block, node.offset)
+        if isinstance(node, ast_nodes.WhileStatement):
+            return builder.WhileStatement(build(node.condition), [build(s) for s in node.body], node.offset)
+        if isinstance(node, ast_nodes.ForEachStatement):
+            return builder.ForEachStatement(node.variable, build(node.iterable), [build(s) for s in node.body], node.offset)
+        if isinstance(node, ast_nodes.RepeatStatement):
+            return builder.RepeatStatement(build(node.count), [build(s) for s in node.body], node.offset)
+        if isinstance(node, ast_nodes.ReturnStatement):
+            return builder.ReturnStatement(build(node.value), node.offset)
+        if isinstance(node, ast_nodes.PrintStatement):
+            return builder.PrintStatement([build(e) for e in node.expressions], node.offset)
+        if isinstance(node, ast_nodes.InputStatement):
+            return builder.InputStatement(node.variable, build(node.prompt), node.offset)
+        raise TypeError(f"Nó não suportado: {type(node).__name__}")
+
+    return builder.Program([build(s) for s in program.statements], list(program._errors))
@@ -0,0 +1,343 @@
+"""
+Dobra e propagação de constantes na AST
+
+Passe entre a análise semântica e o codegen, que reescreve a AST no lugar:
+
+- uma operação com operandos literais vira um literal: aritmética e
+  comparações de 'numero', `e`/`ou`/`nao` e igualdade de 'logico' e
+  concatenação de 'texto' com `+` (`2 * 3 + 1` -> `7`, `"a" + "b"` -> `"ab"`);
+- uma variável declarada com um valor constante e nunca atribuída (nem por
+  `=` nem por `perguntar`) é trocada pelo valor onde é lida, o que deixa
+  dobrar as expressões que a usam. A atribuição é procurada pelo nome: uma
+  atribuição a `x` em qualquer escopo impede a propagação de todo `x`;
+- num `se` com condições 'logico' constantes, os ramos que nunca executam
+  são removidos. Se sobra só um bloco, sempre executado, as instruções dele
+  vão para o bloco de fora (quando ele não declara nada, para não mudar os
+  escopos) ou ficam num `se verdadeiro`; se não sobra nada, o `se` sai.
+
+Só é dobrado o que dá o mesmo resultado que o programa daria ao executar.
+Divisão por zero, resultados não finitos e operandos de tipos que a
+análise semântica recusaria ficam como estão. A aritmética é a do double do
+codegen: inteiros que o double não representa exatamente (e o zero, por
+causa do -0.0) são calculados em ponto flutuante. Textos não são
+comparados: o valor do literal ainda tem as aspas e as sequências de
+escape do fonte.
+
+O passe supõe um programa sem erros semânticos e recusa as árvores de
+parser.hashcons, com nós compartilhados. Os statements mudam no
+lugar, então os resultados guardados por parser.incremental_semantic para
+eles deixam de valer.
+
+Uso:
+    SemanticAnalyzer().analyze(program)
+    stats = fold_constants(program)
+    stats.folded, stats.propagated, stats.removed_branches
+    CodeGen().generate(program)
+"""
+
+import math
+import operator
+from dataclasses import dataclass
+from typing import Any, List, Optional, Set
+
+from parser.ast import (
+    Assignment, BinaryOperation, Declaration, ForEachStatement, FunctionDecl, Identifier, IfStatement,
+    InputStatement, Literal, PrintStatement, Program, UnaryOperation, require_unshared, walk,
+)
+from parser.scopes import SymbolTable
+from parser.visitor import NodeVisitor
+
+# a partir daqui o double não representa todos os inteiros
+_EXACT_INTEGER = 2 ** 53
+
+_ARITHMETIC = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+
+_COMPARISONS = {
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+@dataclass(slots=True)
+class FoldStats:
+    """O que `fold_constants` mudou"""
+    folded: int = 0             # operações trocadas pelo resultado
+    propagated: int = 0         # leituras de variáveis trocadas pelo valor
+    removed_branches: int = 0   # ramos de `se` removidos (blocos que nunca executam)
+
+
+def _arithmetic(op: str, left, right):
+    """`left op right` como o double do codegen calcularia, ou None se não deve ser dobrado"""
+    if op == "/" and right == 0:
+        return None
+    if type(left) is int and type(right) is int and op != "/":
+        result = _ARITHMETIC[op](left, right)
+        if result != 0 and max(abs(left), abs(right), abs(result)) <= _EXACT_INTEGER:
+            return result
+    try:
+        result = _ARITHMETIC[op](float(left), float(right))
+    except OverflowError:
+        return None
+    return result if math.isfinite(result) else None
+
+
+def _concatenate(left: str, right: str) -> Optional[str]:
+    # os valores têm as aspas do fonte: junta o conteúdo se as aspas são as mesmas
+    if len(left) < 2 or len(right) < 2 or not (left[0] == left[-1] == right[0] == right[-1]):
+        return None
+    return left[:-1] + right[1:]
+
+
+def _fold_binary(op: str, left: Literal, right: Literal):
+    """(valor, tipo) de `left op right`, ou None"""
+    kind = left.type
+    if kind != right.type:
+        return None
+    a, b = left.value, right.value
+    if kind == "numero":
+        if op in _ARITHMETIC:
+            result = _arithmetic(op, a, b)
+            return (result, "numero") if result is not None else None
+        if op in _COMPARISONS:
+            try:
+                return _COMPARISONS[op](float(a), float(b)), "logico"
+            except OverflowError:
+                return None
+    elif kind == "logico":
+        if op == "e":
+            return a and b, "logico"
+        if op == "ou":
+            return a or b, "logico"
+        if op in ("==", "=", "!="):
+            return _COMPARISONS[op](a, b), "logico"
+    elif kind == "texto" and op == "+":
+        result = _concatenate(a, b)
+        return (result, "texto") if result is not None else None
+    return None
+
+
+def _fold_unary(op: str, operand: Literal):
+    """(valor, tipo) de `op operand`, ou None"""
+    if op == "-" and operand.type == "numero":
+        # o codegen calcula 0.0 - x
+        result = _arithmetic("-", 0, operand.value)
+        return (result, "numero") if result is not None else None
+    if op == "nao" and operand.type == "logico":
+        return not operand.value, "logico"
+    return None
+
+
+def _assigned_names(program: Program) -> Set[str]:
+    names = set()
+    for node in walk(program):
+        if isinstance(node, Assignment):
+            names.add(node.identifier)
+        elif isinstance(node, InputStatement):
+            names.add(node.variable)
+    return names
+
+
+def _declares(block: List[Any]) -> bool:
+    # statements que declaram um nome no escopo do bloco
+    return any(isinstance(stmt, (Declaration, FunctionDecl)) for stmt in block)
+
+
+class ConstantFolder(NodeVisitor):
+    """Dobra as expressões e propaga as variáveis constantes de um programa
+
+    Os escopos seguem os da análise semântica; cada símbolo guarda, em vez do
+    tipo, o literal do valor constante da variável (None se não é constante).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.symbols = SymbolTable()
+        self.stats = FoldStats()
+        self._assigned: Set[str] = set()
+        # despacho por classe do nó: _fold_<Classe> para statements, _expr_<Classe> para expressões
+        self._statements = self.dispatch_table("_fold_", self._fold_other)
+        self._expressions = self.dispatch_table("_expr_", self._expr_other)
+
+    def fold(self, program: Program) -> FoldStats:
+        require_unshared(program, "dobra de constantes")
+        self.symbols = SymbolTable()
+        self.stats = FoldStats()
+        self._assigned = _assigned_names(program)
+        self._fold_statements(program.statements)
+        return self.stats
+
+    # ---------- statements ----------
+    def _fold_statements(self, statements: List[Any]) -> None:
+        result = []
+        for stmt in statements:
+            # cada statement devolve None (fica como está) ou os statements que o substituem
+            replacement = self._statements[stmt.__class__](stmt)
+            if replacement is None:
+                result.append(stmt)
+            else:
+                result += replacement
+        statements[:] = result
+
+    def _fold_block(self, statements: List[Any]) -> None:
+        self.symbols.push_scope()
+        self._fold_statements(statements)
+        self.symbols.pop_scope()
+
+    def _fold_other(self, stmt):
+        # None e statements sem expressões
+        return None
+
+    def _fold_Declaration(self, decl: Declaration):
+        # declarado antes do valor, como na análise semântica
+        symbol = self.symbols.declare(decl.identifier, None, slot=False)
+        if decl.initial_value is None:
+            return None
+        value = decl.initial_value = self._expr(decl.initial_value)
+        if symbol is not None and decl.identifier not in self._assigned \
+                and isinstance(value, Literal) and value.type == decl.type_name:
+            symbol.type = value
+        return None
+
+    def _fold_Assignment(self, assign: Assignment):
+        assign.value = self._expr(assign.value)
+
+    def _fold_InputStatement(self, stmt: InputStatement):
+        if stmt.prompt is not None:
+            stmt.prompt = self._expr(stmt.prompt)
+
+    def _fold_PrintStatement(self, stmt: PrintStatement):
+        expressions = stmt.expressions
+        for i, expr in enumerate(expressions):
+            expressions[i] = self._expr(expr)
+
+    def _fold_ReturnStatement(self, stmt):
+        if stmt.value is not None:
+            stmt.value = self._expr(stmt.value)
+
+    def _fold_FunctionCall(self, stmt):
+        self._expr(stmt)
+
+    def _fold_FunctionDecl(self, stmt: FunctionDecl):
+        self.symbols.declare(stmt.name, None, slot=False)
+        self.symbols.push_scope()
+        for name in stmt.parameters:
+            self.symbols.declare(name, None, slot=False)
+        self._fold_statements(stmt.body)
+        self.symbols.pop_scope()
+
+    def _fold_WhileStatement(self, stmt):
+        stmt.condition = self._expr(stmt.condition)
+        self._fold_block(stmt.body)
+
+    def _fold_RepeatStatement(self, stmt):
+        stmt.count = self._expr(stmt.count)
+        self._fold_block(stmt.body)
+
+    def _fold_ForEachStatement(self, stmt: ForEachStatement):
+        stmt.iterable = self._expr(stmt.iterable)
+        self.symbols.push_scope()
+        self.symbols.declare(stmt.variable, None, slot=False)
+        self._fold_statements(stmt.body)
+        self.symbols.pop_scope()
+
+    def _fold_IfStatement(self, stmt: IfStatement):
+        # as condições são avaliadas na ordem, até a primeira verdadeira
+        all_branches = [(stmt.condition, stmt.then_block)] + list(stmt.else_ifs)
+        branches = []
+        # bloco executado quando nenhuma das condições que sobram é verdadeira
+        taken = stmt.else_block
+        for condition, block in all_branches:
+            condition = self._expr(condition)
+            if isinstance(condition, Literal) and condition.type == "logico":
+                if condition.value:
+                    # sempre executado: os ramos seguintes nunca executam
+                    taken = block
+                    break
+                continue
+            branches.append((condition, block))
+        self.stats.removed_branches += len(all_branches) + (stmt.else_block is not None) \
+            - len(branches) - (taken is not None)
+        for _, block in branches:
+            self._fold_block(block)
+        if taken is not None:
+            self._fold_block(taken)
+        if branches:
+            (stmt.condition, stmt.then_block), *else_ifs = branches
+            stmt.else_ifs = else_ifs
+            stmt.else_block = taken
+            return None
+        if not taken:
+            return []
+        if not _declares(taken):
+            return taken
+        return [IfStatement(Literal(True, "logico", offset=stmt.condition.offset), taken, [], None,
+                            offset=stmt.offset)]
+
+    # ---------- expressões ----------
+    def _expr(self, node):
+        """`node` com as constantes dobradas (o próprio nó ou o literal que o substitui)"""
+        return self._expressions[node.__class__](node)
+
+    def _expr_other(self, node):
+        return node
+
+    def _constant(self, node: Identifier) -> Optional[Literal]:
+        symbol = self.symbols.lookup(node.name)
+        return symbol.type if symbol is not None else None
+
+    def _expr_Identifier(self, node: Identifier):
+        value = self._constant(node)
+        if value is None:
+            return node
+        self.stats.propagated += 1
+        return Literal(value.value, value.type, offset=node.offset)
+
+    def _expr_UnaryOperation(self, node: UnaryOperation):
+        operand = node.operand = self._expr(node.operand)
+        if isinstance(operand, Literal):
+            result = _fold_unary(node.operator, operand)
+            if result is not None:
+                self.stats.folded += 1
+                return Literal(*result, offset=node.offset)
+        return node
+
+    def _expr_BinaryOperation(self, node: BinaryOperation):
+        left = node.left = self._expr(node.left)
+        right = node.right = self._expr(node.right)
+        if isinstance(left, Literal) and isinstance(right, Literal):
+            result = _fold_binary(node.operator, left, right)
+            if result is not None:
+                self.stats.folded += 1
+                return Literal(*result, offset=node.offset)
+        return node
+
+    def _expr_ListLiteral(self, node):
+        node.elements[:] = [self._expr(e) for e in node.elements]
+        return node
+
+    def _expr_IndexAccess(self, node):
+        node.object = self._expr(node.object)
+        node.index = self._expr(node.index)
+        return node
+
+    def _expr_FunctionCall(self, node):
+        node.arguments[:] = [self._expr(a) for a in node.arguments]
+        return node
+
+
+def fold_constants(program: Program) -> FoldStats:
+    """Dobra e propaga as constantes de `program`, no lugar"""
+    return ConstantFolder().fold(program)
+
+
+__all__ = ["FoldStats", "ConstantFolder", "fold_constants"]
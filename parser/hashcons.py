@@ -0,0 +1,110 @@
+"""
+AST com hash-consing: subárvores estruturalmente iguais são o mesmo objeto
+
+`HashConsFactory` é uma fábrica de nós para o `BrasilScriptParser` (o
+argumento `nodes=`, como `FlatASTBuilder`): cada construtor procura numa
+tabela um nó já criado com a mesma classe e os mesmos campos (os filhos já
+internados são comparados por identidade) e devolve esse nó em vez de um
+novo. Código gerado, que repete os mesmos literais, identificadores e
+subexpressões milhares de vezes, passa a ter um objeto por subárvore
+distinta.
+
+A fábrica também guarda o `structural_hash` (parser.ast) de cada nó,
+calculado ao criá-lo a partir dos hashes dos filhos: `factory.hash(node)` é
+uma consulta a um dicionário. Entre nós da mesma fábrica, igualdade
+estrutural é identidade (`a is b`), o que serve de chave para caches,
+eliminação de subexpressões comuns e recompilação incremental.
+
+Os nós compartilhados são as classes normais de parser.ast, para que os
+passes que só leem a árvore (hash estrutural, serialização, comparação)
+continuem funcionando, mas não devem ser modificados: uma alteração
+aparece em todos os lugares onde a subárvore se repete. Eles não têm
+posição (`offset` é -1), já que cada ocorrência tem a sua. `Program` não
+é compartilhado, guarda os erros do parse normalmente e sai com
+`shared=True`: a análise semântica, a inferência de tipos e a dobra de
+constantes, que anotam ou reescrevem os nós, recusam a árvore com
+ValueError. Para esses passes, `load_ast(dump_ast(program))`
+(parser.binary_ast) dá uma cópia sem compartilhamento.
+
+Uso:
+    factory = HashConsFactory()
+    program = parse_hash_consed(code, factory=factory)
+    factory.hash(program.statements[0])
+"""
+
+from typing import Any, Dict, List, Optional
+
+import parser.ast as ast_nodes
+from parser.ast import ASTNode, Program, structural_hash
+from parser.brasilscript_parser import BrasilScriptParser, tokenize_source
+
+
+def _key(value: Any) -> Any:
+    if isinstance(value, ASTNode):
+        # o filho já é o nó único da sua estrutura
+        return id(value)
+    if isinstance(value, list):
+        return (list, tuple(_key(item) for item in value))
+    if isinstance(value, tuple):
+        return (tuple, tuple(_key(item) for item in value))
+    # o tipo entra na chave para não unificar 1, 1.0 e True
+    return (type(value), value)
+
+
+class HashConsFactory:
+    """Fábrica de nós que devolve um único nó por estrutura; pode ser reusada entre parses"""
+
+    def __init__(self):
+        # (classe, campos com os filhos trocados por id) -> nó
+        self.table: Dict[tuple, ASTNode] = {}
+        # id do nó -> hash estrutural (a tabela mantém os nós vivos, então os ids não se repetem)
+        self.hashes: Dict[int, int] = {}
+        self.hits = 0
+
+    def _intern(self, cls, args: tuple) -> ASTNode:
+        key = (cls, *[_key(value) for value in args])
+        node = self.table.get(key)
+        if node is None:
+            node = self.table[key] = cls(*args)
+            structural_hash(node, self.hashes)
+        else:
+            self.hits += 1
+        return node
+
+    def hash(self, node: ASTNode) -> int:
+        """`structural_hash` de um nó criado por esta fábrica (ou de qualquer árvore, calculado)"""
+        return structural_hash(node, self.hashes)
+
+    def Program(self, statements: List[ASTNode], _errors: Optional[List[str]] = None) -> Program:
+        return Program(statements, _errors if _errors is not None else [], shared=True)
+
+    def __len__(self) -> int:
+        """Número de nós distintos criados"""
+        return len(self.table)
+
+
+def _constructor(cls):
+    def build(self, *args, offset=-1):
+        return self._intern(cls, args)
+    build.__name__ = build.__qualname__ = cls.__name__
+    build.__doc__ = f"Nó `{cls.__name__}` compartilhado (o offset é descartado)"
+    return build
+
+
+for _cls in (ast_nodes.Literal, ast_nodes.Identifier, ast_nodes.Declaration, ast_nodes.Assignment,
+             ast_nodes.BinaryOperation, ast_nodes.UnaryOperation, ast_nodes.ListLiteral,
+             ast_nodes.IndexAccess, ast_nodes.FunctionDecl, ast_nodes.FunctionCall,
+             ast_nodes.IfStatement, ast_nodes.WhileStatement, ast_nodes.ForEachStatement,
+             ast_nodes.RepeatStatement, ast_nodes.ReturnStatement, ast_nodes.PrintStatement,
+             ast_nodes.InputStatement):
+    setattr(HashConsFactory, _cls.__name__, _constructor(_cls))
+del _cls
+
+
+def parse_hash_consed(code: str, engine: str = "afd", factory: Optional[HashConsFactory] = None) -> Program:
+    """Como `parse_brasilscript`, com os nós criados por `factory` (uma nova, se omitida)"""
+    factory = factory if factory is not None else HashConsFactory()
+    return BrasilScriptParser(tokenize_source(code, engine), nodes=factory).parse()
+
+
+__all__ = ["HashConsFactory", "parse_hash_consed"]
@@ -0,0 +1,211 @@
+"""
+Re-parse incremental de statements de nível superior
+
+Um `ParseState` guarda o código fonte, os tokens, o `Program` e, para cada
+statement de nível superior, o intervalo de tokens [start, end) que ele
+consumiu e os erros que gerou (`Segment`). Ao receber uma edição, `reparse`:
+
+1. re-tokeniza a partir de pouco antes da edição até chegar, depois dela,
+   a uma fronteira de token que também existia no fonte antigo (o lexer
+   não tem estado entre tokens, então dali em diante os tokens antigos
+   valem, com o offset deslocado pelo tamanho da edição);
+2. conta quantos tokens do início continuam idênticos;
+3. reaproveita os segmentos do prefixo cujo último token e os dois
+   seguintes (a lookahead do parser, inclusive na recuperação de erros)
+   não mudaram;
+4. faz o parse a partir daí até cair no início de um segmento antigo que
+   está inteiramente no sufixo; desse ponto em diante os segmentos antigos
+   são reaproveitados, com os offsets dos nós deslocados.
+
+O resultado é idêntico ao de `parse_brasilscript(novo_fonte)`, inclusive
+erros (cada segmento guarda seus erros sem o limite `MAX_ERRORS`, que é
+aplicado ao montar o `Program`). `ParseState.changed` traz os índices (em
+`program.statements`) dos statements que foram re-parseados, para passes
+seguintes refazerem só eles.
+
+Os tokens e as subárvores reaproveitados depois da edição são
+compartilhados com o estado anterior e têm o offset ajustado no lugar,
+então o estado anterior não deve mais ser usado depois de `reparse`.
+
+Uso:
+    state = parse_incremental(code)
+    state = reparse(state, inicio, fim, "texto novo")
+    state.program, state.changed
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import List, Optional, Set, Tuple
+
+from parser.ast import ASTNode, Program, walk
+from parser.brasilscript_parser import (
+    K_EOF, MAX_ERRORS, BrasilScriptParser, Token, iter_source_tokens, tokenize_source,
+)
+from parser.diagnostics import Diagnostic, cap
+
+# O lexer examina no máximo dois caracteres além do fim de um lexema (ex.:
+# "1." em "1.x"), então recomeçar dois tokens antes do primeiro token tocado
+# pela edição garante uma fronteira que a edição não altera.
+_RELEX_MARGIN = 2
+
+
+@dataclass(slots=True)
+class Segment:
+    """Statement de nível superior e o intervalo de tokens que ele consumiu"""
+    start: int
+    end: int
+    statement: Optional[ASTNode]  # None para `parar` e statements inválidos
+    errors: Tuple[Diagnostic, ...] = ()
+
+
+@dataclass(slots=True)
+class ParseState:
+    source: str
+    tokens: List[Token]
+    segments: List[Segment]
+    program: Program
+    engine: str = "afd"
+    # índices em program.statements que vieram de parse novo
+    changed: Set[int] = field(default_factory=set)
+
+
+def _parse_segments(parser: BrasilScriptParser, segments: List[Segment], stop=None) -> Optional[int]:
+    """Executa o laço de `parse_statement_list` no nível superior, registrando segmentos
+
+    `stop(indice)` é consultado antes de cada statement; quando devolve um
+    índice de segmento antigo, o laço para e esse índice é retornado.
+    """
+    tokens = parser.tokens
+    errors = parser.errors
+    while True:
+        start = parser.current
+        if stop is not None:
+            reuse = stop(start)
+            if reuse is not None:
+                return reuse
+        if tokens[start].kind == K_EOF:
+            return None
+        n_errors = len(errors)
+        stmt = parser.parse_statement()
+        segments.append(Segment(start, parser.current, stmt, tuple(errors[n_errors:])))
+
+
+def _build_state(source, tokens, segments, engine, changed_segments) -> ParseState:
+    statements = []
+    errors = []
+    changed = set()
+    for i, segment in enumerate(segments):
+        if segment.statement is not None:
+            if i in changed_segments:
+                changed.add(len(statements))
+            statements.append(segment.statement)
+        errors.extend(segment.errors)
+    # mesmo corte que o parser faz durante um parse completo
+    errors = cap(errors, MAX_ERRORS)
+    return ParseState(source, tokens, segments, Program(statements, errors), engine, changed)
+
+
+def parse_incremental(code: str, engine: str = "afd") -> ParseState:
+    """Parse completo que guarda o necessário para `reparse`"""
+    tokens = tokenize_source(code, engine)
+    segments: List[Segment] = []
+    _parse_segments(BrasilScriptParser(tokens, max_errors=None), segments)
+    return _build_state(code, tokens, segments, engine, range(len(segments)))
+
+
+def _shift_offsets(statement: ASTNode, delta: int) -> None:
+    for node in walk(statement):
+        if node.offset >= 0:
+            node.offset += delta
+
+
+def _token_end(token: Token) -> int:
+    return token.offset + len(token.value)
+
+
+def _token_offset(token: Token) -> int:
+    return token.offset
+
+
+def _relex(previous: ParseState, source: str, start: int, new_end: int, delta: int):
+    """Re-tokeniza só a vizinhança da edição
+
+    Devolve (tokens, restart, relexed, sync): os tokens do fonte novo, o índice
+    onde a re-tokenização começou, os tokens novos gerados e o índice (nos
+    tokens antigos) a partir do qual os tokens antigos foram reaproveitados.
+    Os tokens reaproveitados têm o offset deslocado no lugar.
+    """
+    old_tokens = previous.tokens
+    first = bisect_left(old_tokens, start, key=_token_end)
+    restart = max(0, first - _RELEX_MARGIN)
+    # antes do primeiro token, só o início do fonte é uma fronteira segura
+    pos = old_tokens[restart].offset if restart else 0
+    relexed = []
+    sync = len(old_tokens)
+    for token in iter_source_tokens(source, previous.engine, pos):
+        if token.offset > new_end:
+            # mesma fronteira no fonte antigo: daqui em diante o texto é igual,
+            # inclusive o caractere anterior (o `\b` da engine regex olha para trás)
+            old_offset = token.offset - delta
+            j = bisect_left(old_tokens, old_offset, lo=first, key=_token_offset)
+            if j < len(old_tokens) and old_tokens[j].offset == old_offset:
+                sync = j
+                break
+        relexed.append(token)
+    suffix = old_tokens[sync:]
+    if delta:
+        for token in suffix:
+            token.offset += delta
+    return old_tokens[:restart] + relexed + suffix, restart, relexed, sync
+
+
+def reparse(previous: ParseState, start: int, end: int, text: str) -> ParseState:
+    """Aplica a edição source[start:end] = text e re-parseia só o necessário"""
+    old_source = previous.source
+    if not 0 <= start <= end <= len(old_source):
+        raise ValueError(f"Edição fora do código fonte: [{start}, {end})")
+    source = old_source[:start] + text + old_source[end:]
+    delta = len(text) - (end - start)
+    old_tokens = previous.tokens
+    old_count = len(old_tokens)
+    tokens, restart, relexed, sync = _relex(previous, source, start, start + len(text), delta)
+
+    # tokens iguais aos antigos: tudo antes de `restart` e o começo de `relexed`
+    prefix = restart
+    for token in relexed:
+        if prefix >= sync or token != old_tokens[prefix]:
+            break
+        prefix += 1
+    shift = len(tokens) - old_count
+
+    # segmentos do prefixo: os dois tokens seguintes ao statement também não mudaram
+    old_segments = previous.segments
+    kept = 0
+    while kept < len(old_segments) and old_segments[kept].end + 1 < prefix:
+        kept += 1
+    segments = old_segments[:kept]
+    resume = segments[-1].end if segments else 0
+
+    # índice do token antigo -> índice do segmento antigo que começa nele
+    reusable = {}
+    for i in range(len(old_segments) - 1, kept - 1, -1):
+        if old_segments[i].start < sync:
+            break
+        reusable[old_segments[i].start] = i
+
+    parser = BrasilScriptParser(tokens, max_errors=None)
+    parser.current = resume
+    reuse = _parse_segments(parser, segments, lambda index: reusable.get(index - shift))
+    changed_segments = set(range(kept, len(segments)))
+    if reuse is not None:
+        for old in old_segments[reuse:]:
+            errors = old.errors
+            if delta:
+                if old.statement is not None:
+                    _shift_offsets(old.statement, delta)
+                errors = tuple(error.shifted(delta) for error in errors)
+            segments.append(Segment(old.start + shift, old.end + shift, old.statement, errors))
+    return _build_state(source, tokens, segments, previous.engine, changed_segments)
+
+
+__all__ = ["Segment", "ParseState", "parse_incremental", "reparse"]
@@ -0,0 +1,239 @@
+"""
+Análise semântica incremental por statement de nível superior
+
+`IncrementalAnalyzer` registra, para cada statement de nível superior (uma
+função inteira é um statement), quais nomes globais ele lê e quais declara,
+com o tipo visto ou dado a cada um (`StatementInfo`). Um nome lido que não
+estava declarado também é registrado (com tipo None): declará-lo antes
+muda os erros do statement.
+
+Numa nova análise, um statement é reaproveitado sem ser visitado quando:
+
+1. é o mesmo objeto de uma análise anterior (como os statements que
+   `parser.incremental.reparse` não re-parseou), e
+2. cada nome global que ele leu tem, neste ponto do programa, o mesmo tipo
+   de antes (os tipos são internados, então é uma comparação por
+   identidade) e o mesmo slot (parser.scopes).
+
+Nesse caso seus erros guardados são repetidos e suas declarações aplicadas
+à tabela global. Senão ele é checado de novo. Um statement editado que muda
+o tipo de um global faz os leitores desse global serem checados de novo, e
+o mesmo vale para os leitores do que eles declaram: são os dependentes
+transitivos. Quem não lê nada que mudou não é visitado. A lista de erros é
+sempre igual à de `SemanticAnalyzer().analyze(program)`.
+
+O corpo de uma função de nível superior é checado depois do nível
+superior (ver parser.semantic) e tem o seu próprio registro (`body`), com
+as leituras conferidas contra a tabela global completa: um global
+declarado ou mudado depois da função também faz o corpo ser checado de
+novo.
+
+Os slots anotados num statement reaproveitado continuam valendo porque o
+reaproveitamento também exige que o número de slots globais em uso antes
+dele seja o de antes: um statement editado que acrescenta ou remove uma
+variável global faz os statements seguintes serem checados (e anotados)
+de novo.
+
+Os statements não devem ser modificados no lugar entre duas análises: o
+reaproveitamento é por identidade.
+
+Uso:
+    state = parse_incremental(code)
+    analyzer = IncrementalAnalyzer()
+    errors = analyzer.analyze(state.program)
+    state = reparse(state, inicio, fim, "texto novo")
+    errors = analyzer.analyze(state.program)
+    analyzer.rechecked      # índices dos statements checados de novo
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from parser.ast import ASTNode, Program, require_unshared
+from parser.diagnostics import Diagnostic, Diagnostics
+from parser.scopes import Symbol, SymbolTable
+from parser.semantic import SemanticAnalyzer
+from parser.typetable import Type
+
+
+@dataclass(slots=True)
+class StatementInfo:
+    """O que um statement de nível superior leu e declarou no escopo global"""
+    statement: ASTNode
+    reads: Tuple[Tuple[str, Optional[Type]], ...]   # (nome, tipo global antes do statement; None: não declarado)
+    defines: Tuple[Symbol, ...]                      # declarações globais feitas, em ordem
+    errors: Tuple[Diagnostic, ...]
+    # slot global de cada nome de `reads`, na mesma ordem
+    read_slots: Tuple[Optional[Tuple[int, int]], ...]
+    slots: int          # slots globais em uso antes do statement
+    peak: int           # slots do frame global que o statement usou além de `slots`
+    offset: int         # offset do statement quando os erros foram registrados
+    # função de nível superior: o registro do corpo, checado depois do nível superior
+    body: Optional["StatementInfo"] = None
+
+
+class _RecordingSymbolTable(SymbolTable):
+    """SymbolTable que anota as leituras e declarações globais do statement atual"""
+
+    def __init__(self):
+        super().__init__()
+        self.reads: Dict[str, Optional[Type]] = {}
+        self.read_slots: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.defines: List[Symbol] = []
+        # slots em uso e tamanho do frame global antes do statement atual
+        self._start = (0, 0)
+
+    def begin(self) -> None:
+        """Começa a registrar um novo statement (ou corpo de função)"""
+        self.reads = {}
+        self.read_slots = {}
+        self.defines = []
+        # o tamanho do frame é medido de novo a partir dos slots em uso: o do
+        # statement não pode ser tirado do máximo acumulado
+        self._start = (self._slots, self._frame_size)
+        self._frame_size = self._slots
+
+    def end(self) -> int:
+        """Termina o registro; devolve o pico do statement (ver `StatementInfo.peak`)"""
+        slots, frame_size = self._start
+        peak = self._frame_size - slots
+        self._frame_size = max(frame_size, self._frame_size)
+        return peak
+
+    def lookup(self, name: str) -> Optional[Symbol]:
+        stack = self._bindings.get(name)
+        symbol = stack[-1] if stack is not None else None
+        # nomes locais não dependem de outros statements; o primeiro acesso
+        # guarda o valor de antes do statement (uma declaração própria vem depois)
+        if (symbol is None or symbol.depth == 0) and name not in self.reads:
+            if symbol is None:
+                self.reads[name] = self.read_slots[name] = None
+            else:
+                self.reads[name] = symbol.type
+                self.read_slots[name] = symbol.slot
+        return symbol
+
+    def declare(self, name: str, type_name: Any, slot: bool = True) -> Optional[Symbol]:
+        if len(self._scopes) > 1:
+            return super().declare(name, type_name, slot)
+        if name not in self.reads:
+            stack = self._bindings.get(name)
+            if stack is None:
+                self.reads[name] = self.read_slots[name] = None
+            else:
+                self.reads[name] = stack[-1].type
+                self.read_slots[name] = stack[-1].slot
+        symbol = super().declare(name, type_name, slot)
+        if symbol is not None:
+            self.defines.append(symbol)
+        return symbol
+
+    def unchanged(self, info: StatementInfo) -> bool:
+        """Cada nome lido por `info` tem agora, no escopo global, o mesmo tipo e o mesmo slot de antes?"""
+        bindings = self._bindings
+        for (name, type_), slot in zip(info.reads, info.read_slots):
+            stack = bindings.get(name)
+            if stack is None:
+                if type_ is not None:
+                    return False
+            elif stack[-1].type is not type_ or stack[-1].slot != slot:
+                return False
+        return True
+
+    def replay(self, info: StatementInfo) -> None:
+        """Refaz declarações globais já feitas numa análise anterior
+
+        Os nomes estão entre as leituras do statement, que acabaram de ser
+        conferidas: nenhum deles está declarado ainda. Os slots em uso antes
+        do statement também são os de antes, então os dos símbolos valem.
+        """
+        bindings = self._bindings
+        names = self._scopes[0]
+        for symbol in info.defines:
+            bindings[symbol.name] = [symbol]
+            names.append(symbol.name)
+            if symbol.slot is not None:
+                self._slots = symbol.slot[1] + 1
+        self._frame_size = max(self._frame_size, info.slots + info.peak)
+
+
+class IncrementalAnalyzer(SemanticAnalyzer):
+    """SemanticAnalyzer que reaproveita os resultados da análise anterior"""
+
+    def __init__(self):
+        super().__init__()
+        self.infos: List[StatementInfo] = []
+        # índices (em program.statements) dos statements visitados na última análise
+        self.rechecked: List[int] = []
+
+    def analyze(self, program: Program) -> Diagnostics:
+        require_unshared(program, "análise semântica incremental")
+        # id do statement -> resultado anterior; as infos mantêm os statements
+        # vivos, então os ids não se repetem
+        previous = {id(info.statement): info for info in self.infos}
+
+        symbols = self.symbols = _RecordingSymbolTable()
+        errors = self.errors
+        errors.clear()
+        infos: List[StatementInfo] = []
+        rechecked = set()
+        deferred = self._deferred = []
+        # para cada função adiada: índice, registro do statement e registro anterior do corpo
+        functions: List[Tuple[int, StatementInfo, Optional[StatementInfo]]] = []
+
+        for index, stmt in enumerate(program.statements):
+            info = previous.get(id(stmt))
+            old_body = info.body if info is not None else None
+            if info is not None and info.slots == symbols.slots and symbols.unchanged(info):
+                symbols.replay(info)
+                self._shift(stmt, info)
+                errors.extend(info.errors)
+                if info.body is not None:
+                    deferred.append((stmt, len(errors)))
+            else:
+                start = len(errors)
+                slots = symbols.slots
+                symbols.begin()
+                self._check_statement(stmt)
+                peak = symbols.end()
+                info = StatementInfo(stmt, tuple(symbols.reads.items()), tuple(symbols.defines),
+                                     tuple(errors[start:]), tuple(symbols.read_slots.values()), slots, peak, stmt.offset)
+                rechecked.add(index)
+            if len(deferred) > len(functions):
+                functions.append((index, info, old_body))
+            infos.append(info)
+        self._deferred = None
+
+        # corpos das funções de nível superior, com a tabela global completa
+        top = len(errors)
+        bodies = []
+        for (stmt, _), (index, info, body) in zip(deferred, functions):
+            start = len(errors)
+            if body is not None and symbols.unchanged(body):
+                self._shift(stmt, body)
+                errors.extend(body.errors)
+            else:
+                slots = symbols.slots
+                symbols.begin()
+                self._check_function_body(stmt)
+                body = StatementInfo(stmt, tuple(symbols.reads.items()), (), tuple(errors[start:]),
+                                     tuple(symbols.read_slots.values()), slots, symbols.end(), stmt.offset)
+                rechecked.add(index)
+            info.body = body
+            bodies.append(errors[start:])
+        errors[:] = self.splice_errors(errors[:top], [position for _, position in deferred], bodies)
+
+        self.infos = infos
+        self.rechecked = sorted(rechecked)
+        program.frame_size = symbols.frame_size
+        return errors
+
+    @staticmethod
+    def _shift(stmt, info: StatementInfo) -> None:
+        delta = stmt.offset - info.offset
+        if delta:
+            # o statement foi deslocado por uma edição antes dele (parser.incremental)
+            info.errors = tuple(error.shifted(delta) for error in info.errors)
+            info.offset = stmt.offset
+
+__all__ = ["StatementInfo", "IncrementalAnalyzer"]
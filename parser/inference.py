@@ -0,0 +1,258 @@
+"""
+Inferência de tipos do programa inteiro: parâmetros e retornos das funções
+
+Os parâmetros de `FunctionDecl` não têm tipo e a análise semântica trata
+cada um como 'any'. Este passe dá a cada função alcançável do nível
+superior uma ou mais instâncias (`Instance`), uma por combinação de tipos
+de argumentos com que ela é chamada (monomorfização): `soma(1, 2)` e
+`soma("a", "b")` geram `soma` com (numero, numero) e um clone `soma.1`
+com (texto, texto). Cada instância tem o tipo de retorno inferido do seu
+corpo, e cada chamada (no nível superior ou no corpo de uma instância) é
+resolvida para a instância chamada, o que o codegen usa para escolher
+tipos nativos (double, i1, i8*) em vez de tratar tudo como double.
+
+Os tipos vêm das próprias regras da análise semântica (`SemanticAnalyzer`
+com os parâmetros ligados aos tipos da instância) e as restrições são
+resolvidas por ponto fixo sobre o grafo de chamadas:
+
+- uma chamada pede a instância da função para os tipos dos argumentos e
+  usa o retorno atual dela, que começa indefinido (None) e só cresce
+  (None < tipo concreto < 'any', quando os `retornar` discordam);
+- quando o retorno de uma instância muda, quem a chamou (o nível superior
+  ou outras instâncias) é analisado de novo, o que resolve a recursão:
+  em `fat(n - 1) * n` a primeira passada só vê o `retornar 1`.
+
+Uma função tem no máximo `MAX_CLONES` instâncias; as chamadas além disso
+vão para a instância com todos os parâmetros 'any', o que também encerra
+recursões que criariam tipos sem fim (`f(x)` chamando `f([x])`).
+
+Uso:
+    types = infer_program(program)
+    for instance in types.instances["soma"]:
+        instance.name, instance.parameters, instance.returns
+    types.target(call_node)            # instância chamada no nível superior
+    types.target(call_node, instance)  # ... no corpo de `instance`
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from parser.ast import FunctionCall, FunctionDecl, Program, ReturnStatement, require_unshared
+from parser.scopes import SymbolTable
+from parser.semantic import SemanticAnalyzer
+from parser.typetable import ANY, FUNCAO, Type
+
+# instâncias por função, contando a instância com parâmetros 'any'
+MAX_CLONES = 8
+
+
+@dataclass(slots=True, eq=False)
+class Instance:
+    """Uma função com tipos concretos de parâmetros"""
+    function: FunctionDecl
+    name: str                       # nome no código gerado: o da função, ou "nome.N" nos clones
+    parameters: Tuple[Type, ...]
+    returns: Optional[Type] = None  # None: a função não retorna valor (ou ainda não se sabe)
+    # id da FunctionCall no corpo -> instância chamada
+    calls: Dict[int, "Instance"] = field(default_factory=dict)
+    # frame da instância para o codegen; os do FunctionDecl ficam os da análise semântica
+    frame_size: int = 0
+    parameter_slots: List[Optional[Tuple[int, int]]] = field(default_factory=list)
+
+
+def join(a: Optional[Type], b: Optional[Type]) -> Optional[Type]:
+    """Menor tipo que cobre `a` e `b` (None é o indefinido, 'any' o conflito)"""
+    if a is None or a is b:
+        return b
+    if b is None:
+        return a
+    return ANY
+
+
+class _BodyInference(SemanticAnalyzer):
+    """Análise semântica de um corpo que resolve as chamadas e junta os retornos
+
+    Os erros são os da análise semântica e são descartados: este passe só
+    coleta tipos.
+    """
+
+    def __init__(self, types: "ProgramTypes"):
+        super().__init__()
+        self.types = types
+        self.instance: Optional[Instance] = None
+        self.calls: Dict[int, Instance] = {}
+        self.returned: Optional[Type] = None
+
+    def run(self, instance: Optional[Instance], statements, globals_=()) -> None:
+        self.symbols = SymbolTable()
+        self.errors.clear()
+        self.instance = instance
+        self.calls = {}
+        self.returned = None
+        if instance is not None:
+            for name, type_ in globals_:
+                self.symbols.declare(name, type_, slot=type_ is not FUNCAO)
+            self.symbols.push_frame()
+            decl = instance.function
+            parameter_slots = []
+            for name, type_ in zip(decl.parameters, instance.parameters):
+                symbol = self.symbols.declare(name, type_)
+                parameter_slots.append(symbol.slot if symbol is not None else None)
+        for stmt in statements:
+            self._check_statement(stmt)
+        # as anotações de slots dos nós são as da análise semântica (os escopos não
+        # dependem dos tipos); o frame de cada instância fica nela, não no FunctionDecl
+        if instance is not None:
+            instance.frame_size = self.symbols.frame_size
+            instance.parameter_slots = parameter_slots
+        else:
+            self.types.program.frame_size = self.symbols.frame_size
+
+    def _check_FunctionDecl(self, stmt: FunctionDecl):
+        # funções aninhadas não são geradas: só o nome importa
+        self.symbols.declare(stmt.name, FUNCAO, slot=False)
+
+    def _check_ReturnStatement(self, stmt: ReturnStatement):
+        if stmt.value is not None:
+            self.returned = join(self.returned, self._infer_type(stmt.value))
+
+    def _infer_FunctionCall(self, node: FunctionCall) -> Optional[Type]:
+        arguments = tuple(self._infer_type(a) for a in node.arguments)
+        symbol = self.symbols.lookup(node.name)
+        if symbol is None or symbol.type is not FUNCAO or symbol.depth != 0:
+            # não declarada, não é função ou é uma função aninhada
+            return super()._infer_FunctionCall(node)
+        if None in arguments:
+            if not self.types._settled:
+                # o argumento depende de um retorno ainda indefinido: a chamada
+                # é resolvida quando ele mudar e este corpo for analisado de novo
+                return None
+            arguments = tuple(a or ANY for a in arguments)
+        callee = self.types.instantiate(node.name, arguments, self.instance)
+        if callee is None:
+            return ANY
+        self.calls[id(node)] = callee
+        return callee.returns
+
+
+class ProgramTypes:
+    """Instâncias das funções de nível superior e alvos das chamadas"""
+
+    def __init__(self, program: Program):
+        require_unshared(program, "inferência de tipos")
+        self.program = program
+        self.functions: Dict[str, FunctionDecl] = {}
+        for stmt in program.statements:
+            if isinstance(stmt, FunctionDecl):
+                self.functions.setdefault(stmt.name, stmt)
+        # nome da função -> instâncias, na ordem em que foram criadas
+        self.instances: Dict[str, List[Instance]] = {}
+        # id da FunctionCall no nível superior -> instância chamada
+        self.calls: Dict[int, Instance] = {}
+        self._by_key: Dict[Tuple[str, Tuple[Type, ...]], Instance] = {}
+        # instância -> quem usou o seu retorno (None: o nível superior)
+        self._callers: Dict[Instance, Set[Optional[Instance]]] = {}
+        self._pending: Deque[Optional[Instance]] = deque()
+        self._queued: Set[Optional[Instance]] = set()
+        self._globals: Tuple[Tuple[str, Type], ...] = ()
+        # falso enquanto retornos indefinidos (None) ainda podem ser resolvidos
+        self._settled = False
+        self._solve()
+
+    def instantiate(self, name: str, arguments: Tuple[Type, ...],
+                    caller: Optional[Instance]) -> Optional[Instance]:
+        """Instância de `name` para os tipos dos argumentos, criada (e analisada) se ainda não existe"""
+        decl = self.functions.get(name)
+        if decl is None:
+            return None
+        count = len(decl.parameters)
+        parameters = (arguments + (ANY,) * count)[:count]
+        instance = self._by_key.get((name, parameters))
+        if instance is None:
+            clones = self.instances.setdefault(name, [])
+            if len(clones) >= MAX_CLONES - 1:
+                # a última vaga é da instância com todos os parâmetros 'any'
+                parameters = (ANY,) * count
+                instance = self._by_key.get((name, parameters))
+            if instance is None:
+                instance = Instance(decl, f"{name}.{len(clones)}" if clones else name, parameters)
+                clones.append(instance)
+                self._by_key[(name, parameters)] = instance
+                self._callers[instance] = set()
+                self._enqueue(instance)
+        self._callers[instance].add(caller)
+        return instance
+
+    def target(self, call: FunctionCall, instance: Optional[Instance] = None) -> Optional[Instance]:
+        """Instância chamada por `call` no nível superior ou no corpo de `instance`"""
+        calls = self.calls if instance is None else instance.calls
+        return calls.get(id(call))
+
+    def __iter__(self):
+        """Todas as instâncias, função por função"""
+        for clones in self.instances.values():
+            yield from clones
+
+    def _enqueue(self, instance: Optional[Instance]) -> None:
+        if instance not in self._queued:
+            self._queued.add(instance)
+            self._pending.append(instance)
+
+    def _solve(self) -> None:
+        inference = _BodyInference(self)
+        statements = self.program.statements
+        inference.run(None, statements)
+        self.calls = inference.calls
+        # nomes globais (variáveis com o tipo declarado e funções), vistos pelos corpos
+        self._globals = tuple((symbol.name, symbol.type) for symbol in inference.symbols.global_symbols())
+        self._fixpoint(inference)
+        # o que ficou indefinido não vai mudar: as chamadas restantes usam 'any'
+        self._settled = True
+        self._enqueue(None)
+        for instance in self:
+            self._enqueue(instance)
+        self._fixpoint(inference)
+        self._prune()
+
+    def _fixpoint(self, inference: _BodyInference) -> None:
+        statements = self.program.statements
+        while self._pending:
+            instance = self._pending.popleft()
+            self._queued.discard(instance)
+            if instance is None:
+                inference.run(None, statements)
+                self.calls = inference.calls
+                continue
+            inference.run(instance, instance.function.body, self._globals)
+            instance.calls = inference.calls
+            returns = join(instance.returns, inference.returned)
+            if returns is not instance.returns:
+                instance.returns = returns
+                for caller in self._callers[instance]:
+                    self._enqueue(caller)
+
+    def _prune(self) -> None:
+        # instâncias pedidas com tipos que depois cresceram (ex.: um retorno
+        # que virou 'any') não são mais chamadas; os clones são renumerados
+        live = set()
+        pending = list(self.calls.values())
+        while pending:
+            instance = pending.pop()
+            if instance not in live:
+                live.add(instance)
+                pending.extend(instance.calls.values())
+        for name, clones in list(self.instances.items()):
+            clones[:] = [instance for instance in clones if instance in live]
+            if not clones:
+                del self.instances[name]
+            for i, instance in enumerate(clones):
+                instance.name = f"{name}.{i}" if i else name
+
+
+def infer_program(program: Program) -> ProgramTypes:
+    """Tipos dos parâmetros e retornos das funções alcançáveis do nível superior de `program`"""
+    return ProgramTypes(program)
+
+
+__all__ = ["MAX_CLONES", "Instance", "ProgramTypes", "infer_program", "join"]
@@ -0,0 +1,254 @@
+"""
+Parse preguiçoso dos corpos de `funcao` de nível superior
+
+`parse_lazy` lê o nível superior normalmente, mas em cada `funcao` só faz o
+parse do cabeçalho (nome e parâmetros): o corpo é pulado contando apenas as
+palavras-chave de abertura e de fim de bloco (`skim_block`), e o nó guarda o
+intervalo de tokens dele. O parse completo do corpo acontece no primeiro
+acesso a `LazyFunctionDecl.body`. Ferramentas que só precisam da estrutura
+de nível superior (índice de declarações, outline) não pagam pelos corpos.
+Quem usa os corpos sem `force_bodies` confere antes com `check_bodies`,
+como o codegen: os erros dos corpos não estão nos erros do `Program`.
+
+A tokenização continua completa (e antes do parse, como em
+`parse_brasilscript`): erros léxicos aparecem em `parse_lazy`, não depois.
+
+A varredura pode discordar do parser quando o corpo tem erros de sintaxe (o
+parser sai de um bloco em outro ponto) ou quando o cabeçalho tem erros; no
+segundo caso a função é lida na hora. No primeiro, o parse do corpo percebe
+a diferença (ele não termina no token onde a varredura terminou) e
+`force_bodies` refaz o parse do programa todo. Sem essa diferença, o parse
+do corpo a partir do token onde ele começa é o mesmo do parse completo: o
+parser sai do modo de recuperação no início de cada statement e só olha dois
+tokens à frente (ver `parser.incremental`).
+
+Uso:
+    program = parse_lazy(code)
+    [(f.name, f.parameters) for f in program.statements if isinstance(f, FunctionDecl)]
+    program = force_bodies(program)   # igual a parse_brasilscript(code)
+    check_bodies(program.statements)  # ParseError se um corpo tem erro
+    python -m parser.lazy arquivo.bs  # declarações de nível superior
+"""
+
+import sys
+from typing import Iterable, List, Optional
+
+from parser.ast import FunctionDecl, Program, line_column
+from parser.brasilscript_parser import (
+    BLOCK_TERMINATORS, K_EOF, K_PALAVRA_CHAVE, MAX_ERRORS, V_ENQUANTO, V_FIM_ENQUANTO,
+    V_FIM_FUNCAO, V_FIM_PARA_CADA, V_FIM_REPETIR, V_FIM_SE, V_FUNCAO, V_PARA_CADA, V_REPETIR, V_SE,
+    V_SENAO, V_SENAO_SE, BrasilScriptParser, ParseError, Token, _Block, tokenize_source,
+)
+from parser.diagnostics import Diagnostic, cap
+
+# palavra-chave de abertura -> fim de bloco esperado
+_CLOSERS = {
+    V_SE: V_FIM_SE,
+    V_ENQUANTO: V_FIM_ENQUANTO,
+    V_REPETIR: V_FIM_REPETIR,
+    V_PARA_CADA: V_FIM_PARA_CADA,
+    V_FUNCAO: V_FIM_FUNCAO,
+}
+
+# slot `body` de FunctionDecl, sob a property de LazyFunctionDecl
+_BODY = FunctionDecl.__dict__["body"]
+
+
+def skim_block(tokens: List[Token], current: int, closer: int = V_FIM_FUNCAO) -> Optional[int]:
+    """Índice do token depois do `closer` que fecha o bloco aberto antes de `current`
+
+    Só olha palavras-chave de bloco, com uma pilha dos fins esperados.
+    Devolve None se um fim não for o esperado, se `senao`/`senao_se`
+    aparecer fora de um `se` ou se o código acabar antes: nesses casos
+    (código com erro) o parser decide onde o bloco termina.
+    """
+    expected = [closer]
+    while True:
+        token = tokens[current]
+        current += 1
+        if token.kind != K_PALAVRA_CHAVE:
+            if token.kind == K_EOF:
+                return None
+            continue
+        sym = token.sym
+        opened = _CLOSERS.get(sym)
+        if opened is not None:
+            expected.append(opened)
+        elif sym in BLOCK_TERMINATORS:
+            if sym != expected.pop():
+                return None
+            if not expected:
+                return current
+        elif (sym == V_SENAO or sym == V_SENAO_SE) and expected[-1] != V_FIM_SE:
+            return None
+
+
+class _LazySource:
+    """Tokens e erros de nível superior (sem o limite) compartilhados pelas funções de um `parse_lazy`"""
+    __slots__ = ("tokens", "errors")
+
+    def __init__(self, tokens: List[Token], errors: List[Diagnostic]):
+        self.tokens = tokens
+        self.errors = errors
+
+
+class LazyFunctionDecl(FunctionDecl):
+    """`FunctionDecl` cujo corpo só passa pelo parser no primeiro acesso a `body`
+
+    É igual (`==`) ao `FunctionDecl` do parse completo. `body_errors` fica
+    None até o parse do corpo, depois guarda os erros dele.
+    """
+    __slots__ = ("_source", "_start", "_end", "_errors_before", "_exact", "body_errors")
+
+    def __init__(self, name: str, parameters: List[str], source: _LazySource,
+                 start: int, end: int, errors_before: int, offset: int = -1):
+        self.name = name
+        self.parameters = parameters
+        self.offset = offset
+        self.frame_size = 0
+        self.parameter_slots = None
+        _BODY.__set__(self, None)
+        self._source = source
+        self._start = start                  # primeiro token do corpo
+        self._end = end                      # token depois do fim_funcao, segundo a varredura
+        self._errors_before = errors_before  # erros de nível superior antes da função
+        self._exact = None
+        self.body_errors = None
+
+    @property
+    def body(self) -> List:
+        if self.body_errors is None:
+            self._parse_body()
+        return _BODY.__get__(self)
+
+    @body.setter
+    def body(self, value: List) -> None:
+        # um corpo atribuído substitui o pendente
+        _BODY.__set__(self, value)
+        self.body_errors = []
+        self._exact = True
+
+    @property
+    def parsed(self) -> bool:
+        """Se o corpo já passou pelo parser"""
+        return self.body_errors is not None
+
+    def _parse_body(self) -> None:
+        tokens = self._source.tokens
+        parser = BrasilScriptParser(tokens, max_errors=None)
+        parser.current = self._start
+        block = _Block(parser._close_function_decl, tokens[self._start], (self.name, self.parameters))
+        node = parser._parse_nested([block], None)
+        _BODY.__set__(self, node.body)
+        self.body_errors = parser.errors
+        # o parser e a varredura concordam sobre o fim da função?
+        self._exact = parser.current == self._end
+
+    def __eq__(self, other):
+        if isinstance(other, FunctionDecl):
+            return (self.name, self.parameters, self.body) == (other.name, other.parameters, other.body)
+        return NotImplemented
+
+    __hash__ = None
+
+
+class _SkimmingParser(BrasilScriptParser):
+    """Parser cujas funções de nível superior saem como `LazyFunctionDecl`
+
+    `parse_function_decl` só é chamado pelo nível superior: funções dentro
+    de blocos passam por `_open_function_decl` em `_parse_nested`.
+    """
+
+    def __init__(self, tokens):
+        super().__init__(tokens, max_errors=None)
+        self.source = _LazySource(self.tokens, self.errors)
+
+    def parse_function_decl(self) -> FunctionDecl:
+        errors_before = len(self.errors)
+        block = self._open_function_decl()
+        if len(self.errors) == errors_before:
+            end = skim_block(self.tokens, self.current)
+            if end is not None:
+                name, parameters = block.header
+                decl = LazyFunctionDecl(name, parameters, self.source, self.current, end,
+                                        errors_before, offset=block.start.offset)
+                self.current = end
+                return decl
+        # cabeçalho com erro ou blocos que não casam: parse completo agora
+        return self._parse_nested([block], None)
+
+
+def parse_lazy(code: str, engine: str = "afd") -> Program:
+    """Como `parse_brasilscript`, com os corpos das funções de nível superior lidos sob demanda
+
+    Os erros do `Program` devolvido são só os de fora desses corpos.
+    """
+    program = _SkimmingParser(tokenize_source(code, engine)).parse()
+    # mesmo corte que o parser faz durante um parse completo
+    program._errors = cap(program._errors, MAX_ERRORS)
+    return program
+
+
+def force_bodies(program: Program) -> Program:
+    """Faz o parse dos corpos pendentes de um `parse_lazy`; o resultado é igual ao do parse completo
+
+    Os erros dos corpos entram na ordem do fonte e o limite `MAX_ERRORS` é
+    aplicado sobre o total. Se algum corpo terminou fora do ponto previsto
+    pela varredura, o programa todo é lido de novo.
+    """
+    lazy = [stmt for stmt in program.statements if isinstance(stmt, LazyFunctionDecl)]
+    if not lazy:
+        return program
+    source = lazy[0]._source
+    errors = []
+    k = 0
+    for decl in lazy:
+        if not decl.parsed:
+            decl._parse_body()
+        if not decl._exact:
+            return BrasilScriptParser(source.tokens).parse()
+        errors += source.errors[k:decl._errors_before]
+        errors += decl.body_errors
+        k = decl._errors_before
+    errors += source.errors[k:]
+    return Program(list(program.statements), cap(errors, MAX_ERRORS))
+
+
+def check_bodies(functions: Iterable[FunctionDecl]) -> None:
+    """Levanta `ParseError` se o corpo de alguma das funções não pode ser usado como está
+
+    Para quem usa um `parse_lazy` sem `force_bodies`: os erros dos corpos
+    não estão nos erros do `Program`, e um corpo que terminou fora do ponto
+    previsto pela varredura não é o do parse completo (nem o nível superior
+    depois dele). Aceita quaisquer statements; lê os corpos ainda pendentes.
+    """
+    for decl in functions:
+        if not isinstance(decl, LazyFunctionDecl):
+            continue
+        if not decl.parsed:
+            decl._parse_body()
+        if decl.body_errors:
+            raise ParseError(decl.body_errors[0])
+        if not decl._exact:
+            raise ParseError(Diagnostic("corpo_divergente", (decl.name,), decl.offset))
+
+
+def main(argv: List[str]) -> int:
+    if not argv:
+        print("Uso: python -m parser.lazy arquivo.bs")
+        return 2
+    with open(argv[0], encoding="utf-8") as f:
+        code = f.read()
+    program = parse_lazy(code)
+    for stmt in program.statements:
+        if isinstance(stmt, FunctionDecl):
+            line, _ = line_column(code, stmt.offset)
+            print(f"{line:>6}  funcao {stmt.name}({', '.join(stmt.parameters)})")
+    return 0
+
+
+__all__ = ["LazyFunctionDecl", "skim_block", "parse_lazy", "force_bodies", "check_bodies"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
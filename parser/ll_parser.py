@@ -0,0 +1,702 @@
+"""
+Parser preditivo LL dirigido por tabela, gerado a partir da gramática
+
+A gramática executável fica no bloco ```ll de
+docs/diagramas/gramatica_parser.md. Este módulo:
+
+1. lê as produções (`read_grammar`);
+2. calcula FIRST, anuláveis e FOLLOW (`first_sets`, `follow_sets`);
+3. monta a tabela (`build_table`): cada célula (não-terminal, token) guarda a
+   alternativa a expandir; quando duas alternativas disputam a célula e os
+   FIRST₂ delas são disjuntos, a célula vira uma entrada LL(2) indexada pelo
+   token seguinte (é o caso Assignment/CallStmt de `test_ll1_problems.py`);
+   os conflitos restantes ficam com a primeira alternativa e são listados em
+   `LLTable.conflicts`;
+4. executa a tabela com `LLParser`, um laço sobre uma pilha de símbolos
+   codificados como inteiros, comparando os ids internados dos tokens
+   (`Token.sym` ou `Token.kind`) sem recursão nem uma chamada de método por
+   regra.
+
+A AST construída é a mesma de `BrasilScriptParser` (nós, offsets e ordem de
+construção). O driver não tem recuperação de erros: no primeiro token
+inesperado o programa é refeito por `BrasilScriptParser`, então erros e AST
+parcial também são idênticos.
+
+Uso:
+    program = parse_ll(code)
+    python -m parser.ll_parser      # FIRST/FOLLOW, tamanho da tabela e conflitos
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from parser.ast import (
+    Program, Declaration, Assignment, FunctionDecl, IfStatement, WhileStatement,
+    RepeatStatement, ForEachStatement, PrintStatement, InputStatement, ReturnStatement,
+    FunctionCall, BinaryOperation, UnaryOperation, Literal, Identifier, ListLiteral, IndexAccess,
+)
+from parser.brasilscript_parser import (
+    K_EOF, KIND_IDS, SYMBOL_NAMES, VALUE_IDS, BrasilScriptParser, Token, number_value, tokenize_source,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GRAMMAR_PATH = os.path.join(ROOT, "docs", "diagramas", "gramatica_parser.md")
+
+EPSILON = "ε"
+_GRAMMAR_BLOCK = re.compile(r"^```ll\n(.*?)^```", re.MULTILINE | re.DOTALL)
+_GRAMMAR_TOKEN = re.compile(r"->|\||ε|\{\w+\}|\$?'[^']+'|\$?\w+|\S")
+
+
+# --- gramática ---
+
+@dataclass(frozen=True)
+class Item:
+    """Símbolo do lado direito de uma produção
+
+    `kind` é "terminal" (com `value` = id internado), "nonterminal" ou
+    "action". `push` indica um terminal cujo token vai para a pilha de
+    valores.
+    """
+    kind: str
+    value: object = None
+    push: bool = False
+
+    def __str__(self):
+        if self.kind == "terminal":
+            name = SYMBOL_NAMES[self.value]
+            text = name if self.value in _KIND_VALUES else f"'{name}'"
+            return "$" + text if self.push else text
+        if self.kind == "action":
+            return "{" + self.value + "}"
+        return self.value
+
+
+_KIND_VALUES = frozenset(KIND_IDS.values())
+
+
+@dataclass
+class Grammar:
+    start: str
+    # não-terminal -> alternativas, na ordem em que aparecem
+    productions: Dict[str, List[Tuple[Item, ...]]]
+
+
+def _terminal(word: str) -> Item:
+    push = word.startswith("$")
+    name = word[1:] if push else word
+    if name.startswith("'"):
+        ids, name = VALUE_IDS, name[1:-1]
+    else:
+        ids = KIND_IDS
+    if name not in ids:
+        raise ValueError(f"Terminal desconhecido na gramática: {word}")
+    return Item("terminal", ids[name], push)
+
+
+def read_grammar(text: str) -> Grammar:
+    """Lê produções no formato do bloco ```ll (ver gramatica_parser.md)"""
+    productions: Dict[str, List[Tuple[Item, ...]]] = {}
+    alternatives = None
+    for number, line in enumerate(text.splitlines(), start=1):
+        words = _GRAMMAR_TOKEN.findall(line.split("#", 1)[0])
+        if not words:
+            continue
+        if len(words) > 1 and words[1] == "->":
+            alternatives = productions.setdefault(words[0], [])
+            words = words[2:]
+        elif words[0] == "|" and alternatives is not None:
+            words = words[1:]
+        else:
+            raise ValueError(f"Linha {number} da gramática: esperado 'Nome ->' ou '|'")
+        current: List[Item] = []
+        for word in words + ["|"]:
+            if word == "|":
+                alternatives.append(tuple(current))
+                current = []
+            elif word == EPSILON:
+                continue
+            elif word.startswith("{"):
+                current.append(Item("action", word[1:-1]))
+            elif word.lstrip("$").startswith("'") or word.lstrip("$").isupper():
+                current.append(_terminal(word))
+            elif word[0].isupper():
+                current.append(Item("nonterminal", word))
+            else:
+                raise ValueError(f"Linha {number} da gramática: símbolo inválido {word!r}")
+    if not productions:
+        raise ValueError("Gramática vazia")
+    for alternatives in productions.values():
+        for alternative in alternatives:
+            for item in alternative:
+                if item.kind == "nonterminal" and item.value not in productions:
+                    raise ValueError(f"Não-terminal sem produções: {item.value}")
+                if item.kind == "action" and item.value not in ACTIONS:
+                    raise ValueError(f"Ação semântica desconhecida: {{{item.value}}}")
+    return Grammar(next(iter(productions)), productions)
+
+
+def load_grammar(path: str = GRAMMAR_PATH) -> Grammar:
+    """Lê a gramática do bloco ```ll de um arquivo Markdown"""
+    with open(path, encoding="utf-8") as f:
+        match = _GRAMMAR_BLOCK.search(f.read())
+    if match is None:
+        raise ValueError(f"Bloco ```ll não encontrado em {path}")
+    return read_grammar(match.group(1))
+
+
+# --- FIRST / FOLLOW ---
+
+def _symbols(alternative) -> List[Item]:
+    return [item for item in alternative if item.kind in ("terminal", "nonterminal")]
+
+
+def first_sets(grammar: Grammar) -> Tuple[Dict[str, Set[int]], Set[str]]:
+    """FIRST de cada não-terminal (ids de terminais) e o conjunto dos anuláveis"""
+    first = {name: set() for name in grammar.productions}
+    nullable: Set[str] = set()
+    changed = True
+    while changed:
+        changed = False
+        for name, alternatives in grammar.productions.items():
+            for alternative in alternatives:
+                symbols = _symbols(alternative)
+                before = len(first[name])
+                first[name] |= sequence_first(symbols, first, nullable)
+                if len(first[name]) != before:
+                    changed = True
+                if name not in nullable and _sequence_nullable(symbols, nullable):
+                    nullable.add(name)
+                    changed = True
+    return first, nullable
+
+
+def sequence_first(symbols: List[Item], first, nullable) -> Set[int]:
+    """FIRST de uma sequência de símbolos (sem ε)"""
+    result = set()
+    for symbol in symbols:
+        if symbol.kind == "terminal":
+            result.add(symbol.value)
+            break
+        result |= first[symbol.value]
+        if symbol.value not in nullable:
+            break
+    return result
+
+
+def _sequence_nullable(symbols: List[Item], nullable) -> bool:
+    return all(s.kind == "nonterminal" and s.value in nullable for s in symbols)
+
+
+def follow_sets(grammar: Grammar, first, nullable) -> Dict[str, Set[int]]:
+    """FOLLOW de cada não-terminal; FOLLOW(início) contém o EOF"""
+    follow = {name: set() for name in grammar.productions}
+    follow[grammar.start].add(K_EOF)
+    changed = True
+    while changed:
+        changed = False
+        for name, alternatives in grammar.productions.items():
+            for alternative in alternatives:
+                symbols = _symbols(alternative)
+                for i, symbol in enumerate(symbols):
+                    if symbol.kind != "nonterminal":
+                        continue
+                    rest = symbols[i + 1:]
+                    target = follow[symbol.value]
+                    before = len(target)
+                    target |= sequence_first(rest, first, nullable)
+                    if _sequence_nullable(rest, nullable):
+                        target |= follow[name]
+                    if len(target) != before:
+                        changed = True
+    return follow
+
+
+def _concat2(left: Set[tuple], right: Set[tuple]) -> Set[tuple]:
+    return {(a + b)[:2] for a in left for b in right}
+
+
+def first2_sets(grammar: Grammar) -> Dict[str, Set[tuple]]:
+    """FIRST₂: prefixos de até dois terminais de cada não-terminal"""
+    first2: Dict[str, Set[tuple]] = {name: set() for name in grammar.productions}
+    changed = True
+    while changed:
+        changed = False
+        for name, alternatives in grammar.productions.items():
+            for alternative in alternatives:
+                prefixes = _sequence_first2(_symbols(alternative), first2)
+                if not prefixes <= first2[name]:
+                    first2[name] |= prefixes
+                    changed = True
+    return first2
+
+
+def _sequence_first2(symbols: List[Item], first2) -> Set[tuple]:
+    prefixes = {()}
+    for symbol in symbols:
+        step = {(symbol.value,)} if symbol.kind == "terminal" else first2[symbol.value]
+        prefixes = _concat2(prefixes, step)
+        if all(len(p) == 2 for p in prefixes):
+            break
+    return prefixes
+
+
+# --- tabela ---
+
+# Codificação dos símbolos na pilha do driver: terminais são os próprios
+# ids internados (> 0, ou negativos quando o token é empilhado como valor);
+# não-terminais e ações ficam acima de todos os ids de terminais.
+NONTERMINAL_BASE = max(SYMBOL_NAMES) + 1
+
+
+@dataclass
+class LLTable:
+    grammar: Grammar
+    first: Dict[str, Set[int]]
+    follow: Dict[str, Set[int]]
+    nullable: Set[str]
+    # não-terminal -> {id do token: índice da alternativa, ou {id do 2º token: índice}}
+    cells: Dict[str, Dict[int, object]]
+    # células resolvidas pelo segundo token: (não-terminal, id do token)
+    ll2: List[Tuple[str, int]] = field(default_factory=list)
+    # células com alternativas em disputa, resolvidas pela primeira listada
+    conflicts: List[Tuple[str, int, Tuple[int, ...]]] = field(default_factory=list)
+    # forma executável: por não-terminal, {id do token: (lead, lado direito
+    # invertido)} (ou {id do 2º token: ...}), e os nomes das ações por código
+    rows: List[Dict[int, object]] = field(default_factory=list)
+    actions: List[str] = field(default_factory=list)
+    start: int = 0
+
+
+def build_table(grammar: Optional[Grammar] = None) -> LLTable:
+    """Calcula FIRST/FOLLOW e monta a tabela preditiva com entradas LL(2)"""
+    if grammar is None:
+        grammar = load_grammar()
+    first, nullable = first_sets(grammar)
+    follow = follow_sets(grammar, first, nullable)
+    first2 = None
+    table = LLTable(grammar, first, follow, nullable, {})
+
+    for name, alternatives in grammar.productions.items():
+        candidates: Dict[int, List[int]] = {}
+        by_follow: Set[Tuple[int, int]] = set()
+        for index, alternative in enumerate(alternatives):
+            symbols = _symbols(alternative)
+            for terminal in sequence_first(symbols, first, nullable):
+                candidates.setdefault(terminal, []).append(index)
+            if _sequence_nullable(symbols, nullable):
+                for terminal in follow[name]:
+                    candidates.setdefault(terminal, []).append(index)
+                    by_follow.add((terminal, index))
+        row = table.cells[name] = {}
+        for terminal, indices in candidates.items():
+            indices = list(dict.fromkeys(indices))
+            if len(indices) == 1:
+                row[terminal] = indices[0]
+                continue
+            # LL(2): só entre alternativas que começam pelo token (sem ε)
+            entry = None
+            if not any((terminal, i) in by_follow for i in indices):
+                if first2 is None:
+                    first2 = first2_sets(grammar)
+                entry = _ll2_entry(terminal, indices, alternatives, first2)
+            if entry is not None:
+                row[terminal] = entry
+                table.ll2.append((name, terminal))
+            else:
+                row[terminal] = indices[0]
+                table.conflicts.append((name, terminal, tuple(indices)))
+
+    _encode(table)
+    return table
+
+
+def _ll2_entry(terminal: int, indices: List[int], alternatives, first2) -> Optional[Dict[int, int]]:
+    entry: Dict[int, int] = {}
+    for index in indices:
+        for prefix in _sequence_first2(_symbols(alternatives[index]), first2):
+            if prefix[0] != terminal:
+                continue
+            if len(prefix) < 2 or entry.get(prefix[1], index) != index:
+                return None
+            entry[prefix[1]] = index
+    return entry
+
+
+def _encode(table: LLTable) -> None:
+    """Converte as células em linhas com os lados direitos já invertidos e expandidos"""
+    names = list(table.grammar.productions)
+    nonterminal_ids = {name: NONTERMINAL_BASE + i for i, name in enumerate(names)}
+    action_base = NONTERMINAL_BASE + len(names)
+    action_ids: Dict[str, int] = {}
+
+    def encode(item: Item) -> int:
+        if item.kind == "terminal":
+            return -item.value if item.push else item.value
+        if item.kind == "nonterminal":
+            return nonterminal_ids[item.value]
+        if item.value not in action_ids:
+            action_ids[item.value] = action_base + len(action_ids)
+        return action_ids[item.value]
+
+    def expand(alternative, terminal: int) -> Tuple[int, Tuple[int, ...]]:
+        # o token atual continua o mesmo enquanto o símbolo mais à esquerda
+        # for um não-terminal, então as expansões seguintes já são conhecidas
+        items = list(alternative)
+        done = []
+        while items:
+            item = items[0]
+            if item.kind == "nonterminal":
+                entry = table.cells[item.value].get(terminal)
+                if type(entry) is int:
+                    items[:1] = table.grammar.productions[item.value][entry]
+                    continue
+            if item.kind in ("terminal", "nonterminal"):
+                break
+            done.append(items.pop(0))
+        # o terminal que decidiu a célula, quando vem primeiro, é consumido
+        # já na expansão: lead 1 (consome) ou -1 (consome e empilha o token)
+        lead = 0
+        if not done and items and items[0].kind == "terminal" and items[0].value == terminal:
+            lead = -1 if items.pop(0).push else 1
+        return lead, tuple(encode(item) for item in reversed(done + items))
+
+    for name in names:
+        alternatives = table.grammar.productions[name]
+        row = {}
+        for terminal, entry in table.cells[name].items():
+            if type(entry) is dict:
+                row[terminal] = {second: expand(alternatives[i], terminal) for second, i in entry.items()}
+            else:
+                row[terminal] = expand(alternatives[entry], terminal)
+        table.rows.append(row)
+    table.actions = list(action_ids)
+    table.start = nonterminal_ids[table.grammar.start]
+
+
+# --- ações semânticas ---
+#
+# Cada ação recebe a pilha de valores (tokens empilhados por `$` e valores
+# já construídos) e `groups`, que guarda o offset do "(" das subexpressões
+# entre parênteses (id do nó -> offset): o BinaryOperation cujo operando
+# esquerdo é um grupo começa no "(", como no parser manual.
+
+def _lista(values, groups):
+    values.append([])
+
+
+def _nada(values, groups):
+    values.append(None)
+
+
+def _anexar(values, groups):
+    item = values.pop()
+    if item is not None:
+        values[-1].append(item)
+
+
+def _anexar_nome(values, groups):
+    values[-2].append(values.pop().value)
+
+
+def _programa(values, groups):
+    values.append(Program(values.pop(), []))
+
+
+def _declaracao(values, groups):
+    initial_value = values.pop()
+    type_name = values.pop()
+    identifier = values.pop()
+    start = values.pop()
+    values.append(Declaration(identifier.value, type_name, initial_value, offset=start.offset))
+
+
+def _tipo(values, groups):
+    values[-1] = values[-1].value
+
+
+def _tipo_lista(values, groups):
+    inner = values.pop()
+    values[-1] = "lista" if inner is None else f"lista[{inner}]"
+
+
+def _atribuicao(values, groups):
+    value = values.pop()
+    start = values.pop()
+    values.append(Assignment(start.value, value, offset=start.offset))
+
+
+def _chamada(values, groups):
+    arguments = values.pop()
+    start = values.pop()
+    values.append(FunctionCall(start.value, arguments, offset=start.offset))
+
+
+def _funcao(values, groups):
+    body = values.pop()
+    parameters = values.pop()
+    name = values.pop()
+    start = values.pop()
+    values.append(FunctionDecl(name.value, parameters, body, offset=start.offset))
+
+
+def _se(values, groups):
+    else_block = values.pop()
+    else_ifs = values.pop()
+    then_block = values.pop()
+    condition = values.pop()
+    start = values.pop()
+    values.append(IfStatement(condition, then_block, else_ifs, else_block, offset=start.offset))
+
+
+def _senao_se(values, groups):
+    block = values.pop()
+    condition = values.pop()
+    values[-1].append((condition, block))
+
+
+def _enquanto(values, groups):
+    body = values.pop()
+    condition = values.pop()
+    start = values.pop()
+    values.append(WhileStatement(condition, body, offset=start.offset))
+
+
+def _repetir(values, groups):
+    body = values.pop()
+    count = values.pop()
+    start = values.pop()
+    values.append(RepeatStatement(count, body, offset=start.offset))
+
+
+def _para_cada(values, groups):
+    body = values.pop()
+    iterable = values.pop()
+    variable = values.pop()
+    start = values.pop()
+    values.append(ForEachStatement(variable.value, iterable, body, offset=start.offset))
+
+
+def _mostrar(values, groups):
+    expressions = values.pop()
+    start = values.pop()
+    values.append(PrintStatement(expressions, offset=start.offset))
+
+
+def _perguntar(values, groups):
+    variable = values.pop()
+    prompt = values.pop()
+    start = values.pop()
+    values.append(InputStatement(variable.value, prompt, offset=start.offset))
+
+
+def _retornar(values, groups):
+    value = values.pop()
+    start = values.pop()
+    values.append(ReturnStatement(value, offset=start.offset))
+
+
+def _binaria(values, groups):
+    right = values.pop()
+    op = values.pop()
+    left = values[-1]
+    # o offset é o do início do operando esquerdo, inclusive um "(" que o envolva
+    start = groups.get(id(left), left.offset)
+    values[-1] = BinaryOperation(left, op.value, right, offset=start)
+
+
+def _grupo(values, groups):
+    # "(" Expression ")": o nó fica, o offset do "(" vai para `groups`
+    node = values.pop()
+    groups[id(node)] = values[-1].offset
+    values[-1] = node
+
+
+def _unaria(values, groups):
+    operand = values.pop()
+    op = values.pop()
+    values.append(UnaryOperation(op.value, operand, offset=op.offset))
+
+
+def _numero(values, groups):
+    token = values[-1]
+    values[-1] = Literal(number_value(token.value), "numero", offset=token.offset)
+
+
+def _texto(values, groups):
+    token = values[-1]
+    values[-1] = Literal(token.value, "texto", offset=token.offset)
+
+
+def _logico(values, groups):
+    token = values[-1]
+    values[-1] = Literal(token.value == "verdadeiro", "logico", offset=token.offset)
+
+
+def _lista_literal(values, groups):
+    elements = values.pop()
+    start = values.pop()
+    values.append(ListLiteral(elements, offset=start.offset))
+
+
+def _identificador(values, groups):
+    token = values[-1]
+    values[-1] = Identifier(token.value, offset=token.offset)
+
+
+def _indice(values, groups):
+    index = values.pop()
+    obj = values[-1]
+    values[-1] = IndexAccess(obj, index, offset=obj.offset)
+
+
+# nome na gramática ({acao}) -> função
+ACTIONS = {
+    "lista": _lista,
+    "nada": _nada,
+    "anexar": _anexar,
+    "anexar_nome": _anexar_nome,
+    "programa": _programa,
+    "declaracao": _declaracao,
+    "tipo": _tipo,
+    "tipo_lista": _tipo_lista,
+    "atribuicao": _atribuicao,
+    "chamada": _chamada,
+    "funcao": _funcao,
+    "se": _se,
+    "senao_se": _senao_se,
+    "enquanto": _enquanto,
+    "repetir": _repetir,
+    "para_cada": _para_cada,
+    "mostrar": _mostrar,
+    "perguntar": _perguntar,
+    "retornar": _retornar,
+    "binaria": _binaria,
+    "grupo": _grupo,
+    "unaria": _unaria,
+    "numero": _numero,
+    "texto": _texto,
+    "logico": _logico,
+    "lista_literal": _lista_literal,
+    "identificador": _identificador,
+    "indice": _indice,
+}
+
+
+# --- driver ---
+
+_TABLE: Optional[LLTable] = None
+
+
+def default_table() -> LLTable:
+    """Tabela da gramática de gramatica_parser.md, montada no primeiro uso"""
+    global _TABLE
+    if _TABLE is None:
+        _TABLE = build_table()
+    return _TABLE
+
+
+class LLParser:
+    """Driver da tabela LL: mesma interface e mesma AST de `BrasilScriptParser`"""
+
+    def __init__(self, tokens: List[Token], table: Optional[LLTable] = None):
+        if not tokens or tokens[-1].kind != K_EOF:
+            tokens = tokens + [Token("EOF", "")]
+        self.tokens = tokens
+        self.table = table if table is not None else default_table()
+        # True quando houve erro de sintaxe e o parse foi refeito pelo parser manual
+        self.fell_back = False
+
+    def parse(self) -> Program:
+        table = self.table
+        # listas indexadas diretamente pelo código do símbolo
+        action_base = NONTERMINAL_BASE + len(table.rows)
+        rows = [None] * NONTERMINAL_BASE + table.rows
+        actions = [None] * action_base + [ACTIONS[name] for name in table.actions]
+        tokens = self.tokens
+        values = []
+        groups = {}
+        stack = [table.start]
+        pop = stack.pop
+        extend = stack.extend
+        pos = 0
+        token = tokens[0]
+        terminal = token.sym or token.kind
+        while stack:
+            symbol = pop()
+            if symbol >= NONTERMINAL_BASE:
+                if symbol >= action_base:
+                    actions[symbol](values, groups)
+                    continue
+                entry = rows[symbol].get(terminal)
+                if type(entry) is dict:
+                    following = tokens[pos + 1]
+                    entry = entry.get(following.sym or following.kind)
+                if entry is None:
+                    return self._fall_back()
+                lead, rhs = entry
+                extend(rhs)
+                if lead:
+                    if lead < 0:
+                        values.append(token)
+                    pos += 1
+                    token = tokens[pos]
+                    terminal = token.sym or token.kind
+            elif symbol > 0:
+                if terminal != symbol:
+                    return self._fall_back()
+                pos += 1
+                token = tokens[pos]
+                terminal = token.sym or token.kind
+            else:
+                if terminal != -symbol:
+                    return self._fall_back()
+                values.append(token)
+                pos += 1
+                token = tokens[pos]
+                terminal = token.sym or token.kind
+        if terminal != K_EOF:
+            return self._fall_back()
+        return values.pop()
+
+    def _fall_back(self) -> Program:
+        self.fell_back = True
+        return BrasilScriptParser(self.tokens).parse()
+
+
+def parse_ll(code: str, engine: str = "afd") -> Program:
+    """Como `parse_brasilscript`, usando o driver da tabela LL"""
+    return LLParser(tokenize_source(code, engine)).parse()
+
+
+def _format_terminals(ids) -> str:
+    return "{" + ", ".join(sorted(SYMBOL_NAMES[i] for i in ids)) + "}"
+
+
+def main() -> int:
+    table = build_table()
+    print(f"{'não-terminal':<18} {'anulável':<9} FIRST / FOLLOW")
+    for name in table.grammar.productions:
+        print(f"{name:<18} {'sim' if name in table.nullable else '':<9} "
+              f"{_format_terminals(table.first[name])} / {_format_terminals(table.follow[name])}")
+    cells = sum(len(row) for row in table.cells.values())
+    print(f"\n{len(table.cells)} não-terminais, {cells} células, {len(table.ll2)} entradas LL(2)")
+    for name, terminal in table.ll2:
+        print(f"  LL(2): {name} com {SYMBOL_NAMES[terminal]}")
+    for name, terminal, indices in table.conflicts:
+        alternatives = table.grammar.productions[name]
+        print(f"  conflito: {name} com {SYMBOL_NAMES[terminal]}: "
+              + " | ".join(" ".join(map(str, alternatives[i])) or EPSILON for i in indices)
+              + " (fica a primeira)")
+    return 0
+
+
+__all__ = [
+    "Item", "Grammar", "LLTable", "LLParser", "read_grammar", "load_grammar",
+    "first_sets", "follow_sets", "first2_sets", "build_table", "default_table", "parse_ll",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
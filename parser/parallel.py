@@ -0,0 +1,231 @@
+"""
+Parse paralelo dos blocos `funcao ... fim_funcao` de nível superior
+
+Arquivos grandes são quase só listas de funções. `parse_parallel`:
+
+1. com uma varredura linear do fonte (`split_functions`: uma expressão
+   regular que pula textos e comentários e só olha as palavras-chave de
+   abertura e de fim de bloco) acha os intervalos [início, fim) de cada
+   `funcao` de nível superior;
+2. agrupa os intervalos em lotes de tamanho parecido e manda cada lote (o
+   trecho do fonte) para um pool de processos; o worker tokeniza e faz o
+   parse de cada função a partir do início dela e devolve os statements
+   serializados com `dump_ast`, os erros e o offset onde cada um parou;
+3. refaz no processo principal o laço de `parse`, tokenizando sob demanda
+   só o código entre as funções: ao chegar a um token que é o início de
+   uma função feita por um worker, o resultado dele é usado e a
+   tokenização recomeça no fim dela.
+
+O resultado é idêntico ao de `parse_brasilscript`, inclusive erros,
+offsets e erros léxicos (ParseError). O lexer não tem estado entre tokens
+e um statement de nível superior só depende dos seus tokens e dos dois
+seguintes (a lookahead do parser, ver `parser.incremental`); o parser sai
+do modo de recuperação no início de cada statement. Por isso a varredura é
+só uma estimativa, confirmada assim:
+
+- o worker descarta a função se os dois tokens depois dela (e os 2
+  caracteres que o lexer examina depois de um lexema) não couberem no
+  trecho que recebeu, ou se houver um erro léxico: o processo principal
+  refaz esse trecho;
+- um resultado só é usado se a tokenização e o parse sequenciais
+  realmente começarem um statement no offset onde ele começa; se um erro
+  antes fizer o statement anterior avançar por cima desse ponto, ou o
+  início cair dentro de um token, o resultado é descartado.
+
+O limite `MAX_ERRORS` é aplicado no fim, sobre os erros de todos os
+statements na ordem do fonte.
+
+A tokenização do código das funções também vai para os workers: no parser
+ela custa mais que o parse. O processo principal ainda reconstrói os nós
+recebidos (`load_ast`), então o ganho é limitado por esse custo.
+
+Uso:
+    program = parse_parallel(code)                  # um processo por CPU
+    program = parse_parallel(code, executor=pool)   # pool já existente
+"""
+
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from parser.ast import Program
+from parser.binary_ast import dump_ast, load_ast
+from parser.brasilscript_parser import (
+    K_EOF, MAX_ERRORS, V_FUNCAO, BrasilScriptParser, ParseError, Token,
+    TokenBuffer, iter_source_tokens, tokenize_source,
+)
+from parser.diagnostics import cap
+
+# abaixo disso o custo de enviar o código aos processos não compensa
+PARALLEL_MIN_BYTES = 200_000
+# lotes por worker: mais lotes equilibram melhor funções de tamanhos diferentes
+BATCHES_PER_WORKER = 4
+
+# comentários e textos são pulados; o grupo 1 é uma palavra-chave de bloco
+_SCAN = re.compile(
+    r"#[^\r\n]*"
+    r"|\"(?:[^\"\\]|\\.)*\""
+    r"|'(?:[^'\\]|\\.)*'"
+    r"|\b(funcao|se|enquanto|repetir|para_cada"
+    r"|fim_funcao|fim_se|fim_enquanto|fim_repetir|fim_para_cada)\b"
+)
+_SCAN_OPENERS = frozenset({"funcao", "se", "enquanto", "repetir", "para_cada"})
+
+# lookahead do parser (em tokens) e do lexer (em caracteres) depois de um statement
+_LOOKAHEAD_TOKENS = 2
+_LOOKAHEAD_CHARS = 2
+# caracteres a mais no fim de cada lote para caber a lookahead
+_BATCH_MARGIN = 256
+
+
+def split_functions(code: str) -> List[Tuple[int, int]]:
+    """Intervalos [início, fim) em caracteres das funções de nível superior
+
+    Uma só passada, contando aberturas e fins de bloco: é uma estimativa,
+    que a tokenização e o parse confirmam. Uma função sem o fim
+    correspondente vai até o fim do código.
+    """
+    spans = []
+    depth = 0
+    start = -1
+    for match in _SCAN.finditer(code):
+        word = match.group(1)
+        if word is None:
+            continue
+        if word in _SCAN_OPENERS:
+            if not depth and word == "funcao":
+                start = match.start()
+            depth += 1
+        elif depth:
+            depth -= 1
+            if not depth and start >= 0:
+                spans.append((start, match.end()))
+                start = -1
+    if start >= 0:
+        spans.append((start, len(code)))
+    return spans
+
+
+def _batches(spans: List[Tuple[int, int]], n_batches: int) -> List[List[Tuple[int, int]]]:
+    target = max(1, sum(end - start for start, end in spans) // n_batches)
+    batches = []
+    batch = []
+    size = 0
+    for span in spans:
+        batch.append(span)
+        size += span[1] - span[0]
+        if size >= target:
+            batches.append(batch)
+            batch = []
+            size = 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _shifted(tokens: Iterator[Token], delta: int) -> Iterator[Token]:
+    for token in tokens:
+        token.offset += delta
+        yield token
+
+
+def _parse_batch(text: str, base: int, complete: bool, engine: str,
+                 starts: List[int]) -> Tuple[List[tuple], bytes]:
+    """Worker: parse de cada função do lote; `text` é o código a partir do offset `base`
+
+    `complete` indica que `text` vai até o fim do código. Devolve (início,
+    fim, número de erros) das funções confirmadas e um `Program`
+    serializado com os statements e os erros delas, na mesma ordem.
+    """
+    limit = base + len(text)
+    spans = []
+    statements = []
+    errors = []
+    for start in starts:
+        tokens = TokenBuffer(_shifted(iter_source_tokens(text, engine, start - base), base))
+        parser = BrasilScriptParser(tokens, max_errors=None)
+        try:
+            if tokens[0].sym != V_FUNCAO:
+                continue
+            statement = parser.parse_statement()
+            end = tokens[parser.current]
+            last = tokens[parser.current + _LOOKAHEAD_TOKENS - 1]
+        except ParseError:
+            continue
+        if not complete and (last.kind == K_EOF or last.offset + len(last.value) + _LOOKAHEAD_CHARS > limit):
+            continue
+        spans.append((start, end.offset, len(parser.errors)))
+        statements.append(statement)
+        errors += parser.errors
+    return spans, dump_ast(Program(statements, errors))
+
+
+def _parse_functions(code: str, engine: str, spans, executor: Executor, workers: int) -> Dict[int, tuple]:
+    futures = []
+    for batch in _batches(spans, workers * BATCHES_PER_WORKER):
+        # um caractere antes do início: o `\b` da engine regex olha para trás
+        base = max(0, batch[0][0] - 1)
+        stop = min(batch[-1][1] + _BATCH_MARGIN, len(code))
+        futures.append(executor.submit(
+            _parse_batch, code[base:stop], base, stop == len(code), engine, [start for start, _ in batch]))
+    results = {}
+    for future in futures:
+        parsed, data = future.result()
+        program = load_ast(data)
+        errors = program._errors
+        k = 0
+        for (start, end, n_errors), statement in zip(parsed, program.statements):
+            results[start] = (end, statement, errors[k:k + n_errors])
+            k += n_errors
+    return results
+
+
+def parse_parallel(code: str, engine: str = "afd", workers: Optional[int] = None,
+                   executor: Optional[Executor] = None, min_bytes: int = PARALLEL_MIN_BYTES) -> Program:
+    """Como `parse_brasilscript`, com as funções de nível superior num pool de processos
+
+    Sem `executor`, cria um `ProcessPoolExecutor` de `workers` processos (um
+    por CPU por padrão) só para esta chamada. Fontes menores que
+    `min_bytes`, ou sem funções, são lidos no processo principal.
+    """
+    spans = split_functions(code) if len(code) >= min_bytes else []
+    if not spans:
+        return BrasilScriptParser(tokenize_source(code, engine)).parse()
+    workers = workers or os.cpu_count() or 1
+    if executor is None:
+        with ProcessPoolExecutor(workers) as pool:
+            results = _parse_functions(code, engine, spans, pool, workers)
+    else:
+        results = _parse_functions(code, engine, spans, executor, workers)
+
+    statements = []
+    errors = []
+    pos = 0
+    while True:
+        # laço de `parse` sobre o código entre as funções feitas pelos workers
+        tokens = TokenBuffer(iter_source_tokens(code, engine, pos))
+        parser = BrasilScriptParser(tokens, max_errors=None)
+        found = None
+        while True:
+            token = tokens[parser.current]
+            if token.kind == K_EOF:
+                break
+            found = results.get(token.offset)
+            if found is not None:
+                break
+            stmt = parser.parse_statement()
+            tokens.release(parser.current)
+            if stmt is not None:
+                statements.append(stmt)
+        errors += parser.errors
+        if found is None:
+            break
+        pos, statement, function_errors = found
+        statements.append(statement)
+        errors += function_errors
+    # mesmo corte que o parser faz durante um parse completo
+    return Program(statements, cap(errors, MAX_ERRORS))
+
+
+__all__ = ["PARALLEL_MIN_BYTES", "split_functions", "parse_parallel"]
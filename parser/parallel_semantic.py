@@ -0,0 +1,160 @@
+"""
+Análise semântica com os corpos das funções num pool de processos
+
+Na análise semântica os corpos das funções de nível superior são checados
+depois do nível superior, contra a tabela global completa, e um corpo não
+depende dos outros: as chamadas têm tipo 'any', então a ordem do grafo de
+chamadas (parser.callgraph) não importa aqui, só para passes que usam o
+resultado das funções chamadas. `analyze_parallel`:
+
+1. faz no processo principal a passada sobre o nível superior, que só
+   declara o nome de cada `funcao` de nível superior e anota onde os erros
+   do seu corpo entram;
+2. divide as funções em lotes consecutivos e manda cada lote para o pool
+   com a lista das declarações globais (nome e nome do tipo, já que os
+   tipos são internados por processo). O worker refaz a tabela global a
+   partir dessa lista e checa os corpos com `SemanticAnalyzer`, como a
+   passada sequencial faria;
+3. junta os erros de cada corpo na posição anotada.
+
+O resultado é idêntico ao de `SemanticAnalyzer().analyze(program)`,
+inclusive a ordem dos erros. Só os erros voltam dos workers: os slots
+(parser.scopes) dos corpos checados nos workers não são anotados na AST
+do processo principal; quem precisa deles usa `SemanticAnalyzer`.
+
+Com o pool criado aqui (fork), os workers herdam a AST e só recebem os
+índices das funções; com um `executor` de fora os corpos vão serializados
+com `dump_ast`. A checagem de um corpo é barata, então o ganho só aparece
+com muitas funções e mais de um núcleo: com um worker só, a análise é
+feita no processo principal.
+
+Uso:
+    errors = analyze_parallel(program)                  # um processo por CPU
+    errors = analyze_parallel(program, executor=pool)   # pool já existente
+"""
+
+import gc
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from parser.ast import FunctionDecl, Program
+from parser.binary_ast import dump_ast, load_ast
+from parser.diagnostics import Diagnostic
+from parser.parallel import BATCHES_PER_WORKER
+from parser.semantic import SemanticAnalyzer
+from parser.typetable import FUNCAO, type_from_name
+
+# abaixo disso o custo de enviar as funções aos processos não compensa
+PARALLEL_MIN_FUNCTIONS = 2000
+
+
+class _TopLevelAnalyzer(SemanticAnalyzer):
+    """Passada do nível superior que deixa os corpos das funções de nível superior para os workers"""
+
+    def __init__(self):
+        super().__init__()
+        # (função, posição dos seus erros em self.errors)
+        self.deferred: List[Tuple[FunctionDecl, int]] = []
+
+    def _check_deferred(self, deferred: List[Tuple[FunctionDecl, int]]) -> None:
+        self.deferred = deferred
+
+
+def _check(functions: List[FunctionDecl], globals_: List[Tuple[str, str]]) -> List[List[Diagnostic]]:
+    """Erros do corpo de cada função, com as declarações globais de `globals_`"""
+    analyzer = SemanticAnalyzer()
+    symbols = analyzer.symbols
+    errors = analyzer.errors
+    for name, type_name in globals_:
+        type_ = type_from_name(type_name)
+        symbols.declare(name, type_, slot=type_ is not FUNCAO)
+    results = []
+    for stmt in functions:
+        start = len(errors)
+        analyzer._check_function_body(stmt)
+        results.append(errors[start:])
+    return results
+
+
+def _check_batch(data: bytes, globals_: List[Tuple[str, str]]) -> List[List[Diagnostic]]:
+    """Worker de um pool qualquer: as funções do lote chegam serializadas"""
+    return _check(load_ast(data).statements, globals_)
+
+
+# funções e declarações globais herdadas pelos workers de um pool criado com fork
+_shared: Optional[tuple] = None
+
+
+def _share(functions: List[FunctionDecl], globals_: List[Tuple[str, str]]) -> None:
+    global _shared
+    _shared = (functions, globals_)
+
+
+def _check_shared(indices: List[int]) -> List[List[Diagnostic]]:
+    """Worker de um pool criado por `analyze_parallel`: só os índices das funções chegam"""
+    functions, globals_ = _shared
+    return _check([functions[i] for i in indices], globals_)
+
+
+def _batches(deferred, n_batches: int) -> List[List[int]]:
+    """Índices em `deferred`, em lotes consecutivos de tamanho parecido"""
+    size = max(1, -(-len(deferred) // n_batches))
+    return [list(range(i, min(i + size, len(deferred)))) for i in range(0, len(deferred), size)]
+
+
+def _check_functions(deferred, globals_, executor: Executor, workers: int, shared: bool) -> List[List[Diagnostic]]:
+    futures = []
+    for batch in _batches(deferred, workers * BATCHES_PER_WORKER):
+        if shared:
+            future = executor.submit(_check_shared, batch)
+        else:
+            data = dump_ast(Program([deferred[i][0] for i in batch], []))
+            future = executor.submit(_check_batch, data, globals_)
+        futures.append(future)
+    results: List[List[Diagnostic]] = []
+    for future in futures:
+        results += future.result()
+    return results
+
+
+def analyze_parallel(program: Program, workers: Optional[int] = None, executor: Optional[Executor] = None,
+                     min_functions: int = PARALLEL_MIN_FUNCTIONS) -> List[Diagnostic]:
+    """Como `SemanticAnalyzer().analyze(program)`, com os corpos das funções num pool de processos
+
+    Sem `executor`, cria um `ProcessPoolExecutor` de `workers` processos (um
+    por CPU por padrão) só para esta chamada. Programas com menos de
+    `min_functions` funções de nível superior, ou sem pool e com um worker
+    só, são analisados no processo principal.
+    """
+    workers = workers or os.cpu_count() or 1
+    if (executor is None and workers == 1) or \
+            sum(isinstance(stmt, FunctionDecl) for stmt in program.statements) < min_functions:
+        return SemanticAnalyzer().analyze(program)
+    analyzer = _TopLevelAnalyzer()
+    top_errors = analyzer.analyze(program)
+    deferred = analyzer.deferred
+    globals_ = [(symbol.name, str(symbol.type)) for symbol in analyzer.symbols.global_symbols()]
+    if executor is not None:
+        results = _check_functions(deferred, globals_, executor, workers, shared=False)
+    elif "fork" in multiprocessing.get_all_start_methods():
+        # os workers herdam a AST e a tabela global: nada é serializado na ida
+        functions = [stmt for stmt, _ in deferred]
+        # sem o freeze o coletor de lixo dos workers percorre (e copia) a AST inteira
+        gc.freeze()
+        try:
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"),
+                                     initializer=_share, initargs=(functions, globals_)) as pool:
+                results = _check_functions(deferred, globals_, pool, workers, shared=True)
+        finally:
+            gc.unfreeze()
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = _check_functions(deferred, globals_, pool, workers, shared=False)
+
+    # erros de cada corpo na posição em que a passada sequencial os teria gerado
+    return analyzer.splice_errors(top_errors, [position for _, position in deferred], results)
+
+
+__all__ = ["PARALLEL_MIN_FUNCTIONS", "analyze_parallel"]
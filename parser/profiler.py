@@ -0,0 +1,220 @@
+"""
+Profiler por regra e ganchos de rastreamento do parser
+
+`ProfiledParser` é uma subclasse de `BrasilScriptParser` em que cada regra
+`parse_*` avisa seus ganchos ao entrar e ao sair. `BrasilScriptParser` não
+muda: sem `ProfiledParser` não há custo nenhum.
+
+Os statements compostos não têm uma chamada por regra (`_parse_nested` usa
+uma pilha explícita), então o quadro de `parse_if_statement`,
+`parse_while_statement` etc. abre em `_open_*` e fecha quando `_close_*`
+devolve o nó: o corpo do bloco aparece como filho dele, como apareceria
+num parser recursivo.
+
+Um gancho é qualquer objeto com `enter(rule, parser)` e `exit(rule, parser)`.
+`ParseProfile` registra, por regra, chamadas, tempo acumulado e próprio,
+tokens consumidos, erros produzidos e a chamada mais lenta (com o offset
+onde ela começou); `folded()` exporta as pilhas no formato "folded" do
+flamegraph.pl/speedscope. `RuleTracer` escreve cada regra visitada.
+
+Uso:
+    program, profile = profile_parse(code)
+    print(profile.report())
+    profile.write_folded("parse.folded")   # flamegraph.pl parse.folded > parse.svg
+    python -m parser.profiler arquivo.bs [--folded saida.folded]
+"""
+
+import functools
+import sys
+from dataclasses import dataclass
+from time import perf_counter_ns
+from typing import Dict, List, Sequence, TextIO, Tuple
+
+import parser.ast as ast_nodes
+from parser.ast import Program
+from parser.brasilscript_parser import MAX_ERRORS, BrasilScriptParser, tokenize_source
+
+
+@dataclass(slots=True)
+class RuleStats:
+    """Contadores de uma regra; tempos em nanossegundos"""
+    calls: int = 0
+    total_ns: int = 0       # acumulado, sem contar duas vezes chamadas aninhadas da mesma regra
+    self_ns: int = 0        # sem o tempo das regras filhas
+    tokens: int = 0         # consumidos, também sem contar aninhamento duas vezes
+    errors: int = 0         # produzidos pela própria regra, não pelas filhas
+    slowest_ns: int = 0
+    slowest_offset: int = -1
+
+
+class ParseProfile:
+    """Gancho que acumula `RuleStats` por regra e o tempo próprio por pilha de regras"""
+
+    def __init__(self, clock=perf_counter_ns):
+        self.clock = clock
+        self.rules: Dict[str, RuleStats] = {}
+        # pilha de regras (da raiz até a regra) -> tempo próprio
+        self.stacks: Dict[Tuple[str, ...], int] = {}
+        # [regra, início, token inicial, offset inicial, erros no início, tempo das filhas, erros das filhas]
+        self._frames: List[list] = []
+        self._path: List[str] = []
+        self._active: Dict[str, int] = {}
+
+    def enter(self, rule: str, parser: BrasilScriptParser) -> None:
+        current = parser.current
+        self._path.append(rule)
+        self._active[rule] = self._active.get(rule, 0) + 1
+        self._frames.append([rule, self.clock(), current, parser.tokens[current].offset,
+                             len(parser.errors), 0, 0])
+
+    def exit(self, rule: str, parser: BrasilScriptParser) -> None:
+        now = self.clock()
+        _, start, current, offset, n_errors, child_ns, child_errors = self._frames.pop()
+        elapsed = now - start
+        errors = len(parser.errors) - n_errors
+        stats = self.rules.get(rule)
+        if stats is None:
+            stats = self.rules[rule] = RuleStats()
+        stats.calls += 1
+        stats.self_ns += elapsed - child_ns
+        stats.errors += errors - child_errors
+        depth = self._active[rule] - 1
+        self._active[rule] = depth
+        if not depth:
+            stats.total_ns += elapsed
+            stats.tokens += parser.current - current
+        if elapsed > stats.slowest_ns or stats.slowest_offset < 0:
+            stats.slowest_ns = elapsed
+            stats.slowest_offset = offset
+        path = tuple(self._path)
+        self.stacks[path] = self.stacks.get(path, 0) + elapsed - child_ns
+        self._path.pop()
+        if self._frames:
+            parent = self._frames[-1]
+            parent[5] += elapsed
+            parent[6] += errors
+
+    def folded(self) -> str:
+        """Pilhas no formato folded ("parse;parse_statement;... tempo próprio em ns")"""
+        return "".join(f"{';'.join(path)} {ns}\n" for path, ns in self.stacks.items())
+
+    def write_folded(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+
+    def report(self) -> str:
+        """Tabela das regras ordenada pelo tempo próprio"""
+        lines = [f"{'regra':<26} {'chamadas':>9} {'total ms':>9} {'próprio ms':>11} "
+                 f"{'tokens':>8} {'erros':>6}  pior chamada"]
+        ranked = sorted(self.rules.items(), key=lambda item: item[1].self_ns, reverse=True)
+        for rule, stats in ranked:
+            lines.append(
+                f"{rule:<26} {stats.calls:>9} {stats.total_ns / 1e6:>9.3f} {stats.self_ns / 1e6:>11.3f} "
+                f"{stats.tokens:>8} {stats.errors:>6}  {stats.slowest_ns / 1e6:.3f} ms @ offset {stats.slowest_offset}"
+            )
+        return "\n".join(lines)
+
+
+class RuleTracer:
+    """Gancho que escreve, indentada, cada regra visitada e o token onde ela começa"""
+
+    def __init__(self, stream: TextIO = sys.stderr):
+        self.stream = stream
+        self.depth = 0
+
+    def enter(self, rule: str, parser: BrasilScriptParser) -> None:
+        token = parser.tokens[parser.current]
+        self.stream.write(f"{'  ' * self.depth}{rule} {token.value!r} @ {token.offset}\n")
+        self.depth += 1
+
+    def exit(self, rule: str, parser: BrasilScriptParser) -> None:
+        self.depth -= 1
+
+
+class ProfiledParser(BrasilScriptParser):
+    """`BrasilScriptParser` que chama `hook.enter`/`hook.exit` em cada regra `parse_*`"""
+
+    def __init__(self, tokens, hooks: Sequence = (), nodes=ast_nodes, max_errors=MAX_ERRORS):
+        self.hooks = tuple(hooks)
+        # antes do __init__ da base: os despachos guardam métodos já instrumentados
+        super().__init__(tokens, nodes=nodes, max_errors=max_errors)
+
+
+def _instrument_rule(rule: str, method):
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        for hook in self.hooks:
+            hook.enter(rule, self)
+        try:
+            return method(self, *args)
+        finally:
+            for hook in reversed(self.hooks):
+                hook.exit(rule, self)
+    return wrapper
+
+
+def _instrument_open(rule: str, method):
+    @functools.wraps(method)
+    def wrapper(self):
+        for hook in self.hooks:
+            hook.enter(rule, self)
+        return method(self)
+    return wrapper
+
+
+def _instrument_close(rule: str, method):
+    @functools.wraps(method)
+    def wrapper(self, block):
+        node = method(self, block)
+        # None: o bloco abriu outro corpo (senao_se, senao) e continua aberto
+        if node is not None:
+            for hook in reversed(self.hooks):
+                hook.exit(rule, self)
+        return node
+    return wrapper
+
+
+def _instrument() -> None:
+    for name in dir(BrasilScriptParser):
+        if name != "parse" and not name.startswith("parse_"):
+            continue
+        suffix = name[len("parse_"):]
+        opener = getattr(BrasilScriptParser, f"_open_{suffix}", None)
+        if opener is None:
+            setattr(ProfiledParser, name, _instrument_rule(name, getattr(BrasilScriptParser, name)))
+        else:
+            # parse_* do bloco só chama _parse_nested; o quadro vai de _open_* a _close_*
+            setattr(ProfiledParser, f"_open_{suffix}", _instrument_open(name, opener))
+            close = getattr(BrasilScriptParser, f"_close_{suffix}")
+            setattr(ProfiledParser, f"_close_{suffix}", _instrument_close(name, close))
+
+
+_instrument()
+
+
+def profile_parse(code: str, engine: str = "afd", profile: ParseProfile = None) -> Tuple[Program, ParseProfile]:
+    """Faz o parse de `code` com um `ParseProfile` (a tokenização não entra na medição)"""
+    profile = profile if profile is not None else ParseProfile()
+    program = ProfiledParser(tokenize_source(code, engine), [profile]).parse()
+    return program, profile
+
+
+def main(argv: List[str]) -> int:
+    if not argv:
+        print("Uso: python -m parser.profiler arquivo.bs [--folded saida.folded]")
+        return 2
+    with open(argv[0], encoding="utf-8") as f:
+        _, profile = profile_parse(f.read())
+    print(profile.report())
+    if "--folded" in argv[1:]:
+        path = argv[argv.index("--folded") + 1]
+        profile.write_folded(path)
+        print(f"\npilhas em {path}")
+    return 0
+
+
+__all__ = ["RuleStats", "ParseProfile", "RuleTracer", "ProfiledParser", "profile_parse"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,161 @@
+"""
+Tabela de símbolos com escopos aninhados
+
+Cada bloco e cada função abre um escopo. Em vez de uma cadeia de
+dicionários (em que a busca percorre os escopos de dentro para fora e custa
+O(profundidade)), a tabela guarda para cada nome a pilha das suas
+declarações visíveis, a mais interna no topo, e cada escopo guarda a lista
+dos nomes que declarou:
+
+- `lookup` olha o topo da pilha do nome: O(1) em qualquer profundidade;
+- `push_scope` empilha uma lista vazia: O(1);
+- `pop_scope` desempilha as declarações do escopo que fecha: O(1) por
+  declaração, que já foi paga ao declarar.
+
+Assim a análise de um programa com milhares de funções continua linear.
+
+Cada função abre também um frame (`push_frame`/`pop_frame`; o nível
+superior é o frame 0) e cada variável declarada recebe um slot no frame
+atual: `Symbol.slot` é (profundidade do frame, índice), para que um back
+end guarde as variáveis de um frame num array em vez de num dicionário
+por nome. Os slots de um bloco voltam a ficar livres quando ele fecha, e
+`frame_size` é o maior número de slots usados ao mesmo tempo no frame.
+
+Uso:
+    symbols = SymbolTable()
+    symbols.declare("x", "numero")
+    symbols.push_scope()
+    symbols.declare("x", "texto")     # sombreia o x de fora
+    symbols.lookup("x").type          # 'texto'
+    symbols.pop_scope()
+    symbols.push_frame()
+    symbols.declare("n", "any").slot  # (1, 0)
+    symbols.pop_frame()               # 1: tamanho do frame
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass(slots=True)
+class Symbol:
+    """Declaração visível de um nome"""
+    name: str
+    type: Any       # na análise semântica, um `Type` de parser.typetable
+    depth: int      # profundidade do escopo onde foi declarado (0 = global)
+    # (profundidade do frame, índice no frame); None para nomes sem slot (funções)
+    slot: Optional[Tuple[int, int]] = None
+
+
+class SymbolTable:
+    """Escopos aninhados com busca em tempo constante"""
+
+    def __init__(self):
+        # nome -> declarações visíveis, a mais interna no fim
+        self._bindings: Dict[str, List[Symbol]] = {}
+        # por escopo aberto: nomes declarados nele (o global é o primeiro)
+        self._scopes: List[List[str]] = [[]]
+        # por escopo aberto: slots em uso no frame quando ele abriu
+        self._scope_slots: List[int] = [0]
+        # frame atual: profundidade, slots em uso e maior número de slots já usados
+        self._frame = 0
+        self._slots = 0
+        self._frame_size = 0
+        # (slots em uso, tamanho) dos frames de fora
+        self._frames: List[Tuple[int, int]] = []
+
+    @property
+    def depth(self) -> int:
+        """Profundidade do escopo atual (0 = global)"""
+        return len(self._scopes) - 1
+
+    @property
+    def frame_depth(self) -> int:
+        """Profundidade do frame atual (0 = nível superior)"""
+        return self._frame
+
+    @property
+    def slots(self) -> int:
+        """Slots em uso no frame atual"""
+        return self._slots
+
+    @property
+    def frame_size(self) -> int:
+        """Slots que o frame atual precisa até aqui"""
+        return self._frame_size
+
+    def push_scope(self) -> None:
+        self._scopes.append([])
+        self._scope_slots.append(self._slots)
+
+    def pop_scope(self) -> None:
+        if len(self._scopes) == 1:
+            raise IndexError("o escopo global não pode ser fechado")
+        bindings = self._bindings
+        for name in self._scopes.pop():
+            stack = bindings[name]
+            stack.pop()
+            if not stack:
+                del bindings[name]
+        # os slots do escopo que fechou podem ser reusados
+        self._slots = self._scope_slots.pop()
+
+    def push_frame(self) -> None:
+        """Abre o escopo e o frame de um corpo de função"""
+        self._frames.append((self._slots, self._frame_size))
+        self._frame += 1
+        self._slots = self._frame_size = 0
+        self.push_scope()
+
+    def pop_frame(self) -> int:
+        """Fecha o frame aberto por `push_frame`; devolve o tamanho dele"""
+        if not self._frames:
+            raise IndexError("o frame do nível superior não pode ser fechado")
+        size = self._frame_size
+        self.pop_scope()
+        self._slots, self._frame_size = self._frames.pop()
+        self._frame -= 1
+        return size
+
+    def declare(self, name: str, type_name: Any, slot: bool = True) -> Optional[Symbol]:
+        """Declara `name` no escopo atual; devolve None se ele já foi declarado neste escopo
+
+        Com `slot` falso (ex.: nomes de funções) o símbolo não ocupa slot no frame.
+        """
+        stack = self._bindings.get(name)
+        depth = len(self._scopes) - 1
+        if stack is None:
+            stack = self._bindings[name] = []
+        elif stack[-1].depth == depth:
+            return None
+        if slot:
+            index = self._slots
+            self._slots = index + 1
+            if index == self._frame_size:
+                self._frame_size = index + 1
+            symbol = Symbol(name, type_name, depth, (self._frame, index))
+        else:
+            symbol = Symbol(name, type_name, depth)
+        stack.append(symbol)
+        self._scopes[-1].append(name)
+        return symbol
+
+    def lookup(self, name: str) -> Optional[Symbol]:
+        """Declaração mais interna visível de `name`, ou None"""
+        stack = self._bindings.get(name)
+        return stack[-1] if stack is not None else None
+
+    def global_symbols(self) -> List[Symbol]:
+        """Declarações do escopo global, na ordem em que foram feitas"""
+        bindings = self._bindings
+        return [bindings[name][0] for name in self._scopes[0]]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._bindings
+
+    def __len__(self) -> int:
+        """Número de declarações visíveis (contando as sombreadas)"""
+        return sum(len(names) for names in self._scopes)
+
+
+__all__ = ["Symbol", "SymbolTable"]
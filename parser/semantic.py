@@ -7,12 +7,32 @@ Uso:
     errors = analyzer.analyze(ast)
     if errors:
         for e in errors:
-            print(e)
+            print(e.render(code))     # ou str(e): só a mensagem
     else:
         print("Análise semântica: OK")
+
+Os erros são `Diagnostic`s de parser.diagnostics: código, argumentos e
+offset do nó, com a mensagem formatada só quando lida. Com `max_errors`,
+a análise para de registrar erros depois desse número.
+
+A análise também resolve cada variável para um slot de frame (ver
+parser.scopes): `Identifier`, `Assignment`, `Declaration`,
+`ForEachStatement` e `InputStatement` recebem `slot` = (profundidade do
+frame, índice), cada `FunctionDecl` recebe `frame_size` e
+`parameter_slots`, e `Program.frame_size` é o tamanho do frame do nível
+superior. Nomes não declarados (e funções) ficam com `slot` None.
+
+Os corpos das funções de nível superior são checados depois de todo o
+nível superior, com todos os nomes globais já declarados: funções podem
+chamar funções declaradas depois delas (recursão mútua) e ler globais
+declarados depois, como em parser.inference. Os erros de cada corpo
+entram na lista na posição da declaração da função, então a ordem dos
+erros continua a do fonte.
 """
-from typing import List, Dict, Optional
-from parser.brasilscript_parser import (
+from typing import List, Optional, Tuple
+from parser.ast import (
+    walk,
+    require_unshared,
     Program,
     Declaration,
     Assignment,
@@ -32,246 +52,346 @@ from parser.brasilscript_parser import (
     PrintStatement,
     InputStatement,
 )
+from parser.diagnostics import Diagnostic, Diagnostics, cap
+from parser.scopes import SymbolTable
+from parser.typetable import ANY, FUNCAO, LOGICO, NUMERO, TEXTO, Type, compatible, list_of, type_from_name
+from parser.visitor import NodeVisitor
+
+# tipos dos literais comuns, sem passar por type_from_name
+_LITERAL_TYPES = {"numero": NUMERO, "texto": TEXTO, "logico": LOGICO}
+
 
 class SemanticError(Exception):
     pass
 
-class SemanticAnalyzer:
-    def __init__(self):
-        # tabela de símbolos: nome -> tipo (ex.: 'numero', 'texto', 'logico', 'lista[numero]')
-        self.symbols: Dict[str, str] = {}
-        self.errors: List[str] = []
+class SemanticAnalyzer(NodeVisitor):
+    def __init__(self, max_errors: Optional[int] = None):
+        super().__init__()
+        # tabela de símbolos com escopos: nome -> Symbol com o tipo, um `Type`
+        # internado de parser.typetable (ex.: NUMERO, list_of(TEXTO), FUNCAO)
+        self.symbols = SymbolTable()
+        # diagnósticos (parser.diagnostics): a mensagem só é formatada quando lida
+        self.errors = Diagnostics(limit=max_errors)
+        # despacho por classe do nó: _check_<Classe> para statements, _infer_<Classe> para expressões
+        self._checks = self.dispatch_table("_check_", self._check_other)
+        self._inferences = self.dispatch_table("_infer_", self._infer_other)
+        # durante `analyze`: (função de nível superior, posição dos erros do seu corpo)
+        self._deferred: Optional[List[Tuple[FunctionDecl, int]]] = None
 
-    def analyze(self, program: Program) -> List[str]:
-        self.symbols.clear()
-        self.errors.clear()
+    def analyze(self, program: Program) -> Diagnostics:
+        require_unshared(program, "análise semântica")
+        self.symbols = SymbolTable()
+        errors = self.errors
+        errors.clear()
+        # o limite vale para os erros na ordem do fonte, depois de juntar os corpos
+        limit, errors.limit = errors.limit, None
+        deferred = self._deferred = []
+        try:
+            for stmt in program.statements:
+                self._check_statement(stmt)
+            self._deferred = None
+            self._check_deferred(deferred)
+        finally:
+            self._deferred = None
+            errors.limit = limit
+        errors[:] = cap(errors, limit)
+        program.frame_size = self.symbols.frame_size
+        return errors
 
-        for stmt in program.statements:
-            self._check_statement(stmt)
+    def _check_deferred(self, deferred: List[Tuple[FunctionDecl, int]]) -> None:
+        """Checa os corpos adiados, com a tabela global completa"""
+        errors = self.errors
+        top = len(errors)
+        bodies = []
+        for stmt, _ in deferred:
+            start = len(errors)
+            self._check_function_body(stmt)
+            bodies.append(errors[start:])
+        errors[:] = self.splice_errors(errors[:top], [position for _, position in deferred], bodies)
 
-        return self.errors
+    @staticmethod
+    def splice_errors(top: List[Diagnostic], positions: List[int], bodies: List[List[Diagnostic]]) -> List[Diagnostic]:
+        """Erros do nível superior com os de cada corpo inseridos na posição anotada (crescente)"""
+        errors = []
+        done = 0
+        for position, body_errors in zip(positions, bodies):
+            errors += top[done:position]
+            errors += body_errors
+            done = position
+        errors += top[done:]
+        return errors
 
     # ---------- checagem de statements ----------
     def _check_statement(self, stmt):
-        if isinstance(stmt, Declaration):
-            self._check_declaration(stmt)
-        elif isinstance(stmt, Assignment):
-            self._check_assignment(stmt)
-        elif isinstance(stmt, FunctionDecl):
-            # comportamento mínimo: registrar nome da função (sem suporte a assinatura)
-            if stmt.name in self.symbols:
-                self.errors.append(f"Redeclaração: função '{stmt.name}' já declarada como variável")
+        self._checks[stmt.__class__](stmt)
+
+    def _check_other(self, stmt):
+        # None e tipos de statements desconhecidos - ser tolerante
+        pass
+
+    def _check_block(self, statements):
+        # cada bloco é um escopo: o que ele declara não é visível depois dele
+        self.symbols.push_scope()
+        for s in statements:
+            self._check_statement(s)
+        self.symbols.pop_scope()
+
+    def _check_FunctionDecl(self, stmt: FunctionDecl):
+        # o nome entra no escopo de fora antes do corpo, para permitir recursão
+        previous = self.symbols.lookup(stmt.name)
+        if self.symbols.declare(stmt.name, FUNCAO, slot=False) is None:
+            if previous.type is FUNCAO:
+                self.errors.report("funcao_redeclarada", (stmt.name,), stmt.offset)
             else:
-                self.symbols[stmt.name] = 'funcao'
-            # verificação do corpo em um novo escopo (temporário) foi omitida por simplicidade
-        elif isinstance(stmt, IfStatement):
-            self._infer_type(stmt.condition)
-            for s in stmt.then_block:
-                self._check_statement(s)
-            for (_, block) in stmt.else_ifs:
-                for s in block:
-                    self._check_statement(s)
-            if stmt.else_block:
-                for s in stmt.else_block:
-                    self._check_statement(s)
-        elif isinstance(stmt, WhileStatement):
-            self._infer_type(stmt.condition)
-            for s in stmt.body:
-                self._check_statement(s)
-        elif isinstance(stmt, ForEachStatement):
-            self._infer_type(stmt.iterable)
-            # não inferimos o tipo da variável do laço aqui; mantemos simples
-            for s in stmt.body:
-                self._check_statement(s)
-        elif isinstance(stmt, RepeatStatement):
-            self._infer_type(stmt.count)
-            for s in stmt.body:
-                self._check_statement(s)
-        elif isinstance(stmt, PrintStatement):
-            for expr in stmt.expressions:
-                self._infer_type(expr)
-        elif isinstance(stmt, InputStatement):
-            # prompt pode ser uma expressão
-            self._infer_type(stmt.prompt)
-            # a variável deve existir, não fazemos auto-declaração aqui
-            if stmt.variable not in self.symbols:
-                self.errors.append(f"Identificador não declarado: '{stmt.variable}' usado em 'perguntar'")
-        elif isinstance(stmt, ReturnStatement):
-            if stmt.value is not None:
-                self._infer_type(stmt.value)
-        elif stmt is None:
-            return
+                self.errors.report("funcao_redeclarada_variavel", (stmt.name,), stmt.offset)
+        if self._deferred is not None and self.symbols.depth == 0:
+            # função de nível superior: o corpo é checado depois de todo o nível superior
+            self._deferred.append((stmt, len(self.errors)))
         else:
-            # tipos de statements desconhecidos - ser tolerante
-            pass
+            self._check_function_body(stmt)
 
-    def _check_declaration(self, decl: Declaration):
-        if decl.identifier in self.symbols:
-            self.errors.append(f"Redeclaração: identificador '{decl.identifier}' já declarado")
-            return
+    def _check_function_body(self, stmt: FunctionDecl):
+        # corpo em um frame novo com os parâmetros (sem tipo declarado: 'any')
+        self.symbols.push_frame()
+        parameter_slots = []
+        for name in stmt.parameters:
+            symbol = self.symbols.declare(name, ANY)
+            if symbol is None:
+                self.errors.report("parametro_duplicado", (name, stmt.name), stmt.offset)
+            parameter_slots.append(symbol.slot if symbol is not None else None)
+        for s in stmt.body:
+            self._check_statement(s)
+        stmt.frame_size = self.symbols.pop_frame()
+        stmt.parameter_slots = parameter_slots
+
+    def _check_IfStatement(self, stmt: IfStatement):
+        self._infer_type(stmt.condition)
+        self._check_block(stmt.then_block)
+        for (condition, block) in stmt.else_ifs:
+            self._infer_type(condition)
+            self._check_block(block)
+        if stmt.else_block:
+            self._check_block(stmt.else_block)
 
-        declared_type = decl.type_name
-        # registrar símbolo primeiro para permitir usos recursivos (comportamento simples)
-        self.symbols[decl.identifier] = declared_type
+    def _check_WhileStatement(self, stmt: WhileStatement):
+        self._infer_type(stmt.condition)
+        self._check_block(stmt.body)
+
+    def _check_ForEachStatement(self, stmt: ForEachStatement):
+        iterable = self._infer_type(stmt.iterable)
+        # a variável do laço pertence ao escopo do corpo, com o tipo dos elementos
+        element = iterable.element if iterable is not None and iterable.element is not None else ANY
+        self.symbols.push_scope()
+        stmt.slot = self.symbols.declare(stmt.variable, element).slot
+        for s in stmt.body:
+            self._check_statement(s)
+        self.symbols.pop_scope()
+
+    def _check_RepeatStatement(self, stmt: RepeatStatement):
+        self._infer_type(stmt.count)
+        self._check_block(stmt.body)
+
+    def _check_FunctionCall(self, stmt: FunctionCall):
+        # chamada como statement: mesma checagem da chamada em expressão
+        self._infer_type(stmt)
+
+    def _check_PrintStatement(self, stmt: PrintStatement):
+        for expr in stmt.expressions:
+            self._infer_type(expr)
+
+    def _check_InputStatement(self, stmt: InputStatement):
+        # prompt pode ser uma expressão
+        self._infer_type(stmt.prompt)
+        # a variável deve existir, não fazemos auto-declaração aqui
+        symbol = self.symbols.lookup(stmt.variable)
+        if symbol is None:
+            stmt.slot = None
+            self.errors.report("perguntar_nao_declarado", (stmt.variable,), stmt.offset)
+        else:
+            stmt.slot = symbol.slot
+
+    def _check_ReturnStatement(self, stmt: ReturnStatement):
+        if stmt.value is not None:
+            self._infer_type(stmt.value)
+
+    def _check_Declaration(self, decl: Declaration):
+        declared_type = type_from_name(decl.type_name)
+        # registrar símbolo primeiro para permitir usos recursivos (comportamento simples);
+        # só é redeclaração no mesmo escopo, num escopo interno o nome de fora é sombreado
+        symbol = self.symbols.declare(decl.identifier, declared_type)
+        if symbol is None:
+            decl.slot = None
+            self.errors.report("identificador_redeclarado", (decl.identifier,), decl.offset)
+            return
+        decl.slot = symbol.slot
 
         if decl.initial_value is not None:
             inferred = self._infer_type(decl.initial_value)
             if inferred is None:
                 # erro já registrado
                 return
-            if not self._compatible(declared_type, inferred):
-                self.errors.append(
-                    f"Incompatibilidade de tipos na inicialização de '{decl.identifier}': declarado {declared_type}, inicializado com {inferred}"
-                )
-
-    def _check_assignment(self, assign: Assignment):
-        if assign.identifier not in self.symbols:
-            self.errors.append(f"Identificador não declarado: '{assign.identifier}' na atribuição")
+            if not compatible(declared_type, inferred):
+                self.errors.report("inicializacao_incompativel", (decl.identifier, declared_type, inferred), decl.offset)
+
+    def _check_Assignment(self, assign: Assignment):
+        symbol = self.symbols.lookup(assign.identifier)
+        if symbol is None:
+            assign.slot = None
+            self.errors.report("atribuicao_nao_declarada", (assign.identifier,), assign.offset)
             return
+        assign.slot = symbol.slot
 
-        expected = self.symbols[assign.identifier]
+        expected = symbol.type
         inferred = self._infer_type(assign.value)
         if inferred is None:
             return
-        if not self._compatible(expected, inferred):
-            self.errors.append(
-                f"Incompatibilidade de tipos na atribuição para '{assign.identifier}': esperado {expected}, obtido {inferred}"
-            )
+        if not compatible(expected, inferred):
+            self.errors.report("atribuicao_incompativel", (assign.identifier, expected, inferred), assign.offset)
 
     # ---------- inferência de tipos ----------
-    def _infer_type(self, node) -> Optional[str]:
+    def _infer_type(self, node) -> Optional[Type]:
         try:
-            if isinstance(node, Literal):
-                return node.type
-
-            if isinstance(node, Identifier):
-                if node.name not in self.symbols:
-                    self.errors.append(f"Identificador não declarado: '{node.name}'")
-                    return None
-                return self.symbols[node.name]
-
-            if isinstance(node, ListLiteral):
-                # inferir tipo dos elementos
-                if not node.elements:
-                    return "lista[any]"  # lista vazia - flexível
-                elem_types = [self._infer_type(e) for e in node.elements]
-                if any(t is None for t in elem_types):
-                    return None
-                first = elem_types[0]
-                for t in elem_types[1:]:
-                    if t != first:
-                        self.errors.append(f"Elementos de lista com tipos mistos: {elem_types}")
-                        return None
-                return f"lista[{first}]"
-
-            if isinstance(node, IndexAccess):
-                obj_type = self._infer_type(node.object)
-                idx_type = self._infer_type(node.index)
-                if obj_type is None or idx_type is None:
-                    return None
-                if not obj_type.startswith("lista"):
-                    self.errors.append(f"Acesso por índice em tipo não-lista: {obj_type}")
-                    return None
-                if idx_type != "numero":
-                    self.errors.append(f"Índice de lista deve ser 'numero', encontrado {idx_type}")
-                    return None
-                # extrair tipo do elemento de lista[T]
-                if obj_type == "lista[any]":
-                    return "any"
-                if obj_type.startswith("lista[") and obj_type.endswith("]"):
-                    return obj_type[6:-1]
+            return self._inferences[node.__class__](node)
+        except Exception as e:
+            self.errors.report("erro_interno", (str(e),), getattr(node, "offset", -1))
+            return None
+
+    def _infer_other(self, node) -> Optional[Type]:
+        # tratamento padrão para outros tipos de nó
+        return None
+
+    def _infer_Literal(self, node: Literal) -> Optional[Type]:
+        return _LITERAL_TYPES.get(node.type) or type_from_name(node.type)
+
+    def _infer_Identifier(self, node: Identifier) -> Optional[Type]:
+        symbol = self.symbols.lookup(node.name)
+        if symbol is None:
+            node.slot = None
+            self.errors.report("identificador_nao_declarado", (node.name,), node.offset)
+            return None
+        node.slot = symbol.slot
+        return symbol.type
+
+    def _infer_ListLiteral(self, node: ListLiteral) -> Optional[Type]:
+        # inferir tipo dos elementos
+        if not node.elements:
+            return list_of(ANY)  # lista vazia - flexível
+        elem_types = [self._infer_type(e) for e in node.elements]
+        if any(t is None for t in elem_types):
+            return None
+        # 'any' (ex.: parâmetros) combina com qualquer tipo de elemento
+        known = [t for t in elem_types if t is not ANY]
+        first = known[0] if known else ANY
+        for t in known[1:]:
+            if t is not first:
+                self.errors.report("lista_mista", (tuple(elem_types),), node.offset)
+                return None
+        return list_of(first)
+
+    def _infer_IndexAccess(self, node: IndexAccess) -> Optional[Type]:
+        obj_type = self._infer_type(node.object)
+        idx_type = self._infer_type(node.index)
+        if obj_type is None or idx_type is None:
+            return None
+        if obj_type is ANY:
+            obj_type = list_of(ANY)
+        if not obj_type.is_list:
+            self.errors.report("indice_em_nao_lista", (obj_type,), node.offset)
+            return None
+        if idx_type is not NUMERO and idx_type is not ANY:
+            self.errors.report("indice_nao_numerico", (idx_type,), node.offset)
+            return None
+        # tipo do elemento de lista[T]
+        return obj_type.element
+
+    def _infer_UnaryOperation(self, node: UnaryOperation) -> Optional[Type]:
+        op = node.operator
+        operand_type = self._infer_type(node.operand)
+        if operand_type is None:
+            return None
+        if op == "-":
+            if operand_type is not NUMERO and operand_type is not ANY:
+                self.errors.report("menos_nao_numerico", (operand_type,), node.offset)
                 return None
+            return NUMERO
+        if op == "nao":
+            if operand_type is not LOGICO and operand_type is not ANY:
+                self.errors.report("nao_nao_logico", (operand_type,), node.offset)
+                return None
+            return LOGICO
+        return None
+
+    def _infer_BinaryOperation(self, node: BinaryOperation) -> Optional[Type]:
+        left_t = self._infer_type(node.left)
+        right_t = self._infer_type(node.right)
+        if left_t is None or right_t is None:
+            return None
+        op = node.operator
+        # 'any' (ex.: parâmetros) é aceito onde qualquer tipo seria
+        left_any = left_t is ANY
+        right_any = right_t is ANY
 
-            if isinstance(node, UnaryOperation):
-                op = node.operator
-                operand_type = self._infer_type(node.operand)
-                if operand_type is None:
-                    return None
-                if op == "-":
-                    if operand_type != "numero":
-                        self.errors.append(f"Operador unário '-' aplicado a tipo não-numérico: {operand_type}")
-                        return None
-                    return "numero"
-                if op == "nao":
-                    if operand_type != "logico":
-                        self.errors.append(f"Operador 'nao' aplicado a tipo não-lógico: {operand_type}")
-                        return None
-                    return "logico"
+        # operadores lógicos
+        if op in ("e", "ou"):
+            if (left_t is not LOGICO and not left_any) or (right_t is not LOGICO and not right_any):
+                self.errors.report("operandos_nao_logicos", (op, left_t, right_t), node.offset)
                 return None
+            return LOGICO
 
-            if isinstance(node, BinaryOperation):
-                left_t = self._infer_type(node.left)
-                right_t = self._infer_type(node.right)
-                if left_t is None or right_t is None:
-                    return None
-                op = node.operator
-
-                # operadores lógicos
-                if op in ("e", "ou"):
-                    if left_t != "logico" or right_t != "logico":
-                        self.errors.append(f"Operador lógico '{op}' requer operandos 'logico', encontrados {left_t} e {right_t}")
-                        return None
-                    return "logico"
-
-                # operadores aritméticos
-                if op in ("+", "-", "*", "/", "%"):
-                    # '+' também pode concatenar texto
-                    if op == "+":
-                        if left_t == "texto" and right_t == "texto":
-                            return "texto"
-                        if left_t == "numero" and right_t == "numero":
-                            return "numero"
-                        self.errors.append(f"Operador '+' requisitos: ambos 'numero' ou ambos 'texto' - encontrados {left_t} e {right_t}")
-                        return None
-                    # outros operadores aritméticos requerem 'numero'
-                    if left_t != "numero" or right_t != "numero":
-                        self.errors.append(f"Operador '{op}' requer operandos 'numero', encontrados {left_t} e {right_t}")
-                        return None
-                    return "numero"
-
-                # operadores relacionais
-                if op in ("==", "!=", "<", "<=", ">", ">=", "="):
-                    # permitir comparação entre mesmos tipos (listas também compatíveis por estrutura)
-                    if left_t != right_t and not (left_t.startswith("lista") and right_t.startswith("lista")):
-                        self.errors.append(f"Operador relacional '{op}' entre tipos incompatíveis: {left_t} e {right_t}")
-                        return None
-                    return "logico"
-
-                # tratamento padrão
+        # operadores aritméticos
+        if op in ("+", "-", "*", "/", "%"):
+            # '+' também pode concatenar texto
+            if op == "+":
+                if left_any and right_any:
+                    return ANY
+                if left_any or right_any:
+                    known = right_t if left_any else left_t
+                    if known is NUMERO or known is TEXTO:
+                        return known
+                if left_t is TEXTO and right_t is TEXTO:
+                    return TEXTO
+                if left_t is NUMERO and right_t is NUMERO:
+                    return NUMERO
+                self.errors.report("soma_incompativel", (left_t, right_t), node.offset)
                 return None
+            # outros operadores aritméticos requerem 'numero'
+            if (left_t is not NUMERO and not left_any) or (right_t is not NUMERO and not right_any):
+                self.errors.report("operandos_nao_numericos", (op, left_t, right_t), node.offset)
+                return None
+            return NUMERO
+
+        # operadores relacionais
+        if op in ("==", "!=", "<", "<=", ">", ">=", "="):
+            # permitir comparação entre mesmos tipos (listas também compatíveis por estrutura)
+            if left_t is not right_t and not left_any and not right_any \
+                    and not (left_t.is_list and right_t.is_list):
+                self.errors.report("comparacao_incompativel", (op, left_t, right_t), node.offset)
+                return None
+            return LOGICO
 
-            if isinstance(node, FunctionCall):
-                # sem informação de assinatura neste analisador simples
-                # apenas garantir que a função existe e foi declarada como 'funcao'
-                if node.name not in self.symbols:
-                    self.errors.append(f"Chamada para função não declarada: '{node.name}'")
-                    return None
-                if self.symbols[node.name] != 'funcao':
-                    self.errors.append(f"'{node.name}' não é uma função")
-                    return None
-                # tipo de retorno desconhecido
-                return "any"
-
-            # tratamento padrão para outros tipos de nó
+        # tratamento padrão
+        return None
+
+    def _infer_FunctionCall(self, node: FunctionCall) -> Optional[Type]:
+        # sem informação de assinatura neste analisador simples: os argumentos
+        # não são checados, mas os nomes neles também recebem o slot
+        for argument in node.arguments:
+            self._resolve_names(argument)
+        # apenas garantir que a função existe e foi declarada como 'funcao'
+        symbol = self.symbols.lookup(node.name)
+        if symbol is None:
+            self.errors.report("funcao_nao_declarada", (node.name,), node.offset)
             return None
-        except Exception as e:
-            self.errors.append(f"Erro interno na inferência de tipos: {e}")
+        if symbol.type is not FUNCAO:
+            self.errors.report("nao_e_funcao", (node.name,), node.offset)
             return None
+        # tipo de retorno desconhecido
+        return ANY
 
-    def _compatible(self, declared: str, inferred: str) -> bool:
-        # igualdade exata
-        if declared == inferred:
-            return True
-        # número: int/float são representados por 'numero'
-        if declared == 'numero' and inferred == 'numero':
-            return True
-        # permitir atribuir lista[any] para lista[T] e vice-versa
-        if declared.startswith('lista[') and inferred.startswith('lista['):
-            d_inner = declared[6:-1]
-            i_inner = inferred[6:-1]
-            if d_inner == 'any' or i_inner == 'any' or d_inner == i_inner:
-                return True
-        # permitir atribuição quando houver 'any'
-        if declared == 'any' or inferred == 'any':
-            return True
-        return False
\ No newline at end of file
+    def _resolve_names(self, node) -> None:
+        # slot de cada identificador de uma expressão que não é checada
+        lookup = self.symbols.lookup
+        for child in walk(node):
+            if child.__class__ is Identifier:
+                symbol = lookup(child.name)
+                child.slot = symbol.slot if symbol is not None else None
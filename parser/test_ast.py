@@ -0,0 +1,87 @@
+"""
+Testes dos nós canônicos da AST (parser/ast.py)
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from parser import ast as nodes
+from parser.ast import Identifier, Literal, Program, line_column, structural_hash
+from parser.brasilscript_parser import parse_brasilscript
+import parser.brasilscript_parser as brasilscript_parser
+import parser.semantic as semantic
+
+
+class TestCanonicalNodes:
+    """Parser e análise semântica usam as mesmas classes de parser/ast.py"""
+
+    def test_parser_and_semantic_share_classes(self):
+        for name in nodes.__all__:
+            if name in ("line_column", "iter_child_nodes", "walk", "structural_hash", "require_unshared"):
+                continue
+            assert getattr(brasilscript_parser, name) is getattr(nodes, name)
+            if hasattr(semantic, name):
+                assert getattr(semantic, name) is getattr(nodes, name)
+
+    def test_nodes_have_no_instance_dict(self):
+        node = Identifier("x")
+        assert not hasattr(node, "__dict__")
+        with pytest.raises(AttributeError):
+            node.line = 1
+
+    def test_offset_is_ignored_by_equality(self):
+        assert Literal(1, "numero", offset=5) == Literal(1, "numero")
+        assert "offset" not in repr(Literal(1, "numero", offset=5))
+
+
+class TestOffsets:
+    """Os nós guardam o offset do primeiro caractere no código fonte"""
+
+    def test_statement_and_expression_offsets(self):
+        src = "declarar x como numero = 1\n  mostrar x + 20"
+        ast = parse_brasilscript(src)
+        decl, show = ast.statements
+        assert decl.offset == 0
+        assert line_column(src, show.offset) == (2, 3)
+        plus = show.expressions[0]
+        assert plus.offset == plus.left.offset == src.index("x +")
+        assert plus.right.offset == src.index("20")
+
+    def test_errors_are_attached_to_program(self):
+        ast = parse_brasilscript("mostrar")
+        assert isinstance(ast, Program)
+        assert ast._errors == ["Fator inesperado: ''"]
+
+
+class TestStructuralHash:
+    """Hash estrutural estável"""
+
+    CODE = "se x > 1 entao\nmostrar \"a\", [1, 2.5]\nsenao_se nao y entao\nz = f(x)[0]\nfim_se"
+
+    def test_equal_trees_have_equal_hashes(self):
+        assert structural_hash(parse_brasilscript(self.CODE)) == structural_hash(parse_brasilscript(self.CODE))
+        # como no ==: offset não entra e 1 == 1.0
+        assert structural_hash(Literal(1, "numero", offset=3)) == structural_hash(Literal(1.0, "numero"))
+
+    def test_different_trees_have_different_hashes(self):
+        variants = [self.CODE, self.CODE.replace("1", "2"), self.CODE.replace("senao_se", "senao\nse").replace("fim_se", "fim_se\nfim_se"),
+                    self.CODE.replace("x > 1", "1 > x"), self.CODE.replace('"a"', '"b"')]
+        assert len({structural_hash(parse_brasilscript(code)) for code in variants}) == len(variants)
+        assert structural_hash(Identifier("x")) != structural_hash(Literal("x", "texto"))
+
+    def test_stable_across_processes(self):
+        script = ("from parser.ast import structural_hash\n"
+                  "from parser.brasilscript_parser import parse_brasilscript\n"
+                  f"print(structural_hash(parse_brasilscript({self.CODE!r})))")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        hashes = {subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True,
+                                 env={**os.environ, "PYTHONHASHSEED": seed}).stdout.strip()
+                  for seed in ("1", "2")}
+        assert hashes == {str(structural_hash(parse_brasilscript(self.CODE)))}
+
+    def test_deep_tree(self):
+        code = "x = " + "(" * 5000 + "1" + ")" * 5000
+        assert structural_hash(parse_brasilscript(code)) == structural_hash(parse_brasilscript(code))
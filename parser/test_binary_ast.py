@@ -0,0 +1,103 @@
+"""
+Testes da serialização binária da AST (parser/binary_ast.py)
+"""
+
+import math
+import os
+import pickle
+
+import pytest
+
+from parser.ast import (
+    Program, Literal, Identifier, Declaration, Assignment, BinaryOperation, UnaryOperation,
+    ListLiteral, IndexAccess, FunctionDecl, FunctionCall, IfStatement, WhileStatement,
+    ForEachStatement, RepeatStatement, ReturnStatement, PrintStatement, InputStatement, walk,
+)
+from parser.binary_ast import FORMAT_VERSION, MAGIC, dump_ast, load_ast
+from parser.brasilscript_parser import parse_brasilscript
+from parser.testing import EXEMPLOS, read
+
+
+def signature(program):
+    # __eq__ ignora offsets e não distingue 1 de 1.0 nem True de 1
+    return [(type(node).__name__, getattr(node, "offset", None), type(getattr(node, "value", None)))
+            for node in walk(program)]
+
+
+def assert_round_trip(program):
+    loaded = load_ast(dump_ast(program))
+    assert loaded == program
+    assert loaded._errors == program._errors
+    assert signature(loaded) == signature(program)
+    return loaded
+
+
+class TestRoundTrip:
+    """load_ast(dump_ast(p)) reconstrói exatamente p"""
+
+    @pytest.mark.parametrize("path", EXEMPLOS, ids=os.path.basename)
+    def test_examples(self, path):
+        assert_round_trip(parse_brasilscript(read(path)))
+
+    def test_every_node_type(self):
+        x = Identifier("x", offset=3)
+        program = Program([
+            Declaration("l", "lista[numero]", ListLiteral([Literal(1, "numero", 20), Literal(-7, "numero")], 15), 0),
+            Declaration("s", "texto", None, 30),
+            Assignment("x", BinaryOperation(x, "+", UnaryOperation("-", Literal(2.5, "numero", 9), 8), 5), 1),
+            FunctionDecl("f", ["a", "b"], [ReturnStatement(IndexAccess(x, Literal(0, "numero")), 50), ReturnStatement()], 40),
+            IfStatement(Literal(True, "logico"), [PrintStatement([x, Literal("olá", "texto")])],
+                        [(Literal(False, "logico"), []), (x, [InputStatement("n")])], [], 60),
+            IfStatement(x, [], [], None),
+            WhileStatement(x, [FunctionCall("f", [x, Literal(None, "error")])]),
+            ForEachStatement("i", x, [InputStatement("n", Literal("?", "texto"))]),
+            RepeatStatement(Literal(2 ** 70, "numero"), []),
+        ], ["erro 1", "erro 2"])
+        loaded = assert_round_trip(program)
+        assert loaded.statements[4].else_block == [] and loaded.statements[5].else_block is None
+
+    def test_special_floats(self):
+        values = [0.0, -0.0, 0.1, 1e308, math.inf]
+        loaded = assert_round_trip(Program([PrintStatement([Literal(v, "numero") for v in values])]))
+        read = [literal.value for literal in loaded.statements[0].expressions]
+        assert [math.copysign(1, v) for v in read] == [math.copysign(1, v) for v in values]
+        nan = load_ast(dump_ast(Program([PrintStatement([Literal(math.nan, "numero")])])))
+        assert math.isnan(nan.statements[0].expressions[0].value)
+
+    def test_syntax_errors(self):
+        assert_round_trip(parse_brasilscript("se a\nmostrar (1 2\nx y\nfuncao f(\nfim_funcao"))
+
+    def test_deep_nesting(self):
+        depth = 50_000
+        code = "se a entao\n" * depth + "mostrar " + "(" * depth + "-1" + ")" * depth + "\n" + "fim_se\n" * depth
+        program = parse_brasilscript(code)
+        loaded = load_ast(dump_ast(program))
+        assert signature(loaded) == signature(program)
+
+    def test_smaller_than_pickle(self):
+        program = parse_brasilscript("\n".join(f"x{i} = (a + {i}) * f(\"s\", {i}.5)" for i in range(200)))
+        assert len(dump_ast(program)) * 3 < len(pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class TestInvalidData:
+    """Dados de outro formato são recusados com ValueError"""
+
+    def test_not_an_ast(self):
+        with pytest.raises(ValueError, match="não são uma AST"):
+            load_ast(b"lixo")
+
+    def test_other_version(self):
+        data = bytearray(dump_ast(parse_brasilscript("mostrar 1")))
+        data[len(MAGIC)] = FORMAT_VERSION + 1
+        with pytest.raises(ValueError, match="Versão"):
+            load_ast(bytes(data))
+
+    def test_truncated(self):
+        data = dump_ast(parse_brasilscript("declarar x como numero = 1\nmostrar x + 2"))
+        for end in range(len(MAGIC) + 1, len(data)):
+            with pytest.raises(ValueError):
+                load_ast(data[:end])
+
+    def test_unsupported_node(self):
+        with pytest.raises(TypeError):
+            dump_ast(Program([object()]))
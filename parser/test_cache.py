@@ -0,0 +1,76 @@
+"""
+Testes do cache de ASTs em disco (parser/cache.py)
+"""
+
+import os
+
+import pytest
+
+import parser.cache as cache_module
+from parser.brasilscript_parser import parse_brasilscript, ParseError
+from parser.cache import ParseCache, ENTRY_SUFFIX
+
+CODE = "declarar x como numero = 1\nmostrar x + 2"
+
+
+def entries(directory):
+    return sorted(p for p in os.listdir(directory) if p.endswith(ENTRY_SUFFIX))
+
+
+class TestParseCache:
+    """Entradas indexadas por conteúdo, versão e motor léxico"""
+
+    def test_miss_then_hit(self, tmp_path):
+        cache = ParseCache(tmp_path)
+        first = cache.parse(CODE)
+        second = ParseCache(tmp_path).parse(CODE)
+        assert first == second == parse_brasilscript(CODE)
+        assert cache.misses == 1
+        assert len(entries(tmp_path)) == 1
+
+    def test_errors_are_cached(self, tmp_path):
+        ParseCache(tmp_path).parse("mostrar")
+        program = ParseCache(tmp_path).get("mostrar")
+        assert program._errors == ["Fator inesperado: ''"]
+
+    def test_key_depends_on_source_engine_and_version(self, tmp_path, monkeypatch):
+        cache = ParseCache(tmp_path)
+        key = cache.key(CODE)
+        assert cache.key(CODE + " ") != key
+        assert cache.key(CODE, engine="regex") != key
+        monkeypatch.setattr(cache_module, "__version__", "99.0")
+        assert cache.key(CODE) != key
+
+    def test_lexical_errors_are_not_cached(self, tmp_path):
+        cache = ParseCache(tmp_path)
+        with pytest.raises(ParseError):
+            cache.parse("x = 1 @ 2")
+        assert entries(tmp_path) == []
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = ParseCache(tmp_path)
+        cache.parse(CODE)
+        (name,) = entries(tmp_path)
+        (tmp_path / name).write_bytes(b"lixo")
+        assert cache.get(CODE) is None
+        assert entries(tmp_path) == []
+
+    def test_size_cap_evicts_least_recently_used(self, tmp_path):
+        sources = [f"mostrar {i}" for i in range(4)]
+        cache = ParseCache(tmp_path)
+        for i, src in enumerate(sources):
+            cache.parse(src)
+            os.utime(tmp_path / (cache.key(src) + ENTRY_SUFFIX), (i, i))
+        entry_size = (tmp_path / (cache.key(sources[0]) + ENTRY_SUFFIX)).stat().st_size
+        # o acesso a sources[0] o torna o mais recente
+        assert cache.get(sources[0]) is not None
+        small = ParseCache(tmp_path, max_bytes=entry_size * 3)
+        small.parse("mostrar 99")
+        remaining = set(entries(tmp_path))
+        assert cache.key(sources[0]) + ENTRY_SUFFIX in remaining
+        assert cache.key(sources[1]) + ENTRY_SUFFIX not in remaining
+        assert sum((tmp_path / p).stat().st_size for p in remaining) <= entry_size * 3
+
+    def test_no_temporary_files_left(self, tmp_path):
+        ParseCache(tmp_path).parse(CODE)
+        assert [p for p in os.listdir(tmp_path) if p.startswith(".tmp-")] == []
@@ -0,0 +1,48 @@
+"""
+Testes do grafo de chamadas e das componentes fortemente conexas (parser/callgraph.py)
+"""
+
+from parser.brasilscript_parser import parse_brasilscript
+from parser.callgraph import build_call_graph, strongly_connected_components
+
+
+def function(name, *calls):
+    body = "".join(f"mostrar {call}(1)\n" for call in calls)
+    return f"funcao {name}(a)\n{body}fim_funcao\n"
+
+
+class TestCallGraph:
+    """Arestas por nome entre funções de nível superior"""
+
+    def test_edges_and_roots(self):
+        code = function("f", "g", "print", "g") + function("g") + "se 1 entao\nmostrar f(2)\nfim_se"
+        graph = build_call_graph(parse_brasilscript(code))
+        assert graph.calls == {"f": ["g"], "g": []}
+        assert graph.roots == ["f"]
+        assert graph.reachable() == {"f", "g"}
+
+    def test_unreachable(self):
+        graph = build_call_graph(parse_brasilscript(function("f", "f") + function("g", "f")))
+        assert graph.reachable() == set()
+
+
+class TestComponents:
+    """Tarjan: chamadas antes de quem as chama, recursão mútua junta"""
+
+    def test_callees_first(self):
+        code = function("main", "a", "b") + function("a", "b") + function("b", "c") + function("c")
+        assert build_call_graph(parse_brasilscript(code)).components() == [["c"], ["b"], ["a"], ["main"]]
+
+    def test_mutual_recursion(self):
+        code = function("par", "impar") + function("impar", "par", "base") + function("base") + function("f", "f")
+        components = build_call_graph(parse_brasilscript(code)).components()
+        assert components == [["base"], ["par", "impar"], ["f"]]
+
+    def test_long_chain_without_recursion_limit(self):
+        edges = {f"f{i}": [f"f{i + 1}"] for i in range(50_000)}
+        edges["f50000"] = ["f0"]
+        components = strongly_connected_components(edges)
+        assert len(components) == 1 and len(components[0]) == 50_001
+
+    def test_unknown_successors_are_ignored(self):
+        assert strongly_connected_components({"a": ["x", "b"], "b": []}) == [["b"], ["a"]]
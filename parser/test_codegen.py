@@ -0,0 +1,180 @@
+"""
+Testes do IR gerado pelo codegen (codegen.py) com os tipos nativos de parser/inference.py
+
+Cada módulo passa pelo parser e pelo verificador do LLVM (llvmlite.binding).
+"""
+
+import ctypes
+import os
+
+import pytest
+
+llvm = pytest.importorskip("llvmlite.binding")
+
+from codegen import CodeGen, CodeGenError
+from parser.brasilscript_parser import parse_brasilscript
+from parser.folding import fold_constants
+from parser.inference import infer_program
+from parser.semantic import SemanticAnalyzer
+from parser.testing import EXEMPLOS, read
+
+SOMA = "funcao soma(a, b)\nretornar a + b\nfim_funcao\n"
+
+
+def generate(code, fold=False):
+    program = parse_brasilscript(code)
+    assert program._errors == []
+    assert SemanticAnalyzer().analyze(program) == []
+    if fold:
+        fold_constants(program)
+    return CodeGen().generate(program)
+
+
+def compiled(code, target, fold=False):
+    """Motor MCJIT com o IR verificado do programa, depois de executar o main (que inicia as globais)"""
+    module = llvm.parse_assembly(str(generate(code, fold)))
+    module.verify()
+    # o motor fica com a target machine: uma nova por motor
+    engine = llvm.create_mcjit_compiler(module, target.create_target_machine())
+    engine.finalize_object()
+    ctypes.CFUNCTYPE(ctypes.c_int)(engine.get_function_address("main"))()
+    # o printf do main escreve no buffer da libc
+    ctypes.CDLL(None).fflush(None)
+    return engine
+
+
+def native(engine, name, restype=ctypes.c_double, *argtypes):
+    # o código vive enquanto o motor existir: quem chama guarda `engine`
+    return ctypes.CFUNCTYPE(restype, *argtypes)(engine.get_function_address(name))
+
+
+@pytest.fixture(scope="module")
+def target():
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+    return llvm.Target.from_default_triple()
+
+
+def verified(code, fold=False):
+    """IR do programa, já aceito pelo parser e pelo verificador do LLVM"""
+    module = generate(code, fold)
+    llvm.parse_assembly(str(module)).verify()
+    return module
+
+
+class TestVerifiedIR:
+    """O IR com tipos nativos é aceito pelo LLVM"""
+
+    @pytest.mark.parametrize("path", [p for p in EXEMPLOS if not p.endswith("erro_lexico.bs")],
+                             ids=os.path.basename)
+    def test_examples(self, path):
+        verified(read(path))
+
+    def test_monomorphized_clones(self):
+        module = verified(SOMA + 'mostrar soma(1, 2)\nmostrar soma("a", "b")')
+        assert str(module.get_global("soma").function_type) == "double (double, double)"
+        assert str(module.get_global("soma.1").function_type) == "i8* (i8*, i8*)"
+
+    def test_texto_concatenation(self):
+        module = verified('declarar nome como texto = "Ana"\nmostrar "Nome: " + nome + "!"')
+        assert "call i8* @\"strcat\"" in str(module)
+
+    def test_texto_comparisons(self):
+        code = ('funcao g(t)\nse t == "a" entao\nmostrar 1\nsenao_se t < "b" ou t != "c" entao\nmostrar 2\nfim_se\n'
+                'retornar 0\nfim_funcao\nmostrar g("a")')
+        module = verified(code)
+        assert str(module.get_global("g").function_type) == "double (i8*)"
+        assert "fcmp" not in str(module).split("define double @\"g\"")[1].split("}")[0]
+
+    def test_logical_operators(self):
+        verified("declarar a como logico = verdadeiro\nse nao a ou 1 > 2 e a entao\nmostrar a\nfim_se")
+
+    def test_loops(self):
+        verified("declarar n como numero = 0\nenquanto n < 3 faca\nn = n + 1\nfim_enquanto\n"
+                 "repetir n vezes\nmostrar n\nfim_repetir")
+
+
+class TestRejected:
+    """O que não tem tradução com tipos nativos é um erro, não um IR inválido"""
+
+    def test_texto_with_numero(self):
+        # o parâmetro é uma lista (double no codegen) somada a um texto
+        with pytest.raises(CodeGenError):
+            generate('funcao h(x)\nretornar "a" + x\nfim_funcao\nmostrar h([1])')
+
+    def test_texto_arithmetic(self):
+        with pytest.raises(CodeGenError):
+            generate('funcao h(x)\nretornar x * 2\nfim_funcao\nmostrar h("a")')
+
+    def test_no_conversion_to_texto(self):
+        with pytest.raises(CodeGenError):
+            generate("funcao h(x)\ndeclarar s como texto = x\nretornar s\nfim_funcao\nmostrar h(1)")
+
+
+class TestSlots:
+    """Variáveis lidas e escritas pelos slots da análise semântica (executado pelo MCJIT)"""
+
+    def test_parameters(self, target):
+        engine = compiled("funcao f(a, b)\nretornar a - b * 10\nfim_funcao\nmostrar f(5, 2)", target)
+        assert native(engine, "f", ctypes.c_double, ctypes.c_double, ctypes.c_double)(5, 2) == -15
+
+    def test_locals_in_nested_blocks(self, target):
+        # y e z ocupam o mesmo slot, em blocos irmãos
+        code = ("funcao f(a)\ndeclarar x como numero = a\nse a > 1 entao\ndeclarar y como numero = a * 10\n"
+                "x = x + y\nfim_se\nenquanto x > 100 faca\ndeclarar z como numero = 50\nx = x - z\n"
+                "fim_enquanto\nretornar x\nfim_funcao\nmostrar f(3)")
+        engine = compiled(code, target)
+        f = native(engine, "f", ctypes.c_double, ctypes.c_double)
+        assert (f(1), f(3), f(20)) == (1, 33, 70)
+
+    def test_globals_read_from_function_bodies(self, target):
+        code = ("declarar k como numero = 5\nfuncao f(a)\nk = k + a\nretornar k * 2 + j\nfim_funcao\n"
+                "declarar j como numero = 100\nmostrar f(1)")
+        engine = compiled(code, target)
+        f = native(engine, "f", ctypes.c_double, ctypes.c_double)
+        # o main já somou 1 a k
+        assert f(1) == 114
+        assert f(1) == 116
+
+    def test_globals_in_top_level_blocks(self, target):
+        code = ("se verdadeiro entao\ndeclarar t como numero = 1\nfim_se\ndeclarar k como numero = 7\n"
+                "funcao f()\nretornar k\nfim_funcao\nmostrar f()")
+        engine = compiled(code, target)
+        assert native(engine, "f")() == 7
+
+    def test_clones(self, target):
+        code = ("funcao g(a)\ndeclarar n como numero = 1\nse a == a entao\ndeclarar m como numero = 2\n"
+                "n = n + m\nfim_se\nretornar n\nfim_funcao\nmostrar g(1)\nmostrar g(\"x\")\nmostrar g(verdadeiro)")
+        program = parse_brasilscript(code)
+        SemanticAnalyzer().analyze(program)
+        decl = program.statements[0]
+        frame = decl.frame_size, list(decl.parameter_slots)
+        engine = compiled(code, target)
+        assert native(engine, "g", ctypes.c_double, ctypes.c_double)(1) == 3
+        assert native(engine, "g.1", ctypes.c_double, ctypes.c_char_p)(b"x") == 3
+        assert native(engine, "g.2", ctypes.c_double, ctypes.c_bool)(True) == 3
+        # a inferência guarda o frame de cada instância nela, sem reescrever o FunctionDecl
+        types = infer_program(program)
+        assert [(i.frame_size, i.parameter_slots) for i in types] == [frame] * 3
+        assert (decl.frame_size, decl.parameter_slots) == frame
+
+
+class TestFolding:
+    """O programa com as constantes dobradas (parser.folding) gera IR válido e imprime o mesmo"""
+
+    @pytest.mark.parametrize("fold", [False, True], ids=["sem_dobra", "com_dobra"])
+    @pytest.mark.parametrize("path", [p for p in EXEMPLOS if not p.endswith("erro_lexico.bs")],
+                             ids=os.path.basename)
+    def test_examples(self, path, fold):
+        verified(read(path), fold)
+
+    @pytest.mark.parametrize("fold", [False, True], ids=["sem_dobra", "com_dobra"])
+    def test_texto_concatenation(self, target, capfd, fold):
+        code = ('declarar s como texto = "a\\tb"\nmostrar s\nmostrar s + "c" + "d"\nmostrar "x" + "y"\n'
+                'declarar n como numero = 2\nmostrar n * 3\nse s == "a\\tb" entao\nmostrar "igual"\nfim_se')
+        module = verified(code, fold)
+        # com a dobra não sobra concatenação para o runtime
+        assert ("strcat" in str(module)) != fold
+        capfd.readouterr()
+        compiled(code, target, fold)
+        assert capfd.readouterr().out == "a\tb\na\tbcd\nxy\n6.000000\nigual\n"
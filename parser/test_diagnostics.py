@@ -0,0 +1,166 @@
+"""
+Testes dos diagnósticos estruturados (parser/diagnostics.py)
+"""
+
+import pickle
+
+import pytest
+
+from lexer.lexer import LexerError
+from parser.binary_ast import dump_ast, load_ast
+from parser.brasilscript_parser import (
+    MAX_ERRORS, TOO_MANY_ERRORS, BrasilScriptParser, ParseError, parse_brasilscript, tokenize_source,
+)
+from parser.diagnostics import MESSAGES, Diagnostic, Diagnostics, Severity, cap, snippet, too_many
+from parser.semantic import SemanticAnalyzer
+from parser.typetable import NUMERO, TEXTO
+
+
+class TestDiagnostic:
+    """Registro com a mensagem formatada só quando lida"""
+
+    def test_message_is_formatted_on_demand(self, monkeypatch):
+        calls = []
+        monkeypatch.setitem(MESSAGES, "teste", lambda name: calls.append(name) or f"erro em {name}")
+        diagnostic = Diagnostic("teste", ("x",), 3, 4)
+        assert calls == []
+        assert str(diagnostic) == "erro em x"
+        assert diagnostic.message == "erro em x"
+        assert calls == ["x"]
+
+    def test_equal_to_its_message(self):
+        diagnostic = Diagnostic("identificador_nao_declarado", ("x",), 5)
+        assert diagnostic == "Identificador não declarado: 'x'"
+        assert [diagnostic] == ["Identificador não declarado: 'x'"]
+        assert diagnostic != "outra coisa"
+
+    def test_equality_between_diagnostics(self):
+        a = Diagnostic("identificador_nao_declarado", ("x",), 5, 6)
+        assert a == Diagnostic("identificador_nao_declarado", ("x",), 5, 6)
+        assert a != Diagnostic("identificador_nao_declarado", ("x",), 7, 8)
+        assert a != Diagnostic("identificador_nao_declarado", ("x",), 5, 6, Severity.WARNING)
+
+    def test_unhashable(self):
+        # igual ao seu texto, então não pode ter outro hash que o do texto
+        diagnostic = Diagnostic("identificador_nao_declarado", ("x",), 5)
+        with pytest.raises(TypeError):
+            {diagnostic}
+        assert "Identificador não declarado: 'x'" in [diagnostic]
+
+    def test_pickle_keeps_types_interned(self):
+        diagnostic = Diagnostic("soma_incompativel", (NUMERO, TEXTO), 10)
+        loaded = pickle.loads(pickle.dumps(diagnostic))
+        assert loaded == diagnostic
+        assert loaded.arguments[0] is NUMERO
+
+    def test_shifted(self):
+        diagnostic = Diagnostic("fator_inesperado", (")",), 10, 11)
+        moved = diagnostic.shifted(5)
+        assert (moved.start, moved.end) == (15, 16)
+        assert (diagnostic.start, diagnostic.end) == (10, 11)
+        assert Diagnostic("fator_inesperado", (")",), 10).shifted(5).end == -1
+        unplaced = Diagnostic("fator_inesperado", (")",))
+        assert unplaced.shifted(5) is unplaced
+
+    def test_render_with_position_and_snippet(self):
+        source = "declarar x como numero\n\tx = y + 1\n"
+        diagnostic = Diagnostic("identificador_nao_declarado", ("y",), source.index("y"), source.index("y") + 1)
+        assert diagnostic.render(source, "prog.bs") == (
+            "prog.bs:2:6: erro: Identificador não declarado: 'y' [identificador_nao_declarado]\n"
+            "    \tx = y + 1\n"
+            "    \t    ^"
+        )
+        assert diagnostic.render() == "erro: Identificador não declarado: 'y' [identificador_nao_declarado]"
+
+    def test_snippet_stops_at_end_of_line(self):
+        assert snippet("abc def\nxyz", 4, 100) == "    abc def\n        ^~~"
+
+
+class TestDiagnostics:
+    """Lista de erros com deduplicação e limite"""
+
+    def test_repeated_diagnostic_is_dropped(self):
+        errors = Diagnostics()
+        assert errors.report("identificador_nao_declarado", ("x",), 4) is not None
+        assert errors.report("identificador_nao_declarado", ("x",), 4) is None
+        errors.report("identificador_nao_declarado", ("x",), 9)
+        # sem posição não há como saber se é o mesmo erro
+        errors.report("identificador_nao_declarado", ("x",))
+        errors.report("identificador_nao_declarado", ("x",))
+        assert [e.start for e in errors] == [4, 9, -1, -1]
+
+    def test_limit_adds_warning_once(self):
+        errors = Diagnostics(limit=2)
+        for i in range(5):
+            errors.report("identificador_nao_declarado", (f"x{i}",), i)
+        assert len(errors) == 3
+        assert errors[-1] == too_many(2)
+        assert errors[-1] == TOO_MANY_ERRORS.format(limit=2)
+
+    def test_codes(self):
+        errors = Diagnostics()
+        errors.report("identificador_nao_declarado", ("x",), 1)
+        errors.report("identificador_nao_declarado", ("y",), 2)
+        errors.report("nao_e_funcao", ("x",), 3)
+        assert errors.codes() == {"identificador_nao_declarado": 2, "nao_e_funcao": 1}
+
+    def test_cap(self):
+        errors = [Diagnostic("fator_inesperado", (str(i),), i) for i in range(4)]
+        assert cap(errors, None) is errors
+        assert cap(errors, 4) is errors
+        assert cap(errors, 2) == errors[:2] + [too_many(2)]
+
+
+class TestProducers:
+    """Lexer, parser e análise semântica produzem diagnósticos"""
+
+    def test_parser_errors(self):
+        code = "declarar x como numero = )\nmostrar x\n"
+        program = parse_brasilscript(code)
+        [error] = program._errors
+        assert error.code == "fator_inesperado"
+        assert (error.start, error.end) == (code.index(")"), code.index(")") + 1)
+        assert error == "Fator inesperado: ')'"
+
+    def test_parser_cap(self):
+        tokens = tokenize_source("declarar x como numero = )\n" * (MAX_ERRORS + 5))
+        errors = BrasilScriptParser(tokens).parse()._errors
+        assert len(errors) == MAX_ERRORS + 1
+        assert errors[-1].code == "muitos_erros"
+
+    def test_parser_errors_survive_binary_round_trip(self):
+        program = parse_brasilscript("declarar x como numero = )\nx = ]\n")
+        program._errors.append("erro em texto")
+        loaded = load_ast(dump_ast(program))
+        assert loaded._errors == program._errors
+        assert [type(e) for e in loaded._errors] == [Diagnostic, Diagnostic, str]
+        assert [e.start for e in loaded._errors[:2]] == [e.start for e in program._errors[:2]]
+
+    def test_lexer_error_is_lazy(self, monkeypatch):
+        import lexer.lexer as lexer_module
+        calls = []
+        original = lexer_module._unexpected_character
+        monkeypatch.setattr(lexer_module, "_unexpected_character",
+                            lambda text, pos: calls.append(pos) or original(text, pos))
+        with pytest.raises(ParseError) as info:
+            tokenize_source("declarar x como numero = 1 @\n")
+        diagnostic = info.value.diagnostic
+        assert diagnostic.code == "caractere_invalido"
+        assert diagnostic.start == 27
+        assert isinstance(diagnostic.arguments[0], LexerError)
+        assert calls == []
+        assert "Unexpected character at 27: '@'" in str(info.value)
+        assert calls == [27]
+
+    def test_semantic_errors(self):
+        code = "declarar x como numero\nx = y\nmostrar x + verdadeiro\n"
+        errors = SemanticAnalyzer().analyze(parse_brasilscript(code))
+        assert errors.codes() == {"identificador_nao_declarado": 1, "soma_incompativel": 1}
+        assert errors[0].start == code.index("y")
+        assert errors[1].arguments[0] is NUMERO
+        assert errors[1] == "Operador '+' requisitos: ambos 'numero' ou ambos 'texto' - encontrados numero e logico"
+
+    def test_semantic_max_errors(self):
+        code = "".join(f"mostrar y{i}\n" for i in range(10))
+        errors = SemanticAnalyzer(max_errors=3).analyze(parse_brasilscript(code))
+        assert [e.code for e in errors] == ["identificador_nao_declarado"] * 3 + ["muitos_erros"]
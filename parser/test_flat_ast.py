@@ -0,0 +1,82 @@
+"""
+Testes da AST em arena (parser/flat_ast.py)
+"""
+
+import pytest
+
+from parser.ast import Assignment, Literal, Program
+from parser.brasilscript_parser import parse_brasilscript
+from parser.flat_ast import FlatAST, NodeKind, parse_flat, flatten
+from parser.testing import EXEMPLOS, read
+
+PROGRAMS = EXEMPLOS + [
+    "se a > 1 e nao b entao\n mostrar 1\nsenao_se a < 0 entao\n mostrar 2\nsenao\nfim_se",
+    "se x entao\nfim_se",
+    "para_cada i em [1, 2] faca\n perguntar \"?\" guardar_em i\nfim_para_cada",
+    "repetir 3 vezes\n enquanto (a ou b) faca\n  retornar\n fim_enquanto\nfim_repetir",
+    "declarar l como lista[numero]\nmostrar l[0] * -f(1, x)\nmostrar",
+]
+
+
+def source(item):
+    if item in EXEMPLOS:
+        return read(item)
+    return item
+
+
+class TestFlatAST:
+    """A arena representa exatamente a mesma árvore que parser/ast.py"""
+
+    @pytest.mark.parametrize("item", PROGRAMS)
+    def test_parser_builder_round_trip(self, item):
+        code = source(item)
+        program = parse_brasilscript(code)
+        tree = parse_flat(code)
+        assert isinstance(tree, FlatAST)
+        assert tree.to_program() == program
+        assert tree._errors == program._errors
+
+    @pytest.mark.parametrize("item", PROGRAMS)
+    def test_flatten_matches_parser_builder(self, item):
+        code = source(item)
+        flat = flatten(parse_brasilscript(code))
+        direct = parse_flat(code)
+        assert list(flat.kind) == list(direct.kind)
+        assert list(flat.offset) == list(direct.offset)
+        assert flat.payloads == direct.payloads
+
+    def test_names_and_literals_are_interned(self):
+        tree = parse_flat("x = x + 1\nx = x + 1.0\ny = 1\nz = verdadeiro")
+        assert tree.payloads.count("x") == 1
+        literals = [p for p in tree.payloads if isinstance(p, tuple) and p[1] == "numero"]
+        # 1 e 1.0 são iguais com ==, mas não podem virar o mesmo payload
+        assert [type(value) for value, _ in literals] == [int, float]
+        assert len(tree) > len(tree.payloads)
+
+    def test_literal_types_survive_round_trip(self):
+        program = parse_flat("x = 1\ny = 1.0\nz = 1\nw = verdadeiro").to_program()
+        assert [type(stmt.value.value) for stmt in program.statements] == [int, float, int, bool]
+        zeros = flatten(Program([Assignment("x", Literal(0.0, "numero")), Assignment("y", Literal(-0.0, "numero"))],
+                                [])).to_program()
+        assert [str(stmt.value.value) for stmt in zeros.statements] == ["0.0", "-0.0"]
+
+    def test_cursor_api(self):
+        code = "declarar x como numero = 2 * 3"
+        tree = parse_flat(code)
+        root = tree.cursor()
+        assert root.kind is NodeKind.PROGRAM
+        (decl,) = root.children
+        assert decl.kind is NodeKind.DECLARATION
+        assert decl.value == ("x", "numero")
+        (mul,) = decl.children
+        assert mul.kind is NodeKind.BINARY_OPERATION and mul.value == "*"
+        assert [c.value for c in mul] == [(2, "numero"), (3, "numero")]
+        assert mul.offset == code.index("2")
+
+    def test_walk_is_preorder(self):
+        tree = parse_flat("mostrar 1 + 2")
+        kinds = [NodeKind(tree.kind[n]) for n in tree.walk()]
+        assert kinds == [
+            NodeKind.PROGRAM, NodeKind.PRINT_STATEMENT, NodeKind.BINARY_OPERATION,
+            NodeKind.LITERAL, NodeKind.LITERAL,
+        ]
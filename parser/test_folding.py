@@ -0,0 +1,126 @@
+"""
+Testes da dobra e propagação de constantes (parser/folding.py)
+"""
+
+from parser.ast import BinaryOperation, Literal
+from parser.brasilscript_parser import parse_brasilscript
+from parser.folding import FoldStats, fold_constants
+from parser.semantic import SemanticAnalyzer
+
+
+def folded(code):
+    program = parse_brasilscript(code)
+    assert not program._errors
+    assert not SemanticAnalyzer().analyze(program)
+    stats = fold_constants(program)
+    return program, stats
+
+
+def shown(code):
+    """Expressão do último `mostrar` depois da dobra"""
+    program, _ = folded(code)
+    return program.statements[-1].expressions[0]
+
+
+class TestFolding:
+    """Operações com operandos literais viram literais"""
+
+    def test_arithmetic(self):
+        assert shown("mostrar 2 * 3 + 1") == Literal(7, "numero")
+        assert shown("mostrar 7 / 2") == Literal(3.5, "numero")
+        assert shown("mostrar -(4 - 6)") == Literal(2, "numero")
+
+    def test_double_semantics(self):
+        # zero como double: 0 * -1 é -0.0
+        zero = shown("mostrar 0 * -1")
+        assert zero == Literal(-0.0, "numero") and str(zero.value) == "-0.0"
+        big = shown("mostrar 9007199254740993 + 0.5")
+        assert isinstance(big.value, float)
+        assert shown("mostrar 9007199254740992 * 2").value == 2.0 ** 54
+
+    def test_not_folded(self):
+        assert isinstance(shown("mostrar 1 / 0"), BinaryOperation)
+        # fora do alcance do double
+        assert isinstance(shown("mostrar 1" + "0" * 400 + " * 10"), BinaryOperation)
+        assert isinstance(shown("declarar x como numero\nperguntar \"?\" guardar_em x\nmostrar x + 1"), BinaryOperation)
+
+    def test_texto(self):
+        assert shown('mostrar "a" + "b" + "c"') == Literal('"abc"', "texto")
+        # textos não são comparados
+        program, _ = folded('se "a" == "a" entao\nmostrar 1\nfim_se')
+        assert isinstance(program.statements[0].condition, BinaryOperation)
+
+    def test_conditions(self):
+        program, stats = folded("se 1 < 2 e nao falso entao\nmostrar 1\nfim_se")
+        [stmt] = program.statements
+        assert stmt.expressions == [Literal(1, "numero")]
+        assert stats.folded == 3
+        program, _ = folded("declarar x como numero\nperguntar \"?\" guardar_em x\nse x > 1 ou 2 = 3 entao\nmostrar x\nfim_se")
+        condition = program.statements[-1].condition
+        assert condition.right == Literal(False, "logico")
+
+
+class TestPropagation:
+    """Variáveis constantes nunca atribuídas são trocadas pelo valor"""
+
+    def test_chain(self):
+        code = "declarar a como numero = 2\ndeclarar b como numero = a * 5\nmostrar b + a"
+        program, stats = folded(code)
+        assert program.statements[1].initial_value == Literal(10, "numero")
+        assert program.statements[-1].expressions == [Literal(12, "numero")]
+        assert stats == FoldStats(folded=2, propagated=3, removed_branches=0)
+
+    def test_assigned_anywhere(self):
+        code = ("declarar a como numero = 2\nfuncao f(x)\ndeclarar a como numero = 1\na = x\nfim_funcao\n"
+                "mostrar a + 1")
+        assert isinstance(shown(code), BinaryOperation)
+
+    def test_shadowed(self):
+        code = ("declarar a como numero = 2\nfuncao f(a)\nretornar a + 1\nfim_funcao\n"
+                "para_cada a em [1, 2] faca\nmostrar a * 2\nfim_para_cada\nmostrar f(a)")
+        program, _ = folded(code)
+        function, loop, last = program.statements[1:]
+        assert isinstance(function.body[0].value, BinaryOperation)
+        assert isinstance(loop.body[0].expressions[0], BinaryOperation)
+        assert last.expressions[0].arguments == [Literal(2, "numero")]
+
+    def test_texto_in_mostrar(self):
+        # o codegen imprime literais e variáveis 'texto' do mesmo jeito
+        program, _ = folded('declarar s como texto = "x"\nmostrar s\nmostrar s + "y"')
+        assert program.statements[1].expressions == [Literal('"x"', "texto")]
+        assert program.statements[2].expressions == [Literal('"xy"', "texto")]
+
+
+class TestBranches:
+    """Ramos de `se` com condições constantes"""
+
+    def test_false_branch_removed(self):
+        program, stats = folded("se falso entao\nmostrar 1\nfim_se\nmostrar 2")
+        assert len(program.statements) == 1
+        assert stats.removed_branches == 1
+
+    def test_true_branch_inlined(self):
+        program, stats = folded("se 1 < 2 entao\nmostrar 1\nsenao\nmostrar 2\nfim_se")
+        assert program.statements[0].expressions == [Literal(1, "numero")]
+        assert len(program.statements) == 1
+        assert stats.removed_branches == 1
+
+    def test_block_with_declaration_kept(self):
+        program, _ = folded("se verdadeiro entao\ndeclarar x como numero = 1\nmostrar x\nfim_se")
+        [stmt] = program.statements
+        assert stmt.condition == Literal(True, "logico")
+        assert stmt.then_block[1].expressions == [Literal(1, "numero")]
+        # o escopo do bloco continua valendo para a análise semântica
+        assert not SemanticAnalyzer().analyze(program)
+
+    def test_else_ifs(self):
+        code = ("declarar x como numero\nperguntar \"?\" guardar_em x\n"
+                "se falso entao\nmostrar 1\nsenao_se x > 1 entao\nmostrar 2\n"
+                "senao_se verdadeiro entao\nmostrar 3\nsenao_se x > 2 entao\nmostrar 4\nsenao\nmostrar 5\nfim_se")
+        program, stats = folded(code)
+        stmt = program.statements[-1]
+        assert isinstance(stmt.condition, BinaryOperation)
+        assert stmt.then_block[0].expressions == [Literal(2, "numero")]
+        assert stmt.else_ifs == []
+        assert stmt.else_block[0].expressions == [Literal(3, "numero")]
+        assert stats.removed_branches == 3
@@ -0,0 +1,77 @@
+"""
+Testes da fábrica de nós com hash-consing (parser/hashcons.py)
+"""
+
+import pytest
+
+from parser.ast import Program, structural_hash, walk
+from parser.binary_ast import dump_ast, load_ast
+from parser.brasilscript_parser import parse_brasilscript
+from parser.folding import fold_constants
+from parser.hashcons import HashConsFactory, parse_hash_consed
+from parser.inference import infer_program
+from parser.semantic import SemanticAnalyzer
+
+CODE = "x = a + 1\ny = a + 1\nse a + 1 > 2 entao\nx = a + 1\nfim_se\nmostrar f(1, 1.0, verdadeiro)"
+
+
+class TestHashConsFactory:
+    """Subárvores iguais compartilhadas"""
+
+    def test_same_ast_as_parser(self):
+        program = parse_hash_consed(CODE)
+        expected = parse_brasilscript(CODE)
+        assert program == expected and program._errors == expected._errors
+
+    def test_identical_subtrees_are_shared(self):
+        program = parse_hash_consed(CODE)
+        first, second, if_stmt, _ = program.statements
+        assert first.value is second.value is if_stmt.condition.left
+        assert if_stmt.then_block[0] is first
+        assert first.value.offset == -1
+
+    def test_literals_of_different_types_are_not_merged(self):
+        arguments = parse_hash_consed(CODE).statements[3].expressions[0].arguments
+        assert [type(arg.value) for arg in arguments] == [int, float, bool]
+        assert len({id(arg) for arg in arguments}) == 3
+
+    def test_factory_shared_between_parses(self):
+        factory = HashConsFactory()
+        a = parse_hash_consed("mostrar g(1)", factory=factory)
+        b = parse_hash_consed("z = g(1)", factory=factory)
+        assert a.statements[0].expressions[0] is b.statements[0].value
+        # 1, g(1), mostrar e a atribuição; o segundo parse reusa o literal e a chamada
+        assert len(factory) == 4 and factory.hits == 2
+
+    def test_hashes_match_structural_hash(self):
+        factory = HashConsFactory()
+        program = parse_hash_consed(CODE, factory=factory)
+        for node in walk(program):
+            assert factory.hash(node) == structural_hash(node)
+        assert factory.hash(program) == structural_hash(parse_brasilscript(CODE))
+
+    def test_errors_stay_on_program(self):
+        code = "mostra 1\nx = (1"
+        program = parse_hash_consed(code)
+        assert type(program) is Program
+        assert program._errors == parse_brasilscript(code)._errors
+
+
+class TestPassesThatWriteNodes:
+    """Passes que anotam ou reescrevem os nós recusam a árvore compartilhada"""
+
+    @pytest.mark.parametrize("run", [SemanticAnalyzer().analyze, fold_constants, infer_program])
+    def test_refused(self, run):
+        program = parse_hash_consed(CODE)
+        assert program.shared
+        with pytest.raises(ValueError):
+            run(program)
+
+    def test_unshared_copy(self):
+        code = "declarar a como numero\nse a > 1 entao\ndeclarar b como numero\nmostrar a + 1\nfim_se\nmostrar a + 1"
+        copy = load_ast(dump_ast(parse_hash_consed(code)))
+        assert not copy.shared and copy == parse_brasilscript(code)
+        assert SemanticAnalyzer().analyze(copy) == []
+        # cada ocorrência de `a + 1` tem o seu nó e o seu slot
+        first, second = (node.expressions[0].left for node in walk(copy) if type(node).__name__ == "PrintStatement")
+        assert first is not second and first.slot == second.slot == (0, 0)
@@ -0,0 +1,85 @@
+"""
+Testes do re-parse incremental (parser/incremental.py)
+"""
+
+import pytest
+
+from parser.brasilscript_parser import parse_brasilscript, tokenize_source, ParseError
+from parser.incremental import parse_incremental, reparse
+from parser.testing import offsets
+
+FUNCAO = "funcao f{i}(a)\n  declarar x como numero = a * {i}\n  retornar x\nfim_funcao\n"
+PROGRAMA = "".join(FUNCAO.format(i=i) for i in range(5)) + "mostrar f1(2)\n"
+
+
+def assert_same_as_full_parse(state, engine="afd"):
+    full = parse_brasilscript(state.source, engine)
+    assert state.program == full
+    assert state.program._errors == full._errors
+    assert offsets(state.program) == offsets(full)
+    assert state.tokens == tokenize_source(state.source, engine)
+
+
+class TestReparse:
+    """O resultado é sempre igual ao parse completo do fonte editado"""
+
+    def test_edit_inside_one_function(self):
+        state = parse_incremental(PROGRAMA)
+        old = list(state.program.statements)
+        pos = PROGRAMA.index("a * 2") + 4
+        state = reparse(state, pos, pos + 1, "20")
+        assert_same_as_full_parse(state)
+        assert state.changed == {2}
+        for i in (0, 1, 3, 4, 5):
+            assert state.program.statements[i] is old[i]
+
+    def test_reused_suffix_offsets_are_shifted(self):
+        state = parse_incremental(PROGRAMA)
+        state = reparse(state, 0, 0, "\n\n\n")
+        assert_same_as_full_parse(state)
+        assert state.program.statements[-1].offset == PROGRAMA.index("mostrar") + 3
+
+    def test_edit_that_merges_statements(self):
+        state = parse_incremental(PROGRAMA)
+        pos = PROGRAMA.index("fim_funcao\nfuncao f3")
+        state = reparse(state, pos, pos + len("fim_funcao"), "")
+        assert_same_as_full_parse(state)
+        # sem o fim_funcao, f3, f4 e o mostrar passam a fazer parte de f2
+        assert [s.name for s in state.program.statements] == ["f0", "f1", "f2"]
+        assert state.changed == {2}
+
+    def test_edit_inside_comment_and_string(self):
+        code = "# comentario\nmostrar \"ola\"\nx = 1\n"
+        state = parse_incremental(code)
+        state = reparse(state, 2, 5, "")
+        assert_same_as_full_parse(state)
+        assert state.changed == set()
+        pos = state.source.index("ola")
+        state = reparse(state, pos, pos, "\" + \"")
+        assert_same_as_full_parse(state)
+        assert state.changed == {0}
+
+    def test_errors_follow_the_edit(self):
+        state = parse_incremental("mostrar 1\nx = 2\n")
+        state = reparse(state, 10, 15, "mostrar")
+        assert_same_as_full_parse(state)
+        assert state.program._errors == ["Fator inesperado: ''"]
+        state = reparse(state, 17, 17, " 3")
+        assert_same_as_full_parse(state)
+        assert state.program._errors == []
+
+    @pytest.mark.parametrize("engine", ["afd", "regex"])
+    def test_sequence_of_edits(self, engine):
+        state = parse_incremental(PROGRAMA, engine)
+        edits = [("a * 1", "a*1+1"), ("mostrar f1", "mostrar 1mostrar f1"), ("retornar x\nfim_funcao\nfuncao f4", "")]
+        for old, new in edits:
+            pos = state.source.index(old)
+            state = reparse(state, pos, pos + len(old), new)
+            assert_same_as_full_parse(state, engine)
+
+    def test_lexical_error_in_edit(self):
+        state = parse_incremental(PROGRAMA)
+        with pytest.raises(ParseError):
+            reparse(state, 0, 0, "@")
+        with pytest.raises(ValueError):
+            reparse(state, 5, 2, "")
@@ -0,0 +1,151 @@
+"""
+Testes da análise semântica incremental (parser/incremental_semantic.py)
+"""
+
+import pytest
+
+from parser.brasilscript_parser import parse_brasilscript
+from parser.hashcons import parse_hash_consed
+from parser.incremental import parse_incremental, reparse
+from parser.incremental_semantic import IncrementalAnalyzer
+from parser.semantic import SemanticAnalyzer
+from parser.typetable import FUNCAO, NUMERO
+
+PROGRAMA = (
+    "declarar base como numero = 1\n"
+    "funcao f(a)\nretornar a * base\nfim_funcao\n"
+    "funcao g(a)\nretornar f(a) * 2\nfim_funcao\n"
+    "declarar y como numero = g(3)\n"
+    "mostrar y\n"
+)
+
+
+def edit(state, old, new):
+    pos = state.source.index(old)
+    return reparse(state, pos, pos + len(old), new)
+
+
+def assert_same_as_full(analyzer, program):
+    assert analyzer.analyze(program) == SemanticAnalyzer().analyze(program)
+
+
+class TestDependencies:
+    """Leituras e declarações globais de cada statement"""
+
+    def test_reads_and_defines(self):
+        analyzer = IncrementalAnalyzer()
+        analyzer.analyze(parse_brasilscript(PROGRAMA))
+        base, f, g, y, show = analyzer.infos
+        assert [s.name for s in base.defines] == ["base"] and dict(base.reads) == {"base": None}
+        # o corpo tem o seu próprio registro, feito depois do nível superior
+        assert dict(f.reads) == {"f": None} and dict(f.body.reads) == {"base": NUMERO}
+        assert dict(g.reads) == {"g": None} and dict(g.body.reads) == {"f": FUNCAO}
+        assert base.body is None
+        assert dict(show.reads) == {"y": NUMERO} and show.defines == ()
+
+    def test_locals_are_not_dependencies(self):
+        analyzer = IncrementalAnalyzer()
+        analyzer.analyze(parse_brasilscript("declarar x como texto\nfuncao f(x)\ndeclarar z como numero\nretornar x + z\nfim_funcao"))
+        assert dict(analyzer.infos[1].reads) == {"f": None} and analyzer.infos[1].body.reads == ()
+
+    def test_undeclared_name_is_a_dependency(self):
+        analyzer = IncrementalAnalyzer()
+        errors = analyzer.analyze(parse_brasilscript("mostrar z"))
+        assert len(errors) == 1 and dict(analyzer.infos[0].reads) == {"z": None}
+
+
+class TestReanalyze:
+    """Só os statements editados e seus dependentes são checados de novo"""
+
+    def test_unchanged_program_is_not_visited(self):
+        state = parse_incremental(PROGRAMA)
+        analyzer = IncrementalAnalyzer()
+        analyzer.analyze(state.program)
+        assert analyzer.rechecked == [0, 1, 2, 3, 4]
+        assert_same_as_full(analyzer, state.program)
+        assert analyzer.rechecked == []
+
+    def test_edit_inside_function(self):
+        state = parse_incremental(PROGRAMA)
+        analyzer = IncrementalAnalyzer()
+        analyzer.analyze(state.program)
+        state = edit(state, "a * base", "a * base * 2")
+        assert_same_as_full(analyzer, state.program)
+        assert analyzer.rechecked == [1]
+
+    def test_type_change_rechecks_transitive_dependents(self):
+        state = parse_incremental(PROGRAMA)
+        analyzer = IncrementalAnalyzer()
+        analyzer.analyze(state.program)
+        state = edit(state, "declarar y como numero = g(3)", "declarar y como texto = \"a\"")
+        assert_same_as_full(analyzer, state.program)
+        assert analyzer.rechecked == [3, 4]
+        state = edit(state, "declarar base como numero = 1", "declarar base como texto")
+        errors = analyzer.analyze(state.program)
+        assert errors == SemanticAnalyzer().analyze(state.program) and len(errors) == 1
+        assert analyzer.rechecked == [0, 1]
+
+    def test_declaration_moved_before_use(self):
+        state = parse_incremental("mostrar x\ndeclarar x como numero\n")
+        analyzer = IncrementalAnalyzer()
+        assert len(analyzer.analyze(state.program)) == 1
+        state = reparse(state, 0, 0, "declarar x como numero\n")
+        errors = analyzer.analyze(state.program)
+        assert errors == SemanticAnalyzer().analyze(state.program)
+        assert errors == ["Redeclaração: identificador 'x' já declarado"]
+        assert analyzer.rechecked == [0, 1, 2]
+
+    def test_removed_function_reports_callers(self):
+        state = parse_incremental(PROGRAMA)
+        analyzer = IncrementalAnalyzer()
+        analyzer.analyze(state.program)
+        state = edit(state, "funcao f(a)\nretornar a * base\nfim_funcao\n", "")
+        assert_same_as_full(analyzer, state.program)
+        # g, que agora é o statement 1, chama uma função que não existe mais
+        assert set(analyzer.rechecked) == state.changed | {1}
+        assert analyzer.errors == ["Chamada para função não declarada: 'f'"]
+
+    def test_new_global_shifts_slots(self):
+        state = parse_incremental(PROGRAMA)
+        analyzer = IncrementalAnalyzer()
+        analyzer.analyze(state.program)
+        state = reparse(state, 0, 0, "declarar z como numero\n")
+        errors = analyzer.analyze(state.program)
+        # os slots globais mudaram: quem lê ou declara globais depois de z é anotado de novo
+        assert analyzer.rechecked == [0, 1, 2, 3, 4, 5]
+        base, f, _, y, show = state.program.statements[1:]
+        assert base.slot == (0, 1) and f.body[0].value.right.slot == (0, 1)
+        assert y.slot == (0, 2) and show.expressions[0].slot == (0, 2) and state.program.frame_size == 3
+        assert errors == SemanticAnalyzer().analyze(state.program)
+
+    def test_global_declared_after_function(self):
+        state = parse_incremental("funcao f(a)\nretornar a * k + g(a)\nfim_funcao\nmostrar 1\n")
+        analyzer = IncrementalAnalyzer()
+        assert len(analyzer.analyze(state.program)) == 2
+        state = edit(state, "mostrar 1", "declarar k como texto\nfuncao g(a)\nretornar f(a)\nfim_funcao")
+        errors = analyzer.analyze(state.program)
+        assert errors == SemanticAnalyzer().analyze(state.program)
+        assert errors == ["Operador '*' requer operandos 'numero', encontrados any e texto"]
+        # o corpo de f lê k e g, declarados depois dele
+        assert set(analyzer.rechecked) == state.changed | {0}
+
+    def test_frame_size_after_removed_block(self):
+        # o frame global encolhe quando o bloco que usava mais slots sai
+        state = parse_incremental("se verdadeiro entao\ndeclarar a como numero\ndeclarar b como numero\nfim_se\n"
+                                  "declarar z como numero\nmostrar z\n")
+        analyzer = IncrementalAnalyzer()
+        analyzer.analyze(state.program)
+        assert state.program.frame_size == 2
+        state = edit(state, "declarar b como numero\n", "")
+        analyzer.analyze(state.program)
+        assert analyzer.rechecked == [0]
+        assert state.program.frame_size == 1
+        state = edit(state, "se verdadeiro entao\ndeclarar a como numero\nfim_se\n", "")
+        analyzer.analyze(state.program)
+        assert state.program.frame_size == 1 and analyzer.infos[0].peak == 1
+
+    def test_shared_statements_are_refused(self):
+        # com hash-consing o mesmo nó aparece em ambientes diferentes, com slots diferentes
+        program = parse_hash_consed("mostrar x\ndeclarar x como numero\nmostrar x\n")
+        with pytest.raises(ValueError):
+            IncrementalAnalyzer().analyze(program)
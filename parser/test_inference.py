@@ -0,0 +1,85 @@
+"""
+Testes da inferência de tipos de parâmetros e retornos (parser/inference.py)
+"""
+
+from parser.ast import FunctionCall, walk
+from parser.brasilscript_parser import parse_brasilscript
+from parser.inference import MAX_CLONES, infer_program
+from parser.typetable import ANY, LOGICO, NUMERO, TEXTO, list_of
+
+SOMA = "funcao soma(a, b)\nretornar a + b\nfim_funcao\n"
+FAT = "funcao fat(n)\nse n <= 1 entao\nretornar 1\nfim_se\nretornar n * fat(n - 1)\nfim_funcao\n"
+
+
+def infer(code):
+    program = parse_brasilscript(code)
+    assert program._errors == []
+    return program, infer_program(program)
+
+
+def signatures(types):
+    return [(i.name, i.parameters, i.returns) for i in types]
+
+
+def calls(node):
+    return [n for n in walk(node) if isinstance(n, FunctionCall)]
+
+
+class TestInstances:
+    """Uma instância por combinação de tipos de argumentos"""
+
+    def test_single_instance_keeps_name(self):
+        _, types = infer(SOMA + "mostrar soma(1, 2)")
+        assert signatures(types) == [("soma", (NUMERO, NUMERO), NUMERO)]
+
+    def test_clones_when_call_sites_disagree(self):
+        program, types = infer(SOMA + "mostrar soma(1, 2), soma(\"a\", \"b\")")
+        assert signatures(types) == [("soma", (NUMERO, NUMERO), NUMERO), ("soma.1", (TEXTO, TEXTO), TEXTO)]
+        first, second = calls(program.statements[1])
+        assert types.target(first).name == "soma" and types.target(second).name == "soma.1"
+
+    def test_unreachable_functions_have_no_instance(self):
+        _, types = infer(SOMA + "mostrar 1")
+        assert types.instances == {}
+
+    def test_missing_arguments_are_any(self):
+        _, types = infer(SOMA + "mostrar soma(1)")
+        assert signatures(types) == [("soma", (NUMERO, ANY), NUMERO)]
+
+
+class TestReturns:
+    """Retornos inferidos por ponto fixo sobre o grafo de chamadas"""
+
+    def test_recursion(self):
+        _, types = infer(FAT + "mostrar fat(5)")
+        assert signatures(types) == [("fat", (NUMERO,), NUMERO)]
+
+    def test_argument_from_another_call(self):
+        # o retorno de soma(1, 2) só é conhecido depois: não sobra instância com 'any'
+        _, types = infer(SOMA + FAT + "mostrar soma(soma(1, 2), fat(3))")
+        assert signatures(types) == [("soma", (NUMERO, NUMERO), NUMERO), ("fat", (NUMERO,), NUMERO)]
+
+    def test_calls_inside_instances(self):
+        program, types = infer("funcao eco(x)\nretornar x\nfim_funcao\nfuncao f(a)\nretornar [eco(a)]\nfim_funcao\n"
+                               "mostrar f(verdadeiro), f(\"a\")")
+        f, f1 = types.instances["f"]
+        inner = calls(program.statements[1])[0]
+        assert types.target(inner, f).parameters == (LOGICO,)
+        assert types.target(inner, f1).parameters == (TEXTO,)
+        assert (f.returns, f1.returns) == (list_of(LOGICO), list_of(TEXTO))
+
+    def test_conflicting_returns_are_any(self):
+        _, types = infer("funcao f(a)\nse a entao\nretornar 1\nfim_se\nretornar \"x\"\nfim_funcao\nmostrar f(verdadeiro)")
+        assert types.instances["f"][0].returns is ANY
+
+    def test_no_return_value(self):
+        _, types = infer("funcao f(a)\nmostrar a\nfim_funcao\nf(1)")
+        assert signatures(types) == [("f", (NUMERO,), None)]
+
+    def test_clone_limit(self):
+        # cada chamada pediria um tipo novo: lista[numero], lista[lista[numero]], ...
+        _, types = infer("funcao f(x)\nretornar f([x])\nfim_funcao\nmostrar f(1)")
+        clones = types.instances["f"]
+        assert len(clones) == MAX_CLONES
+        assert clones[-1].parameters == (ANY,)
+        assert types.target(calls(clones[-1].function)[0], clones[-1]) is clones[-1]
@@ -0,0 +1,131 @@
+"""
+Testes do parse preguiçoso dos corpos de função (parser/lazy.py)
+"""
+
+import os
+
+import pytest
+
+from parser.ast import FunctionDecl
+from parser.binary_ast import dump_ast, load_ast
+from parser.brasilscript_parser import MAX_ERRORS, ParseError, parse_brasilscript, tokenize_source
+from parser.lazy import LazyFunctionDecl, check_bodies, force_bodies, parse_lazy, skim_block
+from parser.testing import EXEMPLOS, offsets, read
+
+BODY = "se a > 1 entao\nmostrar a\nsenao_se a < 0 entao\nenquanto a < 0 faca\na = a + 1\nfim_enquanto\nsenao\nretornar 0\nfim_se\nretornar f(a - 1)\n"
+CODE = f"funcao f(a)\n{BODY}fim_funcao\nmostrar f(3)\nfuncao g(a, b)\nretornar a + b\nfim_funcao"
+
+
+def assert_same_as_full(code):
+    program = force_bodies(parse_lazy(code))
+    expected = parse_brasilscript(code)
+    assert program == expected
+    assert program._errors == expected._errors
+    assert offsets(program, classes=False) == offsets(expected, classes=False)
+
+
+class TestSkimBlock:
+    """Varredura das palavras-chave de bloco"""
+
+    def test_finds_matching_end(self):
+        tokens = tokenize_source(CODE)
+        end = skim_block(tokens, 5)
+        assert tokens[end - 1].value == "fim_funcao" and tokens[end].value == "mostrar"
+
+    @pytest.mark.parametrize("body", ["se a entao\nfim_funcao", "fim_se", "senao", "enquanto a faca\nsenao_se"])
+    def test_mismatch_gives_up(self, body):
+        tokens = tokenize_source(f"funcao f()\n{body}\nfim_funcao")
+        assert skim_block(tokens, 4) is None
+
+
+class TestParseLazy:
+    """Estrutura de nível superior sem os corpos"""
+
+    def test_top_level_without_parsing_bodies(self):
+        program = parse_lazy(CODE)
+        f, call, g = program.statements
+        assert isinstance(f, LazyFunctionDecl) and isinstance(g, LazyFunctionDecl)
+        assert (f.name, f.parameters, f.offset) == ("f", ["a"], 0)
+        assert (g.name, g.parameters) == ("g", ["a", "b"])
+        assert not f.parsed and not g.parsed
+        assert call == parse_brasilscript(CODE).statements[1]
+
+    def test_body_on_demand(self):
+        program = parse_lazy(CODE)
+        expected = parse_brasilscript(CODE)
+        f, _, g = program.statements
+        assert f.body == expected.statements[0].body
+        assert f.parsed and not g.parsed
+        assert offsets(f, classes=False) == offsets(expected.statements[0], classes=False)
+
+    def test_equal_to_function_decl_both_ways(self):
+        lazy = parse_lazy(CODE).statements[2]
+        full = parse_brasilscript(CODE).statements[2]
+        assert lazy == full and full == lazy
+        assert lazy != FunctionDecl("g", ["a", "b"], [])
+
+    def test_body_errors_are_deferred(self):
+        code = "funcao f()\nmostrar (1\nfim_funcao\nmostra 2"
+        program = parse_lazy(code)
+        assert len(program._errors) == 1
+        assert program.statements[0].body_errors is None
+        assert program.statements[0].body == [parse_brasilscript(code).statements[0].body[0]]
+        assert program.statements[0].body_errors == ["Esperado ')', encontrado 'fim_funcao'"]
+
+    def test_header_error_parses_eagerly(self):
+        code = "funcao f(a b)\nretornar a\nfim_funcao"
+        program = parse_lazy(code)
+        assert type(program.statements[0]) is FunctionDecl
+        assert program._errors == parse_brasilscript(code)._errors
+
+    def test_assigned_body_replaces_pending(self):
+        decl = parse_lazy(CODE).statements[0]
+        decl.body = []
+        assert decl.body == [] and decl.body_errors == []
+
+    def test_serializes_as_function_decl(self):
+        program = parse_lazy(CODE)
+        assert load_ast(dump_ast(program)) == parse_brasilscript(CODE)
+
+
+class TestForceBodies:
+    """Resultado igual ao do parse completo"""
+
+    @pytest.mark.parametrize("path", EXEMPLOS, ids=os.path.basename)
+    def test_examples(self, path):
+        code = read(path)
+        if os.path.basename(path) != "erro_lexico.bs":
+            assert_same_as_full(code)
+
+    def test_errors_merged_in_source_order(self):
+        assert_same_as_full("mostra 1\nfuncao f()\nx = (1\nfim_funcao\nmostra 2\nfuncao g()\nmostrar ]\nfim_funcao")
+
+    def test_error_limit_over_all_bodies(self):
+        code = "\n".join(f"funcao f{i}()\nmostrar (1\nfim_funcao\nmostra {i}" for i in range(MAX_ERRORS))
+        program = force_bodies(parse_lazy(code))
+        assert len(program._errors) == MAX_ERRORS + 1
+        assert_same_as_full(code)
+
+    def test_skim_disagreement_reparses(self):
+        # `x =` consome o `fim_funcao` como fator: a função não termina onde a varredura achou
+        code = "funcao f()\nx =\nfim_funcao\nmostrar 1"
+        program = parse_lazy(code)
+        program.statements[0].body
+        assert not program.statements[0]._exact
+        assert_same_as_full(code)
+
+    def test_check_bodies(self):
+        program = parse_lazy(CODE)
+        check_bodies(program.statements)
+        assert all(stmt.parsed for stmt in program.statements if isinstance(stmt, LazyFunctionDecl))
+        program = parse_lazy("funcao f()\nmostrar ]\nfim_funcao\nmostrar 1")
+        assert program._errors == []
+        with pytest.raises(ParseError) as info:
+            check_bodies(program.statements)
+        assert info.value.diagnostic.code == "fator_inesperado"
+        with pytest.raises(ParseError) as info:
+            check_bodies(parse_lazy("funcao f()\nx =\nfim_funcao\nmostrar 1").statements)
+        assert info.value.diagnostic.code == "fator_inesperado"
+
+    def test_nested_functions_and_blocks(self):
+        assert_same_as_full(f"funcao f(a)\nfuncao g(b)\n{BODY}fim_funcao\nretornar g(a)\nfim_funcao\n" + CODE)
@@ -0,0 +1,110 @@
+"""
+Testes diferenciais entre os motores léxicos do BrasilScript
+
+Compara o lexer por AFD (lexer/lexer.py) com o lexer por regex mestre
+(lexer/regex_lexer.py), inclusive nos casos de fronteira (identificadores
+inválidos, números com expoente, strings, operadores). A regex só aceita
+a mais o que o AFD recusa com LexerError: '%' e caracteres fora do ASCII
+imprimível (não-ASCII, tab) em strings e comentários.
+"""
+
+import os
+
+import pytest
+
+from lexer.lexer import LexerError as AfdLexerError, tokenize_text as afd_tokenize
+from lexer.regex_lexer import tokenize_text as regex_tokenize, LexerError
+from parser.brasilscript_parser import parse_brasilscript, ParseError
+from parser.testing import EXEMPLOS, read
+
+CASES = [
+    "declarar MeuNome como texto",
+    'Preco = 99.99\nNome = "produto"',
+    "(a + b) != c;",
+    "x = 1e-3; y = 42\r\nz = 1.5E+2",
+    "se a == b e c >= d ou nao e1 <= 2 entao\n  mostrar a\nsenao_se x < y entao\nfim_se",
+    "declarar l como lista[numero] = [1, 2, 3]\nmostrar l[0], f(1, 2)",
+    'funcao f(a, b)\n  retornar a * b / 2 - 1 # comentario\nfim_funcao',
+    "para_cada item em itens faca\n  parar\nfim_para_cada",
+    'perguntar "nome? \\"ok\\"" guardar_em nome',
+    "verdadeiro falso verdadeiros seguir fim_se_x",
+    # identificadores inválidos e números: vence o token mais longo
+    "declarar 123abc como numero = 1",
+    "1e5b 12_a 1e 1e5 1.5x 1.5e3x 1.5e 1e+5 1e+x 1.x 123",
+    # strings não atravessam linhas; aspas simples e strings coladas
+    'mostrar "a\nb"',
+    "mostrar 'a\\'b' + \"c\"\"d\"",
+    # operadores de um caractere que só existem no AFD
+    "x = a ! b != c && d || e",
+    "a & b | c === d",
+]
+
+# o que só a regex aceita
+REGEX_ONLY = [
+    "x = 5 % 2",
+    'mostrar "olá"',
+    'mostrar "a\tb"',
+]
+
+
+def _significant(tokenize, src):
+    """Tokens sem espaços e comentários, ou a posição do erro léxico"""
+    try:
+        tokens = tokenize(src)
+    except (LexerError, AfdLexerError) as error:
+        return error.pos
+    return [t for t in tokens if t[0] not in ("WHITESPACE", "COMMENT", "NEWLINE")]
+
+
+class TestLexerEngines:
+    """Os dois motores devem produzir a mesma sequência de tokens"""
+
+    @pytest.mark.parametrize("src", CASES)
+    def test_engines_agree_on_cases(self, src):
+        assert _significant(regex_tokenize, src) == _significant(afd_tokenize, src)
+
+    @pytest.mark.parametrize("src", CASES)
+    def test_engines_agree_on_parse(self, src):
+        try:
+            afd = parse_brasilscript(src)
+        except ParseError as error:
+            with pytest.raises(ParseError) as info:
+                parse_brasilscript(src, engine="regex")
+            # os LexerError dos dois motores são de classes diferentes
+            regex_error, afd_error = info.value.diagnostic, error.diagnostic
+            assert (regex_error.code, regex_error.start) == (afd_error.code, afd_error.start)
+            return
+        regex = parse_brasilscript(src, engine="regex")
+        assert regex == afd
+        assert regex._errors == afd._errors
+
+    @pytest.mark.parametrize("src", REGEX_ONLY)
+    def test_regex_only_inputs(self, src):
+        with pytest.raises(AfdLexerError):
+            afd_tokenize(src)
+        regex_tokenize(src)
+
+    @pytest.mark.parametrize("path", EXEMPLOS, ids=os.path.basename)
+    def test_engines_agree_on_examples(self, path):
+        src = read(path)
+        assert regex_tokenize(src) == afd_tokenize(src)
+
+    @pytest.mark.parametrize("path", EXEMPLOS, ids=os.path.basename)
+    def test_parse_with_regex_engine(self, path):
+        src = read(path)
+        afd = parse_brasilscript(src)
+        regex = parse_brasilscript(src, engine="regex")
+        assert regex == afd
+        assert regex._errors == afd._errors
+
+    def test_regex_engine_reports_position(self):
+        with pytest.raises(LexerError, match=r"line 2, column 3"):
+            regex_tokenize("x = 1\ny @ 2")
+
+    def test_regex_engine_error_becomes_parse_error(self):
+        with pytest.raises(ParseError):
+            parse_brasilscript("x = 1 @ 2", engine="regex")
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            parse_brasilscript("x = 1", engine="lalr")
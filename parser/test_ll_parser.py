@@ -0,0 +1,95 @@
+"""
+Testes do parser LL dirigido por tabela (parser/ll_parser.py)
+"""
+
+import os
+
+import pytest
+
+from parser.ast import walk
+from parser.brasilscript_parser import (
+    FIRST_STATEMENT, FOLLOW_STATEMENT_LIST, K_IDENTIFICADOR, VALUE_IDS,
+    parse_brasilscript, tokenize_source,
+)
+from parser.ll_parser import LLParser, build_table, default_table, parse_ll, read_grammar
+from parser.testing import EXEMPLOS, offsets, read
+
+
+def assert_same_as_manual(code):
+    parser = LLParser(tokenize_source(code))
+    program = parser.parse()
+    manual = parse_brasilscript(code)
+    assert program == manual
+    assert program._errors == manual._errors
+    assert offsets(program) == offsets(manual)
+    return parser
+
+
+class TestTable:
+    """A tabela gerada da gramática em gramatica_parser.md"""
+
+    def test_first_and_follow_match_the_manual_parser(self):
+        table = default_table()
+        assert table.first["Statement"] == FIRST_STATEMENT | {K_IDENTIFICADOR}
+        assert table.follow["StatementList"] == FOLLOW_STATEMENT_LIST
+
+    def test_assignment_and_call_use_the_second_token(self):
+        table = default_table()
+        assert table.ll2 == [("Statement", K_IDENTIFICADOR)]
+        entry = table.cells["Statement"][K_IDENTIFICADOR]
+        assert set(entry) == {VALUE_IDS["="], VALUE_IDS["("]}
+
+    def test_only_known_conflict(self):
+        # `retornar x`: o valor é lido, como em parse_return_statement
+        assert [(name, terminal) for name, terminal, _ in default_table().conflicts] == [
+            ("ReturnValue", K_IDENTIFICADOR),
+        ]
+
+    def test_grammar_errors(self):
+        with pytest.raises(ValueError, match="Não-terminal sem produções"):
+            read_grammar("A -> Bloco")
+        with pytest.raises(ValueError, match="Terminal desconhecido"):
+            read_grammar("A -> 'naoexiste'")
+        with pytest.raises(ValueError, match="Ação semântica desconhecida"):
+            read_grammar("A -> {acao}")
+
+    def test_unresolved_conflicts_are_reported(self):
+        table = build_table(read_grammar("S -> $IDENTIFICADOR {identificador}\n  | $IDENTIFICADOR {identificador} '='"))
+        assert table.ll2 == [] and len(table.conflicts) == 1
+
+
+class TestSameAST:
+    """O driver constrói a mesma AST que BrasilScriptParser"""
+
+    @pytest.mark.parametrize("path", EXEMPLOS, ids=os.path.basename)
+    def test_examples(self, path):
+        parser = assert_same_as_manual(read(path))
+        assert not parser.fell_back
+
+    @pytest.mark.parametrize("code", [
+        "declarar l como lista[lista[numero]] = [[1], []]\nmostrar l[0], -l[1] * 2",
+        "se nao a == b e (c ou d) ou x + 1 < y entao\nmostrar 1\nsenao_se (a) entao\nparar\nsenao\nf()\nfim_se",
+        "enquanto -a * (b - c) >= (d) * 2 faca\na = a - 1\nfim_enquanto",
+        "funcao f(a, b)\nretornar\nfim_funcao\nfuncao g()\nretornar f(a, [b], \"s\")\nfim_funcao",
+        "repetir ((2)) + 1 vezes\nperguntar \"n\" guardar_em n\nfim_repetir",
+        "para_cada i em l faca\nmostrar verdadeiro, falso\nfim_para_cada",
+    ])
+    def test_valid_programs(self, code):
+        assert not assert_same_as_manual(code).fell_back
+
+    @pytest.mark.parametrize("code", [
+        "x y z\nmostrar 1",
+        "se a entao\nmostrar 1",
+        "mostrar (1 + \nfim_se",
+        "retornar x = 1",
+        "se (a) < b entao\nfim_se",
+    ])
+    def test_syntax_errors_fall_back(self, code):
+        assert assert_same_as_manual(code).fell_back
+
+    def test_deep_nesting(self):
+        depth = 50_000
+        code = "se a entao\n" * depth + "mostrar " + "(" * depth + "1" + ")" * depth + "\n" + "fim_se\n" * depth
+        program = parse_ll(code)
+        assert program._errors == []
+        assert sum(1 for _ in walk(program)) == 2 * depth + 3
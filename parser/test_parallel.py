@@ -0,0 +1,98 @@
+"""
+Testes do parse paralelo de funções (parser/parallel.py)
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from parser.brasilscript_parser import MAX_ERRORS, ParseError, parse_brasilscript
+import parser.parallel as parallel_module
+from parser.parallel import parse_parallel, split_functions
+from parser.testing import BODY, functions, offsets
+
+
+def assert_same_as_sequential(code, pool, engine="afd", workers=3):
+    program = parse_parallel(code, engine, workers=workers, executor=pool, min_bytes=0)
+    expected = parse_brasilscript(code, engine)
+    assert program == expected
+    assert program._errors == expected._errors
+    assert offsets(program) == offsets(expected)
+
+
+class TestSplitFunctions:
+    """Varredura dos limites das funções de nível superior"""
+
+    def test_nested_blocks_and_functions(self):
+        code = "funcao f()\nse a entao\nfuncao g()\nfim_funcao\nfim_se\nfim_funcao\nmostrar 1\nfuncao h()\nfim_funcao"
+        spans = split_functions(code)
+        assert [code[start:end].split()[1] for start, end in spans] == ["f()", "h()"]
+        assert all(code[start:end].endswith("fim_funcao") for start, end in spans)
+
+    def test_strings_comments_and_identifiers_are_skipped(self):
+        code = 'mostrar "funcao f()"\n# funcao g()\nx_se = funcao_b\nfuncao h()\nmostrar "fim_funcao"\nfim_funcao'
+        (span,) = split_functions(code)
+        assert code[span[0]:span[1]].startswith("funcao h()") and span[1] == len(code)
+
+    def test_unclosed_function_goes_to_the_end(self):
+        code = "funcao f()\nmostrar 1"
+        assert split_functions(code) == [(0, len(code))]
+
+
+class TestSameAsSequential:
+    """O resultado é idêntico ao parse sequencial"""
+
+    @pytest.mark.parametrize("engine", ["afd", "regex"])
+    def test_many_functions(self, pool, engine):
+        assert_same_as_sequential(functions(60) + "\nmostrar f1(2)\n" + functions(5), pool, engine)
+
+    @pytest.mark.parametrize("code", [
+        # erros dentro das funções e entre elas
+        functions(4, "mostra x\nx = (1 2)\n") + "\nx y\n" + functions(3),
+        # fim_funcao faltando: a função engole as seguintes
+        functions(3).replace("fim_funcao", "", 1),
+        # statement anterior que avança por cima do início de uma função
+        "se a entao\n" + functions(5),
+        "mostrar (\n" + functions(3),
+        # terminadores soltos e função no fim do código
+        "fim_se\n" + functions(3) + "\nfim_funcao",
+        functions(2) + "\nfuncao g(",
+    ])
+    def test_errors(self, pool, code):
+        assert_same_as_sequential(code, pool)
+
+    def test_error_cap_is_applied_at_the_end(self, pool):
+        code = functions(MAX_ERRORS, "x = )\nx = )\n")
+        program = parse_parallel(code, executor=pool, min_bytes=0)
+        assert len(program._errors) == MAX_ERRORS + 1
+        assert_same_as_sequential(code, pool)
+
+    def test_lexical_error_is_the_same(self, pool):
+        code = functions(10) + "\nx = 1 @ 2\n" + functions(10, BODY + "y = 3 @ 4\n")
+        with pytest.raises(ParseError) as sequential:
+            parse_brasilscript(code)
+        with pytest.raises(ParseError) as parallel:
+            parse_parallel(code, executor=pool, min_bytes=0)
+        assert str(parallel.value) == str(sequential.value)
+
+    def test_function_results_are_used(self, pool, monkeypatch):
+        produced = []
+        parse_functions = parallel_module._parse_functions
+
+        def spy(*args):
+            results = parse_functions(*args)
+            produced.append(len(results))
+            return results
+        monkeypatch.setattr(parallel_module, "_parse_functions", spy)
+        assert_same_as_sequential("mostrar 1\n" + functions(30), pool)
+        assert produced == [30]
+
+    def test_small_sources_are_parsed_in_process(self):
+        code = functions(3)
+        assert parse_parallel(code, executor=object()) == parse_brasilscript(code)
+
+    def test_process_pool(self):
+        code = functions(40)
+        with ProcessPoolExecutor(2) as executor:
+            program = parse_parallel(code, executor=executor, min_bytes=0)
+        assert offsets(program) == offsets(parse_brasilscript(code))
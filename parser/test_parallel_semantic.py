@@ -0,0 +1,70 @@
+"""
+Testes da análise semântica com os corpos das funções em paralelo (parser/parallel_semantic.py)
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import pytest
+
+from parser.brasilscript_parser import parse_brasilscript
+import parser.parallel_semantic as parallel_semantic_module
+from parser.parallel_semantic import analyze_parallel
+from parser.semantic import SemanticAnalyzer
+from parser.testing import functions
+
+
+def assert_same_as_sequential(code, pool, workers=3):
+    program = parse_brasilscript(code)
+    expected = SemanticAnalyzer().analyze(program)
+    assert analyze_parallel(program, workers, executor=pool, min_functions=0) == expected
+    return expected
+
+
+class TestAnalyzeParallel:
+    """Mesmos erros, na mesma ordem, que a análise sequencial"""
+
+    def test_errors_interleaved_with_top_level(self, pool):
+        code = "mostrar z\n" + functions(10) + "\ndeclarar y como numero\n" + functions(10) + "\nmostrar w"
+        errors = assert_same_as_sequential(code, pool)
+        assert errors[0] == "Identificador não declarado: 'z'" and errors[-1] == "Identificador não declarado: 'w'"
+
+    def test_bodies_see_all_globals(self, pool):
+        # os corpos são checados depois do nível superior: k e g já estão declarados
+        code = "funcao f(a)\nmostrar k\nretornar g(1)\nfim_funcao\ndeclarar k como texto\nfuncao g(a)\nretornar k * f(a)\nfim_funcao"
+        assert assert_same_as_sequential(code, pool) == [
+            "Operador '*' requer operandos 'numero', encontrados texto e any",
+        ]
+
+    def test_redeclarations(self, pool):
+        code = "declarar f1 como numero\n" + functions(3) + "\n" + functions(2) + "\nfuncao h(a, a)\nfim_funcao"
+        assert len(assert_same_as_sequential(code, pool)) > 3
+
+    def test_nested_functions_in_top_level_blocks(self, pool):
+        assert_same_as_sequential("se 1 entao\n" + functions(3) + "\nfim_se\n" + functions(3), pool)
+
+    def test_process_pool(self):
+        program = parse_brasilscript(functions(20))
+        with ProcessPoolExecutor(2) as executor:
+            errors = analyze_parallel(program, 2, executor=executor, min_functions=0)
+        assert errors == SemanticAnalyzer().analyze(program)
+
+    @pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="sem fork")
+    def test_forked_workers_use_the_shared_functions(self, monkeypatch):
+        # os workers herdam o módulo já alterado: um lote serializado falharia
+        def refuse(*args):
+            raise AssertionError("o pool com fork não deveria serializar as funções")
+        monkeypatch.setattr(parallel_semantic_module, "_check_batch", refuse)
+        code = "mostrar z\n" + functions(10) + "\ndeclarar y como numero\n" + functions(10, "retornar a + q\n")
+        program = parse_brasilscript(code)
+        errors = analyze_parallel(program, workers=2, min_functions=0)
+        assert errors == SemanticAnalyzer().analyze(program)
+        assert errors[-1] == "Identificador não declarado: 'q'"
+
+    def test_small_programs_are_analyzed_in_process(self):
+        class Refuse:
+            def submit(self, *args):
+                raise AssertionError("não deveria usar o pool")
+
+        program = parse_brasilscript(functions(3))
+        assert analyze_parallel(program, executor=Refuse()) == SemanticAnalyzer().analyze(program)
@@ -0,0 +1,79 @@
+"""
+Testes do parser de expressões por precedência (Pratt) do BrasilScript
+"""
+
+from parser.brasilscript_parser import (
+    parse_brasilscript, BinaryOperation, UnaryOperation, Literal, Identifier,
+    FunctionCall, IndexAccess,
+)
+
+
+def condition_of(code):
+    ast = parse_brasilscript(f"se {code} entao\nfim_se")
+    assert ast._errors == []
+    return ast.statements[0].condition
+
+
+def value_of(code, engine="afd"):
+    ast = parse_brasilscript(f"x = {code}", engine=engine)
+    assert ast._errors == []
+    return ast.statements[0].value
+
+
+def B(left, op, right):
+    return BinaryOperation(left, op, right)
+
+
+def I(name):
+    return Identifier(name)
+
+
+def N(value):
+    return Literal(value, "numero")
+
+
+class TestArithmeticPrecedence:
+    """Operadores aritméticos associam à esquerda, '*' '/' '%' antes de '+' '-'"""
+
+    def test_multiplicative_binds_tighter(self):
+        assert value_of("2 + 3 * 4 - 1") == B(B(N(2), "+", B(N(3), "*", N(4))), "-", N(1))
+
+    def test_left_associative(self):
+        assert value_of("a - b - c") == B(B(I("a"), "-", I("b")), "-", I("c"))
+        # '%' só é reconhecido pelo lexer por regex
+        assert value_of("a / b % c", engine="regex") == B(B(I("a"), "/", I("b")), "%", I("c"))
+
+    def test_unary_minus_binds_to_factor(self):
+        assert value_of("-a * -b") == B(UnaryOperation("-", I("a")), "*", UnaryOperation("-", I("b")))
+        assert value_of("- -1") == UnaryOperation("-", UnaryOperation("-", N(1)))
+
+    def test_parentheses_and_postfix(self):
+        assert value_of("(a + b) * l[0]") == B(B(I("a"), "+", I("b")), "*", IndexAccess(I("l"), N(0)))
+        assert value_of("f(a + 1, 2)") == FunctionCall("f", [B(I("a"), "+", N(1)), N(2)])
+
+
+class TestConditionPrecedence:
+    """ou < e < nao < relacionais < aritméticos"""
+
+    def test_or_and(self):
+        assert condition_of("a ou b e c") == B(I("a"), "ou", B(I("b"), "e", I("c")))
+        assert condition_of("a e b ou c") == B(B(I("a"), "e", I("b")), "ou", I("c"))
+
+    def test_relational_over_arithmetic(self):
+        assert condition_of("a + 1 > b * 2") == B(B(I("a"), "+", N(1)), ">", B(I("b"), "*", N(2)))
+
+    def test_nao_negates_primary_condition(self):
+        assert condition_of("nao a == b e c") == B(UnaryOperation("nao", B(I("a"), "==", I("b"))), "e", I("c"))
+
+    def test_parenthesized_condition(self):
+        assert condition_of("(a ou b) e c") == B(B(I("a"), "ou", I("b")), "e", I("c"))
+        assert condition_of("nao (a ou b)") == UnaryOperation("nao", B(I("a"), "ou", I("b")))
+
+    def test_relational_is_not_associative(self):
+        ast = parse_brasilscript("se a < b < c entao\nfim_se")
+        assert ast.statements[0].condition == B(I("a"), "<", I("b"))
+        assert ast._errors[0] == "Esperado 'entao', encontrado '<'"
+
+    def test_expression_context_has_no_logic(self):
+        ast = parse_brasilscript("x = nao a")
+        assert ast._errors[0] == "Fator inesperado: 'nao'"
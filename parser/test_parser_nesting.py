@@ -0,0 +1,85 @@
+"""
+Testes de aninhamento profundo (parser sem recursão)
+
+A profundidade usada passa bastante do limite de recursão do Python. Os nós
+são inspecionados com `walk` (iterativo): comparar ou fazer repr de árvores
+tão fundas com == ainda recursaria nos __eq__/__repr__ das dataclasses.
+"""
+
+import sys
+
+import pytest
+
+from parser.ast import (
+    walk, BinaryOperation, FunctionCall, FunctionDecl, Identifier, IfStatement,
+    IndexAccess, ListLiteral, Literal, PrintStatement, UnaryOperation, WhileStatement,
+)
+from parser.brasilscript_parser import parse_brasilscript
+
+DEPTH = sys.getrecursionlimit() * 20
+
+
+def kinds(program):
+    counts = {}
+    for node in walk(program):
+        counts[type(node)] = counts.get(type(node), 0) + 1
+    return counts
+
+
+class TestDeepExpressions:
+    """Expressões aninhadas são limitadas só pela memória"""
+
+    @pytest.mark.parametrize("code, node_type, count", [
+        ("mostrar " + "(" * DEPTH + "1" + ")" * DEPTH, Literal, 1),
+        ("mostrar " + "-" * DEPTH + "1", UnaryOperation, DEPTH),
+        ("se " + "nao (" * DEPTH + "a" + ")" * DEPTH + " entao\nfim_se", UnaryOperation, DEPTH),
+        ("mostrar " + "1 + (" * DEPTH + "1" + ")" * DEPTH, BinaryOperation, DEPTH),
+        ("mostrar " + "[" * DEPTH + "1" + "]" * DEPTH, ListLiteral, DEPTH),
+        ("mostrar " + "f(" * DEPTH + "1" + ")" * DEPTH, FunctionCall, DEPTH),
+        ("mostrar " + "l[" * DEPTH + "0" + "]" * DEPTH, IndexAccess, DEPTH),
+    ])
+    def test_deep_expression(self, code, node_type, count):
+        program = parse_brasilscript(code)
+        assert program._errors == []
+        assert kinds(program)[node_type] == count
+
+    def test_offsets_of_nested_operands(self):
+        code = "mostrar " + "1 + (" * DEPTH + "2" + ")" * DEPTH
+        program = parse_brasilscript(code)
+        node = program.statements[0].expressions[0]
+        while isinstance(node, BinaryOperation):
+            assert code[node.offset] == "1"
+            node = node.right
+        assert node == Literal(2, "numero") and code[node.offset] == "2"
+
+    def test_deep_list_type(self):
+        code = "declarar l como " + "lista[" * DEPTH + "numero" + "]" * DEPTH
+        decl = parse_brasilscript(code).statements[0]
+        assert decl.type_name == "lista[" * DEPTH + "numero" + "]" * DEPTH
+
+    def test_unclosed_parentheses_report_one_error(self):
+        program = parse_brasilscript("mostrar " + "(" * DEPTH + "1")
+        assert program._errors == ["Esperado ')', encontrado ''"]
+
+
+class TestDeepBlocks:
+    """Blocos aninhados usam a pilha de `_parse_nested`"""
+
+    def test_deep_if(self):
+        code = "se a entao\nmostrar 1\n" * DEPTH + "fim_se\n" * DEPTH
+        program = parse_brasilscript(code)
+        assert program._errors == []
+        counts = kinds(program)
+        assert counts[IfStatement] == counts[PrintStatement] == DEPTH
+
+    def test_deep_mixed_blocks(self):
+        half = DEPTH // 2
+        code = "enquanto a faca\nfuncao f()\n" * half + "fim_funcao\nfim_enquanto\n" * half
+        counts = kinds(parse_brasilscript(code))
+        assert counts[WhileStatement] == counts[FunctionDecl] == half
+
+    def test_missing_terminators(self):
+        program = parse_brasilscript("se a entao\n" * DEPTH)
+        # os demais fim_se faltando são cascata do primeiro
+        assert program._errors == ["Esperado 'fim_se', encontrado ''"]
+        assert isinstance(program.statements[0].condition, Identifier)
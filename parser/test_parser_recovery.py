@@ -0,0 +1,82 @@
+"""
+Testes da recuperação de erros (modo pânico com conjuntos FIRST/FOLLOW)
+"""
+
+from parser.ast import Assignment, FunctionDecl, IfStatement, PrintStatement, ReturnStatement
+from parser.brasilscript_parser import (
+    BrasilScriptParser, Token, MAX_ERRORS, TOO_MANY_ERRORS, parse_brasilscript,
+)
+
+
+class TestSynchronization:
+    """Um erro é reportado uma vez e o parse continua no próximo statement"""
+
+    def test_else_branches_are_parsed(self):
+        code = "se a entao\nmostrar 1\nsenao_se b entao\nmostrar 2\nsenao\nmostrar 3\nfim_se"
+        program = parse_brasilscript(code)
+        assert program._errors == []
+        stmt = program.statements[0]
+        assert len(stmt.else_ifs) == 1 and len(stmt.else_block) == 1
+
+    def test_invalid_line_reports_one_error(self):
+        program = parse_brasilscript("mostra x + 1 * 2\nmostrar 1")
+        assert program._errors == ["token invalido, digite da forma correta: IDENTIFICADOR = 'mostra'"]
+        assert program.statements == parse_brasilscript("mostrar 1").statements
+
+    def test_sync_on_identifier_statement(self):
+        program = parse_brasilscript("x y z\nx = 1\nf(2)")
+        assert len(program._errors) == 1
+        assert [type(s).__name__ for s in program.statements] == ["Assignment", "FunctionCall"]
+
+    def test_missing_terminator_does_not_cascade(self):
+        code = "funcao f(a)\nse a entao\nmostrar a\nfim_funcao\nmostrar 1"
+        program = parse_brasilscript(code)
+        assert program._errors == ["Esperado 'fim_se', encontrado 'fim_funcao'"]
+        decl, after = program.statements
+        assert isinstance(decl, FunctionDecl) and isinstance(decl.body[0], IfStatement)
+        assert isinstance(after, PrintStatement)
+
+    def test_stray_terminators_at_top_level(self):
+        program = parse_brasilscript("mostrar 1\nfim_se\nsenao\nmostrar 2")
+        assert program._errors == [
+            "token invalido, digite da forma correta: PALAVRA_CHAVE = 'fim_se'",
+            "token invalido, digite da forma correta: PALAVRA_CHAVE = 'senao'",
+        ]
+        assert len(program.statements) == 2
+
+    def test_return_without_value_before_statement(self):
+        code = "funcao f()\nretornar\nmostrar 1\nfim_funcao"
+        body = parse_brasilscript(code).statements[0].body
+        assert isinstance(body[0], ReturnStatement) and body[0].value is None
+        assert isinstance(body[1], PrintStatement)
+
+    def test_errors_are_capped(self):
+        program = parse_brasilscript("x = )\n" * (MAX_ERRORS * 3))
+        assert len(program._errors) == MAX_ERRORS + 1
+        assert program._errors[-1] == TOO_MANY_ERRORS.format(limit=MAX_ERRORS)
+        assert all(isinstance(s, Assignment) for s in program.statements)
+
+
+class TestConsumeRecovery:
+    """consume descarta um token sobrando ou assume um token faltando"""
+
+    def test_extra_token_is_deleted(self):
+        program = parse_brasilscript("x = (1 2)\nmostrar x")
+        assert program._errors == ["Esperado ')', encontrado '2'"]
+        assert program.statements == parse_brasilscript("x = (1)\nmostrar x").statements
+
+    def test_missing_token_is_inserted(self):
+        program = parse_brasilscript("se a\nmostrar 1\nfim_se")
+        assert program._errors == ["Esperado 'entao', encontrado 'mostrar'"]
+        assert program.statements == parse_brasilscript("se a entao\nmostrar 1\nfim_se").statements
+
+    def test_cascade_ends_on_next_match(self):
+        tokens = [Token("OP", "+"), Token("OP", "+"), Token("IDENTIFICADOR", "x"), Token("OP", "+")]
+        parser = BrasilScriptParser(tokens)
+        parser.consume("(")
+        parser.consume(")")
+        assert parser.errors == ["Esperado '(', encontrado '+'"]
+        parser.current = 2
+        parser.consume("IDENTIFICADOR")
+        parser.consume(")")
+        assert parser.errors == ["Esperado '(', encontrado '+'", "Esperado ')', encontrado '+'"]
@@ -0,0 +1,53 @@
+"""
+Testes do parse em fluxo (parse_stream / TokenBuffer)
+"""
+
+import os
+
+import pytest
+
+from parser.brasilscript_parser import (
+    parse_brasilscript, parse_stream, iter_source_tokens, TokenBuffer, ParseError,
+)
+from parser.testing import EXEMPLOS, offsets, read
+
+
+class TestParseStream:
+    """parse_stream gera os mesmos statements que parse_brasilscript"""
+
+    @pytest.mark.parametrize("path", EXEMPLOS, ids=os.path.basename)
+    def test_examples(self, path):
+        code = read(path)
+        program = parse_brasilscript(code)
+        errors = []
+        statements = list(parse_stream(code, errors=errors))
+        assert statements == program.statements
+        assert offsets(*statements) == offsets(*program.statements)
+        assert errors == program._errors
+
+    @pytest.mark.parametrize("code", [
+        "x y z\nmostrar 1",
+        "parar\nmostrar\nfim_se\nmostrar 2",
+        "funcao f(a)\n retornar a\n",
+        "f(1, [1,2], -x)\nx = 1",
+    ])
+    def test_errors_and_early_stop(self, code):
+        program = parse_brasilscript(code)
+        errors = []
+        assert list(parse_stream(code, errors=errors)) == program.statements
+        assert errors == program._errors
+
+    def test_statements_are_yielded_before_lexing_the_rest(self):
+        stream = parse_stream("mostrar 1\nmostrar 2\n@")
+        assert next(stream) == parse_brasilscript("mostrar 1").statements[0]
+        with pytest.raises(ParseError):
+            list(stream)
+
+    def test_buffer_keeps_only_the_current_statement(self):
+        code = "".join(f"x = {i} + {i}\n" for i in range(100))
+        tokens = TokenBuffer(iter_source_tokens(code))
+        assert tokens[7].value == "1"
+        tokens.release(5)
+        assert len(tokens._tokens) == 3
+        assert [tokens[i].value for i in range(5, 8)] == ["x", "=", "1"]
+        assert tokens[10 ** 6].type == "EOF"
@@ -0,0 +1,59 @@
+"""
+Testes dos ids internados de tokens e do despacho do BrasilScriptParser
+"""
+
+from parser.brasilscript_parser import (
+    BrasilScriptParser, Token, KIND_IDS, VALUE_IDS, K_EOF, K_IDENTIFICADOR,
+    V_FIM_SE, BLOCK_TERMINATORS, parse_brasilscript, Declaration, FunctionDecl,
+)
+
+
+class TestTokenInterning:
+    """Tipos e lexemas fixos viram inteiros na criação do token"""
+
+    def test_kind_and_sym_ids(self):
+        tok = Token("PALAVRA_CHAVE", "fim_se")
+        assert tok.kind == KIND_IDS["PALAVRA_CHAVE"]
+        assert tok.sym == V_FIM_SE
+        assert tok.sym in BLOCK_TERMINATORS
+
+    def test_identifier_has_no_sym(self):
+        # identificadores com nome de tipo de token não podem colidir com ids
+        tok = Token("IDENTIFICADOR", "EOF")
+        assert tok.kind == K_IDENTIFICADOR
+        assert tok.sym == 0
+
+    def test_kind_and_value_ranges_are_disjoint(self):
+        assert not set(KIND_IDS.values()) & set(VALUE_IDS.values())
+
+    def test_match_accepts_ids_and_names(self):
+        parser = BrasilScriptParser([Token("OP", "="), Token("EOF", "")])
+        assert parser.match(VALUE_IDS["="])
+        assert parser.match("=")
+        assert parser.match(["+", "="])
+        assert not parser.match(K_EOF)
+
+    def test_consume_error_messages(self):
+        tokens = [Token("OP", "+"), Token("OP", "+"), Token("EOF", "")]
+        parser = BrasilScriptParser(tokens)
+        parser.consume(K_IDENTIFICADOR)
+        assert parser.errors == ["Esperado token IDENTIFICADOR, encontrado OP: '+'"]
+        parser = BrasilScriptParser(tokens)
+        parser.consume("fim_se")
+        assert parser.errors == ["Esperado 'fim_se', encontrado '+'"]
+
+
+class TestStatementDispatch:
+    """Statements são despachados pela palavra-chave inicial"""
+
+    def test_keyword_dispatch(self):
+        ast = parse_brasilscript("declarar x como numero\nfuncao f()\nparar\nfim_funcao")
+        assert isinstance(ast.statements[0], Declaration)
+        assert isinstance(ast.statements[1], FunctionDecl)
+        assert ast.statements[1].body == []
+        assert ast._errors == []
+
+    def test_non_statement_keyword_is_reported(self):
+        ast = parse_brasilscript("entao")
+        assert ast.statements == []
+        assert ast._errors == ["token invalido, digite da forma correta: PALAVRA_CHAVE = 'entao'"]
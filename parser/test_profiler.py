@@ -0,0 +1,92 @@
+"""
+Testes do profiler por regra (parser/profiler.py)
+"""
+
+import io
+import itertools
+
+from parser.brasilscript_parser import parse_brasilscript, tokenize_source
+from parser.profiler import ParseProfile, ProfiledParser, RuleTracer, profile_parse
+
+NESTED = "se a entao\nse b entao\nmostrar 1\nfim_se\nsenao\nx = 2\nfim_se"
+
+
+def tick_profile():
+    # relógio que avança 1 a cada leitura: tempos determinísticos
+    return ParseProfile(clock=itertools.count().__next__)
+
+
+class TestParseProfile:
+    """Contadores por regra e pilhas folded"""
+
+    def test_same_ast_as_parser(self):
+        code = NESTED + "\nmostra 1\nfuncao f(a)\nretornar a\nfim_funcao"
+        program, _ = profile_parse(code)
+        manual = parse_brasilscript(code)
+        assert program == manual and program._errors == manual._errors
+
+    def test_calls_and_tokens(self):
+        _, profile = profile_parse("mostrar 1\nmostrar 2 + 3")
+        rules = profile.rules
+        assert rules["parse"].calls == 1 and rules["parse"].tokens == 6
+        assert rules["parse_statement"].calls == 2
+        assert rules["parse_print_statement"].tokens == 6
+        assert rules["parse_expression"].tokens == 4
+
+    def test_blocks_are_frames_from_open_to_close(self):
+        _, profile = profile_parse(NESTED, profile=tick_profile())
+        stats = profile.rules["parse_if_statement"]
+        # o `se` de dentro não soma de novo os tokens do de fora
+        assert stats.calls == 2 and stats.tokens == len(tokenize_source(NESTED)) - 1
+        assert ("parse", "parse_statement", "parse_if_statement", "parse_if_statement",
+                "parse_statement", "parse_print_statement") in profile.stacks
+        assert ("parse", "parse_statement", "parse_if_statement", "parse_statement",
+                "parse_assignment") in profile.stacks
+
+    def test_self_times_add_up_to_the_root(self):
+        _, profile = profile_parse(NESTED + "\nx = (1 + 2) * 3", profile=tick_profile())
+        total = profile.rules["parse"].total_ns
+        assert sum(stats.self_ns for stats in profile.rules.values()) == total
+        assert sum(profile.stacks.values()) == total
+        lines = profile.folded().splitlines()
+        assert all(line.split(" ")[0].startswith("parse") for line in lines)
+        assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == total
+
+    def test_errors_go_to_the_rule_that_produced_them(self):
+        _, profile = profile_parse("mostra 1\nx = (1 2)\nmostrar 3")
+        rules = profile.rules
+        assert rules["parse_statement"].errors == 1
+        assert rules["parse_operators"].errors == 1
+        assert rules["parse"].errors == 0
+
+    def test_report_lists_every_rule(self):
+        _, profile = profile_parse(NESTED)
+        report = profile.report()
+        for rule in profile.rules:
+            assert rule in report
+
+
+class TestRuleTracer:
+    """Ganchos de rastreamento"""
+
+    def test_trace_is_indented_by_rule(self):
+        out = io.StringIO()
+        ProfiledParser(tokenize_source("se a entao\nmostrar 1\nfim_se"), [RuleTracer(out)]).parse()
+        assert out.getvalue().splitlines() == [
+            "parse 'se' @ 0",
+            "  parse_statement 'se' @ 0",
+            "    parse_if_statement 'se' @ 0",
+            "      parse_condition 'a' @ 3",
+            "        parse_operators 'a' @ 3",
+            "      parse_statement 'mostrar' @ 11",
+            "        parse_print_statement 'mostrar' @ 11",
+            "          parse_expression '1' @ 19",
+            "            parse_operators '1' @ 19",
+        ]
+
+    def test_several_hooks(self):
+        profile = ParseProfile()
+        out = io.StringIO()
+        ProfiledParser(tokenize_source("mostrar 1"), [profile, RuleTracer(out)]).parse()
+        assert profile.rules["parse_print_statement"].calls == 1
+        assert "parse_print_statement" in out.getvalue()
@@ -0,0 +1,173 @@
+"""
+Testes da tabela de símbolos com escopos (parser/scopes.py) e da checagem
+de escopos, corpos de função e slots de frame na análise semântica
+(parser/semantic.py)
+"""
+
+import pytest
+
+from parser.ast import Identifier, structural_hash, walk
+from parser.brasilscript_parser import parse_brasilscript
+from parser.scopes import SymbolTable
+from parser.semantic import SemanticAnalyzer
+
+
+def analyze(code):
+    return SemanticAnalyzer().analyze(parse_brasilscript(code))
+
+
+class TestSymbolTable:
+    """Escopos aninhados"""
+
+    def test_shadowing_and_pop(self):
+        symbols = SymbolTable()
+        symbols.declare("x", "numero")
+        symbols.push_scope()
+        assert symbols.lookup("x").type == "numero"
+        assert symbols.declare("x", "texto").depth == 1
+        assert symbols.lookup("x").type == "texto"
+        symbols.pop_scope()
+        assert symbols.lookup("x").type == "numero" and symbols.depth == 0
+
+    def test_redeclaration_only_in_same_scope(self):
+        symbols = SymbolTable()
+        assert symbols.declare("x", "numero") is not None
+        assert symbols.declare("x", "texto") is None
+        assert symbols.lookup("x").type == "numero"
+
+    def test_names_disappear_with_their_scope(self):
+        symbols = SymbolTable()
+        symbols.push_scope()
+        symbols.declare("y", "logico")
+        symbols.pop_scope()
+        assert symbols.lookup("y") is None and "y" not in symbols and len(symbols) == 0
+
+    def test_global_symbols_under_shadowing(self):
+        symbols = SymbolTable()
+        symbols.declare("x", "numero")
+        symbols.declare("f", "funcao")
+        symbols.push_scope()
+        symbols.declare("x", "texto")
+        assert [(s.name, s.type) for s in symbols.global_symbols()] == [("x", "numero"), ("f", "funcao")]
+
+    def test_global_scope_cannot_be_popped(self):
+        with pytest.raises(IndexError):
+            SymbolTable().pop_scope()
+        with pytest.raises(IndexError):
+            SymbolTable().pop_frame()
+
+    def test_frames_and_slot_reuse(self):
+        symbols = SymbolTable()
+        assert symbols.declare("g", "numero").slot == (0, 0)
+        assert symbols.declare("f", "funcao", slot=False).slot is None
+        symbols.push_frame()
+        assert symbols.declare("a", "any").slot == (1, 0) and symbols.frame_depth == 1
+        symbols.push_scope()
+        assert symbols.declare("b", "numero").slot == (1, 1)
+        symbols.declare("c", "numero")
+        symbols.pop_scope()
+        # os slots do bloco fechado são reusados
+        assert symbols.declare("d", "texto").slot == (1, 1)
+        assert symbols.pop_frame() == 3
+        assert symbols.frame_depth == 0 and symbols.declare("h", "numero").slot == (0, 1)
+        assert symbols.frame_size == 2
+
+
+class TestScopes:
+    """Blocos e funções abrem escopos"""
+
+    def test_function_body_is_checked(self):
+        code = "funcao f(a, b)\ndeclarar s como texto = a\nretornar s - 1\nfim_funcao"
+        assert analyze(code) == ["Operador '-' requer operandos 'numero', encontrados texto e numero"]
+
+    def test_parameters_and_locals_are_local(self):
+        code = "funcao f(a)\ndeclarar t como numero = a * 2\nretornar t\nfim_funcao\nmostrar a, t"
+        assert analyze(code) == ["Identificador não declarado: 'a'", "Identificador não declarado: 't'"]
+
+    def test_duplicate_parameter(self):
+        assert analyze("funcao f(a, a)\nretornar a\nfim_funcao") == ["Parâmetro duplicado: 'a' na função 'f'"]
+
+    def test_recursion_and_globals(self):
+        code = "declarar base como numero = 1\nfuncao fat(n)\nse n <= 1 entao\nretornar base\nfim_se\nretornar n * fat(n - 1)\nfim_funcao\nmostrar fat(5)"
+        assert analyze(code) == []
+
+    def test_bodies_see_later_functions_and_globals(self):
+        code = ("funcao par(n)\nretornar impar(n - 1) + limite\nfim_funcao\n"
+                "funcao impar(n)\nretornar par(n - 1)\nfim_funcao\ndeclarar limite como numero = 10")
+        assert analyze(code) == []
+
+    def test_body_errors_in_source_order(self):
+        code = "mostrar a\nfuncao f()\nmostrar b\nfim_funcao\nmostrar c"
+        assert analyze(code) == [f"Identificador não declarado: '{name}'" for name in "abc"]
+        errors = SemanticAnalyzer(max_errors=2).analyze(parse_brasilscript(code))
+        assert [e.arguments for e in errors[:2]] == [("a",), ("b",)] and errors[2].code == "muitos_erros"
+
+    def test_block_scopes(self):
+        code = ("declarar x como numero\nse x > 0 entao\ndeclarar x como texto = \"a\"\ndeclarar y como numero\n"
+                "senao\ndeclarar y como logico\nfim_se\ny = 1")
+        assert analyze(code) == ["Identificador não declarado: 'y' na atribuição"]
+
+    def test_redeclaration_in_same_scope(self):
+        code = "funcao f()\ndeclarar x como numero\ndeclarar x como texto\nfim_funcao\nfuncao f()\nfim_funcao"
+        assert analyze(code) == ["Redeclaração: identificador 'x' já declarado", "Redeclaração: função 'f' já declarada"]
+
+    def test_for_each_variable_has_element_type(self):
+        code = "declarar l como lista[texto]\npara_cada item em l faca\nmostrar item - 1\nfim_para_cada\nmostrar item"
+        assert analyze(code) == ["Operador '-' requer operandos 'numero', encontrados texto e numero",
+                                 "Identificador não declarado: 'item'"]
+
+    def test_parameter_shadows_function(self):
+        code = "funcao g()\nretornar 1\nfim_funcao\nfuncao f(g)\nretornar g()\nfim_funcao"
+        assert analyze(code) == ["'g' não é uma função"]
+
+    def test_deep_nesting_and_many_functions(self):
+        depth = 300
+        code = ("declarar x como numero\n" + "se x > 0 entao\n" * depth + "x = verdadeiro\n" + "fim_se\n" * depth
+                + "\n".join(f"funcao f{i}(a)\nretornar a + f{i}(x)\nfim_funcao" for i in range(2000)))
+        assert analyze(code) == ["Incompatibilidade de tipos na atribuição para 'x': esperado numero, obtido logico"]
+
+
+def slots(program):
+    return [(node.name, node.slot) for node in walk(program) if isinstance(node, Identifier)]
+
+
+class TestSlots:
+    """Variáveis resolvidas para (profundidade do frame, índice)"""
+
+    def test_globals_parameters_and_locals(self):
+        program = parse_brasilscript(
+            "declarar x como numero = 1\n"
+            "funcao f(a, b)\ndeclarar c como numero = a * b\nretornar c + x\nfim_funcao\n"
+            "x = f(x, 2)\n")
+        assert SemanticAnalyzer().analyze(program) == []
+        decl, function, assign = program.statements
+        assert decl.slot == (0, 0) and assign.slot == (0, 0) and program.frame_size == 1
+        assert function.parameter_slots == [(1, 0), (1, 1)] and function.frame_size == 3
+        assert function.body[0].slot == (1, 2)
+        # os argumentos de uma chamada também são resolvidos
+        assert slots(program) == [("a", (1, 0)), ("b", (1, 1)), ("c", (1, 2)), ("x", (0, 0)), ("x", (0, 0))]
+
+    def test_shadowing_blocks_and_for_each(self):
+        program = parse_brasilscript(
+            "declarar x como numero\nse x > 0 entao\ndeclarar x como texto\nmostrar x\nfim_se\n"
+            "para_cada item em [1, 2] faca\nmostrar item, x\nfim_para_cada\nperguntar \"?\" guardar_em x\n")
+        SemanticAnalyzer().analyze(program)
+        _, if_stmt, for_each, ask = program.statements
+        assert if_stmt.then_block[0].slot == (0, 1) and for_each.slot == (0, 1) and ask.slot == (0, 0)
+        assert slots(program) == [("x", (0, 0)), ("x", (0, 1)), ("item", (0, 1)), ("x", (0, 0))]
+        assert program.frame_size == 2
+
+    def test_unresolved_names_and_duplicate_parameter(self):
+        program = parse_brasilscript("funcao f(a, a)\nretornar a + y\nfim_funcao\nz = f\n")
+        SemanticAnalyzer().analyze(program)
+        function, assign = program.statements
+        assert function.parameter_slots == [(1, 0), None] and function.frame_size == 1
+        # funções não ocupam slot
+        assert slots(program) == [("a", (1, 0)), ("y", None), ("f", None)] and assign.slot is None
+
+    def test_annotations_do_not_change_equality_or_hash(self):
+        code = "declarar x como numero = 1\nmostrar x + 1\n"
+        program = parse_brasilscript(code)
+        before = structural_hash(program)
+        SemanticAnalyzer().analyze(program)
+        assert program == parse_brasilscript(code) and structural_hash(program) == before
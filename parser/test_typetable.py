@@ -0,0 +1,47 @@
+"""
+Testes dos tipos internados da análise semântica (parser/typetable.py)
+"""
+
+from parser.brasilscript_parser import parse_brasilscript
+from parser.semantic import SemanticAnalyzer
+from parser.typetable import ANY, NUMERO, TEXTO, base_type, compatible, list_of, type_from_name
+
+
+class TestInterning:
+    """Um objeto por tipo"""
+
+    def test_base_types_are_unique(self):
+        assert base_type("numero") is NUMERO
+        assert type_from_name("texto") is TEXTO
+
+    def test_list_types_are_unique(self):
+        nested = type_from_name("lista[lista[numero]]")
+        assert nested is list_of(list_of(NUMERO))
+        assert nested.element.element is NUMERO and nested.is_list
+        assert not NUMERO.is_list
+
+    def test_name_matches_source(self):
+        assert str(list_of(list_of(TEXTO))) == "lista[lista[texto]]"
+        assert str(type_from_name("lista")) == "lista" and type_from_name("lista").element is None
+
+
+class TestCompatible:
+    """Mesma relação da checagem antiga por strings"""
+
+    def test_rules(self):
+        numeros = list_of(NUMERO)
+        assert compatible(NUMERO, NUMERO)
+        assert compatible(ANY, TEXTO) and compatible(TEXTO, ANY)
+        assert compatible(numeros, list_of(ANY)) and compatible(list_of(ANY), numeros)
+        assert not compatible(NUMERO, TEXTO)
+        assert not compatible(numeros, list_of(TEXTO))
+        assert not compatible(type_from_name("lista"), list_of(ANY))
+
+    def test_memoized(self):
+        numeros = list_of(NUMERO)
+        assert compatible(numeros, TEXTO) is compatible(numeros, TEXTO) is False
+
+    def test_messages_use_type_names(self):
+        code = "declarar m como lista[lista[texto]]\ndeclarar x como numero = m[0]"
+        errors = SemanticAnalyzer().analyze(parse_brasilscript(code))
+        assert len(errors) == 1 and "lista[texto]" in str(errors[0]) and "numero" in str(errors[0])
@@ -0,0 +1,81 @@
+"""
+Testes do despacho por tabela (parser/visitor.py) e dos passes que o usam
+"""
+
+from parser.ast import BinaryOperation, FunctionDecl, Identifier, Literal
+from parser.brasilscript_parser import parse_brasilscript
+from parser.lazy import parse_lazy
+from parser.semantic import SemanticAnalyzer
+from parser.visitor import NodeVisitor
+
+
+class Names(NodeVisitor):
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+
+    def visit_Identifier(self, node):
+        self.seen.append(node.name)
+
+    def visit_FunctionDecl(self, node):
+        self.seen.append(f"funcao {node.name}")
+        self.generic_visit(node)
+
+
+class TestNodeVisitor:
+    """Tabela classe -> método"""
+
+    def test_visit_and_generic_visit(self):
+        visitor = Names()
+        visitor.visit(parse_brasilscript("x = a + f(b)\nfuncao g(c)\nretornar [c, d]\nfim_funcao"))
+        assert visitor.seen == ["a", "b", "funcao g", "c", "d"]
+
+    def test_subclass_uses_base_method(self):
+        visitor = Names()
+        visitor.visit(parse_lazy("funcao g(c)\nmostrar c\nfim_funcao"))
+        assert visitor.seen == ["funcao g", "c"]
+
+    def test_table_is_filled_once_per_class(self):
+        visitor = Names()
+        visitor.visit(BinaryOperation(Identifier("a"), "+", Literal(1, "numero")))
+        table = visitor._visitors
+        assert table[Identifier] == visitor.visit_Identifier
+        assert table[Literal] == visitor.generic_visit
+        visitor.visit_Identifier = lambda node: None
+        visitor.visit(Identifier("b"))
+        # o método já resolvido continua na tabela
+        assert visitor.seen == ["a", "b"]
+
+    def test_several_tables(self):
+        class Pass(NodeVisitor):
+            def __init__(self):
+                super().__init__()
+                self.kinds = self.dispatch_table("kind_", lambda node: "outro")
+
+            def kind_Literal(self, node):
+                return "literal"
+
+        tables = Pass()
+        assert tables.kinds[Literal](Literal(1, "numero")) == "literal"
+        assert tables.kinds[FunctionDecl](FunctionDecl("f", [], [])) == "outro"
+        assert tables.kinds[type(None)](None) == "outro"
+
+
+class TestSemanticAnalyzer:
+    """A análise semântica despachada pela tabela"""
+
+    def test_errors(self):
+        code = ("declarar x como numero = \"a\"\ny = 1\nse x > \"b\" entao\nmostrar -verdadeiro\nfim_se\n"
+                "funcao f(a)\nretornar a\nfim_funcao\nx = f(1) + g(2)\nperguntar \"?\" guardar_em z")
+        assert SemanticAnalyzer().analyze(parse_brasilscript(code)) == [
+            "Incompatibilidade de tipos na inicialização de 'x': declarado numero, inicializado com texto",
+            "Identificador não declarado: 'y' na atribuição",
+            "Operador relacional '>' entre tipos incompatíveis: numero e texto",
+            "Operador unário '-' aplicado a tipo não-numérico: logico",
+            "Chamada para função não declarada: 'g'",
+            "Identificador não declarado: 'z' usado em 'perguntar'",
+        ]
+
+    def test_valid_program(self):
+        code = "declarar l como lista[numero] = [1, 2]\ndeclarar s como texto = \"a\" + \"b\"\nmostrar l[0] * 2, nao (l[1] < 3)"
+        assert SemanticAnalyzer().analyze(parse_brasilscript(code)) == []
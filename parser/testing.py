@@ -0,0 +1,35 @@
+"""
+Utilitários compartilhados pelos testes de parser/ (a fixture `pool` fica em conftest.py)
+"""
+
+import glob
+import os
+
+from parser.ast import walk
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXEMPLOS = sorted(glob.glob(os.path.join(ROOT, "exemplos", "*.bs")))
+
+# corpo com declaração, bloco aninhado, identificador não declarado (y) e chamada
+BODY = "declarar x como numero = a * 2\nse x > 1 entao\nmostrar y + 1\nfim_se\nretornar f0(x)\n"
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def functions(n, body=BODY):
+    """`n` funções de nível superior f0..f{n-1}(a), todas com o mesmo corpo"""
+    return "\n".join(f"funcao f{i}(a)\n{body}fim_funcao" for i in range(n))
+
+
+def offsets(*trees, classes=True):
+    """Offsets de todos os nós das árvores, em pré-ordem
+
+    Com `classes`, cada offset vem com o nome da classe do nó; sem, árvores
+    que só diferem no nome da classe (ex.: LazyFunctionDecl) comparam iguais.
+    """
+    if classes:
+        return [(type(node).__name__, getattr(node, "offset", None)) for tree in trees for node in walk(tree)]
+    return [getattr(node, "offset", None) for tree in trees for node in walk(tree)]
@@ -0,0 +1,118 @@
+"""
+Tabela de tipos da análise semântica: tipos internados
+
+Cada tipo existe uma única vez (`Type` compara por identidade): `numero`,
+`texto`, `logico`, `any`, `funcao` e, para cada tipo de elemento, uma única
+`lista[T]`, guardada no próprio tipo do elemento. Checar um tipo é uma
+comparação de ponteiros (`t is NUMERO`), o tipo do elemento de uma lista é
+um campo (`t.element`) e a relação de compatibilidade é calculada uma vez
+por par de tipos e guardada (`compatible`).
+
+O texto de um tipo (`str(t)`, ex.: "lista[numero]") é o mesmo das
+mensagens de erro e das declarações: `type_from_name` converte o nome
+escrito em `declarar x como lista[numero]` no tipo, também com cache.
+
+Uso:
+    t = type_from_name("lista[numero]")
+    t is list_of(NUMERO)            # True
+    t.element is NUMERO             # True
+    compatible(t, list_of(ANY))     # True
+"""
+
+from typing import Dict, Optional, Tuple
+
+
+class Type:
+    """Tipo internado; crie com `base_type`, `list_of` ou `type_from_name`"""
+    __slots__ = ("kind", "element", "name", "_list")
+
+    def __init__(self, kind: str, element: Optional["Type"] = None):
+        self.kind = kind            # 'numero', 'texto', 'logico', 'any', 'funcao', 'lista', ...
+        self.element = element      # tipo dos elementos de uma lista (None em `lista` sem elemento)
+        self.name = f"lista[{element.name}]" if element is not None else kind
+        self._list: Optional[Type] = None
+
+    @property
+    def is_list(self) -> bool:
+        return self.kind == "lista"
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __repr__(self) -> str:
+        return f"Type({self.name})"
+
+    def __reduce__(self):
+        # em outro processo (ex.: erros vindos de um pool) o tipo volta internado
+        return type_from_name, (self.name,)
+
+
+# tipos básicos por nome (inclui os criados sob demanda, ex.: 'error' dos literais inválidos)
+_BASE: Dict[str, Type] = {}
+# nome escrito no código -> tipo
+_BY_NAME: Dict[str, Type] = {}
+# (declarado, inferido) -> compatível?
+_COMPATIBLE: Dict[Tuple[Type, Type], bool] = {}
+
+
+def base_type(kind: str) -> Type:
+    """Tipo básico único de nome `kind`"""
+    t = _BASE.get(kind)
+    if t is None:
+        t = _BASE[kind] = Type(kind)
+    return t
+
+
+NUMERO = base_type("numero")
+TEXTO = base_type("texto")
+LOGICO = base_type("logico")
+ANY = base_type("any")
+FUNCAO = base_type("funcao")
+
+
+def list_of(element: Type) -> Type:
+    """Tipo único `lista[element]`"""
+    t = element._list
+    if t is None:
+        t = element._list = Type("lista", element)
+    return t
+
+
+def type_from_name(name: str) -> Type:
+    """Tipo de um nome como os do parser ("numero", "lista[lista[texto]]")"""
+    t = _BY_NAME.get(name)
+    if t is None:
+        if name.startswith("lista[") and name.endswith("]"):
+            t = list_of(type_from_name(name[6:-1]))
+        else:
+            t = base_type(name)
+        _BY_NAME[name] = t
+    return t
+
+
+def compatible(declared: Type, inferred: Type) -> bool:
+    """Um valor do tipo `inferred` pode ir para um lugar do tipo `declared`? (memoizado)"""
+    if declared is inferred:
+        return True
+    key = (declared, inferred)
+    result = _COMPATIBLE.get(key)
+    if result is None:
+        result = _COMPATIBLE[key] = _compatible(declared, inferred)
+    return result
+
+
+def _compatible(declared: Type, inferred: Type) -> bool:
+    # permitir atribuir lista[any] para lista[T] e vice-versa (só no primeiro nível)
+    d_inner = declared.element
+    i_inner = inferred.element
+    if d_inner is not None and i_inner is not None:
+        if d_inner is ANY or i_inner is ANY or d_inner is i_inner:
+            return True
+    # permitir atribuição quando houver 'any'
+    return declared is ANY or inferred is ANY
+
+
+__all__ = [
+    "Type", "NUMERO", "TEXTO", "LOGICO", "ANY", "FUNCAO",
+    "base_type", "list_of", "type_from_name", "compatible",
+]
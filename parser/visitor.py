@@ -0,0 +1,78 @@
+"""
+Base dos passes sobre a AST com despacho por tabela
+
+Em vez de uma cadeia de `isinstance` (ou de comparações com
+`type(node).__name__`) a cada nó, um `NodeVisitor` despacha com uma
+consulta a um dicionário classe do nó -> método ligado. O método de uma
+classe é achado pelo nome, como no módulo `ast` do Python: com o prefixo
+"visit_", um `BinaryOperation` vai para `visit_BinaryOperation`. Subclasses
+de nó sem método próprio (ex.: `parser.lazy.LazyFunctionDecl`) usam o da
+classe base, seguindo o MRO, como faria o `isinstance`. A busca pelo nome é
+feita uma vez por classe de nó; as chamadas seguintes só consultam a tabela.
+
+Um passe pode ter várias tabelas, uma por prefixo (ex.: statements e
+expressões na análise semântica), criadas com `dispatch_table`. Em laços
+quentes, `table[node.__class__](node)` evita a chamada a mais de `visit`.
+
+Uso:
+    class Contador(NodeVisitor):
+        def visit_Identifier(self, node):
+            ...
+        def generic_visit(self, node):
+            for child in iter_child_nodes(node):
+                self.visit(child)
+
+`python -m parser.benchmark_despacho` compara o custo por nó com os
+despachos antigos.
+"""
+
+from typing import Any, Callable
+
+from parser.ast import iter_child_nodes
+
+
+class DispatchTable(dict):
+    """Classe do nó -> método ligado `<prefix><Classe>` do passe, preenchida no primeiro nó de cada classe
+
+    Consultada com `table[node.__class__](node)`; classes sem método vão para `default`.
+    """
+    __slots__ = ("owner", "prefix", "default")
+
+    def __init__(self, owner: Any, prefix: str, default: Callable[[Any], Any]):
+        super().__init__()
+        self.owner = owner
+        self.prefix = prefix
+        self.default = default
+
+    def __missing__(self, cls: type) -> Callable[[Any], Any]:
+        method = self.default
+        for klass in cls.__mro__:
+            found = getattr(self.owner, self.prefix + klass.__name__, None)
+            if found is not None:
+                method = found
+                break
+        self[cls] = method
+        return method
+
+
+class NodeVisitor:
+    """Base de passes sobre a AST: `visit(node)` chama `visit_<Classe>(node)` ou `generic_visit(node)`"""
+
+    def __init__(self):
+        self._visitors = self.dispatch_table("visit_", self.generic_visit)
+
+    def dispatch_table(self, prefix: str, default: Callable[[Any], Any]) -> DispatchTable:
+        """Tabela para os métodos `<prefix><Classe>` deste passe (ex.: uma para statements, outra para expressões)"""
+        return DispatchTable(self, prefix, default)
+
+    def visit(self, node):
+        return self._visitors[node.__class__](node)
+
+    def generic_visit(self, node) -> None:
+        """Visita os filhos de `node` (nada, para None)"""
+        if node is not None:
+            for child in iter_child_nodes(node):
+                self.visit(child)
+
+
+__all__ = ["DispatchTable", "NodeVisitor"]
@@ -3,13 +3,23 @@
 
 Uso:
     PYTHONPATH=. python3 run_parser.py exemplos/hello_world.bs
+
+Com `--cache-dir DIR` (ou a variável BRASILSCRIPT_CACHE_DIR) o AST de cada
+fonte fica em cache no diretório, indexado pelo conteúdo do arquivo.
+
+Com `--emit-llvm` as constantes são dobradas e propagadas antes do codegen
+(parser.folding); `--no-fold` gera o IR da AST como foi escrita.
 """
+import os
 import sys
 from pathlib import Path
 import subprocess
 import shutil
 
 from parser.brasilscript_parser import parse_brasilscript, ParseError
+from parser.diagnostics import Diagnostic
+from parser.folding import fold_constants
+from parser.cache import ParseCache
 from parser.semantic import SemanticAnalyzer
 from pprint import pprint
 from codegen import CodeGen
@@ -17,11 +27,12 @@ from codegen import CodeGen
 
 
 def main(argv):
-    # Suporta flags: --print-ast, --emit-llvm e --run
+    # Suporta flags: --print-ast, --emit-llvm, --run e --no-fold
     examples_dir = Path("exemplos")
     print_ast = False
     emit_llvm = False
     run_exec = False
+    fold = True
     # coleta argumentos da linha de comando depois do nome do programa
     cli_args = list(argv[1:])
     if '--print-ast' in cli_args:
@@ -33,6 +44,17 @@ def main(argv):
     if '--run' in cli_args:
         run_exec = True
         cli_args = [a for a in cli_args if a != '--run']
+    if '--no-fold' in cli_args:
+        fold = False
+        cli_args = [a for a in cli_args if a != '--no-fold']
+    cache_dir = os.environ.get('BRASILSCRIPT_CACHE_DIR')
+    if '--cache-dir' in cli_args:
+        idx = cli_args.index('--cache-dir')
+        if idx + 1 >= len(cli_args):
+            print("--cache-dir requer um diretório")
+            return 2
+        cache_dir = cli_args[idx + 1]
+        del cli_args[idx:idx + 2]
 
     if len(cli_args) >= 1:
         requested = Path(cli_args[0])
@@ -56,7 +78,7 @@ def main(argv):
                             print(" -", f)
                 return 2
     else:
-        print("Uso: PYTHONPATH=. python3 run_parser.py [--print-ast] [--emit-llvm] [--run] <arquivo.bs>")
+        print("Uso: PYTHONPATH=. python3 run_parser.py [--print-ast] [--emit-llvm] [--run] [--no-fold] [--cache-dir DIR] <arquivo.bs>")
         if examples_dir.exists() and examples_dir.is_dir():
             files = sorted([p.name for p in examples_dir.iterdir() if p.is_file() and p.suffix.lower() == ".bs"]) 
             if files:
@@ -73,7 +95,10 @@ def main(argv):
 
     # 1) Parse (captura erros léxicos/sintáticos)
     try:
-        ast = parse_brasilscript(code)
+        if cache_dir:
+            ast = ParseCache(cache_dir).parse(code)
+        else:
+            ast = parse_brasilscript(code)
     except ParseError as e:
         # Mensagem amigável já construída pelo parser
         print(f"Erro durante a análise: {e}")
@@ -90,7 +115,7 @@ def main(argv):
         if hasattr(ast, '_errors') and getattr(ast, '_errors'):
             print('\nErros encontrados durante o parse:')
             for err in getattr(ast, '_errors'):
-                print(' -', err)
+                print(' -', err.render(code, str(path)) if isinstance(err, Diagnostic) else err)
         else:
             print('\nNenhum erro de parse não-fatal registrado.')
         print('--- End AST ---\n')
@@ -100,13 +125,16 @@ def main(argv):
     if errors:
         print("Erros semânticos encontrados:")
         for err in errors:
-            print(f" - {err}")
+            print(f" - {err.render(code, str(path))}")
         return 3
 
     print("Compilação estática: OK (sem erros léxicos, sintáticos ou semânticos)")
     # emissão de LLVM IR
     if emit_llvm:
         try:
+            if fold:
+                # dobra e propaga as constantes antes de gerar o IR (parser.folding)
+                fold_constants(ast)
             cg = CodeGen()
             module = cg.generate(ast)
             out_name = Path(path).stem + '.ll'